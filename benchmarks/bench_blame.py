@@ -0,0 +1,70 @@
+"""
+Times the blame ownership cache: blaming every file of a repository once,
+then catching up after a few new commits, which should only blame the
+blobs those commits changed.
+
+Usage:
+    python benchmarks/bench_blame.py
+    BENCH_REPO=/path/to/large/repo BENCH_BLAME_JOBS=8 python benchmarks/bench_blame.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import create_repo  # noqa: E402
+from git_py_stats import blame  # noqa: E402
+
+
+def _timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<32} {time.perf_counter() - start:.2f}s")
+    return result
+
+
+def _commit_changes(repo: str, files: int) -> None:
+    """
+    Appends a unique line to a few tracked files and commits them.
+    """
+    paths = subprocess.run(
+        ["git", "-C", repo, "ls-files"], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    for i, path in enumerate(paths[:: max(1, len(paths) // files)][:files]):
+        with open(os.path.join(repo, path), "a") as f:
+            f.write(f"benchmark change {time.time()} {i}\n")
+    subprocess.run(
+        ["git", "-C", repo, "-c", "user.name=Bench", "-c", "user.email=bench@example.com"]
+        + ["commit", "-qam", "Benchmark change"],
+        check=True,
+    )
+
+
+def main() -> None:
+    repo = os.environ.get("BENCH_REPO") or create_repo(int(os.environ.get("BENCH_COMMITS", "5000")))
+    jobs = int(os.environ.get("BENCH_BLAME_JOBS", "0"))
+    os.chdir(repo)
+    print(f"repo: {repo}, jobs: {jobs or os.cpu_count()}")
+
+    conn = blame.open_index({"cache_dir": tempfile.mkdtemp(prefix="git-py-stats-blame-")})
+    files, blamed = _timed("cold run", lambda: blame.sync_blame(conn, "HEAD", jobs))
+    print(f"files: {len(files)}, blobs blamed: {blamed}")
+    _, blamed = _timed("re-run, nothing changed", lambda: blame.sync_blame(conn, "HEAD", jobs))
+    print(f"blobs blamed: {blamed}")
+
+    if not os.environ.get("BENCH_REPO"):
+        _commit_changes(repo, 5)
+        _, blamed = _timed(
+            "re-run after 5 changed files", lambda: blame.sync_blame(conn, "HEAD", jobs)
+        )
+        print(f"blobs blamed: {blamed}")
+    _timed("roll up by directory", lambda: blame.lines_by_directory(conn, files, 2))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
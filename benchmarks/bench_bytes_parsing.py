@@ -0,0 +1,116 @@
+"""
+Compares parsing git log --numstat output the way iter_commits used to,
+decoding every line to str and then splitting it, against reading it as
+bytes with commit_stream.parse_commit_records, which only decodes each
+distinct path once. The bytes parser reads the NUL framed (-z) log that
+iter_commits asks for. Both logs are captured up front so only parsing is
+timed, and the records are kept to show how much memory they hold.
+
+Usage:
+    python benchmarks/bench_bytes_parsing.py
+    BENCH_REPO=/path/to/large/repo python benchmarks/bench_bytes_parsing.py
+    BENCH_COMMITS=50000 BENCH_FILES_PER_COMMIT=40 python benchmarks/bench_bytes_parsing.py
+"""
+
+import io
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import create_repo  # noqa: E402
+from git_py_stats import commit_stream  # noqa: E402
+from git_py_stats.commit_stream import CommitRecord  # noqa: E402
+
+
+def _parse_text_lines(lines: Iterator[str]) -> Iterator[CommitRecord]:
+    """
+    The str based parser iter_commits used before, kept here as the baseline.
+    """
+    current: Optional[CommitRecord] = None
+    for line in lines:
+        if line.startswith(commit_stream.RECORD_SEP):
+            if current is not None:
+                yield current
+            parts = line[1:].split(commit_stream.FIELD_SEP, 7)
+            if len(parts) not in (7, 8):
+                current = None
+                continue
+            commit_hash, parents, author, email, author_date, committer_date, subject = parts[:7]
+            co_authors = parts[7].split(commit_stream.CO_AUTHOR_SEP) if len(parts) == 8 else []
+            timestamp, tz = commit_stream._parse_raw_date(author_date)
+            committer_timestamp, committer_tz = commit_stream._parse_raw_date(committer_date)
+            current = CommitRecord(
+                commit_hash,
+                tuple(parents.split()),
+                author,
+                email,
+                timestamp,
+                tz,
+                committer_timestamp,
+                committer_tz,
+                subject,
+                [],
+                tuple(value for value in co_authors if value.strip()),
+            )
+        elif current is not None and "\t" in line:
+            parts = line.split("\t", 2)
+            if len(parts) != 3:
+                continue
+            added, removed, path = parts
+            added_count = int(added) if added != "-" else 0
+            removed_count = int(removed) if removed != "-" else 0
+            current.files.append((added_count, removed_count, path))
+    if current is not None:
+        yield current
+
+
+def _parse_text(blob: bytes) -> List[CommitRecord]:
+    lines = io.TextIOWrapper(io.BytesIO(blob), encoding="utf-8", errors="surrogateescape")
+    return list(_parse_text_lines(line.rstrip("\n") for line in lines))
+
+
+def _parse_bytes(blob: bytes) -> List[CommitRecord]:
+    return list(commit_stream.parse_commit_records(blob.split(b"\x1e")))
+
+
+def _measure(label: str, func, blob: bytes, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        func(blob)
+        best = min(best, time.process_time() - start)
+
+    tracemalloc.start()
+    records = func(blob)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    paths = len({id(path) for record in records for _, _, path in record.files})
+    print(
+        f"{label:<20} cpu {best:.3f}s   records hold {held / 1024 / 1024:.1f} MiB"
+        f"   path strings {paths}"
+    )
+
+
+def main() -> None:
+    repo = os.environ.get("BENCH_REPO") or create_repo(
+        int(os.environ.get("BENCH_COMMITS", "20000")),
+        files=20000,
+        files_per_commit=int(os.environ.get("BENCH_FILES_PER_COMMIT", "20")),
+    )
+    cmd = ["git", "-C", repo, "log", commit_stream.LOG_FORMAT, "--date=raw", "--numstat"]
+    blob = subprocess.run(cmd, stdout=subprocess.PIPE, check=True).stdout
+    blob_z = subprocess.run([*cmd, "-z"], stdout=subprocess.PIPE, check=True).stdout
+    repeat = int(os.environ.get("BENCH_REPEAT", "5"))
+    print(f"repo: {repo}, log: {len(blob) / 1024 / 1024:.1f} MiB, best of {repeat}")
+
+    _measure("decode, then parse", _parse_text, blob, repeat)
+    _measure("parse bytes (-z)", _parse_bytes, blob_z, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Times the co-change counters on synthetic commit records, without git, to
+show they scale to a million commits without a quadratic blow-up.
+
+Usage:
+    python benchmarks/bench_cochanges.py
+    BENCH_COCHANGE_COMMITS=200000 python benchmarks/bench_cochanges.py
+"""
+
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git_py_stats import analyze_cmds  # noqa: E402
+from git_py_stats.commit_stream import CommitRecord  # noqa: E402
+
+
+def _history(commits: int, files: int = 50000):
+    """
+    Commits mostly touch files from one of many small modules, with the odd
+    bulk commit touching hundreds of files.
+    """
+    rng = random.Random(42)
+    paths = [f"src/mod{i // 8}/file{i % 8}.py" for i in range(files)]
+    for n in range(commits):
+        if n % 1000 == 0:
+            touched = rng.sample(paths, 500)
+        else:
+            module = rng.randrange(files // 8) * 8
+            touched = [paths[module + rng.randrange(8)] for _ in range(rng.randint(1, 6))]
+        yield CommitRecord(
+            str(n),
+            (),
+            "Dev",
+            "dev@example.com",
+            n,
+            "+0000",
+            n,
+            "+0000",
+            "",
+            [(1, 0, path) for path in touched],
+        )
+
+
+def _timed(label: str, func):
+    start = time.perf_counter()
+    paths, _, pairs = func()
+    print(
+        f"{label:<24} {time.perf_counter() - start:6.1f}s  {len(paths)} files, {len(pairs)} pairs"
+    )
+
+
+def main() -> None:
+    commits = int(os.environ.get("BENCH_COCHANGE_COMMITS", "1000000"))
+    print(f"commits: {commits}")
+    _timed(
+        "exact pair counts",
+        lambda: analyze_cmds._count_cochanges(_history(commits), lambda _s: False, 30, 3),
+    )
+    _timed(
+        "min-hash (sketch of 64)",
+        lambda: analyze_cmds._minhash_cochanges(_history(commits), lambda _s: False, 30, 3, 64),
+    )
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak memory: {peak:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Times the daily stats CSV export and reports its peak Python memory.
+
+Usage:
+    python benchmarks/bench_daily_stats_csv.py
+    BENCH_REPO=/path/to/large/repo python benchmarks/bench_daily_stats_csv.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import default_repo  # noqa: E402
+from git_py_stats import generate_cmds  # noqa: E402
+
+
+def main() -> None:
+    repo = os.path.abspath(default_repo())
+    config = {"merges": "--no-merges", "branch": "HEAD", "ignore_authors": lambda _s: False}
+
+    out_dir = tempfile.mkdtemp(prefix="git-py-stats-csv-")
+    os.chdir(repo)
+
+    # The exporter writes into the cwd, so point open() at a scratch dir
+    real_open = open
+
+    def run() -> None:
+        with patch(
+            "builtins.open",
+            lambda name, *a, **kw: real_open(os.path.join(out_dir, name), *a, **kw),
+        ), patch("builtins.print"):
+            generate_cmds.output_daily_stats_csv(config)
+
+    # Time without tracemalloc since it slows every allocation down
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with open(os.path.join(out_dir, "git_daily_stats.csv")) as f:
+        rows = sum(1 for _ in f) - 1
+    print(f"repo:      {repo}")
+    print(f"days:      {rows}")
+    print(f"time:      {elapsed:.2f}s")
+    print(f"peak heap: {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
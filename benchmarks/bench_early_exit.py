@@ -0,0 +1,67 @@
+"""
+Shows that the branch tree and reviewer suggestions cost the same no
+matter how long the history is, since git is stopped after the few
+commits they print. Reading the whole log is timed alongside to compare.
+
+Usage:
+    python benchmarks/bench_early_exit.py
+    BENCH_SIZES=10000,100000,500000 python benchmarks/bench_early_exit.py
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import create_repo  # noqa: E402
+from git_py_stats import list_cmds, suggest_cmds  # noqa: E402
+
+CONFIG = {
+    "since": "",
+    "until": "",
+    "merges": "--no-merges",
+    "log_options": "",
+    "pathspec": [],
+    "limit": 10,
+}
+
+
+def _timed(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _full_log() -> None:
+    subprocess.run(
+        ["git", "log", "--graph", "--all", "--pretty=%aN"], stdout=subprocess.PIPE, check=True
+    )
+
+
+def main() -> None:
+    sizes = [int(n) for n in os.environ.get("BENCH_SIZES", "5000,50000,200000").split(",")]
+    print(f"{'commits':>8} {'full log':>10} {'branch tree':>12} {'reviewers':>10}")
+    for size in sizes:
+        repo = create_repo(size)
+        os.chdir(repo)
+        # --graph needs a commit-graph to stop early, like 'git gc' would write
+        subprocess.run(["git", "commit-graph", "write", "--reachable"], check=True)
+        full = _timed(_full_log, repeat=1)
+        tree = _timed(lambda: list_cmds.branch_tree(CONFIG))
+        reviewers = _timed(lambda: suggest_cmds.suggest_reviewers(CONFIG))
+        print(f"{size:>8} {full:>8.1f}ms {tree:>10.1f}ms {reviewers:>8.1f}ms")
+        os.chdir("/")
+        shutil.rmtree(repo)
+
+
+if __name__ == "__main__":
+    main()
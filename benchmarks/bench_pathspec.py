@@ -0,0 +1,102 @@
+"""
+Times a report limited with _GIT_PATHSPEC without a commit-graph, with
+one but without its changed-path Bloom filters, and with both, for a few
+kinds of pathspec. The repository is copied first so the commit-graph
+written here never lands in $BENCH_REPO.
+
+git log only consults Bloom filters for some pathspecs, so the ones it
+can't use them for show up as the same time in the last two columns.
+
+Usage:
+    python benchmarks/bench_pathspec.py
+    BENCH_REPO=/path/to/large/repo BENCH_PATHSPECS="src;src docs;:(exclude)docs" \\
+        python benchmarks/bench_pathspec.py
+"""
+
+import contextlib
+import io
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import default_repo  # noqa: E402
+from git_py_stats import list_cmds  # noqa: E402
+
+CONFIG = {
+    "since": "",
+    "until": "",
+    "merges": "--no-merges",
+    "log_options": "",
+    "pathspec": ["--"],
+    "limit": 10,
+}
+
+# Passed to git through the environment, which every report's git inherits
+STATES = {
+    "no commit-graph": {"core.commitGraph": "false"},
+    "commit-graph": {"commitGraph.readChangedPaths": "false"},
+    "+ Bloom filters": {},
+}
+
+
+def _git_config_env(settings: Dict[str, str]) -> Dict[str, str]:
+    env = {"GIT_CONFIG_COUNT": str(len(settings))}
+    for i, (key, value) in enumerate(settings.items()):
+        env[f"GIT_CONFIG_KEY_{i}"] = key
+        env[f"GIT_CONFIG_VALUE_{i}"] = value
+    return env
+
+
+def _timed(pathspec: List[str], settings: Dict[str, str], repeat: int) -> float:
+    config = dict(CONFIG, pathspec=["--", *pathspec])
+    saved = dict(os.environ)
+    os.environ.update(_git_config_env(settings))
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                list_cmds.git_commits_per_year(config)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+    return best
+
+
+def main() -> None:
+    source = os.path.abspath(default_repo())
+    repo = tempfile.mkdtemp(prefix="git-py-stats-pathspec-")
+    subprocess.run(["git", "clone", "-q", "--no-local", source, repo], check=True)
+    os.chdir(repo)
+    subprocess.run(["git", "commit-graph", "write", "--reachable", "--changed-paths"], check=True)
+
+    # A directory and a file with history, unless given
+    latest = subprocess.run(
+        ["git", "log", "-1", "--format=", "--name-only"], stdout=subprocess.PIPE, text=True
+    ).stdout.split()[0]
+    directory = os.path.dirname(latest) or latest
+    default = f"{directory};{latest};{directory} {latest};:(exclude){directory}"
+    pathspecs = [
+        shlex.split(value) for value in os.environ.get("BENCH_PATHSPECS", default).split(";")
+    ]
+    repeat = int(os.environ.get("BENCH_REPEAT", "3"))
+    commits = subprocess.run(
+        ["git", "rev-list", "--count", "HEAD"], stdout=subprocess.PIPE, text=True
+    ).stdout.strip()
+    print(f"repo: {source}, {commits} commits, commits per year report, best of {repeat}\n")
+
+    print("".join(f"{state:>17}" for state in STATES) + "  pathspec")
+    for pathspec in pathspecs:
+        timings = [_timed(pathspec, settings, repeat) for settings in STATES.values()]
+        print("".join(f"{seconds:16.3f}s" for seconds in timings) + f"  {' '.join(pathspec)}")
+
+
+if __name__ == "__main__":
+    main()
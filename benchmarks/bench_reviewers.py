@@ -0,0 +1,51 @@
+"""
+Times building the ownership index, catching it up, and ranking reviewers
+for a handful of changed paths, which is what a pre-push hook pays.
+
+Usage:
+    python benchmarks/bench_reviewers.py
+    BENCH_REPO=/path/to/large/repo python benchmarks/bench_reviewers.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import default_repo  # noqa: E402
+from git_py_stats import ownership  # noqa: E402
+
+
+def _timed(label: str, func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"{label:<28} {(time.perf_counter() - start) / repeat * 1000:.1f}ms")
+    return result
+
+
+def main() -> None:
+    repo = os.path.abspath(default_repo())
+    os.chdir(repo)
+    print(f"repo: {repo}")
+
+    files = subprocess.run(
+        ["git", "ls-files"], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    changed = files[:: max(1, len(files) // 20)][:20]
+
+    conn = ownership.open_index({"cache_dir": tempfile.mkdtemp(prefix="git-py-stats-owners-")})
+    commits = _timed("build index", lambda: ownership.sync_index(conn))
+    _timed("catch up (no new commits)", lambda: ownership.sync_index(conn), repeat=10)
+    reviewers = _timed(
+        f"rank {len(changed)} paths", lambda: ownership.rank_reviewers(conn, changed), repeat=10
+    )
+    print(f"commits: {commits}, reviewers: {len(reviewers)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
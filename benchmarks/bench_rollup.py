@@ -0,0 +1,113 @@
+"""
+Compares answering a --since/--until window with git log, the columnar
+snapshot, and the rollup cube, then times a synthetic cube covering
+twenty years of history on its own.
+
+Usage:
+    python benchmarks/bench_rollup.py
+    BENCH_REPO=/path/to/large/repo python benchmarks/bench_rollup.py
+    BENCH_ROLLUP_COMMITS=5000000 python benchmarks/bench_rollup.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import default_repo  # noqa: E402
+from git_py_stats import rollup, snapshot  # noqa: E402
+from git_py_stats.git_operations import run_git_command  # noqa: E402
+
+
+def _timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<36} {time.perf_counter() - start:.3f}s")
+    return result
+
+
+def bench_repo() -> None:
+    repo = os.path.abspath(default_repo())
+    config = {"merges": "--no-merges", "cache_dir": tempfile.mkdtemp(prefix="git-py-stats-rollup-")}
+    os.chdir(repo)
+
+    # A 30 day window at the end of the history
+    newest = int(run_git_command(["git", "log", "-1", "--format=%ct"]))
+    bounds = (newest - 30 * 86400, newest)
+    print(f"repo: {repo}")
+
+    _timed(
+        "git log, 30 days",
+        lambda: run_git_command(
+            [
+                "git",
+                "log",
+                "--no-merges",
+                f"--since={bounds[0]}",
+                f"--until={bounds[1]}",
+                "--format=%cd",
+            ]
+        ),
+    )
+    snap = _timed("build snapshot", lambda: snapshot.sync_snapshot(config))
+    cube = _timed("build rollup", lambda: rollup.sync_rollup(config))
+    cube = _timed(
+        "reload rollup",
+        lambda: rollup.load_rollup(os.path.join(config["cache_dir"], rollup.ROLLUP_NAME)),
+    )
+    _timed(
+        "snapshot, 30 days by weekday",
+        lambda: snapshot.count_commits(snap, config, "weekday", bounds=bounds),
+    )
+    _timed(
+        "rollup, 30 days by weekday",
+        lambda: rollup.count_commits(cube, config, "weekday", bounds=bounds),
+    )
+    _timed("rollup, 30 days totals", lambda: rollup.totals(cube, config, bounds))
+    print(f"commits: {len(snap)}, cells: {len(cube)}")
+    snap.close()
+
+
+def bench_synthetic(commits: int) -> None:
+    rng = random.Random(42)
+    authors = 500
+    start_hour = 1262304000 // 3600  # 2010-01-01
+    span = 20 * 365 * 24
+
+    cells = {}
+    for _ in range(commits):
+        key = (start_hour + rng.randrange(span), rng.randrange(authors), 1, 0, 60, 0)
+        cell = cells.setdefault(key, [0, 0, 0])
+        cell[0] += 1
+        cell[1] += rng.randint(0, 50)
+        cell[2] += rng.randint(0, 20)
+    names = [(f"Dev {i}", f"dev{i}@example.com") for i in range(authors)]
+    cube = _timed(
+        "\nbuild synthetic rollup", lambda: rollup.build_rollup(cells, names, "0" * 40, "HEAD")
+    )
+
+    path = os.path.join(tempfile.mkdtemp(prefix="git-py-stats-rollup-"), rollup.ROLLUP_NAME)
+    rollup.write_rollup(path, cube)
+    print(f"{commits} commits, {len(cube)} cells, {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+    config = {"merges": "--no-merges"}
+    end = (start_hour + span) * 3600
+    cube = _timed("reload rollup", lambda: rollup.load_rollup(path))
+    for days in (30, 365, 20 * 365):
+        bounds = (end - days * 86400, end)
+        _timed(
+            f"{days} days by weekday",
+            lambda: rollup.count_commits(cube, config, "weekday", bounds=bounds),
+        )
+        _timed(f"{days} days totals", lambda: rollup.totals(cube, config, bounds))
+
+
+def main() -> None:
+    bench_repo()
+    bench_synthetic(int(os.environ.get("BENCH_ROLLUP_COMMITS", "1000000")))
+
+
+if __name__ == "__main__":
+    main()
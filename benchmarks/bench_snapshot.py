@@ -0,0 +1,94 @@
+"""
+Compares reading history with git log against reloading the columnar
+snapshot, then times a synthetic million-commit snapshot on its own.
+
+Usage:
+    python benchmarks/bench_snapshot.py
+    BENCH_REPO=/path/to/large/repo python benchmarks/bench_snapshot.py
+    BENCH_SNAPSHOT_COMMITS=2000000 python benchmarks/bench_snapshot.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_repo import default_repo  # noqa: E402
+from git_py_stats import snapshot  # noqa: E402
+from git_py_stats.commit_stream import iter_commits  # noqa: E402
+
+
+def _timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {time.perf_counter() - start:.3f}s")
+    return result
+
+
+def bench_repo() -> None:
+    repo = os.path.abspath(default_repo())
+    config = {"merges": "", "cache_dir": tempfile.mkdtemp(prefix="git-py-stats-snap-")}
+    os.chdir(repo)
+    print(f"repo: {repo}")
+
+    commits = _timed(
+        "parse git log --numstat", lambda: sum(1 for _ in iter_commits(config, numstat=True))
+    )
+    snap = _timed("build snapshot", lambda: snapshot.sync_snapshot(config))
+    snap.close()
+    snap = _timed("reload snapshot", lambda: snapshot.sync_snapshot(config))
+    _timed("count by weekday", lambda: snapshot.count_commits(snap, config, "weekday"))
+    _timed("author stats", lambda: snapshot.author_stats(snap, config))
+    print(f"commits: {commits}, snapshot: {len(snap)}")
+    snap.close()
+
+
+def bench_synthetic(commits: int) -> None:
+    rng = random.Random(42)
+    authors, paths = 500, 50000
+    start_time = 1262304000  # 2010-01-01
+
+    columns = {name: array(typecode) for name, typecode in snapshot._COLUMNS.items()}
+    strings = [f"Dev {i}" for i in range(authors)] + [f"dev{i}@example.com" for i in range(authors)]
+    strings += [f"src/module{i % 97}/file{i}.py" for i in range(paths)]
+    columns["author_name"].extend(range(authors))
+    columns["author_email"].extend(range(authors, 2 * authors))
+    columns["file_offsets"].append(0)
+    for i in range(commits):
+        timestamp = start_time + i * 300
+        columns["author_time"].append(timestamp)
+        columns["committer_time"].append(timestamp)
+        columns["author_offset"].append(3600)
+        columns["committer_offset"].append(3600)
+        columns["author_id"].append(rng.randrange(authors))
+        columns["parent_count"].append(1)
+        for _ in range(rng.randint(1, 3)):
+            columns["path_id"].append(2 * authors + rng.randrange(paths))
+            columns["insertions"].append(rng.randint(0, 50))
+            columns["deletions"].append(rng.randint(0, 20))
+        columns["file_offsets"].append(len(columns["path_id"]))
+
+    path = os.path.join(tempfile.mkdtemp(prefix="git-py-stats-snap-"), snapshot.SNAPSHOT_NAME)
+    snapshot.write_snapshot(path, columns, strings, "0" * 40, "HEAD")
+    del columns
+
+    print(f"\nsynthetic snapshot: {commits} commits, {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+    config = {"merges": "--no-merges"}
+    snap = _timed("reload snapshot", lambda: snapshot.load_snapshot(path))
+    _timed("count by weekday", lambda: snapshot.count_commits(snap, config, "weekday"))
+    _timed("count by author", lambda: snapshot.count_commits(snap, config, "author"))
+    _timed("author stats", lambda: snapshot.author_stats(snap, config))
+    snap.close()
+
+
+def main() -> None:
+    bench_repo()
+    bench_synthetic(int(os.environ.get("BENCH_SNAPSHOT_COMMITS", "1000000")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Checks how long the CLI entry point takes to start, using python -X importtime.
+
+Reports the cumulative import time of git_py_stats.main and the wall time
+of 'git-py-stats --version', and fails if startup goes over the target or
+if report modules get imported before a command needs them.
+
+Usage:
+    python benchmarks/bench_startup.py
+    BENCH_STARTUP_TARGET_MS=40 python benchmarks/bench_startup.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that --help/--version are allowed to import from the package
+ALLOWED = {"git_py_stats", "git_py_stats.main", "git_py_stats.arg_parser"}
+
+RUNS = 10
+
+
+def import_times() -> Dict[str, int]:
+    """
+    Imports the entry point in a fresh interpreter and returns the
+    cumulative import time in microseconds of every module it loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import git_py_stats.main"],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    target_ms = float(os.environ.get("BENCH_STARTUP_TARGET_MS", "50"))
+
+    runs = [import_times() for _ in range(RUNS)]
+    import_ms = min(times["git_py_stats.main"] for times in runs) / 1000
+    loaded = {name for name in runs[0] if name.startswith("git_py_stats")}
+
+    wall = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "git_py_stats.main", "--version"],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        wall.append(time.perf_counter() - start)
+
+    print(f"import git_py_stats.main: {import_ms:.1f}ms (best of {RUNS}, target {target_ms:.0f}ms)")
+    print(f"git-py-stats --version:   {min(wall) * 1000:.1f}ms wall (best of {RUNS})")
+    slowest = sorted(runs[0].items(), key=lambda item: item[1], reverse=True)[:8]
+    print("slowest imports (cumulative):")
+    for name, micros in slowest:
+        print(f"  {micros / 1000:6.1f}ms {name}")
+
+    failed = False
+    if import_ms > target_ms:
+        print(f"FAIL: startup is over the {target_ms:.0f}ms target")
+        failed = True
+    if loaded - ALLOWED:
+        print(f"FAIL: imported at startup: {', '.join(sorted(loaded - ALLOWED))}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Builds throwaway git repositories for the benchmark scripts.
+
+History is generated with git fast-import, which can write hundreds of
+thousands of commits in seconds. The layout is deterministic for a given
+seed so timings are comparable between runs.
+"""
+
+import os
+import random
+import subprocess
+import tempfile
+from typing import Optional
+
+
+def create_repo(
+    commits: int,
+    authors: int = 50,
+    files: int = 2000,
+    files_per_commit: int = 3,
+    path: Optional[str] = None,
+    seed: int = 42,
+) -> str:
+    """
+    Creates a git repository with a synthetic linear history.
+
+    Args:
+        commits (int): Number of commits to generate.
+        authors (int): Number of distinct authors.
+        files (int): Number of distinct file paths, spread over nested directories.
+        files_per_commit (int): Upper bound of files touched per commit.
+        path (Optional[str]): Where to create the repo. A temp dir if None.
+        seed (int): Seed for the random layout.
+
+    Returns:
+        str: Path to the new repository.
+    """
+    rng = random.Random(seed)
+    path = path or tempfile.mkdtemp(prefix="git-py-stats-bench-")
+    subprocess.run(["git", "init", "-q", path], check=True)
+
+    paths = [
+        f"src/mod{i % 20}/pkg{i % 7}/file{i}.py" if i % 5 else f"docs/section{i % 11}/page{i}.md"
+        for i in range(files)
+    ]
+    contents = {}
+    timestamp = 1262304000  # 2010-01-01
+
+    proc = subprocess.Popen(["git", "fast-import", "--quiet"], stdin=subprocess.PIPE, cwd=path)
+    out = proc.stdin
+    for n in range(commits):
+        author = rng.randrange(authors)
+        timestamp += rng.randrange(60, 7200)
+        tz = rng.choice(["+0000", "-0500", "+0100", "+0530", "-0800", "+0900"])
+        message = f"Change number {n}\n".encode()
+        out.write(b"commit refs/heads/main\n")
+        ident = f"Dev {author} <dev{author}@example.com> {timestamp} {tz}\n".encode()
+        out.write(b"author " + ident)
+        out.write(b"committer " + ident)
+        out.write(b"data %d\n%s\n" % (len(message), message))
+        for _ in range(rng.randint(1, files_per_commit)):
+            file_path = rng.choice(paths)
+            lines = contents.get(file_path, 0) + rng.randint(1, 5)
+            contents[file_path] = lines
+            data = "".join(f"line {i}\n" for i in range(lines)).encode()
+            out.write(b"M 100644 inline %s\n" % file_path.encode())
+            out.write(b"data %d\n%s\n" % (len(data), data))
+    out.close()
+    if proc.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+
+    subprocess.run(["git", "-C", path, "checkout", "-q", "main"], check=True)
+    return path
+
+
+def default_repo() -> str:
+    """
+    Returns the repository to benchmark: $BENCH_REPO if set, otherwise a
+    freshly generated one with $BENCH_COMMITS commits (default 20000).
+    """
+    repo = os.environ.get("BENCH_REPO")
+    if repo:
+        return repo
+    return create_repo(int(os.environ.get("BENCH_COMMITS", "20000")))
@@ -1 +1,2 @@
-# Leaving blank for now
+# Read by setup.py and --version, so keep this the only place it's set
+__version__ = "0.2.0"
@@ -0,0 +1,796 @@
+"""
+Functions related to the 'Analyze' section.
+"""
+
+import csv
+import heapq
+import json
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from git_py_stats import blame, ownership
+from git_py_stats.commit_stream import CommitRecord, iter_commits, tz_offset_seconds
+from git_py_stats.config import is_author_ignored
+from git_py_stats.identity import IdentityResolver, get_resolver
+from git_py_stats.renames import FileIdentities
+
+
+def _is_ignored(commit: CommitRecord, ignore_authors: Callable[[str], bool]) -> bool:
+    """
+    Helper function that tells whether a commit's author matches _GIT_IGNORE_AUTHORS
+    as a name, an email, or 'name <email>'.
+    """
+    return is_author_ignored(ignore_authors, commit.author, commit.email)
+
+
+def _save_report(
+    report_format: str, basename: str, header: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> None:
+    """
+    Helper function that saves a report's rows as JSON or CSV when asked
+    to by _GIT_REPORT_FORMAT. JSON is a list of objects keyed by the
+    lowercased header names.
+
+    Args:
+        report_format (str): 'json' or 'csv'.
+        basename (str): File name without the extension.
+        header (Sequence[str]): Column names.
+        rows (Iterable[Sequence[Any]]): One sequence of values per row.
+
+    Returns:
+        None
+    """
+    filename = f"{basename}.{report_format}"
+    try:
+        with open(filename, "w", newline="", errors="surrogateescape") as f:
+            if report_format == "csv":
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(rows)
+            else:
+                keys = [column.lower().replace(" ", "_") for column in header]
+                json.dump([dict(zip(keys, row)) for row in rows], f, indent=4)
+        print(f"Report saved to {filename}")
+    except IOError as e:
+        print(f"Failed to write to {filename}: {e}")
+
+
+class _DirNode:
+    """
+    A directory in the churn trie. last_commit remembers the last commit
+    counted here so a commit touching several files in one directory is
+    only counted once.
+    """
+
+    __slots__ = ("commits", "insertions", "deletions", "last_commit", "children")
+
+    def __init__(self) -> None:
+        self.commits = 0
+        self.insertions = 0
+        self.deletions = 0
+        self.last_commit = -1
+        self.children: Dict[str, "_DirNode"] = {}
+
+
+def _build_churn_trie(
+    commits: Iterable[CommitRecord], depth: int, ignore_authors: Callable[[str], bool]
+) -> Optional[_DirNode]:
+    """
+    Helper function for churn_by_directory that rolls numstat data up into
+    a trie of directories at most 'depth' levels deep.
+
+    Args:
+        commits (Iterable[CommitRecord]): Commits read with numstat.
+        depth (int): Deepest directory level to keep.
+        ignore_authors (Callable[[str], bool]): Matches authors to skip.
+
+    Returns:
+        Optional[_DirNode]: The repository root, or None if no commits were seen.
+    """
+    root = _DirNode()
+    seen = False
+    for index, commit in enumerate(commits):
+        if _is_ignored(commit, ignore_authors):
+            continue
+        seen = True
+        for added, removed, path in commit.files:
+            # The file name itself isn't a directory, so leave it off
+            parts = path.split("/")[:-1][:depth]
+            node = root
+            for part in [None, *parts]:
+                if part is not None:
+                    child = node.children.get(part)
+                    if child is None:
+                        child = node.children[part] = _DirNode()
+                    node = child
+                node.insertions += added
+                node.deletions += removed
+                if node.last_commit != index:
+                    node.last_commit = index
+                    node.commits += 1
+    return root if seen else None
+
+
+def churn_by_directory(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Displays commits, insertions, and deletions rolled up per directory,
+    down to _GIT_DIR_DEPTH levels, from a single pass over git log --numstat.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    depth = int(config.get("dir_depth", 2))
+    limit = int(config.get("limit", 10))
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+
+    root = _build_churn_trie(
+        iter_commits(config, branch, numstat=True, skip_ignored=True), depth, ignore_authors
+    )
+    if root is None:
+        print("No data available.")
+        return
+
+    def churn(item):
+        return -(item[1].insertions + item[1].deletions), item[0]
+
+    if report_format in ("json", "csv"):
+        # Every directory goes in the file, parents before their children
+        rows: List[List[Any]] = []
+        stack = [(".", root)]
+        while stack:
+            name, node = stack.pop()
+            rows.append([name, node.commits, node.insertions, node.deletions])
+            prefix = "" if name == "." else name
+            children = sorted(node.children.items(), key=churn, reverse=True)
+            stack.extend((f"{prefix}{child}/", child_node) for child, child_node in children)
+        _save_report(
+            report_format,
+            "git_churn_by_directory",
+            ["Directory", "Commits", "Insertions", "Deletions"],
+            rows,
+        )
+        return
+
+    print(f"Churn by directory (depth {depth}, top {limit} per directory):\n")
+    print(f"{'Commits':>9} {'Insertions':>11} {'Deletions':>10}  Directory")
+
+    def show(name: str, node: _DirNode, level: int) -> None:
+        indent = "  " * level
+        print(f"{node.commits:>9} {node.insertions:>11} {node.deletions:>10}  {indent}{name}")
+        children = sorted(node.children.items(), key=churn)
+        prefix = "" if name == "." else name
+        for child, child_node in children[:limit]:
+            show(f"{prefix}{child}/", child_node, level + 1)
+        if len(children) > limit:
+            print(f"{'':>34}{indent}  ... {len(children) - limit} more")
+
+    show(".", root, 0)
+
+
+def _intern(path: str, path_ids: Dict[str, int], paths: List[str]) -> int:
+    """
+    Helper function that returns the id of a path, giving it the next free
+    one the first time it's seen.
+    """
+    path_id = path_ids.get(path)
+    if path_id is None:
+        path_id = path_ids[path] = len(paths)
+        paths.append(path)
+    return path_id
+
+
+def _count_file_changes(
+    commits: Iterable[CommitRecord], ignore_authors: Callable[[str], bool]
+) -> Tuple[List[str], array, array]:
+    """
+    Helper function for hotspots that counts commits and lines churned per
+    file. Every path is interned to a small int the first time it's seen,
+    so the counts live in two flat arrays instead of a dict per file.
+    Renamed files are counted once, under their newest name.
+
+    Args:
+        commits (Iterable[CommitRecord]): Commits read with numstat.
+        ignore_authors (Callable[[str], bool]): Matches authors to skip.
+
+    Returns:
+        Tuple: Paths by id, then commits and lines churned by id.
+    """
+    path_ids: Dict[str, int] = {}
+    paths: List[str] = []
+    commit_counts = array("Q")
+    churn = array("Q")
+    identities = FileIdentities()
+    for commit in commits:
+        # Renames by ignored authors still tie the file's names together
+        files = identities.canonical_files(commit)
+        if _is_ignored(commit, ignore_authors):
+            continue
+        for added, removed, path in files:
+            path_id = _intern(path, path_ids, paths)
+            if path_id == len(commit_counts):
+                commit_counts.append(0)
+                churn.append(0)
+            commit_counts[path_id] += 1
+            churn[path_id] += added + removed
+    return paths, commit_counts, churn
+
+
+def hotspots(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Displays the files changed most often and the files with the most
+    lines churned, the usual places to look for risky code.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    limit = int(config.get("limit", 10))
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+
+    commits = iter_commits(config, branch, numstat=True, skip_ignored=True)
+    paths, commit_counts, churn = _count_file_changes(commits, ignore_authors)
+    if not paths:
+        print("No data available.")
+        return
+
+    # nlargest keeps a heap of 'limit' ids rather than sorting every file
+    rankings = [
+        ("commits", heapq.nlargest(limit, range(len(paths)), key=commit_counts.__getitem__)),
+        ("churn", heapq.nlargest(limit, range(len(paths)), key=churn.__getitem__)),
+    ]
+
+    if report_format in ("json", "csv"):
+        _save_report(
+            report_format,
+            "git_hotspots",
+            ["Ranking", "Rank", "Path", "Commits", "Churn"],
+            [
+                [ranking, rank, paths[i], commit_counts[i], churn[i]]
+                for ranking, ids in rankings
+                for rank, i in enumerate(ids, 1)
+            ],
+        )
+        return
+
+    titles = {"commits": "Most frequently changed files", "churn": "Most churned files"}
+    for ranking, ids in rankings:
+        print(f"{titles[ranking]}:\n")
+        print(f"{'Commits':>9} {'Churn':>10}  Path")
+        for i in ids:
+            print(f"{commit_counts[i]:>9} {churn[i]:>10}  {paths[i]}")
+        print()
+
+
+# Pairs tracked before the rarest ones get pruned to bound memory
+_MAX_PAIRS = 2_000_000
+
+# Odd constant (Knuth's multiplicative hash) that scrambles commit numbers
+_MINHASH_MULTIPLIER = 2654435761
+
+
+def _count_cochanges(
+    commits: Iterable[CommitRecord],
+    ignore_authors: Callable[[str], bool],
+    max_files: int,
+    min_support: int,
+    max_pairs: int = _MAX_PAIRS,
+) -> Tuple[List[str], array, Dict[int, int]]:
+    """
+    Helper function for cochanges that counts how often each pair of files
+    shows up in the same commit. Only pairs that are seen at all are stored,
+    keyed by their two path ids packed into one int. Commits touching more
+    than 'max_files' files (bulk renames, reformatting) are skipped since
+    they would add a quadratic number of meaningless pairs.
+
+    If more than 'max_pairs' pairs are tracked, pairs seen less than
+    'min_support' times are dropped (and more if that's not enough), so
+    counts may come out slightly low on very large histories. Renamed files
+    are counted once, under their newest name.
+
+    Returns:
+        Tuple: Paths by id, commits by id, and co-change counts by pair key.
+    """
+    path_ids: Dict[str, int] = {}
+    paths: List[str] = []
+    commit_counts = array("Q")
+    pairs: Dict[int, int] = {}
+    identities = FileIdentities()
+    for commit in commits:
+        # Renames in skipped commits still tie the file's names together
+        files = identities.canonical_files(commit)
+        if len(files) > max_files or _is_ignored(commit, ignore_authors):
+            continue
+        ids = {_intern(path, path_ids, paths) for _, _, path in files}
+        commit_counts.extend([0] * (len(paths) - len(commit_counts)))
+        ordered = sorted(ids)
+        for i, first in enumerate(ordered):
+            commit_counts[first] += 1
+            for second in ordered[i + 1 :]:
+                key = first << 32 | second
+                pairs[key] = pairs.get(key, 0) + 1
+
+        if len(pairs) > max_pairs:
+            floor = min_support
+            while len(pairs) > max_pairs // 2:
+                pairs = {key: count for key, count in pairs.items() if count >= floor}
+                floor += 1
+
+    pairs = {key: count for key, count in pairs.items() if count >= min_support}
+    return paths, commit_counts, pairs
+
+
+def _minhash_cochanges(
+    commits: Iterable[CommitRecord],
+    ignore_authors: Callable[[str], bool],
+    max_files: int,
+    min_support: int,
+    sketch_size: int,
+) -> Tuple[List[str], array, Dict[int, int]]:
+    """
+    Helper function for cochanges that estimates co-change counts from
+    bottom-k min-hash sketches instead of counting pairs. Every commit gets
+    a pseudo-random hash, and each file keeps only the 'sketch_size'
+    smallest hashes of the commits touching it, so memory is fixed per file
+    no matter how many files change together. Files sharing a hash in their
+    sketches become candidate pairs, and how much their sketches overlap
+    estimates how often they change together. Files with fewer commits than
+    'sketch_size' keep all of them, so their counts are exact. Renamed
+    files are counted once, under their newest name.
+
+    Returns:
+        Tuple: Paths by id, commits by id, and estimated co-change counts
+               by pair key, for pairs estimated at 'min_support' or more.
+    """
+    path_ids: Dict[str, int] = {}
+    paths: List[str] = []
+    commit_counts = array("Q")
+    # Max-heaps (as negated values) of each file's smallest commit hashes
+    sketches: List[List[int]] = []
+    identities = FileIdentities()
+    for index, commit in enumerate(commits):
+        # Renames in skipped commits still tie the file's names together
+        files = identities.canonical_files(commit)
+        if len(files) > max_files or _is_ignored(commit, ignore_authors):
+            continue
+        # Multiplying by an odd constant mod 2**32 scrambles the index
+        # without ever mapping two commits to the same hash
+        commit_hash = -((index * _MINHASH_MULTIPLIER) & 0xFFFFFFFF)
+        ids = {_intern(path, path_ids, paths) for _, _, path in files}
+        for path_id in ids:
+            if path_id >= len(sketches):
+                grow = path_id + 1 - len(sketches)
+                sketches.extend([] for _ in range(grow))
+                commit_counts.extend([0] * grow)
+            commit_counts[path_id] += 1
+            sketch = sketches[path_id]
+            if len(sketch) < sketch_size:
+                heapq.heappush(sketch, commit_hash)
+            elif commit_hash > sketch[0]:
+                heapq.heapreplace(sketch, commit_hash)
+
+    # Files that share any sampled commit are worth comparing
+    holders: Dict[int, List[int]] = {}
+    for path_id, sketch in enumerate(sketches):
+        if commit_counts[path_id] >= min_support:
+            for commit_hash in sketch:
+                holders.setdefault(commit_hash, []).append(path_id)
+    candidates = set()
+    for bucket in holders.values():
+        for i, first in enumerate(bucket):
+            for second in bucket[i + 1 :]:
+                candidates.add(first << 32 | second)
+
+    pairs: Dict[int, int] = {}
+    for key in candidates:
+        first, second = sketches[key >> 32], sketches[key & 0xFFFFFFFF]
+        # The smallest hashes of the union are a sample of it; the share
+        # of them found in both sketches estimates the Jaccard index
+        first_set, second_set = set(first), set(second)
+        union = heapq.nlargest(sketch_size, first_set | second_set)
+        both = sum(1 for value in union if value in first_set and value in second_set)
+        if len(union) < sketch_size:
+            # Both sketches hold every commit, so this is an exact count
+            together = both
+        else:
+            jaccard = both / len(union)
+            sizes = commit_counts[key >> 32] + commit_counts[key & 0xFFFFFFFF]
+            # |A and B| from the Jaccard index and the sizes of A and B
+            together = round(jaccard * sizes / (1 + jaccard))
+        if together >= min_support:
+            pairs[key] = together
+    return paths, commit_counts, pairs
+
+
+def cochanges(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Displays the pairs of files that are most often changed in the same
+    commit, a sign of hidden coupling between them.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    limit = int(config.get("limit", 10))
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+    max_files = int(config.get("cochange_max_files", 30))
+    min_support = int(config.get("cochange_min_support", 3))
+    sketch_size = int(config.get("cochange_minhash", 0))
+
+    commits = iter_commits(config, branch, numstat=True, skip_ignored=True)
+    if sketch_size:
+        paths, commit_counts, pairs = _minhash_cochanges(
+            commits, ignore_authors, max_files, min_support, sketch_size
+        )
+    else:
+        paths, commit_counts, pairs = _count_cochanges(
+            commits, ignore_authors, max_files, min_support
+        )
+    if not pairs:
+        print("No files changed together often enough.")
+        return
+
+    def coupling(key: int) -> float:
+        # Share of the commits touching either file that touched both
+        together = pairs[key]
+        return together / (commit_counts[key >> 32] + commit_counts[key & 0xFFFFFFFF] - together)
+
+    top = heapq.nlargest(limit, pairs, key=lambda key: (coupling(key), pairs[key]))
+    rows = [
+        [paths[key >> 32], paths[key & 0xFFFFFFFF], pairs[key], round(coupling(key), 4)]
+        for key in top
+    ]
+
+    if report_format in ("json", "csv"):
+        _save_report(
+            report_format, "git_cochanges", ["File A", "File B", "Together", "Coupling"], rows
+        )
+        return
+
+    estimated = ", estimated" if sketch_size else ""
+    print(
+        f"Files changed together (at least {min_support} times, "
+        f"commits of up to {max_files} files{estimated}):\n"
+    )
+    print(f"{'Together':>9} {'Coupling':>9}  Files")
+    for first, second, together, share in rows:
+        print(f"{together:>9} {share:>9.1%}  {first}")
+        print(f"{'':>21}{second}")
+
+
+def _bus_factor(lines_by_author: Dict[str, int], threshold: int) -> int:
+    """
+    Helper function for bus_factor that counts the fewest authors whose
+    lines changed add up to 'threshold' percent of the total.
+    """
+    target = sum(lines_by_author.values()) * threshold / 100
+    covered = 0
+    for factor, lines in enumerate(sorted(lines_by_author.values(), reverse=True), 1):
+        covered += lines
+        if covered >= target:
+            return factor
+    return len(lines_by_author)
+
+
+def bus_factor(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Displays, per directory, how many authors account for
+    _GIT_BUS_FACTOR_THRESHOLD percent of the lines changed there, and
+    flags the directories that depend on a single author. Reads from the
+    ownership index in the cache dir, which only has to catch up with new
+    commits, so regular runs don't walk the whole history again.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    depth = int(config.get("dir_depth", 2))
+    threshold = int(config.get("bus_factor_threshold", 50))
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+
+    conn = ownership.open_index(config)
+    if conn is None:
+        return
+    try:
+        if ownership.sync_index(conn, str(branch or "HEAD")) is None:
+            print("No data available.")
+            return
+        directories = ownership.lines_by_directory(
+            conn, depth, ignore_authors, get_resolver(config)
+        )
+    finally:
+        conn.close()
+
+    if not directories:
+        print("No data available.")
+        return
+
+    rows: List[List[Any]] = []
+    # Parents first, then their children
+    for directory in sorted(directories, key=lambda name: name.split("/")):
+        authors = directories[directory]
+        total = sum(authors.values())
+        top_author = min(authors, key=lambda name: (-authors[name], name))
+        rows.append(
+            [
+                directory,
+                _bus_factor(authors, threshold),
+                total,
+                len(authors),
+                top_author,
+                round(authors[top_author] / total, 4),
+            ]
+        )
+
+    if report_format in ("json", "csv"):
+        _save_report(
+            report_format,
+            "git_bus_factor",
+            ["Directory", "Bus Factor", "Lines", "Authors", "Top Author", "Top Share"],
+            rows,
+        )
+        return
+
+    print(f"Bus factor by directory (depth {depth}, authors behind {threshold}% of lines):\n")
+    print(
+        f"{'Bus factor':>11} {'Lines':>10} {'Authors':>7} {'Top share':>9}  Directory (top author)"
+    )
+    for directory, factor, total, authors, top_author, share in rows:
+        # A '!' marks directories that only one person really knows
+        flag = "!" if factor == 1 else " "
+        indent = "  " * (directory.count("/") if directory != "." else 0)
+        print(
+            f"{factor:>10}{flag} {total:>10} {authors:>7} {share:>9.1%}  "
+            f"{indent}{directory} ({top_author})"
+        )
+
+    single = sum(1 for row in rows if row[1] == 1)
+    print(f"\n{single} of {len(rows)} directories have a bus factor of 1 (marked with '!').")
+
+
+def blame_ownership(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Displays who owns the lines that survive in each directory today,
+    according to git blame, rather than who made the most commits there.
+    Blame results are cached per file content, so after the first run only
+    files that changed since are blamed again, _GIT_BLAME_JOBS at a time.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    depth = int(config.get("dir_depth", 2))
+    limit = int(config.get("limit", 10))
+    jobs = int(config.get("blame_jobs", 0))
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+
+    conn = blame.open_index(config)
+    if conn is None:
+        return
+    try:
+        synced = blame.sync_blame(conn, str(branch or "HEAD"), jobs)
+        if synced is None:
+            print("No data available.")
+            return
+        directories = blame.lines_by_directory(
+            conn, synced[0], depth, ignore_authors, get_resolver(config)
+        )
+    finally:
+        conn.close()
+
+    if not directories:
+        print("No data available.")
+        return
+
+    # Parents first, then their children
+    ordered = sorted(directories, key=lambda name: name.split("/"))
+
+    def owners(directory: str) -> List[Tuple[str, int]]:
+        authors = directories[directory]
+        return sorted(authors.items(), key=lambda item: (-item[1], item[0]))
+
+    if report_format in ("json", "csv"):
+        _save_report(
+            report_format,
+            "git_blame_ownership",
+            ["Directory", "Author", "Lines", "Share"],
+            [
+                [directory, name, lines, round(lines / sum(directories[directory].values()), 4)]
+                for directory in ordered
+                for name, lines in owners(directory)
+            ],
+        )
+        return
+
+    print(f"Surviving lines by directory (depth {depth}, top {limit} owners):\n")
+    print(f"{'Lines':>10} {'Share':>7}  Directory / owner")
+    for directory in ordered:
+        total = sum(directories[directory].values())
+        indent = "  " * (directory.count("/") if directory != "." else 0)
+        print(f"{total:>10} {'':>7}  {indent}{directory}")
+        ranked = owners(directory)
+        for name, lines in ranked[:limit]:
+            print(f"{lines:>10} {lines / total:>7.1%}  {indent}  {name}")
+        if len(ranked) > limit:
+            print(f"{'':>20}{indent}  ... {len(ranked) - limit} more")
+
+
+_WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class _AuthorActivity:
+    """
+    Commit counts of one author by weekday, hour, and timezone. Weekday
+    and hour are taken in the committer's local time, like the single
+    author reports; the timezone is the author's.
+    """
+
+    __slots__ = ("commits", "weekdays", "hours", "timezones")
+
+    def __init__(self) -> None:
+        self.commits = 0
+        self.weekdays = array("L", bytes(7 * array("L").itemsize))
+        self.hours = array("L", bytes(24 * array("L").itemsize))
+        self.timezones: Dict[str, int] = {}
+
+
+def _count_author_activity(
+    commits: Iterable[CommitRecord],
+    ignore_authors: Callable[[str], bool],
+    resolver: IdentityResolver,
+    co_authors: bool = False,
+) -> Dict[int, _AuthorActivity]:
+    """
+    Helper function that fills in every author's weekday, hour, and
+    timezone counts in one pass. Only authors with commits get a row,
+    keyed by their resolver id. With 'co_authors', everyone in a commit's
+    Co-authored-by trailers is counted for it too.
+    """
+    activity: Dict[int, _AuthorActivity] = {}
+    for commit in commits:
+        if _is_ignored(commit, ignore_authors):
+            continue
+        local = commit.committer_timestamp + tz_offset_seconds(commit.committer_tz)
+        days, seconds = divmod(local, 86400)
+        tz = commit.tz
+        valid_tz = len(tz) == 5 and tz[0] in "+-" and tz[1:].isdigit()
+
+        for author_id in resolver.resolve_credited(
+            commit.author, commit.email, commit.co_authors if co_authors else (), ignore_authors
+        ):
+            row = activity.get(author_id)
+            if row is None:
+                row = activity[author_id] = _AuthorActivity()
+            # 1970-01-01 was a Thursday
+            row.weekdays[(days + 3) % 7] += 1
+            row.hours[seconds // 3600] += 1
+            if valid_tz:
+                row.timezones[tz] = row.timezones.get(tz, 0) + 1
+            row.commits += 1
+    return activity
+
+
+def activity_by_author(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Displays commits by weekday, by hour, and by timezone for every author
+    at once, from a single pass over the log, instead of one run of the
+    per-author reports for each person. With _GIT_CO_AUTHORS enabled,
+    co-authors are counted for the commits they're credited in.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    limit = int(config.get("limit", 10))
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+    co_authors = config.get("co_authors", False)
+
+    resolver = get_resolver(config)
+    commits = iter_commits(config, branch, skip_ignored=True)
+    activity = _count_author_activity(commits, ignore_authors, resolver, co_authors)
+    if not activity:
+        print("No data available.")
+        return
+
+    names = resolver.display_names(activity)
+    ranked = sorted(
+        activity, key=lambda author_id: (-activity[author_id].commits, names[author_id])
+    )
+
+    if report_format in ("json", "csv"):
+        # One row per non-zero cell keeps the matrices sparse
+        rows = []
+        for author_id in ranked:
+            row = activity[author_id]
+            rows.extend(
+                [names[author_id], "weekday", day, count]
+                for day, count in zip(_WEEKDAYS, row.weekdays)
+                if count
+            )
+            rows.extend(
+                [names[author_id], "hour", f"{hour:02d}", count]
+                for hour, count in enumerate(row.hours)
+                if count
+            )
+            rows.extend(
+                [names[author_id], "timezone", tz, count]
+                for tz, count in sorted(row.timezones.items())
+            )
+        _save_report(
+            report_format, "git_activity_by_author", ["Author", "Group", "Value", "Commits"], rows
+        )
+        return
+
+    shown = ranked[:limit]
+    width = max(len("Author"), *(len(names[author_id]) for author_id in shown))
+
+    print("Commits by weekday per author:\n")
+    print(f"{'Author':<{width}}  " + " ".join(f"{day:>5}" for day in _WEEKDAYS) + "   Total")
+    for author_id in shown:
+        row = activity[author_id]
+        counts = " ".join(f"{count:>5}" for count in row.weekdays)
+        print(f"{names[author_id]:<{width}}  {counts} {row.commits:>7}")
+
+    print("\nCommits by hour per author:\n")
+    print(f"{'Author':<{width}}  " + " ".join(f"{hour:>4}" for hour in range(24)))
+    for author_id in shown:
+        counts = " ".join(f"{count:>4}" if count else "   -" for count in activity[author_id].hours)
+        print(f"{names[author_id]:<{width}}  {counts}")
+
+    print("\nCommits by timezone per author:\n")
+    print(f"{'Author':<{width}}  Timezones (commits)")
+    for author_id in shown:
+        timezones = sorted(activity[author_id].timezones.items(), key=lambda x: (-x[1], x[0]))
+        listed = ", ".join(f"{tz} ({count})" for tz, count in timezones)
+        print(f"{names[author_id]:<{width}}  {listed or '-'}")
+
+    if len(ranked) > limit:
+        print(f"\n... {len(ranked) - limit} more authors (set _GIT_LIMIT to show more)")
@@ -9,6 +9,8 @@ Provides CLI parsing for Git Py Stats.
 from argparse import ArgumentParser, Namespace
 from typing import List, Optional
 
+from git_py_stats import __version__
+
 
 def parse_arguments(argv: Optional[List[str]] = None) -> Namespace:
     """
@@ -29,6 +31,11 @@ def parse_arguments(argv: Optional[List[str]] = None) -> Namespace:
         description="Git Py Stats - A Python Implementation of Git Quick Stats.",
         allow_abbrev=False,  # Force users to be explicit. Makes testing sane.
     )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"git-py-stats {__version__}",
+    )
 
     # Generate Options
     parser.add_argument(
@@ -75,6 +82,11 @@ def parse_arguments(argv: Optional[List[str]] = None) -> Namespace:
         action="store_true",
         help="Save git log as a JSON formatted file to a specified area",
     )
+    parser.add_argument(
+        "--export-sqlite",
+        action="store_true",
+        help="Save the commit history to a SQLite database in the cache directory",
+    )
 
     # List Options
     parser.add_argument(
@@ -181,6 +193,11 @@ def parse_arguments(argv: Optional[List[str]] = None) -> Namespace:
         action="store_true",
         help="Show a heatmap of commits per day-of-week",
     )
+    parser.add_argument(
+        "--commits-calendars-all-authors",
+        action="store_true",
+        help="Save the activity calendar of every author to one file, from a single pass",
+    )
 
     # Suggest Options
     parser.add_argument(
@@ -189,6 +206,69 @@ def parse_arguments(argv: Optional[List[str]] = None) -> Namespace:
         action="store_true",
         help="Show the best people to contact to review code",
     )
+    parser.add_argument(
+        "--suggest-reviewers-for-paths",
+        metavar="PATH",
+        nargs="+",
+        help="Show the best people to review changes to the given paths",
+    )
+    parser.add_argument(
+        "--suggest-reviewers-for-diff",
+        metavar="REVISION",
+        type=str,
+        help="Show the best people to review the changes since REVISION (or a A..B range)",
+    )
+
+    # Analyze Options
+    parser.add_argument(
+        "--churn-by-directory",
+        action="store_true",
+        help="Show commits, insertions, and deletions rolled up per directory",
+    )
+    parser.add_argument(
+        "--hotspots",
+        action="store_true",
+        help="Show the files changed most often and with the most lines churned",
+    )
+    parser.add_argument(
+        "--cochanges",
+        action="store_true",
+        help="Show the pairs of files most often changed in the same commit",
+    )
+    parser.add_argument(
+        "--bus-factor",
+        action="store_true",
+        help="Show how many authors account for most of the lines changed per directory",
+    )
+    parser.add_argument(
+        "--blame-ownership",
+        action="store_true",
+        help="Show who owns the surviving lines of each directory according to git blame",
+    )
+    parser.add_argument(
+        "--activity-by-author",
+        action="store_true",
+        help="Show commits by weekday, hour, and timezone for every author in one pass",
+    )
+
+    # Repository Options
+    parser.add_argument(
+        "--doctor",
+        action="store_true",
+        help="Check for the commit-graph, Bloom filters, and packs that speed up reports",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Write the commit-graph, Bloom filters, and packs the repository is missing",
+    )
+
+    # Options that change how the reports above run
+    parser.add_argument(
+        "--no-renames",
+        action="store_true",
+        help="Skip rename detection, so renamed files count once per name (faster)",
+    )
 
     # Help option inherited from argparse by default, no need to impl them.
 
@@ -0,0 +1,147 @@
+"""
+Picks where reports read commit history from when _GIT_BACKEND is set.
+
+Reports ask open_backend() for a store and, if they get one, answer from
+it with count_commits() or author_stats() instead of running git log.
+"""
+
+import collections
+from typing import TYPE_CHECKING, Any, Counter, Dict, Optional, Tuple, Union
+
+from git_py_stats.identity import get_resolver
+from git_py_stats.lazy import lazy_import
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from git_py_stats.rollup import Rollup
+    from git_py_stats.snapshot import Snapshot
+
+# No store is loaded unless _GIT_BACKEND asks for it
+commit_db = lazy_import("git_py_stats.commit_db")
+rollup = lazy_import("git_py_stats.rollup")
+snapshot = lazy_import("git_py_stats.snapshot")
+
+Backend = Union["sqlite3.Connection", "Snapshot", "Rollup"]
+
+# Time window overriding the configured --since/--until, as timestamps
+Bounds = Tuple[Optional[int], Optional[int]]
+
+# Characters that mean something in the basic or extended regexes git's
+# --author takes. An author without any of them matches as plain text in
+# every syntax, which is all the stores do.
+_AUTHOR_REGEX_CHARS = frozenset(".[]*^$\\|+?(){}")
+
+
+def open_backend(
+    config: Dict[str, Union[str, int]],
+    branch: Optional[str] = None,
+    files: bool = False,
+    author: Optional[str] = None,
+) -> Optional[Backend]:
+    """
+    Returns a synced history store when reports should skip git log, i.e.
+    when _GIT_BACKEND is 'sqlite', 'snapshot', or 'rollup'. Close it when done.
+
+    Options the stores can't answer (pathspecs, extra log options, an
+    author pattern with regex characters, or a branch other than the
+    configured one) make the report fall back to git.
+    So do reports that need to know which files each commit changed, which
+    the rollup cube doesn't keep.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        branch (Optional[str]): Branch the report asks for, if any.
+        files (bool): Whether the report needs per-file data.
+        author (Optional[str]): The --author pattern the report filters on, if any.
+
+    Returns:
+        Optional[Backend]: The store, or None to use git log.
+    """
+    backend = config.get("backend", "git")
+    if backend not in ("sqlite", "snapshot", "rollup") or (files and backend == "rollup"):
+        return None
+
+    ref = str(config.get("branch", "") or "HEAD")
+    if any(arg != "--" for arg in config.get("pathspec", [])) or config.get("log_options", ""):
+        print(f"NOTE: _GIT_PATHSPEC and _GIT_LOG_OPTIONS need git log; not using {backend}.")
+        return None
+    if author and _AUTHOR_REGEX_CHARS.intersection(author):
+        print(f"NOTE: author patterns with regex characters need git log; not using {backend}.")
+        return None
+    if branch and branch != ref:
+        return None
+
+    if backend == "snapshot":
+        return snapshot.sync_snapshot(config, ref)
+    if backend == "rollup":
+        return rollup.sync_rollup(config, ref)
+
+    conn = commit_db.open_db(config)
+    if conn is None:
+        return None
+    if commit_db.sync_commits(conn, ref) is None:
+        conn.close()
+        return None
+    return conn
+
+
+def count_commits(
+    store: Backend,
+    config: Dict[str, Union[str, int]],
+    group: str,
+    author: Optional[str] = None,
+    bounds: Optional[Bounds] = None,
+) -> Counter:
+    """
+    Counts commits grouped by author name, date, year, month, weekday,
+    hour, timezone, or calendar cell. Authors go through the identity
+    resolver, so one person committing under several spellings of their
+    name or email is counted once, like the git log based reports do.
+
+    Args:
+        store (Backend): A store returned by open_backend.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        group (str): One of the supported groupings.
+        author (Optional[str]): Only count commits whose 'name <email>' contains this text.
+        bounds (Optional[Bounds]): Since and until timestamps to use instead
+                                   of the configured window.
+
+    Returns:
+        Counter: Commit counts per group value.
+    """
+    if isinstance(store, rollup.Rollup):
+        counts = rollup.count_commits(store, config, group, author, bounds)
+    elif isinstance(store, snapshot.Snapshot):
+        counts = snapshot.count_commits(store, config, group, author, bounds)
+    else:
+        counts = commit_db.count_commits(store, config, group, author, bounds)
+    if group != "author":
+        return counts
+
+    # The stores count by (name, email) as committed
+    resolver = get_resolver(config)
+    by_person: Counter = collections.Counter()
+    for (name, email), count in counts.items():
+        by_person[resolver.resolve(name, email)] += count
+    names = resolver.display_names(by_person)
+    return collections.Counter({names[author_id]: count for author_id, count in by_person.items()})
+
+
+def author_stats(
+    store: Backend, config: Dict[str, Union[str, int]]
+) -> Tuple[Dict[str, Dict[str, Any]], int, int, int, int]:
+    """
+    Aggregates the per-author contribution stats shown by detailed_git_stats.
+
+    Args:
+        store (Backend): A store returned by open_backend.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        Tuple: Stats keyed by author display name, then total insertions,
+               deletions, distinct files changed, and commits.
+    """
+    if isinstance(store, snapshot.Snapshot):
+        return snapshot.author_stats(store, config, get_resolver(config))
+    return commit_db.author_stats(store, config, get_resolver(config))
@@ -0,0 +1,270 @@
+"""
+Surviving-line ownership from git blame, cached per blob.
+
+Blaming every tracked file is by far the slowest thing git-py-stats does,
+so the result for each file is stored under its blob id. A file that
+hasn't changed has the same blob id and is never blamed again, and the
+files that do need it are blamed by a pool of git processes in parallel.
+"""
+
+import os
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from git_py_stats.cache import open_cache_db
+from git_py_stats.commit_stream import parent_directories
+from git_py_stats.git_operations import resolve_commit, run_git_command, run_git_command_bytes
+from git_py_stats.identity import IdentityResolver
+
+INDEX_NAME = "blame.sqlite3"
+
+# Bump this whenever the schema changes so old caches get rebuilt
+INDEX_VERSION = "1"
+
+# Larger files are almost always generated or data, and slow to blame
+MAX_BLOB_SIZE = 1 << 20
+
+# Blamed files are saved every this many, so an interrupted run keeps its work
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    UNIQUE (name, email)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    blob TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS blob_lines (
+    blob TEXT NOT NULL REFERENCES blobs (blob),
+    author_id INTEGER NOT NULL REFERENCES authors (id),
+    lines INTEGER NOT NULL,
+    PRIMARY KEY (blob, author_id)
+) WITHOUT ROWID;
+"""
+
+Identity = Tuple[str, str]
+
+
+def open_index(config: Dict[str, Union[str, int]]) -> Optional[sqlite3.Connection]:
+    """
+    Opens (and creates if needed) the blame cache in the cache dir.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        Optional[sqlite3.Connection]: The open cache, or None on failure.
+    """
+    return open_cache_db(config, INDEX_NAME, _SCHEMA, INDEX_VERSION)
+
+
+def list_files(tip: str) -> List[Tuple[str, str]]:
+    """
+    Lists the regular files in a commit that are worth blaming, i.e. not
+    symlinks, submodules, or files over MAX_BLOB_SIZE.
+
+    Args:
+        tip (str): The commit to list.
+
+    Returns:
+        List[Tuple[str, str]]: (blob id, path) pairs.
+    """
+    # Original command:
+    # git ls-tree -r -l -z --full-tree <tip>
+    output = run_git_command(["git", "ls-tree", "-r", "-l", "-z", "--full-tree", tip])
+    files = []
+    for entry in (output or "").split("\0"):
+        info, _, path = entry.partition("\t")
+        fields = info.split()
+        if len(fields) != 4 or fields[1] != "blob" or fields[0] == "120000":
+            continue
+        if int(fields[3]) <= MAX_BLOB_SIZE:
+            files.append((fields[2], path))
+    return files
+
+
+def parse_blame(output: bytes) -> Optional[Dict[Identity, int]]:
+    """
+    Counts the lines each author owns in 'git blame --porcelain' output.
+
+    Porcelain output describes each commit once, the first time it shows
+    up, and then only refers to it by hash, so the author of every commit
+    seen so far is remembered.
+
+    Args:
+        output (bytes): Raw blame output.
+
+    Returns:
+        Optional[Dict[Identity, int]]: Lines per (name, email), or None if
+                                       the file turned out to be binary.
+    """
+    authors: Dict[bytes, Tuple[bytes, bytes]] = {}
+    counts: Dict[Tuple[bytes, bytes], int] = defaultdict(int)
+    commit = b""
+    name = email = b""
+    for line in output.split(b"\n"):
+        if line.startswith(b"\t"):
+            # Binary files are NUL-terminated line noise, not code anyone owns
+            if b"\0" in line:
+                return None
+            counts[authors[commit]] += 1
+        elif line.startswith(b"author "):
+            name = line[7:]
+        elif line.startswith(b"author-mail "):
+            email = line[12:].strip(b"<>")
+        elif line.startswith(b"filename "):
+            authors.setdefault(commit, (name, email))
+        elif line and not line.startswith(b"author-") and b" " in line:
+            head = line.split(b" ", 1)[0]
+            if len(head) in (40, 64):
+                commit = head
+    return {
+        (name.decode("utf-8", "replace"), email.decode("utf-8", "replace")): lines
+        for (name, email), lines in counts.items()
+    }
+
+
+def blame_file(tip: str, path: str) -> Optional[Dict[Identity, int]]:
+    """
+    Blames one file and counts the lines each author owns.
+
+    Args:
+        tip (str): The commit to blame at.
+        path (str): The file to blame.
+
+    Returns:
+        Optional[Dict[Identity, int]]: Lines per (name, email), or None if
+                                       the file is binary or blame failed.
+    """
+    # Original command:
+    # git blame --porcelain <tip> -- <path>
+    output = run_git_command_bytes(["git", "blame", "--porcelain", tip, "--", path])
+    if output is None:
+        return None
+    return parse_blame(output)
+
+
+def sync_blame(
+    conn: sqlite3.Connection, ref: str = "HEAD", jobs: int = 0
+) -> Optional[Tuple[List[Tuple[str, str]], int]]:
+    """
+    Blames every file of 'ref' whose blob isn't in the cache yet, 'jobs'
+    at a time, and drops cached blobs that are no longer part of 'ref'.
+
+    Args:
+        conn (sqlite3.Connection): An open blame cache.
+        ref (str): The branch or revision to blame.
+        jobs (int): How many git blame processes to run at once; 0 means
+                    one per CPU.
+
+    Returns:
+        Optional[Tuple]: The (blob id, path) pairs of 'ref' and how many
+                         blobs were blamed, or None if 'ref' is invalid.
+    """
+    tip = resolve_commit(ref)
+    if not tip:
+        return None
+
+    files = list_files(tip)
+    cached = {blob for (blob,) in conn.execute("SELECT blob FROM blobs")}
+    todo: Dict[str, str] = {}
+    for blob, path in files:
+        # A blob at several paths only needs to be blamed once
+        if blob not in cached and blob not in todo:
+            todo[blob] = path
+
+    current = {blob for blob, _ in files}
+    stale = [(blob,) for blob in cached - current]
+    conn.executemany("DELETE FROM blob_lines WHERE blob = ?", stale)
+    conn.executemany("DELETE FROM blobs WHERE blob = ?", stale)
+
+    if todo:
+        jobs = jobs or os.cpu_count() or 1
+        print(f"Blaming {len(todo)} file(s) with {jobs} worker(s)...")
+        author_ids: Dict[Identity, int] = {
+            (name, email): author_id
+            for author_id, name, email in conn.execute("SELECT id, name, email FROM authors")
+        }
+        # git does the work, so threads are enough to keep every CPU busy
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(lambda item: blame_file(tip, item[1]), todo.items())
+            for done, (blob, counts) in enumerate(zip(todo, results), 1):
+                conn.execute("INSERT INTO blobs (blob) VALUES (?)", (blob,))
+                for identity, lines in (counts or {}).items():
+                    author_id = author_ids.get(identity)
+                    if author_id is None:
+                        author_id = conn.execute(
+                            "INSERT INTO authors (name, email) VALUES (?, ?)", identity
+                        ).lastrowid
+                        author_ids[identity] = author_id
+                    conn.execute(
+                        "INSERT INTO blob_lines (blob, author_id, lines) VALUES (?, ?, ?)",
+                        (blob, author_id, lines),
+                    )
+                if done % _BATCH_SIZE == 0:
+                    conn.commit()
+    conn.commit()
+    return files, len(todo)
+
+
+def lines_by_directory(
+    conn: sqlite3.Connection,
+    files: List[Tuple[str, str]],
+    depth: int,
+    ignore_authors: Callable[[str], bool] = lambda _s: False,
+    resolver: Optional[IdentityResolver] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Rolls the surviving lines of each author up into every directory at
+    most 'depth' levels deep, plus the repository root as '.'. Authors are
+    cached as git blame printed them and merged into people here.
+
+    Args:
+        conn (sqlite3.Connection): A synced blame cache.
+        files (List[Tuple[str, str]]): (blob id, path) pairs from sync_blame.
+        depth (int): Deepest directory level to keep.
+        ignore_authors (Callable[[str], bool]): Returns True for names or
+            emails to leave out.
+        resolver (Optional[IdentityResolver]): Tells which cached authors
+            are the same person.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Lines per author display name, keyed by
+                                   directory ('src/app/').
+    """
+    resolver = resolver or IdentityResolver()
+    blob_owners: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    rows = conn.execute("""
+        SELECT b.blob, a.name, a.email, b.lines
+        FROM blob_lines b
+        JOIN authors a ON a.id = b.author_id
+        """)
+    for blob, name, email, lines in rows:
+        if not ignore_authors(name) and not ignore_authors(email):
+            blob_owners[blob].append((resolver.resolve(name, email), lines))
+
+    directories: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for blob, path in files:
+        owners = blob_owners.get(blob)
+        if not owners:
+            continue
+        for directory in parent_directories(path, depth):
+            totals = directories[directory]
+            for person, lines in owners:
+                totals[person] += lines
+    names = resolver.display_names(
+        {person for authors in directories.values() for person in authors}
+    )
+    return {
+        directory: {names[person]: lines for person, lines in authors.items()}
+        for directory, authors in directories.items()
+    }
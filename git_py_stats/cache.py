@@ -0,0 +1,142 @@
+"""
+Locates the on-disk cache shared by the stores that persist parsed history,
+and holds the bits of bookkeeping those stores have in common.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from git_py_stats.git_operations import is_ancestor, run_git_command
+
+
+def get_cache_dir(config: Dict[str, Union[str, int]], create: bool = True) -> Optional[str]:
+    """
+    Returns the directory used for cached history, creating it if needed.
+
+    Defaults to a 'git-py-stats' folder inside the repository's common git
+    dir so every worktree shares one cache and nothing shows up in
+    'git status'. _GIT_CACHE_DIR overrides the location.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        create (bool): Whether to create the directory if it doesn't exist.
+
+    Returns:
+        Optional[str]: Absolute path to the cache directory, or None if it
+                       could not be determined or created.
+    """
+    cache_dir = str(config.get("cache_dir", "") or "")
+    if not cache_dir:
+        git_dir = run_git_command(
+            ["git", "rev-parse", "--path-format=absolute", "--git-common-dir"]
+        )
+        if not git_dir:
+            return None
+        cache_dir = os.path.join(git_dir, "git-py-stats")
+
+    if not create:
+        return os.path.abspath(cache_dir) if os.path.isdir(cache_dir) else None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Failed to create cache directory {cache_dir}: {e}")
+        return None
+    return os.path.abspath(cache_dir)
+
+
+def open_cache_db(
+    config: Dict[str, Union[str, int]], name: str, schema: str, version: str
+) -> Optional[sqlite3.Connection]:
+    """
+    Opens (and creates if needed) a SQLite database in the cache dir.
+
+    The schema must create a 'meta' (key, value) table. A database written
+    with a different schema version is deleted and created again, since
+    rebuilding from git is cheaper than maintaining migrations.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        name (str): File name of the database inside the cache dir.
+        schema (str): SQL script creating the tables and indexes.
+        version (str): Schema version stored alongside the data.
+
+    Returns:
+        Optional[sqlite3.Connection]: The open database, or None on failure.
+    """
+    cache_dir = get_cache_dir(config)
+    if not cache_dir:
+        return None
+
+    path = os.path.join(cache_dir, name)
+    try:
+        conn = sqlite3.connect(path)
+        conn.executescript(schema)
+        if get_meta(conn, "schema_version") not in (None, version):
+            conn.close()
+            os.remove(path)
+            conn = sqlite3.connect(path)
+            conn.executescript(schema)
+        set_meta(conn, [("schema_version", version)])
+        conn.commit()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Failed to open {path}: {e}")
+        return None
+    return conn
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    """
+    Reads a value from a cache database's meta table.
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(conn: sqlite3.Connection, items: Iterable[Tuple[str, str]]) -> None:
+    """
+    Writes (key, value) pairs to a cache database's meta table.
+    """
+    conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", items)
+
+
+def encode_path(path: str) -> bytes:
+    """
+    Returns a path as the bytes git printed, for a BLOB column. Paths that
+    aren't valid UTF-8 reach us with surrogate escapes, which SQLite
+    refuses to store as TEXT.
+    """
+    return path.encode("utf-8", "surrogateescape")
+
+
+def decode_path(blob: bytes) -> str:
+    """
+    Turns a path stored with encode_path back into the str git reports use.
+    """
+    return blob.decode("utf-8", "surrogateescape")
+
+
+def catch_up_args(
+    old_tip: Optional[str], old_ref: Optional[str], tip: str, ref: str
+) -> Optional[List[str]]:
+    """
+    Works out which commits a cache built up to 'old_tip' of 'old_ref'
+    has to read to catch up with 'tip' of 'ref'.
+
+    Args:
+        old_tip (Optional[str]): Commit the cache was last synced to, if any.
+        old_ref (Optional[str]): Branch or revision the cache follows, if any.
+        tip (str): Commit to sync to.
+        ref (str): Branch or revision to follow.
+
+    Returns:
+        Optional[List[str]]: None if the cache is up to date, ['^<old tip>']
+                             if only newer commits are needed, or an empty
+                             list if it has to be built again from scratch
+                             (e.g. after a rebase or for another branch).
+    """
+    if old_tip == tip and old_ref == ref:
+        return None
+    if old_tip and old_ref == ref and is_ancestor(old_tip, tip):
+        return [f"^{old_tip}"]
+    return []
@@ -2,11 +2,41 @@
 Functions related to the 'Calendar' section.
 """
 
-from typing import Optional, Dict, Union
-from datetime import datetime, timedelta
+import csv
+import json
+from array import array
+from typing import Optional, Dict, List, Union
+from datetime import date, datetime, time, timedelta
 from collections import defaultdict
 
+from git_py_stats.backends import count_commits, open_backend
+from git_py_stats.commit_stream import iter_commits, local_day
+from git_py_stats.config import is_author_ignored
 from git_py_stats.git_operations import run_git_command
+from git_py_stats.identity import get_resolver
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Each author's calendars live in one array('H'): the weekday x month grid
+# first, then a GitHub-style grid of 53 weeks x 7 days
+_MONTH_CELLS = 7 * 12
+_WEEKS = 53
+_CALENDAR_CELLS = _MONTH_CELLS + _WEEKS * 7
+_MAX_CELL = 0xFFFF
+
+
+def _shade(count: int) -> str:
+    """
+    Helper function that picks the block drawn for a weekday x month cell.
+    """
+    if count == 0:
+        return "..."
+    elif count <= 9:
+        return "░░░"
+    elif count <= 19:
+        return "▒▒▒"
+    return "▓▓▓"
 
 
 def commits_calendar_by_author(config: Dict[str, Union[str, int]], author: Optional[str]) -> None:
@@ -31,7 +61,7 @@ def commits_calendar_by_author(config: Dict[str, Union[str, int]], author: Optio
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
 
     # Original git command:
     # git -c log.showSignature=false log --use-mailmap $_merges \
@@ -44,54 +74,51 @@ def commits_calendar_by_author(config: Dict[str, Union[str, int]], author: Optio
         "log",
         "--use-mailmap",
         "--date=iso",
-        f"--author={author}",
         "--pretty=%ad",
     ]
 
     if author_option:
         cmd.append(author_option)
 
-    cmd.extend([since, until, log_options, merges, pathspec])
+    cmd.extend([since, until, log_options, merges, *pathspec])
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
     print(f"Commit Activity Calendar for '{author}'")
 
-    # Get commit dates
-    output = run_git_command(cmd)
-    if not output:
-        print("No commits found.")
-        return
+    count = defaultdict(lambda: defaultdict(int))
+    store = open_backend(config, author=author)
+    if store is not None:
+        for (weekday, month), commits in count_commits(store, config, "calendar", author).items():
+            count[weekday][month] += commits
+        store.close()
+        if not count:
+            print("No commits found.")
+            return
+    else:
+        # Get commit dates
+        output = run_git_command(cmd)
+        if not output:
+            print("No commits found.")
+            return
+
+        for line in output.strip().split("\n"):
+            try:
+                date_str = line.strip().split(" ")[0]
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+                weekday = date_obj.isoweekday()  # 1=Mon, ..., 7=Sun
+                month = date_obj.month
+                count[weekday][month] += 1
+            except ValueError:
+                continue
 
     print("\n      Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec")
 
-    count = defaultdict(lambda: defaultdict(int))
-    for line in output.strip().split("\n"):
-        try:
-            date_str = line.strip().split(" ")[0]
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            weekday = date_obj.isoweekday()  # 1=Mon, ..., 7=Sun
-            month = date_obj.month
-            count[weekday][month] += 1
-        except ValueError:
-            continue
-
     # Print the calendar
-    weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     for d in range(1, 8):
-        row = f"{weekdays[d-1]:<5} "
-        for m in range(1, 13):
-            c = count[d][m]
-            if c == 0:
-                out = "..."
-            elif c <= 9:
-                out = "░░░"
-            elif c <= 19:
-                out = "▒▒▒"
-            else:
-                out = "▓▓▓"
-            row += out + (" " if m < 12 else "")
+        row = f"{WEEKDAYS[d-1]:<5} "
+        row += " ".join(_shade(count[d][m]) for m in range(1, 13))
         print(row)
 
     print("\nLegend: ... = 0   ░░░ = 1–9   ▒▒▒ = 10–19   ▓▓▓ = 20+ commits")
@@ -160,7 +187,7 @@ def commits_heatmap(config: Dict[str, Union[str, int]]) -> None:
     # lets also provide some defaults just in case.
     merges = config.get("merges", "--no-merges")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "--")
+    pathspec = config.get("pathspec", ["--"])
     days = int(config.get("days", 30))
 
     print(f"Commit Heatmap for the last {days} days")
@@ -177,6 +204,7 @@ def commits_heatmap(config: Dict[str, Union[str, int]]) -> None:
     # Build each day row from oldest to newest, marking weekends,
     # and printing the row header in "DDD | YYYY-MM-DD |" format
     today = datetime.now().date()
+    store = open_backend(config)
     for delta in range(days - 1, -1, -1):
         day = today - timedelta(days=delta)
         is_weekend = day.isoweekday() > 5
@@ -184,43 +212,52 @@ def commits_heatmap(config: Dict[str, Union[str, int]]) -> None:
         dayname = day.strftime("%a")
         print(f"{day_prefix_color}{dayname} | {day.isoformat()} |", end="")
 
-        # Count commits per hour for this day
-        since = f"--since={day.isoformat()} 00:00"
-        until = f"--until={day.isoformat()} 23:59"
-
-        cmd = [
-            "git",
-            "-c",
-            "log.showSignature=false",
-            "log",
-            "--use-mailmap",
-            merges,
-            since,
-            until,
-            "--pretty=%ci",
-            log_options,
-            pathspec,
-        ]
-
-        # Remove any empty space from the cmd
-        cmd = [arg for arg in cmd if arg]
-
-        output = run_git_command(cmd) or ""
-
-        # Create 24 cell per-hour commit histrogram for the day,
-        # grabbing only what is parseable.
-        counts = [0] * 24
-        if output:
-            for line in output.splitlines():
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    time_part = parts[1]
-                    try:
-                        hour = int(time_part.split(":")[0])
-                        if 0 <= hour <= 23:
-                            counts[hour] += 1
-                    except ValueError:
-                        continue
+        if store is not None:
+            # Same local-time window as the git command below
+            bounds = (
+                int(datetime.combine(day, time(0, 0)).timestamp()),
+                int(datetime.combine(day, time(23, 59)).timestamp()),
+            )
+            hours = count_commits(store, config, "hour", bounds=bounds)
+            counts = [hours.get(f"{hour:02d}", 0) for hour in range(24)]
+        else:
+            # Count commits per hour for this day
+            since = f"--since={day.isoformat()} 00:00"
+            until = f"--until={day.isoformat()} 23:59"
+
+            cmd = [
+                "git",
+                "-c",
+                "log.showSignature=false",
+                "log",
+                "--use-mailmap",
+                merges,
+                since,
+                until,
+                "--pretty=%ci",
+                log_options,
+                *pathspec,
+            ]
+
+            # Remove any empty space from the cmd
+            cmd = [arg for arg in cmd if arg]
+
+            output = run_git_command(cmd) or ""
+
+            # Create 24 cell per-hour commit histrogram for the day,
+            # grabbing only what is parseable.
+            counts = [0] * 24
+            if output:
+                for line in output.splitlines():
+                    parts = line.strip().split()
+                    if len(parts) >= 2:
+                        time_part = parts[1]
+                        try:
+                            hour = int(time_part.split(":")[0])
+                            if 0 <= hour <= 23:
+                                counts[hour] += 1
+                        except ValueError:
+                            continue
 
         # Render the cells
         for hour in range(24):
@@ -234,6 +271,9 @@ def commits_heatmap(config: Dict[str, Union[str, int]]) -> None:
         # End the row/reset
         print(RESET)
 
+    if store is not None:
+        store.close()
+
     # Match original version in the bash impl
     print(
         "------------------------------------------------------------------------------------------"
@@ -250,3 +290,144 @@ def commits_heatmap(config: Dict[str, Union[str, int]]) -> None:
     print(f" {COLOR_DEEPEST_RED}█{RESET} 9–10 commits")
     print(f" {COLOR_DEEPEST_RED}█{RESET} 11+ commits")
     print(f" {COLOR_GRAY}.{RESET} = no commits\n")
+
+
+def _week_shade(count: int) -> str:
+    """
+    Helper function that picks the block drawn for one day of the week grid.
+    """
+    if count == 0:
+        return "."
+    elif count <= 2:
+        return "░"
+    elif count <= 5:
+        return "▒"
+    return "▓"
+
+
+def _render_calendars(name: str, cells: "array[int]", first_week: date) -> List[str]:
+    """
+    Helper function that draws one author's weekday x month calendar and
+    week grid as lines of text.
+    """
+    total = sum(cells[:_MONTH_CELLS])
+    lines = [f"Commit Activity Calendar for '{name}' ({total} commits)", ""]
+    lines.append("      " + " ".join(f"{month:<3}" for month in MONTHS))
+    for d in range(7):
+        row = cells[d * 12 : d * 12 + 12]
+        lines.append(f"{WEEKDAYS[d]:<5} " + " ".join(_shade(count) for count in row))
+
+    last_day = first_week + timedelta(days=_WEEKS * 7 - 1)
+    lines.extend(["", f"Weeks from {first_week.isoformat()} to {last_day.isoformat()}:"])
+    for d in range(7):
+        days = cells[_MONTH_CELLS + d : _CALENDAR_CELLS : 7]
+        lines.append(f"{WEEKDAYS[d]:<5} " + "".join(_week_shade(count) for count in days))
+    lines.append("")
+    return lines
+
+
+def commits_calendars_all_authors(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Builds the activity calendar of every author from a single pass over
+    the log and saves them all to one file: the weekday x month calendar
+    of commits_calendar_by_author plus a GitHub-style grid of the 53 weeks
+    up to the newest commit. Each author's counts are kept in one
+    array('H') of 455 cells, so hundreds of authors stay small. With
+    _GIT_CO_AUTHORS enabled, co-authors get the commit on their calendar too.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity,
+    # lets also provide some defaults just in case.
+    report_format = config.get("report_format", "text")
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+    co_authors = config.get("co_authors", False)
+
+    resolver = get_resolver(config)
+    calendars: Dict[int, "array[int]"] = {}
+    first_week: Optional[date] = None
+
+    # Dates are the author's, in their own timezone, like --date=iso shows
+    for commit in iter_commits(config, skip_ignored=True):
+        if is_author_ignored(ignore_authors, commit.author, commit.email):
+            continue
+        day = local_day(commit.timestamp, commit.tz)
+        if first_week is None:
+            # The log is newest first, so the grid ends with this week
+            first_week = day - timedelta(days=day.weekday(), weeks=_WEEKS - 1)
+
+        indexes = [day.weekday() * 12 + day.month - 1]
+        week_day = (day - first_week).days
+        if 0 <= week_day < _WEEKS * 7:
+            indexes.append(_MONTH_CELLS + week_day)
+
+        for author_id in resolver.resolve_credited(
+            commit.author, commit.email, commit.co_authors if co_authors else (), ignore_authors
+        ):
+            cells = calendars.get(author_id)
+            if cells is None:
+                cells = calendars[author_id] = array("H", bytes(2 * _CALENDAR_CELLS))
+            for index in indexes:
+                # Counts stop at the top of the 16-bit range rather than wrap
+                if cells[index] < _MAX_CELL:
+                    cells[index] += 1
+
+    if not calendars or first_week is None:
+        print("No commits found.")
+        return
+
+    names = resolver.display_names(calendars)
+    ranked = sorted(calendars, key=lambda author_id: names[author_id].lower())
+
+    filename = "git_calendars_by_author." + (
+        report_format if report_format in ("json", "csv") else "txt"
+    )
+    try:
+        with open(filename, "w", newline="", encoding="utf-8", errors="surrogateescape") as f:
+            if report_format == "json":
+                json.dump(
+                    {
+                        "first_week": first_week.isoformat(),
+                        "authors": [
+                            {
+                                "author": names[author_id],
+                                "calendar": [
+                                    list(calendars[author_id][d * 12 : d * 12 + 12])
+                                    for d in range(7)
+                                ],
+                                "weeks": [
+                                    list(calendars[author_id][start : start + 7])
+                                    for start in range(_MONTH_CELLS, _CALENDAR_CELLS, 7)
+                                ],
+                            }
+                            for author_id in ranked
+                        ],
+                    },
+                    f,
+                    indent=4,
+                )
+            elif report_format == "csv":
+                # One row per author and weekday, one column per month
+                writer = csv.writer(f)
+                writer.writerow(["Author", "Weekday", *MONTHS])
+                for author_id in ranked:
+                    cells = calendars[author_id]
+                    for d in range(7):
+                        writer.writerow(
+                            [names[author_id], WEEKDAYS[d], *cells[d * 12 : d * 12 + 12]]
+                        )
+            else:
+                for author_id in ranked:
+                    lines = _render_calendars(names[author_id], calendars[author_id], first_week)
+                    f.write("\n".join(lines) + "\n")
+                f.write("Legend: ... = 0   ░░░ = 1–9   ▒▒▒ = 10–19   ▓▓▓ = 20+ commits\n")
+                f.write("Weeks:  . = 0   ░ = 1–2   ▒ = 3–5   ▓ = 6+ commits\n")
+        print(f"Calendars for {len(calendars)} authors saved to {filename}")
+    except IOError as e:
+        print(f"Failed to write to {filename}: {e}")
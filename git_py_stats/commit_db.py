@@ -0,0 +1,489 @@
+"""
+SQLite store of commit history for ad hoc queries and git-free reports.
+"""
+
+import collections
+import sqlite3
+from typing import Any, Counter, Dict, List, Optional, Set, Tuple, Union
+
+from git_py_stats.cache import (
+    catch_up_args,
+    decode_path,
+    encode_path,
+    get_meta,
+    open_cache_db,
+    set_meta,
+)
+from git_py_stats.commit_stream import iter_commits, tz_offset_seconds
+from git_py_stats.git_operations import resolve_commit, run_git_command
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.renames import FileIdentities
+
+DB_NAME = "commits.sqlite3"
+
+# Bump this whenever the schema changes so old databases get rebuilt
+SCHEMA_VERSION = "4"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    UNIQUE (name, email)
+);
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    parents TEXT NOT NULL,
+    parent_count INTEGER NOT NULL,
+    author_id INTEGER NOT NULL REFERENCES authors (id),
+    author_time INTEGER NOT NULL,
+    author_tz TEXT NOT NULL,
+    author_offset INTEGER NOT NULL,
+    committer_time INTEGER NOT NULL,
+    committer_offset INTEGER NOT NULL,
+    subject TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path BLOB NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS file_changes (
+    commit_id INTEGER NOT NULL REFERENCES commits (id),
+    path_id INTEGER NOT NULL REFERENCES paths (id),
+    insertions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS renames (
+    commit_id INTEGER NOT NULL REFERENCES commits (id),
+    old_path_id INTEGER NOT NULL REFERENCES paths (id),
+    new_path_id INTEGER NOT NULL REFERENCES paths (id)
+);
+CREATE INDEX IF NOT EXISTS commits_committer_time ON commits (committer_time);
+CREATE INDEX IF NOT EXISTS commits_author ON commits (author_id, author_time);
+CREATE INDEX IF NOT EXISTS file_changes_commit ON file_changes (commit_id);
+CREATE INDEX IF NOT EXISTS file_changes_path ON file_changes (path_id, commit_id);
+"""
+
+# SQL expressions that produce the same values the git based reports read
+# out of git log, so both paths can share the same rendering code.
+_AUTHOR_LOCAL = "c.author_time + c.author_offset, 'unixepoch'"
+_COMMITTER_LOCAL = "c.committer_time + c.committer_offset, 'unixepoch'"
+_GROUP_EXPRESSIONS = {
+    "author": "a.id",
+    "date": f"strftime('%Y-%m-%d', {_AUTHOR_LOCAL})",
+    "year": f"strftime('%Y', {_COMMITTER_LOCAL})",
+    "month": f"CAST(strftime('%m', {_COMMITTER_LOCAL}) AS INTEGER)",
+    "weekday": f"CAST(strftime('%w', {_COMMITTER_LOCAL}) AS INTEGER)",
+    "hour": f"strftime('%H', {_COMMITTER_LOCAL})",
+    "timezone": "c.author_tz",
+    "calendar": f"CAST(strftime('%w', {_AUTHOR_LOCAL}) AS INTEGER) * 100"
+    f" + CAST(strftime('%m', {_AUTHOR_LOCAL}) AS INTEGER)",
+}
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_WEEKDAYS = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+
+def open_db(config: Dict[str, Union[str, int]]) -> Optional[sqlite3.Connection]:
+    """
+    Opens (and creates if needed) the commit database in the cache dir.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        Optional[sqlite3.Connection]: The open database, or None on failure.
+    """
+    return open_cache_db(config, DB_NAME, _SCHEMA, SCHEMA_VERSION)
+
+
+def _clear_history(conn: sqlite3.Connection) -> None:
+    """
+    Removes every stored commit so the history can be ingested again.
+    """
+    conn.executescript("""
+        DELETE FROM file_changes;
+        DELETE FROM renames;
+        DELETE FROM commits;
+        DELETE FROM paths;
+        DELETE FROM authors;
+        DELETE FROM meta WHERE key IN ('tip', 'ref');
+        """)
+
+
+def sync_commits(conn: sqlite3.Connection, ref: str = "HEAD") -> Optional[int]:
+    """
+    Brings the database up to date with 'ref', ingesting only commits that
+    were added since the last sync. If the stored tip is no longer part of
+    the history (e.g. after a rebase) everything is ingested again.
+
+    Args:
+        conn (sqlite3.Connection): An open commit database.
+        ref (str): The branch or revision to store.
+
+    Returns:
+        Optional[int]: Number of commits added, or None if 'ref' is invalid.
+    """
+    tip = resolve_commit(ref)
+    if not tip:
+        return None
+
+    extra_args = catch_up_args(get_meta(conn, "tip"), get_meta(conn, "ref"), tip, ref)
+    if extra_args is None:
+        return 0
+    if not extra_args:
+        _clear_history(conn)
+
+    author_ids: Dict[Tuple[str, str], int] = {
+        (name, email): author_id
+        for author_id, name, email in conn.execute("SELECT id, name, email FROM authors")
+    }
+    path_ids: Dict[str, int] = {
+        decode_path(path): path_id for path_id, path in conn.execute("SELECT id, path FROM paths")
+    }
+    next_commit_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM commits").fetchone()[0]
+
+    added = 0
+    commit_rows: List[Tuple[Any, ...]] = []
+    change_rows: List[Tuple[int, int, int, int]] = []
+    rename_rows: List[Tuple[int, int, int]] = []
+
+    def intern(path: str) -> int:
+        path_id = path_ids.get(path)
+        if path_id is None:
+            path_id = conn.execute(
+                "INSERT INTO paths (path) VALUES (?)", (encode_path(path),)
+            ).lastrowid
+            path_ids[path] = path_id
+        return path_id
+
+    # Ingest everything on the branch; filters are applied at query time
+    for commit in iter_commits({"merges": ""}, tip, numstat=True, extra_args=extra_args):
+        identity = (commit.author, commit.email)
+        author_id = author_ids.get(identity)
+        if author_id is None:
+            author_id = conn.execute(
+                "INSERT INTO authors (name, email) VALUES (?, ?)", identity
+            ).lastrowid
+            author_ids[identity] = author_id
+
+        commit_id = next_commit_id + added
+        commit_rows.append(
+            (
+                commit_id,
+                commit.hash,
+                " ".join(commit.parents),
+                len(commit.parents),
+                author_id,
+                commit.timestamp,
+                commit.tz,
+                tz_offset_seconds(commit.tz),
+                commit.committer_timestamp,
+                tz_offset_seconds(commit.committer_tz),
+                commit.subject,
+            )
+        )
+        for insertions, deletions, path in commit.files:
+            change_rows.append((commit_id, intern(path), insertions, deletions))
+        for old, new in commit.renames:
+            rename_rows.append((commit_id, intern(old), intern(new)))
+        added += 1
+
+        # Flush in batches to keep memory flat on huge histories
+        if len(commit_rows) >= 5000:
+            _insert_rows(conn, commit_rows, change_rows, rename_rows)
+
+    _insert_rows(conn, commit_rows, change_rows, rename_rows)
+    set_meta(conn, [("tip", tip), ("ref", ref)])
+    conn.commit()
+    return added
+
+
+def _insert_rows(
+    conn: sqlite3.Connection,
+    commit_rows: List[Tuple[Any, ...]],
+    change_rows: List[Tuple[int, int, int, int]],
+    rename_rows: List[Tuple[int, int, int]],
+) -> None:
+    """
+    Writes out pending rows and empties the buffers.
+    """
+    conn.executemany("INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", commit_rows)
+    conn.executemany("INSERT INTO file_changes VALUES (?, ?, ?, ?)", change_rows)
+    conn.executemany("INSERT INTO renames VALUES (?, ?, ?)", rename_rows)
+    commit_rows.clear()
+    change_rows.clear()
+    rename_rows.clear()
+
+
+def export_sqlite(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Saves the commit history (authors, dates, parents, and per-file
+    numstat) to a SQLite database in the cache dir. Re-running only adds
+    commits that are new since the previous export.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+    ref = str(config.get("branch", "") or "HEAD")
+    conn = open_db(config)
+    if conn is None:
+        return
+
+    try:
+        added = sync_commits(conn, ref)
+        if added is None:
+            print(f"Could not resolve '{ref}'.")
+            return
+        total = conn.execute("SELECT COUNT(*) FROM commits").fetchone()[0]
+        path = conn.execute("PRAGMA database_list").fetchone()[2]
+    finally:
+        conn.close()
+
+    print(f"Commit history saved to {path}")
+    print(f"\t{added} new commits, {total} commits total")
+
+
+def resolve_date_bounds(config: Dict[str, Union[str, int]]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Turns the configured --since/--until into timestamps using git's own
+    date parser, without walking any history.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: Since and until timestamps, or None if unset.
+    """
+    args = [arg for arg in (config.get("since", ""), config.get("until", "")) if arg]
+    if not args:
+        return None, None
+
+    since_ts = until_ts = None
+    output = run_git_command(["git", "rev-parse", *args]) or ""
+    for line in output.split("\n"):
+        if line.startswith("--max-age="):
+            since_ts = int(line[len("--max-age=") :])
+        elif line.startswith("--min-age="):
+            until_ts = int(line[len("--min-age=") :])
+    return since_ts, until_ts
+
+
+def _build_filters(
+    config: Dict[str, Union[str, int]],
+    author: Optional[str] = None,
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Translates the config into a WHERE clause over commits 'c' and authors 'a'.
+    """
+    clauses = ["1"]
+    params: List[Any] = []
+
+    merges = config.get("merges", "--no-merges")
+    if merges == "--no-merges":
+        clauses.append("c.parent_count <= 1")
+    elif merges == "--merges":
+        clauses.append("c.parent_count > 1")
+
+    since_ts, until_ts = bounds if bounds is not None else resolve_date_bounds(config)
+    if since_ts is not None:
+        clauses.append("c.committer_time >= ?")
+        params.append(since_ts)
+    if until_ts is not None:
+        clauses.append("c.committer_time <= ?")
+        params.append(until_ts)
+
+    if author:
+        clauses.append("instr(a.name || ' <' || a.email || '>', ?) > 0")
+        params.append(author)
+
+    return " AND ".join(clauses), params
+
+
+def count_commits(
+    conn: sqlite3.Connection,
+    config: Dict[str, Union[str, int]],
+    group: str,
+    author: Optional[str] = None,
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> Counter:
+    """
+    Counts commits grouped by author, date, year, month, weekday, hour,
+    timezone, or calendar cell. Keys match what the equivalent git log
+    format prints (e.g. 'Mon', 'Jan', '09', '+0100'), author keys are
+    (name, email) tuples, and calendar keys are (ISO weekday, month) tuples.
+
+    Args:
+        conn (sqlite3.Connection): A synced commit database.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        group (str): One of the supported groupings.
+        author (Optional[str]): Only count commits whose 'name <email>' contains this text.
+        bounds (Optional[Tuple]): Since and until timestamps to use instead of
+                                  the configured window.
+
+    Returns:
+        Counter: Commit counts per group value.
+    """
+    where, params = _build_filters(config, author, bounds)
+    rows = conn.execute(
+        f"""
+        SELECT {_GROUP_EXPRESSIONS[group]}, COUNT(*)
+        FROM commits c JOIN authors a ON a.id = c.author_id
+        WHERE {where}
+        GROUP BY 1
+        """,
+        params,
+    )
+
+    counts: Counter = collections.Counter()
+    if group == "author":
+        identities = {
+            author_id: (name, email)
+            for author_id, name, email in conn.execute("SELECT id, name, email FROM authors")
+        }
+    for key, count in rows:
+        if group == "author":
+            key = identities[key]
+        elif group == "month":
+            key = _MONTHS[key - 1]
+        elif group == "weekday":
+            key = _WEEKDAYS[key]
+        elif group == "calendar":
+            # (ISO weekday, month), where Sunday is 7 rather than 0
+            key = (key // 100 or 7, key % 100)
+        counts[key] += count
+    return counts
+
+
+def author_stats(
+    conn: sqlite3.Connection, config: Dict[str, Union[str, int]], resolver: IdentityResolver
+) -> Tuple[Dict[str, Dict[str, Any]], int, int, int, int]:
+    """
+    Aggregates the per-author contribution stats shown by detailed_git_stats.
+    Authors are merged by the identity resolver like the git log based
+    version, and unless rename tracking is off, files renamed within the
+    selected commits count once.
+
+    Args:
+        conn (sqlite3.Connection): A synced commit database.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        resolver (IdentityResolver): Tells which stored authors are the same person.
+
+    Returns:
+        Tuple: Stats keyed by author display name, then total insertions,
+               deletions, distinct files changed, and commits.
+    """
+    where, params = _build_filters(config)
+    stats: Dict[int, Dict[str, Any]] = {}
+    # Stored author id -> person id
+    people: Dict[int, int] = {}
+
+    # Newest first, the order git log shows them to the resolver in, so the
+    # most recent email wins like in the git log based version
+    for author_id, name, email, commits, first, last in conn.execute(
+        f"""
+        SELECT a.id, a.name, a.email, COUNT(*), MIN(c.author_time), MAX(c.author_time)
+        FROM commits c JOIN authors a ON a.id = c.author_id
+        WHERE {where}
+        GROUP BY a.id
+        ORDER BY MAX(c.author_time) DESC
+        """,
+        params,
+    ):
+        person = people[author_id] = resolver.resolve(name, email)
+        entry = stats.get(person)
+        if entry is None:
+            entry = stats[person] = {
+                "email": email,
+                "insertions": 0,
+                "deletions": 0,
+                "files": 0,
+                "commits": 0,
+                "lines_changed": 0,
+                "first_commit": first,
+                "last_commit": last,
+            }
+        entry["commits"] += commits
+        entry["first_commit"] = min(entry["first_commit"], first)
+
+    for author_id, insertions, deletions, files in conn.execute(
+        f"""
+        SELECT a.id, SUM(f.insertions), SUM(f.deletions), COUNT(DISTINCT f.path_id)
+        FROM file_changes f
+        JOIN commits c ON c.id = f.commit_id
+        JOIN authors a ON a.id = c.author_id
+        WHERE {where}
+        GROUP BY a.id
+        """,
+        params,
+    ):
+        entry = stats[people[author_id]]
+        entry["insertions"] += insertions
+        entry["deletions"] += deletions
+        entry["files"] += files
+        entry["lines_changed"] += insertions + deletions
+
+    total_insertions, total_deletions, total_files = conn.execute(
+        f"""
+        SELECT COALESCE(SUM(f.insertions), 0), COALESCE(SUM(f.deletions), 0),
+               COUNT(DISTINCT f.path_id)
+        FROM file_changes f
+        JOIN commits c ON c.id = f.commit_id
+        JOIN authors a ON a.id = c.author_id
+        WHERE {where}
+        """,
+        params,
+    ).fetchone()
+    total_commits = sum(author["commits"] for author in stats.values())
+
+    # SQL can't follow rename chains, so when the selected commits renamed
+    # anything the distinct files are counted again by identity
+    identities = FileIdentities()
+    if config.get("renames", True):
+        identities.add_renames(
+            conn.execute(
+                f"""
+                SELECT r.old_path_id, r.new_path_id
+                FROM renames r
+                JOIN commits c ON c.id = r.commit_id
+                JOIN authors a ON a.id = c.author_id
+                WHERE {where}
+                """,
+                params,
+            )
+        )
+    # The same goes for people who committed as several stored authors,
+    # whose distinct files can't simply be added up
+    if len(identities) or len(people) > len(stats):
+        files_by_person: Dict[int, Set[int]] = collections.defaultdict(set)
+        for author_id, path_id in conn.execute(
+            f"""
+            SELECT DISTINCT a.id, f.path_id
+            FROM file_changes f
+            JOIN commits c ON c.id = f.commit_id
+            JOIN authors a ON a.id = c.author_id
+            WHERE {where}
+            """,
+            params,
+        ):
+            files_by_person[people[author_id]].add(path_id)
+        for person, paths in files_by_person.items():
+            stats[person]["files"] = identities.count(paths)
+        total_files = identities.count(set().union(*files_by_person.values()))
+
+    names = resolver.display_names(stats)
+    return (
+        {names[person]: entry for person, entry in stats.items()},
+        total_insertions,
+        total_deletions,
+        total_files,
+        total_commits,
+    )
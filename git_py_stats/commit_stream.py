@@ -0,0 +1,539 @@
+"""
+Streaming access to commit records parsed from git log.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from git_py_stats.git_operations import (
+    GIT_ENCODING,
+    fetch_objects,
+    git_version,
+    promisor_remote,
+    stream_git_command_bytes,
+    supports_perl_regexp,
+)
+
+# Record separator starts every commit header, unit separator splits its fields.
+# Neither can show up in names, emails, or subjects in practice.
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+_RECORD_SEP_BYTES = RECORD_SEP.encode()
+
+# Co-authored-by trailer values, one 'Name <email>' each, split by the
+# group separator. git finds and unfolds the trailers, so commit bodies
+# never have to be read in Python.
+CO_AUTHOR_SEP = "\x1d"
+CO_AUTHORS_FORMAT = "%(trailers:key=Co-authored-by,valueonly,unfold,separator=%x1d)"
+
+LOG_FORMAT = (
+    "--pretty=format:%x1e%H%x1f%P%x1f%aN%x1f%aE%x1f%ad%x1f%cd%x1f%s%x1f" + CO_AUTHORS_FORMAT
+)
+
+_EPOCH = date(1970, 1, 1)
+
+# A --raw row's object id for the side of a change that doesn't exist, and
+# the mode of a submodule, whose commit lives in another repository
+_NULL_OID = re.compile(rb"0+")
+_GITLINK_MODE = b"160000"
+
+# git matches --author against the mailmapped identity from 2.39 on; older
+# versions match the raw one, which could skip commits the mailmap keeps
+_AUTHOR_MAILMAP_VERSION = (2, 39)
+
+# A literal made of only these could match the date git appends to the
+# author line, so it's never pushed down
+_DATE_CHARS = frozenset("0123456789 +-")
+
+# Options that change how --author is combined or interpreted
+_AUTHOR_MATCH_OPTIONS = (
+    "--author",
+    "--committer",
+    "--grep",
+    "--all-match",
+    "--invert-grep",
+    "--regexp-ignore-case",
+    "--basic-regexp",
+    "--extended-regexp",
+    "--fixed-strings",
+    "--perl-regexp",
+    "-i",
+    "-E",
+    "-F",
+    "-P",
+)
+
+
+class CommitRecord(NamedTuple):
+    """
+    A single commit as read from git log.
+
+    timestamp and tz are the author date, which is what most reports show.
+    The committer date is kept as well since git's --since and --until
+    filter on it.
+
+    files holds (insertions, deletions, path) tuples and is only filled in
+    when the log was requested with numstat. Binary files count as 0/0.
+
+    co_authors holds the values of the commit's Co-authored-by trailers as
+    written, e.g. 'Name <email>'.
+
+    renames holds an (old path, new path) pair for every file git saw
+    renamed or copied in the commit. Its entry in files uses the new path.
+    """
+
+    hash: str
+    parents: Tuple[str, ...]
+    author: str
+    email: str
+    timestamp: int
+    tz: str
+    committer_timestamp: int
+    committer_tz: str
+    subject: str
+    files: List[Tuple[int, int, str]]
+    co_authors: Tuple[str, ...] = ()
+    renames: Tuple[Tuple[str, str], ...] = ()
+
+
+def tz_offset_seconds(tz: str) -> int:
+    """
+    Converts a git timezone offset into seconds east of UTC.
+
+    Args:
+        tz (str): Offset in git's +HHMM/-HHMM form.
+
+    Returns:
+        int: The offset in seconds, or 0 if it can't be parsed.
+    """
+    try:
+        sign = -1 if tz.startswith("-") else 1
+        return sign * (int(tz[1:3]) * 3600 + int(tz[3:5]) * 60)
+    except ValueError:
+        return 0
+
+
+def local_day(timestamp: int, tz: str) -> date:
+    """
+    Returns the calendar day a commit was made on in its author's timezone,
+    which is what git's --date=short shows.
+
+    Args:
+        timestamp (int): Seconds since the epoch.
+        tz (str): Offset in git's +HHMM/-HHMM form.
+
+    Returns:
+        date: The local date of the commit.
+    """
+    return _EPOCH + timedelta(seconds=timestamp + tz_offset_seconds(tz))
+
+
+def format_iso_date(timestamp: int, tz: str) -> str:
+    """
+    Formats a raw git date the same way git's --date=iso does.
+
+    Args:
+        timestamp (int): Seconds since the epoch.
+        tz (str): Offset in git's +HHMM/-HHMM form.
+
+    Returns:
+        str: Date in 'YYYY-MM-DD HH:MM:SS +HHMM' format.
+    """
+    offset = timezone(timedelta(seconds=tz_offset_seconds(tz)))
+    return datetime.fromtimestamp(timestamp, offset).strftime("%Y-%m-%d %H:%M:%S %z")
+
+
+def parent_directories(path: str, depth: int) -> List[str]:
+    """
+    Returns the directories a file rolls up into in the per-directory
+    reports, from the repository root ('.') down to 'depth' levels.
+
+    Args:
+        path (str): A file path relative to the repository root.
+        depth (int): Deepest directory level to keep.
+
+    Returns:
+        List[str]: Directories like ['.', 'src/', 'src/app/'].
+    """
+    directories = ["."]
+    prefix = ""
+    # The file name itself isn't a directory, so leave it off
+    for part in path.split("/")[:-1][:depth]:
+        prefix = f"{prefix}{part}/"
+        directories.append(prefix)
+    return directories
+
+
+def git_author_exclusion(pattern: str) -> Optional[str]:
+    """
+    Translates a _GIT_IGNORE_AUTHORS pattern into a --perl-regexp --author
+    pattern that skips the same authors inside git.
+
+    git matches --author against 'Name <email> <timestamp> <tz>', while
+    Python checks the name, the email, and 'Name <email>' one at a time.
+    Only an alternation of literals ('.' standing for any character) is
+    translated: without '<' or '>' a literal can't straddle the name and
+    the email, and with one character that can't be part of a date it
+    can't match the date, so git never skips a commit Python would keep.
+
+    Args:
+        pattern (str): The _GIT_IGNORE_AUTHORS regex.
+
+    Returns:
+        Optional[str]: The git pattern, or None if it can't be translated.
+    """
+    # One group around the whole alternation is common: '(a@b.com|Some User)'
+    group = re.fullmatch(r"\((?:\?:)?(.*)\)", pattern or "")
+    body = group.group(1) if group else pattern or ""
+
+    alternatives = []
+    current: List[str] = []
+    plain = False
+    for token in re.finditer(r"\\(.)|(.)", body + "|", re.DOTALL):
+        escaped, char = token.groups()
+        if escaped is not None:
+            if escaped.isalnum() or escaped in "<>":
+                return None
+            current.append(re.escape(escaped))
+            plain = plain or escaped not in _DATE_CHARS
+        elif char == "|":
+            if not plain:
+                return None
+            alternatives.append("".join(current))
+            current, plain = [], False
+        elif char == ".":
+            current.append("[^<>]")
+        elif char in "()[]{}*+?^$<>\\":
+            return None
+        else:
+            current.append(re.escape(char))
+            plain = plain or char not in _DATE_CHARS
+    return f"^(?!.*(?:{'|'.join(alternatives)}))"
+
+
+def author_exclusion_args(config: Dict[str, Union[str, int]]) -> List[str]:
+    """
+    Returns the git log options that keep commits by ignored authors from
+    ever reaching Python, or nothing if git can't do it exactly. Callers
+    still check every commit, so this only saves work.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        List[str]: ['--perl-regexp', '--author=...'] or [].
+    """
+    ignore_authors = config.get("ignore_authors")
+    pattern = git_author_exclusion(getattr(ignore_authors, "pattern", ""))
+    if not pattern:
+        return []
+    # Another --author would be OR-ed with ours, and -P would change --grep
+    log_options = str(config.get("log_options", "")).split()
+    if any(option.startswith(_AUTHOR_MATCH_OPTIONS) for option in log_options):
+        return []
+    if git_version() < _AUTHOR_MAILMAP_VERSION or not supports_perl_regexp():
+        return []
+    return ["--perl-regexp", f"--author={pattern}"]
+
+
+def build_log_command(
+    config: Dict[str, Union[str, int]],
+    branch: Optional[str] = None,
+    numstat: bool = False,
+    extra_args: Optional[List[str]] = None,
+    skip_ignored: bool = False,
+    metadata_only: bool = False,
+) -> List[str]:
+    """
+    Builds the git log command used to stream commit records.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        branch (Optional[str]): Git branch to read. If None, use current branch.
+        numstat (bool): Whether to request per-file insertions/deletions.
+        extra_args (Optional[List[str]]): More revisions or options, e.g. '^<tip>'.
+        skip_ignored (bool): Whether git may leave out commits by authors
+                             in _GIT_IGNORE_AUTHORS.
+        metadata_only (bool): With numstat, list changed files from the trees
+                              alone (--raw) instead of diffing their contents,
+                              so no blob is ever read.
+
+    Returns:
+        List[str]: The git command with empty options removed.
+    """
+    merges = config.get("merges", "--no-merges")
+    since = config.get("since", "")
+    until = config.get("until", "")
+    log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
+    rename_args = "-M" if config.get("renames", True) else "--no-renames"
+    # Rename detection compares contents, so a listing from trees skips it
+    file_args = ["--raw", "--no-abbrev", "--no-renames"] if metadata_only else ["--numstat"]
+
+    cmd = [
+        "git",
+        "-c",
+        "log.showSignature=false",
+        "log",
+        branch or "",
+        *(extra_args or []),
+        "--use-mailmap",
+        merges,
+        LOG_FORMAT,
+        "--date=raw",
+        # NUL framed, so paths come through verbatim and renames as two paths
+        *(file_args if numstat else []),
+        "-z" if numstat else "",
+        rename_args if numstat and not metadata_only else "",
+        since,
+        until,
+        *(author_exclusion_args(config) if skip_ignored else []),
+        log_options,
+        *pathspec,
+    ]
+
+    # Remove any empty space from the cmd
+    return [arg for arg in cmd if arg]
+
+
+def _parse_raw_date(date_raw: str) -> Tuple[int, str]:
+    """
+    Splits a --date=raw value such as '1609459200 +0100' into its parts.
+    """
+    date_parts = date_raw.split()
+    return int(date_parts[0]), date_parts[1] if len(date_parts) > 1 else "+0000"
+
+
+def parse_numstat(
+    body: bytes, paths: Dict[bytes, str]
+) -> Tuple[List[Tuple[int, int, str]], Tuple[Tuple[str, str], ...]]:
+    """
+    Tokenizes the numstat rows git log -z writes after a commit header.
+
+    Every row ends in a NUL and paths are never quoted, so tabs, newlines,
+    and non-ASCII bytes in file names come through as they are. A rename
+    or copy leaves the path column empty and follows it with the old and
+    the new path as two more NUL terminated fields:
+
+        10\t2\tsrc/a.py\0
+        1\t1\t\0src/old.py\0src/new.py\0
+
+    Rows from a metadata only log (--raw) start with ':' and are followed
+    by the path the same way. They carry no line counts, so those are 0:
+
+        :100644 100644 <old id> <new id> M\0src/a.py\0
+
+    Args:
+        body (bytes): The part of a record after the header line.
+        paths (Dict[bytes, str]): Paths decoded so far, shared across
+                                  commits so each is decoded only once.
+
+    Returns:
+        Tuple: (insertions, deletions, path) per file, with binary files
+               as 0/0 and renamed files under their new path, then the
+               (old path, new path) pairs.
+    """
+    files: List[Tuple[int, int, str]] = []
+    renames: List[Tuple[str, str]] = []
+    tokens = body.split(b"\0")
+    index = 0
+    count = len(tokens)
+    while index < count:
+        token = tokens[index]
+        index += 1
+        if not token:
+            continue
+        if token[:1] == b":":
+            # Renames and copies have an R or C status and two paths
+            status = token.rpartition(b" ")[2]
+            width = 2 if status[:1] in (b"R", b"C") else 1
+            row_paths = tokens[index : index + width]
+            index += width
+            if len(row_paths) != width or not all(row_paths):
+                continue
+            added_count = removed_count = 0
+            old_path = row_paths[0] if width == 2 else None
+            raw_path = row_paths[-1]
+        else:
+            row_parts = token.split(b"\t", 2)
+            if len(row_parts) != 3:
+                continue
+            added, removed, raw_path = row_parts
+            old_path = None
+            if not raw_path:
+                old_path, raw_path = tokens[index : index + 2] if index + 2 <= count else (b"", b"")
+                index += 2
+                if not old_path or not raw_path:
+                    continue
+            try:
+                added_count = int(added) if added != b"-" else 0
+                removed_count = int(removed) if removed != b"-" else 0
+            except ValueError:
+                continue
+        path = paths.get(raw_path)
+        if path is None:
+            path = paths[raw_path] = raw_path.decode(GIT_ENCODING, "surrogateescape")
+        files.append((added_count, removed_count, path))
+        if old_path is not None:
+            old = paths.get(old_path)
+            if old is None:
+                old = paths[old_path] = old_path.decode(GIT_ENCODING, "surrogateescape")
+            renames.append((old, path))
+    return files, tuple(renames)
+
+
+def parse_commit_records(records: Iterable[bytes]) -> Iterator[CommitRecord]:
+    """
+    Turns git log output produced with LOG_FORMAT into commit records.
+
+    The output is read as bytes and split on RECORD_SEP, so each record
+    holds one commit's header line followed by its numstat rows, which
+    parse_numstat tokenizes straight from the bytes. Headers are decoded
+    whole, and each distinct path is decoded only once no matter how many
+    commits touch it. Paths are most of a --numstat log, and every commit
+    that touches a path shares one string for it.
+
+    Args:
+        records (Iterable[bytes]): git log output split on RECORD_SEP.
+
+    Yields:
+        CommitRecord: One record per commit, in git log order.
+    """
+    paths: Dict[bytes, str] = {}
+    for record in records:
+        # -z ends a commit with NULs, and one without files has no newline
+        header, _, body = record.rstrip(b"\0").partition(b"\n")
+        parts = header.decode(GIT_ENCODING, "surrogateescape").split(FIELD_SEP, 7)
+        if len(parts) not in (7, 8):
+            continue
+        commit_hash, parents, author, email, author_date, committer_date, subject = parts[:7]
+        co_authors = parts[7].split(CO_AUTHOR_SEP) if len(parts) == 8 else []
+        try:
+            timestamp, tz = _parse_raw_date(author_date)
+            committer_timestamp, committer_tz = _parse_raw_date(committer_date)
+        except (ValueError, IndexError):
+            continue
+
+        files, renames = parse_numstat(body, paths) if body else ([], ())
+
+        yield CommitRecord(
+            commit_hash,
+            tuple(parents.split()),
+            author,
+            email,
+            timestamp,
+            tz,
+            committer_timestamp,
+            committer_tz,
+            subject,
+            files,
+            tuple(value for value in co_authors if value.strip()),
+            renames,
+        )
+
+
+def missing_blobs(
+    config: Dict[str, Union[str, int]],
+    branch: Optional[str] = None,
+    extra_args: Optional[List[str]] = None,
+    skip_ignored: bool = False,
+) -> List[str]:
+    """
+    Lists the blobs a numstat log over the same commits would read that a
+    partial clone doesn't have yet.
+
+    Which blobs a commit changed is known from its trees alone, so a --raw
+    log names them without reading any. Those not among the objects the
+    clone already has are what git would otherwise fetch one at a time.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        branch (Optional[str]): Git branch to read. If None, use current branch.
+        extra_args (Optional[List[str]]): More revisions or options, e.g. '^<tip>'.
+        skip_ignored (bool): Whether git may leave out commits by authors
+                             in _GIT_IGNORE_AUTHORS.
+
+    Returns:
+        List[str]: Ids of the missing blobs.
+    """
+    cmd = build_log_command(config, branch, True, extra_args, skip_ignored, metadata_only=True)
+    wanted: Set[bytes] = set()
+    # Without -z every row is one line with its paths quoted, and only
+    # rows start with ':' (':<old mode> <new mode> <old id> <new id> <status>\t<path>')
+    for line in stream_git_command_bytes([arg for arg in cmd if arg != "-z"]):
+        if line[:1] != b":":
+            continue
+        fields = line[1:].partition(b"\t")[0].split(b" ")
+        if len(fields) != 5:
+            continue
+        for mode, object_id in ((fields[0], fields[2]), (fields[1], fields[3])):
+            if mode != _GITLINK_MODE and not _NULL_OID.fullmatch(object_id):
+                wanted.add(object_id)
+    if not wanted:
+        return []
+
+    present = [
+        "git",
+        "cat-file",
+        "--batch-all-objects",
+        "--batch-check=%(objectname)",
+        "--unordered",
+    ]
+    for object_id in stream_git_command_bytes(present):
+        wanted.discard(object_id)
+        if not wanted:
+            return []
+    return sorted(object_id.decode("ascii") for object_id in wanted)
+
+
+@lru_cache(maxsize=None)
+def _metadata_only_notice() -> None:
+    """
+    Says once per run that line counts are left out.
+    """
+    print("Partial clone: counting changed files only, insertions and deletions show as 0.")
+
+
+def iter_commits(
+    config: Dict[str, Union[str, int]],
+    branch: Optional[str] = None,
+    numstat: bool = False,
+    extra_args: Optional[List[str]] = None,
+    skip_ignored: bool = False,
+) -> Iterator[CommitRecord]:
+    """
+    Streams commit records straight from git log without buffering the
+    whole history.
+
+    In a partial clone, numstat would make git fetch every blob it diffs
+    with a request of its own. Depending on _GIT_PARTIAL_CLONE, the blobs
+    are fetched up front in one request instead, or the files are listed
+    from the trees alone without line counts.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        branch (Optional[str]): Git branch to read. If None, use current branch.
+        numstat (bool): Whether to include per-file insertions/deletions.
+        extra_args (Optional[List[str]]): More revisions or options, e.g. '^<tip>'.
+        skip_ignored (bool): Whether git may leave out commits by authors
+                             in _GIT_IGNORE_AUTHORS.
+
+    Yields:
+        CommitRecord: One record per commit, newest first.
+    """
+    metadata_only = False
+    partial_clone = config.get("partial_clone", "prefetch")
+    remote = promisor_remote() if numstat and partial_clone != "lazy" else None
+    if remote and partial_clone == "metadata":
+        metadata_only = True
+        _metadata_only_notice()
+    elif remote:
+        object_ids = missing_blobs(config, branch, extra_args, skip_ignored)
+        if object_ids:
+            print(f"Partial clone: fetching {len(object_ids)} blobs from '{remote}'...")
+            fetch_objects(remote, object_ids)
+
+    cmd = build_log_command(config, branch, numstat, extra_args, skip_ignored, metadata_only)
+    yield from parse_commit_records(stream_git_command_bytes(cmd, _RECORD_SEP_BYTES))
@@ -4,10 +4,15 @@ Handles reading configuration settings from environment variables.
 
 import os
 import re
+import shlex
 from datetime import datetime
-from typing import Dict, Union, Optional, Callable
+from functools import lru_cache
+from typing import Dict, List, Union, Optional, Callable
 from git_py_stats.git_operations import run_git_command
 
+# How many distinct names/emails (and identities) keep their verdict cached
+AUTHOR_VERDICT_CACHE_SIZE = 4096
+
 
 def _build_author_exclusion_filter(pattern: str) -> Callable[[str], bool]:
     """
@@ -20,6 +25,11 @@ def _build_author_exclusion_filter(pattern: str) -> Callable[[str], bool]:
                        No flags are injected automatically, but users can
                        include them for case-insensitive matches.
 
+    The same few names and emails come up on every commit, so each verdict
+    is cached (LRU, AUTHOR_VERDICT_CACHE_SIZE entries) and the regex runs
+    once per distinct string. The source pattern is kept as '.pattern' so
+    callers can hand it to git as well.
+
     Returns:
         Callable[[str], bool]: Input string 's' that matches the pattern to be
                                ignored. False otherwise.
@@ -28,7 +38,32 @@ def _build_author_exclusion_filter(pattern: str) -> Callable[[str], bool]:
     if not pattern:
         return lambda _s: False
     rx = re.compile(pattern)
-    return lambda s: bool(rx.search(s or ""))
+
+    @lru_cache(maxsize=AUTHOR_VERDICT_CACHE_SIZE)
+    def ignore_authors(s: Optional[str]) -> bool:
+        return bool(rx.search(s or ""))
+
+    ignore_authors.pattern = pattern
+    return ignore_authors
+
+
+@lru_cache(maxsize=AUTHOR_VERDICT_CACHE_SIZE)
+def is_author_ignored(ignore_authors: Callable[[str], bool], name: str, email: str) -> bool:
+    """
+    Tells whether an author matches _GIT_IGNORE_AUTHORS as a name, an email,
+    or 'name <email>'. The verdict is cached per identity, so checking
+    every commit costs a dict lookup instead of up to three regex searches.
+
+    Args:
+        ignore_authors (Callable[[str], bool]): The filter from the config.
+        name (str): The author's name.
+        email (str): The author's email.
+
+    Returns:
+        bool: True if the author should be left out.
+    """
+    combo = f"{name} <{email}>" if name else f"<{email}>"
+    return bool(ignore_authors(combo) or ignore_authors(name) or (email and ignore_authors(email)))
 
 
 def _parse_git_sort_by(raw: str) -> tuple[str, str]:
@@ -98,7 +133,10 @@ def get_config() -> Dict[str, Union[str, int]]:
             If not set, defaults to the current system date/time upon exec
             of the program.
         _GIT_PATHSPEC (str): Specifies files or directories to include/exclude in stats.
-            Defaults to "--" which means to skip over this option.
+            Split like a shell would, so several pathspecs and magic such as
+            ':(exclude)vendor' each reach git as their own argument, and
+            quotes keep a path with spaces whole. Defaults to empty, which
+            means to skip over this option.
         _GIT_MERGE_VIEW (str): Merge commit view strategy. Options:
             - 'exclusive' to show only merge commits.
             - 'enable' to use the user's default merge view from the conf.
@@ -112,6 +150,58 @@ def get_config() -> Dict[str, Union[str, int]]:
         _GIT_SORT_BY (str): Defines sort metric and direction for contribution stats.
                             Default is name-asc.
         _GIT_IGNORE_AUTHORS (str): Defines authors to ignore. Default is empty.
+        _GIT_JSON_FORMAT (str): Output format for the JSON log export. Options:
+            - 'json' (default) for a single JSON array.
+            - 'ndjson' for one JSON object per line.
+            - Either of the above with a '.gz' suffix to gzip the file.
+        _GIT_JSON_FIELDS (str): Comma separated extra fields for the JSON log
+            export. Any of 'email', 'parents', 'numstat'. Default is empty.
+        _GIT_BACKEND (str): Where reports read history from. Options:
+            - 'git' (default) to run git log for every report.
+            - 'sqlite' to answer supported reports from the SQLite export,
+               syncing new commits into it first.
+            - 'snapshot' to answer them from a memory-mapped columnar
+               snapshot, syncing new commits into it first.
+            - 'rollup' to answer them from a cube of commit counts per
+               hour and author, syncing new commits into it first.
+        _GIT_RENAMES (str): Whether renamed files keep one identity. Options:
+            - 'enable' (default) to have git detect renames (-M) and count
+               every name a file has had as the same file.
+            - 'disable' to skip rename detection (--no-renames), which is
+               faster on huge repos. Same as the --no-renames switch.
+        _GIT_CO_AUTHORS (str): Whether Co-authored-by trailers credit people in
+            the contribution stats, the activity by author report, and the
+            calendars of all authors. Options:
+            - 'disable' (default) to credit the commit author only.
+            - 'enable' to also credit each co-author with the commit.
+        _GIT_PARTIAL_CLONE (str): What reports that need line counts do in a
+            partial clone (e.g. --filter=blob:none), where git would otherwise
+            fetch every missing blob one request at a time. Options:
+            - 'prefetch' (default) to fetch the blobs the report needs up
+               front in a single request.
+            - 'metadata' to fetch nothing and count changed files only, with
+               insertions and deletions reported as 0.
+            - 'lazy' to leave it to git.
+        _GIT_CACHE_DIR (str): Directory for cached history such as the SQLite
+            export and the snapshot. Defaults to 'git-py-stats' inside the
+            repo's git dir.
+        _GIT_DIR_DEPTH (int): How many directory levels the per-directory
+            reports roll up to. Defaults to 2.
+        _GIT_REPORT_FORMAT (str): Output of the Analyze reports. Options:
+            - 'text' (default) to print a table.
+            - 'json' or 'csv' to save the full results to a file instead.
+        _GIT_COCHANGE_MAX_FILES (int): Commits touching more files than this
+            are left out of the co-change report. Defaults to 30.
+        _GIT_COCHANGE_MIN_SUPPORT (int): Fewest commits a pair of files must
+            share to show up in the co-change report. Defaults to 3.
+        _GIT_COCHANGE_MINHASH (int): Size of the per-file min-hash sketches
+            used to estimate co-changes instead of counting every pair. At
+            least 4, e.g. 64. Default is empty, which counts exactly.
+        _GIT_BUS_FACTOR_THRESHOLD (int): Percent of a directory's lines
+            changed that its top authors must account for in the bus factor
+            report. Defaults to 50.
+        _GIT_BLAME_JOBS (int): How many git blame processes the blame
+            ownership report runs at once. Defaults to one per CPU.
         _MENU_THEME (str): Toggles between the default theme and legacy theme.
             - 'legacy' to set the legacy theme
             - 'none' to disable the menu theme
@@ -124,7 +214,7 @@ def get_config() -> Dict[str, Union[str, int]]:
         Dict[str, Union[str, int]]: A dictionary containing the configuration options:
             - 'since' (str): Git command option for the start date.
             - 'until' (str): Git command option for the end date.
-            - 'pathspec' (str): Git command option for pathspec.
+            - 'pathspec' (List[str]): '--' followed by each pathspec.
             - 'merges' (str): Git command option for merge commit view strategy.
             - 'branch' (str): Git branch name.
             - 'limit' (int): Git log output limit.
@@ -132,6 +222,20 @@ def get_config() -> Dict[str, Union[str, int]]:
             - 'days' (str): Number of days for the heatmap.
             - 'sort_by' (str): Sort by field and sort direction (asc/desc).
             - 'ignore_authors': (str): Any author(s) to ignore.
+            - 'json_format' (str): JSON export format and compression.
+            - 'json_fields' (List[str]): Extra fields for the JSON export.
+            - 'backend' (str): Report backend, 'git', 'sqlite', 'snapshot', or 'rollup'.
+            - 'renames' (bool): Whether to detect renames and track file identity.
+            - 'co_authors' (bool): Whether co-authors are credited with commits.
+            - 'partial_clone' (str): 'prefetch', 'metadata', or 'lazy'.
+            - 'cache_dir' (str): Cache directory override, empty for the default.
+            - 'dir_depth' (int): Directory depth for per-directory reports.
+            - 'report_format' (str): Analyze report output, 'text', 'json', or 'csv'.
+            - 'cochange_max_files' (int): Largest commit counted for co-changes.
+            - 'cochange_min_support' (int): Fewest shared commits for a co-change.
+            - 'cochange_minhash' (int): Min-hash sketch size, 0 to count exactly.
+            - 'bus_factor_threshold' (int): Percent of lines behind the bus factor.
+            - 'blame_jobs' (int): Parallel git blame processes, 0 for one per CPU.
             - 'menu_theme' (str): Menu theme color.
     """
     config: Dict[str, Union[str, int]] = {}
@@ -141,12 +245,14 @@ def get_config() -> Dict[str, Union[str, int]]:
     if git_since:
         config["since"] = f"--since={git_since}"
     else:
-        # Get the earliest commit date in the repo
+        # Get the earliest commit date in the repo. Only root commits are
+        # printed, and the walk always ends on one, so the last line is the
+        # same date 'git log --reverse' would print first.
         earliest_commit_date: Optional[str] = run_git_command(
-            ["git", "log", "--reverse", "--format=%ad"]
+            ["git", "log", "--max-parents=0", "--format=%ad"]
         )
         if earliest_commit_date:
-            first_commit_date: str = earliest_commit_date.split("\n")[0]
+            first_commit_date: str = earliest_commit_date.split("\n")[-1]
             config["since"] = f"--since='{first_commit_date}'"
         else:
             config["since"] = ""
@@ -161,11 +267,14 @@ def get_config() -> Dict[str, Union[str, int]]:
         config["until"] = f"--until='{now}'"
 
     # _GIT_PATHSPEC
-    git_pathspec: Optional[str] = os.environ.get("_GIT_PATHSPEC")
-    if git_pathspec:
-        config["pathspec"] = f"-- {git_pathspec}"
-    else:
-        config["pathspec"] = "--"
+    git_pathspec: str = os.environ.get("_GIT_PATHSPEC", "")
+    pathspecs: List[str]
+    try:
+        pathspecs = shlex.split(git_pathspec)
+    except ValueError:
+        print(f"Invalid value for _GIT_PATHSPEC: '{git_pathspec}'. Splitting on whitespace.")
+        pathspecs = git_pathspec.split()
+    config["pathspec"] = ["--", *pathspecs]
 
     # _GIT_MERGE_VIEW
     git_merge_view: str = os.environ.get("_GIT_MERGE_VIEW", "").lower()
@@ -225,6 +334,125 @@ def get_config() -> Dict[str, Union[str, int]]:
     ignore_authors_pattern: Optional[str] = os.environ.get("_GIT_IGNORE_AUTHORS")
     config["ignore_authors"] = _build_author_exclusion_filter(ignore_authors_pattern)
 
+    # _GIT_JSON_FORMAT
+    json_format: str = os.environ.get("_GIT_JSON_FORMAT", "").strip().lower()
+    if json_format in {"json", "ndjson", "json.gz", "ndjson.gz"}:
+        config["json_format"] = json_format
+    else:
+        if json_format:
+            print(f"Invalid value for _GIT_JSON_FORMAT: '{json_format}'. Using 'json'.")
+        config["json_format"] = "json"
+
+    # _GIT_JSON_FIELDS
+    allowed_json_fields = ("email", "parents", "numstat")
+    json_fields = [
+        field.strip().lower()
+        for field in os.environ.get("_GIT_JSON_FIELDS", "").split(",")
+        if field.strip()
+    ]
+    for field in json_fields:
+        if field not in allowed_json_fields:
+            print(f"WARNING: Unknown field '{field}' set in _GIT_JSON_FIELDS. Ignoring.")
+    config["json_fields"] = [field for field in allowed_json_fields if field in json_fields]
+
+    # _GIT_BACKEND
+    backend: str = os.environ.get("_GIT_BACKEND", "").strip().lower()
+    if backend in {"git", "sqlite", "snapshot", "rollup"}:
+        config["backend"] = backend
+    else:
+        if backend:
+            print(f"Invalid value for _GIT_BACKEND: '{backend}'. Using 'git'.")
+        config["backend"] = "git"
+
+    # _GIT_RENAMES
+    git_renames: str = os.environ.get("_GIT_RENAMES", "").strip().lower()
+    if git_renames not in {"", "enable", "disable"}:
+        print(f"Invalid value for _GIT_RENAMES: '{git_renames}'. Using 'enable'.")
+    config["renames"] = git_renames != "disable"
+
+    # _GIT_CO_AUTHORS
+    git_co_authors: str = os.environ.get("_GIT_CO_AUTHORS", "").strip().lower()
+    if git_co_authors not in {"", "enable", "disable"}:
+        print(f"Invalid value for _GIT_CO_AUTHORS: '{git_co_authors}'. Using 'disable'.")
+    config["co_authors"] = git_co_authors == "enable"
+
+    # _GIT_PARTIAL_CLONE
+    partial_clone: str = os.environ.get("_GIT_PARTIAL_CLONE", "").strip().lower()
+    if partial_clone in {"prefetch", "metadata", "lazy"}:
+        config["partial_clone"] = partial_clone
+    else:
+        if partial_clone:
+            print(f"Invalid value for _GIT_PARTIAL_CLONE: '{partial_clone}'. Using 'prefetch'.")
+        config["partial_clone"] = "prefetch"
+
+    # _GIT_CACHE_DIR
+    config["cache_dir"] = os.environ.get("_GIT_CACHE_DIR", "")
+
+    # _GIT_DIR_DEPTH
+    git_dir_depth: Optional[str] = os.environ.get("_GIT_DIR_DEPTH")
+    if git_dir_depth:
+        try:
+            config["dir_depth"] = max(int(git_dir_depth), 1)
+        except ValueError:
+            print("Invalid value for _GIT_DIR_DEPTH. Using default value 2.")
+            config["dir_depth"] = 2
+    else:
+        config["dir_depth"] = 2
+
+    # _GIT_REPORT_FORMAT
+    report_format: str = os.environ.get("_GIT_REPORT_FORMAT", "").strip().lower()
+    if report_format in {"text", "json", "csv"}:
+        config["report_format"] = report_format
+    else:
+        if report_format:
+            print(f"Invalid value for _GIT_REPORT_FORMAT: '{report_format}'. Using 'text'.")
+        config["report_format"] = "text"
+
+    # _GIT_COCHANGE_MAX_FILES and _GIT_COCHANGE_MIN_SUPPORT
+    for name, key, default in (
+        ("_GIT_COCHANGE_MAX_FILES", "cochange_max_files", 30),
+        ("_GIT_COCHANGE_MIN_SUPPORT", "cochange_min_support", 3),
+    ):
+        value: Optional[str] = os.environ.get(name)
+        try:
+            config[key] = max(int(value), 1) if value else default
+        except ValueError:
+            print(f"Invalid value for {name}. Using default value {default}.")
+            config[key] = default
+
+    # _GIT_COCHANGE_MINHASH
+    git_minhash: Optional[str] = os.environ.get("_GIT_COCHANGE_MINHASH")
+    config["cochange_minhash"] = 0
+    if git_minhash:
+        try:
+            if int(git_minhash) < 4:
+                raise ValueError
+            config["cochange_minhash"] = int(git_minhash)
+        except ValueError:
+            print("Invalid value for _GIT_COCHANGE_MINHASH. Counting co-changes exactly.")
+
+    # _GIT_BUS_FACTOR_THRESHOLD
+    git_bus_factor: Optional[str] = os.environ.get("_GIT_BUS_FACTOR_THRESHOLD")
+    if git_bus_factor:
+        try:
+            config["bus_factor_threshold"] = min(max(int(git_bus_factor), 1), 100)
+        except ValueError:
+            print("Invalid value for _GIT_BUS_FACTOR_THRESHOLD. Using default value 50.")
+            config["bus_factor_threshold"] = 50
+    else:
+        config["bus_factor_threshold"] = 50
+
+    # _GIT_BLAME_JOBS
+    git_blame_jobs: Optional[str] = os.environ.get("_GIT_BLAME_JOBS")
+    if git_blame_jobs:
+        try:
+            config["blame_jobs"] = max(int(git_blame_jobs), 0)
+        except ValueError:
+            print("Invalid value for _GIT_BLAME_JOBS. Using one per CPU.")
+            config["blame_jobs"] = 0
+    else:
+        config["blame_jobs"] = 0
+
     # _MENU_THEME
     menu_theme: Optional[str] = os.environ.get("_MENU_THEME")
     if menu_theme == "legacy":
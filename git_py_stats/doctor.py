@@ -0,0 +1,449 @@
+"""
+Checks how well a repository is set up for the history walks the reports
+run, and writes the structures git needs to make them fast.
+
+Every report walks commits with git log. Without a commit-graph, git has
+to inflate and parse each commit object on the way. Without changed-path
+Bloom filters in it, a walk limited to paths (_GIT_PATHSPEC) also has to
+diff the trees of every commit to see whether it touched them. Many loose
+objects slow down every object read, which the reports that count lines
+do a lot of. A multi-pack-index and reachability bitmaps don't change the
+walks, but help git find objects across many packs and count them.
+"""
+
+import glob
+import os
+import struct
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from git_py_stats.git_operations import git_version, promisor_remote, run_git_command
+
+# git gc --auto packs loose objects once there are more than this many
+LOOSE_OBJECTS_LIMIT = 6700
+
+# 'git multi-pack-index write --bitmap' first shipped in git 2.34
+_MIDX_BITMAP_VERSION = (2, 34)
+
+_COMMIT_GRAPH_SIGNATURE = b"CGPH"
+_HEADER = struct.Struct(">4sBBBB")
+_CHUNK = struct.Struct(">4sQ")
+
+
+class CommitGraph(NamedTuple):
+    """
+    What the commit-graph files of a repository cover.
+
+    commits is the number of commits across every layer, and bloom_commits
+    the number of those in layers written with changed-path Bloom filters.
+    """
+
+    commits: int
+    bloom_commits: int
+    layers: int
+
+
+class RepositoryHealth(NamedTuple):
+    """
+    The state of the structures that make history walks fast.
+    """
+
+    commits: int
+    graph: CommitGraph
+    graph_enabled: bool
+    packs: int
+    multi_pack_index: bool
+    bitmaps: int
+    loose_objects: int
+    loose_size_kib: int
+
+
+def read_commit_graph_file(path: str) -> Optional[Tuple[int, bool]]:
+    """
+    Reads the header and chunk table of one commit-graph file.
+
+    The last entry of the OID fanout chunk is the number of commits in the
+    file, and the BIDX and BDAT chunks hold its Bloom filters, so nothing
+    past the chunk table and one fanout entry is read.
+
+    Args:
+        path (str): Path to a commit-graph file or a layer of a chain.
+
+    Returns:
+        Optional[Tuple[int, bool]]: (commits, has Bloom filters), or None
+                                    if the file is missing or not a commit-graph.
+    """
+    try:
+        with open(path, "rb") as f:
+            signature, _version, _hash_version, chunk_count, _bases = _HEADER.unpack(
+                f.read(_HEADER.size)
+            )
+            if signature != _COMMIT_GRAPH_SIGNATURE:
+                return None
+            # One more entry than there are chunks, marking where the last ends
+            table = f.read(_CHUNK.size * (chunk_count + 1))
+            chunks = dict(_CHUNK.iter_unpack(table))
+            if b"OIDF" not in chunks:
+                return None
+            f.seek(chunks[b"OIDF"] + 255 * 4)
+            (commits,) = struct.unpack(">I", f.read(4))
+    except (OSError, struct.error):
+        return None
+    return commits, b"BIDX" in chunks and b"BDAT" in chunks
+
+
+def read_commit_graph(objects_dir: str) -> CommitGraph:
+    """
+    Sums up the commit-graph of a repository, either a single file or a
+    chain of layers written with --split.
+
+    Args:
+        objects_dir (str): The repository's objects directory.
+
+    Returns:
+        CommitGraph: Commits covered, and how many of them have Bloom filters.
+    """
+    info_dir = os.path.join(objects_dir, "info")
+    paths = [os.path.join(info_dir, "commit-graph")]
+    # git reads the single file if there is one, and the chain otherwise
+    if not os.path.exists(paths[0]):
+        graphs_dir = os.path.join(info_dir, "commit-graphs")
+        try:
+            with open(os.path.join(graphs_dir, "commit-graph-chain")) as f:
+                layers = [line.strip() for line in f if line.strip()]
+        except OSError:
+            layers = []
+        paths = [os.path.join(graphs_dir, f"graph-{layer}.graph") for layer in layers]
+
+    commits = bloom_commits = layer_count = 0
+    for path in paths:
+        layer = read_commit_graph_file(path)
+        if layer is None:
+            continue
+        layer_count += 1
+        commits += layer[0]
+        if layer[1]:
+            bloom_commits += layer[0]
+    return CommitGraph(commits, bloom_commits, layer_count)
+
+
+def _objects_dir() -> Optional[str]:
+    """
+    Returns the absolute path to the objects directory, shared by every worktree.
+    """
+    return run_git_command(["git", "rev-parse", "--path-format=absolute", "--git-path", "objects"])
+
+
+def inspect_repository() -> Optional[RepositoryHealth]:
+    """
+    Looks at the commit-graph, packs, and loose objects of the repository.
+
+    Args:
+        None
+
+    Returns:
+        Optional[RepositoryHealth]: What was found, or None if git failed.
+    """
+    objects_dir = _objects_dir()
+    commits = run_git_command(["git", "rev-list", "--count", "--all"])
+    counts = run_git_command(["git", "count-objects", "-v"])
+    if not objects_dir or commits is None or counts is None:
+        return None
+
+    # 'count: 12', 'size: 48', 'in-pack: 1000', 'packs: 1', ...
+    objects: Dict[str, int] = {}
+    for line in counts.splitlines():
+        key, _, value = line.partition(": ")
+        if value.isdigit():
+            objects[key] = int(value)
+
+    pack_dir = os.path.join(objects_dir, "pack")
+    graph_setting = run_git_command(
+        ["git", "config", "--type=bool", "--default=true", "core.commitGraph"]
+    )
+    return RepositoryHealth(
+        commits=int(commits or 0),
+        graph=read_commit_graph(objects_dir),
+        graph_enabled=graph_setting != "false",
+        packs=objects.get("packs", 0),
+        multi_pack_index=os.path.exists(os.path.join(pack_dir, "multi-pack-index")),
+        bitmaps=len(glob.glob(os.path.join(pack_dir, "*.bitmap"))),
+        loose_objects=objects.get("count", 0),
+        loose_size_kib=objects.get("size", 0),
+    )
+
+
+def diagnose(health: RepositoryHealth) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Turns what inspect_repository found into one row per structure.
+
+    Args:
+        health (RepositoryHealth): The state of the repository.
+
+    Returns:
+        List[Tuple[str, str, Optional[str]]]: (structure, state, impact) per
+                                              structure, where impact is None
+                                              if nothing is missing.
+    """
+    graph = health.graph
+    total = max(health.commits, 1)
+    rows: List[Tuple[str, str, Optional[str]]] = []
+
+    if not health.graph_enabled:
+        rows.append(
+            (
+                "commit-graph",
+                "disabled (core.commitGraph=false)",
+                "History walks read every commit's parents and dates from its object.",
+            )
+        )
+    elif graph.commits < health.commits:
+        state = f"{graph.commits:,} of {health.commits:,} commits ({graph.commits / total:.0%})"
+        rows.append(
+            (
+                "commit-graph",
+                state,
+                "History walks read the parents and dates of the commits it doesn't "
+                "cover from their objects. Reports limited with _GIT_SINCE/_GIT_UNTIL, "
+                "the branch tree, and the cached backends' ancestry checks lose the most.",
+            )
+        )
+    else:
+        rows.append(("commit-graph", f"all {health.commits:,} commits", None))
+
+    if graph.bloom_commits < health.commits:
+        rows.append(
+            (
+                "Bloom filters",
+                f"{graph.bloom_commits:,} of {health.commits:,} commits",
+                "Reports limited with _GIT_PATHSPEC, and git blame for the blame "
+                "ownership report, diff the trees of every commit to find the ones "
+                "that touched the paths.",
+            )
+        )
+    else:
+        rows.append(("Bloom filters", f"all {health.commits:,} commits", None))
+
+    if health.packs > 1 and not health.multi_pack_index:
+        rows.append(
+            (
+                "multi-pack-index",
+                f"none ({health.packs} packs)",
+                "Object lookups search each pack index in turn.",
+            )
+        )
+    else:
+        rows.append(("multi-pack-index", "yes" if health.multi_pack_index else "not needed", None))
+
+    if not health.packs and not health.loose_objects:
+        rows.append(("bitmaps", "not needed", None))
+    elif not health.bitmaps:
+        rows.append(
+            (
+                "bitmaps",
+                "none",
+                "No report depends on them, but git fetch, clone, and counting "
+                "reachable objects do.",
+            )
+        )
+    else:
+        rows.append(("bitmaps", f"{health.bitmaps}", None))
+
+    loose = f"{health.loose_objects:,} ({health.loose_size_kib / 1024:.1f} MiB)"
+    if health.loose_objects > LOOSE_OBJECTS_LIMIT:
+        rows.append(
+            (
+                "loose objects",
+                loose,
+                "Reports that count lines read blobs one file at a time: the "
+                "contribution stats, changelogs, hotspots, and churn.",
+            )
+        )
+    else:
+        rows.append(("loose objects", loose, None))
+    return rows
+
+
+def sample_reports(config: Dict[str, Union[str, int]]) -> List[Tuple[str, List[str]]]:
+    """
+    Returns the git commands behind two reports, one walking the whole
+    history and one limited to _GIT_PATHSPEC, or to the most recently
+    changed file without one, to time before and after.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        List[Tuple[str, List[str]]]: (label, command) per sample.
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    merges = config.get("merges", "--no-merges")
+    pathspec = config.get("pathspec", [])
+
+    # Same walk as the commits per author report
+    cmd = [
+        "git",
+        "-c",
+        "log.showSignature=false",
+        "log",
+        branch,
+        "--use-mailmap",
+        merges,
+        "--pretty=%aN",
+    ]
+
+    # Remove any empty space from the cmd
+    cmd = [arg for arg in cmd if arg]
+
+    samples = [("Commits per author", cmd)]
+    paths = [arg for arg in pathspec if arg != "--"]
+    if not paths:
+        # The most recently changed file, which has history to find
+        latest = ["git", "log", "-1", "--format=", "--name-only", "--no-renames", branch]
+        output = run_git_command([arg for arg in latest if arg])
+        paths = output.splitlines()[:1] if output else []
+    if paths:
+        samples.append((f"Commits per author -- {' '.join(paths)}", [*cmd, "--", *paths]))
+    return samples
+
+
+def _time_commands(samples: List[Tuple[str, List[str]]]) -> List[float]:
+    """
+    Runs each sample command once and returns how long each took.
+    """
+    timings = []
+    for _label, cmd in samples:
+        start = time.perf_counter()
+        run_git_command(cmd)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _print_diagnosis(rows: List[Tuple[str, str, Optional[str]]]) -> None:
+    print("Repository health:\n")
+    for structure, state, impact in rows:
+        mark = "!" if impact else " "
+        print(f"  {mark} {structure:<17} {state}")
+
+    missing = [(structure, impact) for structure, _state, impact in rows if impact]
+    if missing:
+        print("\nWhat is missing slows down:\n")
+        for structure, impact in missing:
+            print(f"  {structure}: {impact}")
+
+
+def repository_doctor(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Reports which of the structures that speed up history walks the
+    repository has, which reports miss the rest, and how long two sample
+    reports take right now. Nothing is written.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+    health = inspect_repository()
+    if health is None:
+        print("Could not inspect the repository.")
+        return
+
+    rows = diagnose(health)
+    _print_diagnosis(rows)
+
+    samples = sample_reports(config)
+    print("\nSample reports:\n")
+    for (label, _cmd), seconds in zip(samples, _time_commands(samples)):
+        print(f"  {seconds:8.3f}s  {label}")
+
+    if any(impact for _structure, _state, impact in rows):
+        print("\nRun git-py-stats --optimize to write what is missing.")
+    else:
+        print("\nNothing to do.")
+
+
+def optimize_commands(health: RepositoryHealth) -> List[Tuple[str, List[str]]]:
+    """
+    Returns the git commands that write what the repository is missing, in
+    the order they have to run: loose objects are packed before the
+    multi-pack-index covers the packs, and the commit-graph comes last.
+    The multi-pack-index is only written once there is a pack to index.
+
+    Args:
+        health (RepositoryHealth): The state of the repository.
+
+    Returns:
+        List[Tuple[str, List[str]]]: (description, command) per step.
+    """
+    steps: List[Tuple[str, List[str]]] = []
+
+    # Bitmaps need every reachable object, which a partial clone doesn't
+    # have, in a pack: loose objects are packed first, and a repository
+    # with no objects at all gets none
+    bitmaps = git_version() >= _MIDX_BITMAP_VERSION and not promisor_remote()
+    missing_bitmaps = bitmaps and not health.bitmaps and (health.packs or health.loose_objects)
+    if health.loose_objects > LOOSE_OBJECTS_LIMIT or (missing_bitmaps and health.loose_objects):
+        steps.append(("Packing loose objects", ["git", "repack", "-d", "-q"]))
+
+    if (health.packs > 1 and not health.multi_pack_index) or missing_bitmaps:
+        cmd = ["git", "multi-pack-index", "write"]
+        if bitmaps:
+            cmd.append("--bitmap")
+        steps.append(("Writing the multi-pack-index", cmd))
+
+    graph = health.graph
+    if health.graph_enabled and (
+        graph.commits < health.commits or graph.bloom_commits < health.commits
+    ):
+        cmd = ["git", "commit-graph", "write", "--reachable", "--changed-paths"]
+        # Fold an existing chain into one layer instead of adding to it
+        if graph.layers > 1:
+            cmd.append("--split=replace")
+        steps.append(("Writing the commit-graph with Bloom filters", cmd))
+    return steps
+
+
+def optimize_repository(config: Dict[str, Union[str, int]]) -> None:
+    """
+    Writes the commit-graph, Bloom filters, multi-pack-index, and bitmaps
+    the repository is missing and packs its loose objects, then times two
+    sample reports again to show the difference.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        None
+    """
+    health = inspect_repository()
+    if health is None:
+        print("Could not inspect the repository.")
+        return
+
+    _print_diagnosis(diagnose(health))
+    steps = optimize_commands(health)
+    if not health.graph_enabled:
+        print("\ncore.commitGraph is off, so no commit-graph is written.")
+    if not steps:
+        print("\nNothing to do.")
+        return
+
+    samples = sample_reports(config)
+    before = _time_commands(samples)
+
+    print()
+    for description, cmd in steps:
+        print(f"{description} ({' '.join(cmd)})...")
+        if run_git_command(cmd) is None:
+            print(f"  Failed, skipping: {description.lower()}.")
+
+    after = _time_commands(samples)
+    print("\nSample reports:\n")
+    print(f"  {'Before':>9} {'After':>9}  Report")
+    for (label, _cmd), old, new in zip(samples, before, after):
+        print(f"  {old:8.3f}s {new:8.3f}s  {label}")
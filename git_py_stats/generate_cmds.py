@@ -2,13 +2,19 @@
 Functions related to the 'Generate' section.
 """
 
-import collections
 import csv
+import gzip
+import itertools
 import json
 from typing import Optional, Dict, Any, List, Union, Tuple
 from datetime import datetime, timedelta
 
+from git_py_stats.backends import author_stats as author_stats_from_store, open_backend
+from git_py_stats.commit_stream import CommitRecord, format_iso_date, iter_commits, local_day
+from git_py_stats.config import is_author_ignored
 from git_py_stats.git_operations import run_git_command
+from git_py_stats.identity import get_resolver
+from git_py_stats.renames import FileIdentities
 
 
 # TODO: This can also be part of the future detailed_git_stats refactor
@@ -41,95 +47,62 @@ def _author_sort_key(item: Tuple[str, Dict[str, Any]], sort_by: str) -> Tuple:
     return (author.lower(),)
 
 
-# TODO: We should really refactor this; It's huge
-def detailed_git_stats(config: Dict[str, Union[str, int]], branch: Optional[str] = None) -> None:
+def _collect_author_stats(
+    config: Dict[str, Union[str, int]], branch: Optional[str] = None
+) -> Optional[Tuple[Dict[str, Dict[str, Any]], int, int, int, int]]:
     """
-    Displays detailed contribution stats by author.
+    Helper function for detailed_git_stats that gathers per-author stats
+    from git log --numstat.
 
     Args:
         config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
         branch (Optional[str]): Git branch to analyze. If None, use current branch.
 
+    With _GIT_CO_AUTHORS enabled, co-authors are credited with the whole
+    commit, so the authors' shares can add up to more than the totals.
+
     Returns:
-        None
+        Optional[Tuple]: Stats keyed by author name (with 'files' as a count),
+                         then total insertions, deletions, distinct files
+                         changed, and commits. None if git returned nothing.
     """
 
-    # Reset all relevant variables
-    author_stats: Dict[str, Dict[str, Any]] = {}
+    # Reset all relevant variables. Stats are kept per author id and only
+    # keyed by name at the end, so people the mailmap or a differently
+    # cased email would split up are counted once.
+    author_stats: Dict[int, Dict[str, Any]] = {}
     total_insertions = 0
     total_deletions = 0
     total_files = set()
     total_commits = 0
 
-    # Variables to track current commit metadata
-    current_author = ""
-    current_date = 0
-
-    # Grab the config options from our config.py.
-    # config.py should give fallbacks for these, but for sanity,
-    # lets also provide some defaults just in case.
-    merges = config.get("merges", "--no-merges")
-    since = config.get("since", "")
-    until = config.get("until", "")
-    log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    co_authors = config.get("co_authors", False)
+    resolver = get_resolver(config)
+    identities = FileIdentities()
 
     # Original command:
     # git -c log.showSignature=false log ${_branch} --use-mailmap $_merges --numstat \
     #     --pretty="format:commit %H%nAuthor: %aN <%aE>%nDate:   %ad%n%n%w(0,4,4)%B%n" \
     #     "$_since" "$_until" $_log_options $_pathspec
-    # Define the git base command
-    cmd = [
-        "git",
-        "-c",
-        "log.showSignature=false",
-        "log",
-    ]
-
-    # Handle optional branch arg
-    if branch:
-        cmd.append(branch)
-
-    # Create the rest of the command
-    cmd.extend(
-        [
-            "--use-mailmap",
-            merges,
-            "--numstat",
-            "--pretty=format:%H%x09%aN%x09%aE%x09%ad",
-            "--date=raw",
-            since,
-            until,
-            log_options,
-            pathspec,
-        ]
-    )
-
-    # Remove any empty space from the cmd
-    cmd = [arg for arg in cmd if arg]
-
-    output = run_git_command(cmd)
-    if not output:
-        return
-
-    # Split the output into lines and process each line
-    lines = output.split("\n")
-    for line in lines:
-        # Check if the line is empty or does not contain tab-separated values
-        if line.strip() == "" or "\t" not in line:
-            continue
-
-        parts = line.split("\t")
-        if len(parts) == 4:
-            # Commit metadata
-            commit_hash, author_name, author_email, date_raw = parts
-            current_author = author_name
-            current_date = int(date_raw.split()[0])
-
+    # The shared stream reads numstat NUL framed, so paths with tabs or
+    # renames can't be mistaken for a commit header. Renamed files are
+    # counted once, under their newest name.
+    for commit in iter_commits(config, branch, numstat=True):
+        current_date = commit.timestamp
+        files = identities.canonical_files(commit)
+        total_commits += 1
+
+        credited = resolver.resolve_credited(
+            commit.author, commit.email, commit.co_authors if co_authors else ()
+        )
+        for author_id in credited:
             # Initialize stats for the current author if not already done
-            if author_name not in author_stats:
-                author_stats[author_name] = {
-                    "email": author_email,
+            stats = author_stats.get(author_id)
+            if stats is None:
+                stats = author_stats[author_id] = {
+                    "email": (
+                        commit.email if author_id == credited[0] else resolver.emails[author_id]
+                    ),
                     "insertions": 0,
                     "deletions": 0,
                     "files": set(),
@@ -139,41 +112,62 @@ def detailed_git_stats(config: Dict[str, Union[str, int]], branch: Optional[str]
                     "last_commit": current_date,
                 }
             # Increment commit count
-            author_stats[author_name]["commits"] += 1
-            total_commits += 1
+            stats["commits"] += 1
 
             # Update first and last commit dates
-            if current_date < author_stats[author_name]["first_commit"]:
-                author_stats[author_name]["first_commit"] = current_date
-            if current_date > author_stats[author_name]["last_commit"]:
-                author_stats[author_name]["last_commit"] = current_date
-
-        elif len(parts) == 3:
-            # This line contains numstat data
-            try:
-                added, removed, filename = parts
-                added = int(added) if added != "-" else 0
-                removed = int(removed) if removed != "-" else 0
-
-                if not current_author:
-                    continue  # Skip if current_author is not set
-
-                # Update stats for the current author
-                author_stats[current_author]["insertions"] += added
-                author_stats[current_author]["deletions"] += removed
-                author_stats[current_author]["lines_changed"] += added + removed
-                author_stats[current_author]["files"].add(filename)
-
-                # Update total stats
-                total_insertions += added
-                total_deletions += removed
-                total_files.add(filename)
-
-            except ValueError:
-                continue  # Skip lines that don't match expected format
+            if current_date < stats["first_commit"]:
+                stats["first_commit"] = current_date
+            if current_date > stats["last_commit"]:
+                stats["last_commit"] = current_date
+
+            # Update stats for the current author
+            for added, removed, filename in files:
+                stats["insertions"] += added
+                stats["deletions"] += removed
+                stats["lines_changed"] += added + removed
+                stats["files"].add(filename)
+
+        # Update total stats
+        for added, removed, filename in files:
+            total_insertions += added
+            total_deletions += removed
+            total_files.add(filename)
+
+    if not total_commits:
+        return None
+
+    for stats in author_stats.values():
+        stats["files"] = len(stats["files"])
+
+    names = resolver.display_names(author_stats)
+    stats_by_name = {names[author_id]: stats for author_id, stats in author_stats.items()}
+    return stats_by_name, total_insertions, total_deletions, len(total_files), total_commits
+
+
+def detailed_git_stats(config: Dict[str, Union[str, int]], branch: Optional[str] = None) -> None:
+    """
+    Displays detailed contribution stats by author.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        branch (Optional[str]): Git branch to analyze. If None, use current branch.
 
+    Returns:
+        None
+    """
+
+    # The stores don't keep Co-authored-by trailers
+    store = None if config.get("co_authors") else open_backend(config, branch, files=True)
+    if store is not None:
+        collected = author_stats_from_store(store, config)
+        store.close()
+    else:
+        collected = _collect_author_stats(config, branch)
+    if not collected or not collected[0]:
+        return
+
+    author_stats, total_insertions, total_deletions, total_files_changed, total_commits = collected
     total_lines_changed = total_insertions + total_deletions
-    total_files_changed = len(total_files)
 
     # Display the contribution stats for each author
     print(
@@ -195,7 +189,7 @@ def detailed_git_stats(config: Dict[str, Union[str, int]], branch: Optional[str]
         email = stats["email"]
         insertions = stats["insertions"]
         deletions = stats["deletions"]
-        files = len(stats["files"])
+        files = stats["files"]
         commits = stats["commits"]
         lines_changed = stats["lines_changed"]
         first_commit = datetime.fromtimestamp(stats["first_commit"]).strftime(
@@ -256,7 +250,7 @@ def changelogs(config: Dict[str, Union[str, int]], author: Optional[str] = None)
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
     limit = int(config.get("limit", 10))
 
     # Original git command:
@@ -276,7 +270,7 @@ def changelogs(config: Dict[str, Union[str, int]], author: Optional[str] = None)
     if author_option:
         cmd.append(author_option)
 
-    cmd.extend([since, until, log_options, pathspec])
+    cmd.extend([since, until, log_options, *pathspec])
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
@@ -358,6 +352,7 @@ def my_daily_status(config: Dict[str, Union[str, int]]) -> None:
     # lets also provide some defaults just in case.
     merges = config.get("merges", "--no-merges")
     log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
 
     print("My daily status:")
     # Equivalent Bash Command:
@@ -366,7 +361,7 @@ def my_daily_status(config: Dict[str, Union[str, int]]) -> None:
     #                     { printf "\t%s\n", args[i] } }'
 
     # Mimic 'git diff --shortstat "@{0 day ago}"'
-    diff_cmd = ["git", "diff", "--shortstat", "@{0 day ago}"]
+    diff_cmd = ["git", "diff", "--shortstat", "@{0 day ago}", *pathspec]
     diff_output = run_git_command(diff_cmd)
     if diff_output:
         # Replace commas with newlines
@@ -412,6 +407,7 @@ def my_daily_status(config: Dict[str, Union[str, int]]) -> None:
         "--reverse",
         "--pretty=%H",  # Output only commit hashes
         log_options,
+        *pathspec,
     ]
 
     # Remove any empty space from the log_cmd
@@ -434,7 +430,13 @@ def my_daily_status(config: Dict[str, Union[str, int]]) -> None:
 
 def output_daily_stats_csv(config: Dict[str, Union[str, int]]) -> None:
     """
-    Exports daily commit counts to a CSV file.
+    Exports daily commit, insertion, and deletion counts to CSV files.
+
+    Two files are written from a single pass over the log:
+    git_daily_stats.csv with one row per day, and
+    git_daily_stats_by_author.csv with one row per day and author.
+    Only the running totals are kept in memory, so memory grows with
+    the number of active days rather than the size of the history.
 
     Args:
         config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
@@ -446,11 +448,6 @@ def output_daily_stats_csv(config: Dict[str, Union[str, int]]) -> None:
     # Grab the config options from our config.py.
     # config.py should give fallbacks for these, but for sanity, lets
     # also provide some defaults just in case.
-    merges = config.get("merges", "--no-merges")
-    since = config.get("since", "")
-    until = config.get("until", "")
-    log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
     branch = config.get("branch", "")
     ignore_authors = config.get("ignore_authors", lambda _s: False)
 
@@ -461,92 +458,93 @@ def output_daily_stats_csv(config: Dict[str, Union[str, int]]) -> None:
     # git -c log.showSignature=false log ${_branch} --use-mailmap $_merges --numstat \
     #     --pretty="format:commit %H%nAuthor: %aN <%aE>%nDate:   %ad%n%n%w(0,4,4)%B%n" \
     #     "$_since" "$_until" $_log_options $_pathspec
-    cmd = [
-        "git",
-        "-c",
-        "log.showSignature=false",
-        "log",
-        branch,
-        "--use-mailmap",
-        merges,
-        "--numstat",
-        "--pretty=format:commit %H%nAuthor: %aN <%aE>%nDate:   %ad%n%n%w(0,4,4)%B%n",
-        since,
-        until,
-        log_options,
-        pathspec,
-    ]
-
-    # Remove any empty space from the cmd
-    cmd = [arg for arg in cmd if arg]
-
-    output = run_git_command(cmd)
-
-    # Exit early if no output valid
-    if not output:
-        print("No data available.")
-        return
-
-    # NOTE: This has to be expanded to handle the new ability to ignore
-    # authors, but there might be a better way to handle this...
-    kept_lines = []
-    current_block = []
-    current_ignored = False
-    have_seen_author = False
-
-    for line in output.splitlines():
-        # New commit starts
-        if line.startswith("commit "):
-            # Flush the previous block
-            if current_block and not current_ignored:
-                kept_lines.extend(current_block)
-            # Reset for the next block
-            current_block = [line]
-            current_ignored = False
-            have_seen_author = False
+    # We only need the author, date, and numstat, so skip the bodies entirely.
+    # Each entry holds [commits, insertions, deletions], by day and by
+    # (day, author id), so one person's spellings of their name share a row
+    daily: Dict[str, List[int]] = {}
+    daily_by_author: Dict[Tuple[str, int], List[int]] = {}
+    resolver = get_resolver(config)
+    # The most recent email of each author, like the contribution stats
+    emails: Dict[int, str] = {}
+
+    for commit in iter_commits(config, branch, numstat=True, skip_ignored=True):
+        # If any form matches (name or email), drop the whole commit
+        name, email = commit.author, commit.email
+        if is_author_ignored(ignore_authors, name, email):
             continue
 
-        # Only check author once per block
-        if not have_seen_author and line.startswith("Author: "):
-            author_line = line[len("Author: ") :].strip()
-            name = author_line
-            email = ""
-            if "<" in author_line and ">" in author_line:
-                name = author_line.split("<", 1)[0].strip()
-                email = author_line.split("<", 1)[1].split(">", 1)[0].strip()
-
-            # If any form matches (name or email), drop the whole block
-            if (
-                ignore_authors(author_line)
-                or ignore_authors(name)
-                or (email and ignore_authors(email))
-            ):
-                current_ignored = True
-            have_seen_author = True
-        current_block.append(line)
-
-    # Flush the last block
-    if current_block and not current_ignored:
-        kept_lines.extend(current_block)
+        author_id = resolver.resolve(name, email)
+        emails.setdefault(author_id, email)
+        day = local_day(commit.timestamp, commit.tz).isoformat()
+        insertions = sum(added for added, _removed, _path in commit.files)
+        deletions = sum(removed for _added, removed, _path in commit.files)
+
+        for totals in (
+            daily.setdefault(day, [0, 0, 0]),
+            daily_by_author.setdefault((day, author_id), [0, 0, 0]),
+        ):
+            totals[0] += 1
+            totals[1] += insertions
+            totals[2] += deletions
 
     # Found nothing worth keeping? Just exit then
-    if not kept_lines:
+    if not daily:
         print("No data available.")
         return
 
-    counter = collections.Counter(kept_lines)
     filename = "git_daily_stats.csv"
     try:
-        with open(filename, "w", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=["Date", "Commits"])
-            writer.writeheader()
-            for text, count in sorted(counter.items()):
-                writer.writerow({"Date": text, "Commits": count})
+        with open(filename, "w", newline="", errors="surrogateescape") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Date", "Commits", "Insertions", "Deletions"])
+            for day, totals in sorted(daily.items()):
+                writer.writerow([day, *totals])
         print(f"Daily stats saved to {filename}")
+
+        filename = "git_daily_stats_by_author.csv"
+        with open(filename, "w", newline="", errors="surrogateescape") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Date", "Author", "Email", "Commits", "Insertions", "Deletions"])
+            names = resolver.display_names(emails)
+            rows = sorted(
+                (day, names[author_id], emails[author_id], *totals)
+                for (day, author_id), totals in daily_by_author.items()
+            )
+            writer.writerows(rows)
+        print(f"Daily stats by author saved to {filename}")
     except IOError as e:
         print(f"Failed to write to {filename}: {e}")
 
 
+def _commit_to_json(commit: CommitRecord, fields: List[str]) -> Dict[str, Any]:
+    """
+    Helper function for save_git_log_output_json that turns a commit
+    record into the dict written to the JSON file.
+
+    Args:
+        commit (CommitRecord): The commit to convert.
+        fields (List[str]): Extra fields requested via _GIT_JSON_FIELDS.
+
+    Returns:
+        Dict[str, Any]: The JSON-serializable commit.
+    """
+    record: Dict[str, Any] = {
+        "hash": commit.hash,
+        "author": commit.author,
+    }
+    if "email" in fields:
+        record["email"] = commit.email
+    record["date"] = format_iso_date(commit.timestamp, commit.tz)
+    record["message"] = commit.subject
+    if "parents" in fields:
+        record["parents"] = list(commit.parents)
+    if "numstat" in fields:
+        record["insertions"] = sum(added for added, _removed, _path in commit.files)
+        record["deletions"] = sum(removed for _added, removed, _path in commit.files)
+        record["files"] = len(commit.files)
+    return record
+
+
 # TODO: This doesn't match the original functionality as it uses some pretty
 #       tricky shell code to format everything, as well as blast a bunch of
 #       info out into a JSON file. For now, let's take a simple approach
@@ -555,6 +553,10 @@ def save_git_log_output_json(config: Dict[str, Union[str, int]]) -> None:
     """
     Saves detailed commit logs to a JSON file.
 
+    Commits are written as they are read from git, so memory use stays
+    flat regardless of the size of the history. The layout is picked by
+    _GIT_JSON_FORMAT and extra fields by _GIT_JSON_FIELDS.
+
     Args:
         config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
 
@@ -565,55 +567,42 @@ def save_git_log_output_json(config: Dict[str, Union[str, int]]) -> None:
     # Grab the config options from our config.py.
     # config.py should give fallbacks for these, but for sanity, lets
     # also provide some defaults just in case.
-    merges = config.get("merges", "--no-merges")
-    since = config.get("since", "")
-    until = config.get("until", "")
-    log_options = config.get("log_options", "")
+    json_format = str(config.get("json_format", "json"))
+    fields = list(config.get("json_fields", []))
 
     # Original command:
     # git -c log.showSignature=false log --use-mailmap $_merges \
     #     "$_since" "$_until" $_log_options \
     #     --pretty=format: <trimmed for brevity>
-    cmd = [
-        "git",
-        "-c",
-        "log.showSignature=false",
-        "log",
-        "--use-mailmap",
-        merges,
-        since,
-        until,
-        log_options,
-        "--pretty=format:%H|%aN|%ad|%s",
-        "--date=iso",
-    ]
-
-    # Remove any empty space from the cmd
-    cmd = [arg for arg in cmd if arg]
+    commits = iter_commits(config, numstat="numstat" in fields)
 
-    # Process the output into a JSON file
-    output = run_git_command(cmd)
-    if output:
-        commits: List[Dict[str, Any]] = []
-        for line in output.split("\n"):
-            try:
-                commit_hash, author, date, message = line.split("|", 3)
-                commits.append(
-                    {
-                        "hash": commit_hash,
-                        "author": author,
-                        "date": date,
-                        "message": message,
-                    }
-                )
-            except ValueError:
-                continue  # Skip lines that don't match the expected format
-        filename = "git_log.json"
-        try:
-            with open(filename, "w") as jsonfile:
-                json.dump(commits, jsonfile, indent=4)
-            print(f"Git log saved to {filename}")
-        except IOError as e:
-            print(f"Failed to write to {filename}: {e}")
-    else:
+    # Peek at the first commit so we don't leave an empty file behind
+    first_commit = next(commits, None)
+    if first_commit is None:
         print("No log data available.")
+        return
+
+    ndjson = json_format.startswith("ndjson")
+    filename = "git_log.ndjson" if ndjson else "git_log.json"
+    try:
+        if json_format.endswith(".gz"):
+            filename += ".gz"
+            jsonfile = gzip.open(filename, "wt", encoding="utf-8")
+        else:
+            jsonfile = open(filename, "w")
+        with jsonfile:
+            if ndjson:
+                for commit in itertools.chain([first_commit], commits):
+                    jsonfile.write(json.dumps(_commit_to_json(commit, fields)) + "\n")
+            else:
+                # Write the array by hand, matching json.dump(..., indent=4)
+                jsonfile.write("[")
+                separator = "\n"
+                for commit in itertools.chain([first_commit], commits):
+                    entry = json.dumps(_commit_to_json(commit, fields), indent=4)
+                    jsonfile.write(separator + "    " + entry.replace("\n", "\n    "))
+                    separator = ",\n"
+                jsonfile.write("\n]")
+        print(f"Git log saved to {filename}")
+    except IOError as e:
+        print(f"Failed to write to {filename}: {e}")
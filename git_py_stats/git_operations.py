@@ -3,7 +3,17 @@ General git operation functions
 """
 
 import subprocess
-from typing import List, Optional
+import tempfile
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+# git writes names and messages in UTF-8 but paths as whatever bytes they
+# are, so anything that isn't valid UTF-8 is decoded with surrogateescape.
+# That keeps the original bytes, which print and CSV files write back out.
+GIT_ENCODING = "utf-8"
+
+# How much of a -z stream is read at a time
+_STREAM_CHUNK = 1 << 16
 
 
 def run_git_command(cmd: List[str]) -> Optional[str]:
@@ -21,7 +31,12 @@ def run_git_command(cmd: List[str]) -> Optional[str]:
         return None
     try:
         result = subprocess.run(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding=GIT_ENCODING,
+            errors="surrogateescape",
+            check=True,
         )
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
@@ -33,6 +48,100 @@ def run_git_command(cmd: List[str]) -> Optional[str]:
         return None
 
 
+def run_git_command_bytes(cmd: List[str]) -> Optional[bytes]:
+    """
+    Runs a git command and returns its raw output, for commands that print
+    file contents which don't have to be valid UTF-8.
+
+    Args:
+        cmd List[str]: A list of strings representing the git command and its arguments.
+
+    Returns:
+        The standard output from the git command if successful, None otherwise.
+    """
+    if not cmd:
+        print("Error: Command list is empty!")
+        return None
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        return result.stdout
+    except subprocess.CalledProcessError as e:
+        print(f"Error running command: {e}")
+        return None
+    # Grab any other possible exception
+    except Exception as e:
+        print(f"Unexpected error running command: {e}")
+        return None
+
+
+def stream_git_command(cmd: List[str]) -> Iterator[str]:
+    """
+    Runs a git command and yields its output one line at a time.
+
+    Unlike run_git_command, the output is never held in memory as a whole,
+    which keeps memory flat on very large histories. If the caller stops
+    iterating early, the pipe is closed so git exits on its next write.
+
+    Args:
+        cmd List[str]: A list of strings representing the git command and its arguments.
+
+    Yields:
+        str: Each line of standard output without its trailing newline.
+    """
+    for line in stream_git_command_bytes(cmd):
+        yield line.decode(GIT_ENCODING, "surrogateescape")
+
+
+def stream_git_command_bytes(cmd: List[str], separator: bytes = b"\n") -> Iterator[bytes]:
+    """
+    Runs a git command and yields its raw output one record at a time,
+    leaving callers to decode only the parts they keep.
+
+    Args:
+        cmd List[str]: A list of strings representing the git command and its arguments.
+        separator (bytes): What ends each record, e.g. a NUL byte for git's -z output.
+
+    Yields:
+        bytes: Each record of standard output without its separator.
+    """
+    if not cmd:
+        print("Error: Command list is empty!")
+        return
+    # stderr goes to a file rather than a second pipe: nothing reads it until
+    # stdout is done, and git would block once a pipe's buffer filled up
+    errors = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+    except Exception as e:
+        errors.close()
+        print(f"Unexpected error running command: {e}")
+        return
+
+    finished = False
+    try:
+        if separator == b"\n":
+            for line in proc.stdout:
+                yield line[:-1] if line.endswith(b"\n") else line
+        else:
+            pending = b""
+            for chunk in iter(lambda: proc.stdout.read(_STREAM_CHUNK), b""):
+                records = (pending + chunk).split(separator)
+                pending = records.pop()
+                yield from records
+            if pending:
+                yield pending
+        finished = True
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        # Only complain if git failed on its own, not because we hung up on it
+        if finished and returncode != 0:
+            errors.seek(0)
+            stderr = errors.read().decode(GIT_ENCODING, "replace")
+            print(f"Error running command: {' '.join(cmd)} ({stderr.strip()})")
+        errors.close()
+
+
 def check_git_repository() -> bool:
     """
     Checks if the current directory is within a git repository.
@@ -50,3 +159,154 @@ def check_git_repository() -> bool:
     else:
         print("This script must be run inside a git repository.")
         return False
+
+
+def resolve_commit(ref: str) -> Optional[str]:
+    """
+    Resolves a branch or revision to a full commit hash.
+
+    Args:
+        ref (str): The branch or revision to resolve.
+
+    Returns:
+        Optional[str]: The commit hash, or None if 'ref' is not a commit.
+    """
+    return run_git_command(["git", "rev-parse", "--verify", "-q", f"{ref}^{{commit}}"]) or None
+
+
+def is_ancestor(ancestor: str, descendant: str) -> bool:
+    """
+    Checks whether one commit is reachable from another.
+
+    Args:
+        ancestor (str): The commit that should be in the history.
+        descendant (str): The commit whose history is searched.
+
+    Returns:
+        bool: True if 'ancestor' is part of the history of 'descendant'.
+    """
+    merge_base = run_git_command(["git", "merge-base", ancestor, descendant])
+    return merge_base == ancestor
+
+
+@lru_cache(maxsize=None)
+def supports_perl_regexp() -> bool:
+    """
+    Checks once per run whether this git was built with PCRE, which
+    --perl-regexp needs. Failing is expected on some builds, so nothing is
+    printed.
+
+    Args:
+        None
+
+    Returns:
+        bool: True if git log accepts --perl-regexp.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "log", "-1", "--format=", "--perl-regexp", "--author=(?!)"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except Exception:
+        return False
+    return result.returncode == 0
+
+
+@lru_cache(maxsize=None)
+def git_version() -> Tuple[int, ...]:
+    """
+    Returns the version of the git on PATH, read once per run.
+
+    Args:
+        None
+
+    Returns:
+        Tuple[int, ...]: The version, e.g. (2, 39, 5), or () if unknown.
+    """
+    output = run_git_command(["git", "--version"]) or ""
+    # 'git version 2.39.5' or 'git version 2.39.5.windows.1'
+    numbers = []
+    for part in output.rpartition(" ")[2].split("."):
+        if not part.isdigit():
+            break
+        numbers.append(int(part))
+    return tuple(numbers)
+
+
+@lru_cache(maxsize=None)
+def promisor_remote() -> Optional[str]:
+    """
+    Returns the remote a partial clone (e.g. --filter=blob:none) fetches
+    missing objects from, read once per run. Most repositories aren't
+    partial clones, so finding nothing is not an error.
+
+    Args:
+        None
+
+    Returns:
+        Optional[str]: The remote name, or None if this isn't a partial clone.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "config", "--get-regexp", r"^(extensions\.partialclone|remote\..*\.promisor)$"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding=GIT_ENCODING,
+            errors="surrogateescape",
+        )
+    except Exception:
+        return None
+
+    promisors = []
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "extensions.partialclone" and value:
+            return value
+        if key.endswith(".promisor") and value.lower() in ("true", "yes", "on", "1"):
+            promisors.append(key[len("remote.") : -len(".promisor")])
+    return promisors[0] if promisors else None
+
+
+def fetch_objects(remote: str, object_ids: List[str]) -> bool:
+    """
+    Fetches objects a partial clone is missing from its promisor remote in
+    a single request, the same way git fetches one on demand.
+
+    Args:
+        remote (str): The promisor remote.
+        object_ids (List[str]): Ids of the objects to fetch.
+
+    Returns:
+        bool: True if git fetched them.
+    """
+    cmd = [
+        "git",
+        "-c",
+        "fetch.negotiationAlgorithm=noop",
+        "fetch",
+        remote,
+        "--no-tags",
+        "--no-write-fetch-head",
+        "--recurse-submodules=no",
+        "--filter=blob:none",
+        "--stdin",
+    ]
+    try:
+        subprocess.run(
+            cmd,
+            input="".join(f"{object_id}\n" for object_id in object_ids),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding=GIT_ENCODING,
+            errors="surrogateescape",
+            check=True,
+        )
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"Error running command: {e} ({e.stderr.strip()})")
+        return False
+    # Grab any other possible exception
+    except Exception as e:
+        print(f"Unexpected error running command: {e}")
+        return False
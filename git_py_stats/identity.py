@@ -0,0 +1,385 @@
+"""
+Turns the (name, email) pairs git prints into one small int per person.
+
+Reports used to group commits by whatever string they happened to ask git
+for: the name, the email, or 'Name <email>', with or without the mailmap.
+The resolver applies the repository's .mailmap once, normalizes emails,
+and hands out ids in the order people are first seen, so every report can
+count by int and agree on who is who. Lookups are memoized on the raw
+pair, which makes resolving an author seen before a single dict hit.
+
+An email the mailmap maps to is taken to be one person whatever name they
+commit under. Any other address only joins commits whose names match
+(ignoring case), so people who share an address such as root@localhost
+stay apart. A person's name is the mailmap's proper name if it has one,
+otherwise the spelling that sorts first, so it doesn't depend on which
+commit a report happened to read first.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from git_py_stats.cache import get_cache_dir
+from git_py_stats.config import is_author_ignored
+from git_py_stats.git_operations import run_git_command
+
+IDENTITIES_NAME = "identities.json"
+
+# Bump this whenever the saved format or the normalization changes
+IDENTITIES_VERSION = 2
+
+# 'Proper Name <proper@email>' optionally followed by 'Commit Name <commit@email>'
+_MAILMAP_LINE = re.compile(r"^\s*([^<#]*?)\s*<([^>]*)>(?:\s*([^<#]*?)\s*<([^>]*)>)?")
+
+# 'Name <email>' as written in trailers such as Co-authored-by
+_IDENTITY = re.compile(r"^\s*(.*?)\s*<([^>]*)>\s*$")
+
+_Replacement = Tuple[Optional[str], Optional[str]]
+
+
+def normalize_email(email: str) -> str:
+    """
+    Returns the form of an email used to tell people apart: without
+    surrounding whitespace or angle brackets, and lowercased, since mail
+    servers and git's own mailmap matching ignore case.
+
+    Args:
+        email (str): An email as git printed it.
+
+    Returns:
+        str: The normalized email.
+    """
+    return email.strip().strip("<>").strip().lower()
+
+
+def _split_identity(identity: str) -> Optional[Tuple[str, str]]:
+    """
+    Splits 'Name <email>' into its name and email. A bare name comes back
+    with an empty email, and an empty string as None.
+    """
+    match = _IDENTITY.match(identity)
+    if match:
+        return match.group(1), match.group(2)
+    identity = identity.strip()
+    return (identity, "") if identity else None
+
+
+class Mailmap:
+    """
+    The rules of a .mailmap file, matched the way git matches them: by
+    email, case-insensitively, with 'Name <email>' entries taking priority
+    over entries for the email alone.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        # commit email -> (replacement for the email alone, replacements by commit name)
+        self._entries: Dict[str, Tuple[_Replacement, Dict[str, _Replacement]]] = {}
+        # Normalized emails the rules map to, each of which is one person
+        self.proper_emails: Set[str] = set()
+        self.digest = hashlib.sha1(text.encode("utf-8", "surrogateescape")).hexdigest()
+        for line in text.splitlines():
+            self._add(line)
+
+    def _add(self, line: str) -> None:
+        """
+        Adds one line of a .mailmap file, ignoring comments and anything
+        that doesn't parse.
+        """
+        match = _MAILMAP_LINE.match(line)
+        if not match:
+            return
+        name, email, commit_name, commit_email = match.groups()
+        if commit_email is None:
+            # 'Proper Name <commit@email>' only fixes the name
+            replacement: _Replacement = (name or None, None)
+            commit_email = email
+        else:
+            replacement = (name or None, email or None)
+        if email:
+            self.proper_emails.add(normalize_email(email))
+        default, by_name = self._entries.setdefault(
+            normalize_email(commit_email), ((None, None), {})
+        )
+        if commit_name:
+            by_name[commit_name.lower()] = replacement
+        else:
+            self._entries[normalize_email(commit_email)] = (replacement, by_name)
+
+    def map(self, name: str, email: str) -> Tuple[str, str]:
+        """
+        Returns the canonical (name, email) for a commit identity.
+
+        Args:
+            name (str): The name from the commit.
+            email (str): The email from the commit.
+
+        Returns:
+            Tuple[str, str]: The identity after applying the mailmap.
+        """
+        entry = self._entries.get(normalize_email(email))
+        if entry is None:
+            return name, email
+        default, by_name = entry
+        new_name, new_email = by_name.get(name.lower(), default)
+        return new_name or name, new_email or email
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+
+class IdentityResolver:
+    """
+    Hands out a stable int id per person. Two commits belong to the same
+    person when, after the mailmap and normalization, their emails match
+    and either the mailmap maps to that email or their names match too.
+    Commits without an email fall back to the name.
+    """
+
+    def __init__(self, mailmap: Optional[Mailmap] = None) -> None:
+        self.mailmap = mailmap or Mailmap()
+        self.names: List[str] = []
+        self.emails: List[str] = []
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._memo: Dict[Tuple[str, str], int] = {}
+        # Whether each name came from the mailmap, which beats any other spelling
+        self._proper: List[bool] = []
+        self.dirty = False
+
+    def _key(self, name: str, email: str) -> Tuple[str, str]:
+        """
+        Returns what tells a mapped (name, normalized email) apart from
+        other people.
+        """
+        if email in self.mailmap.proper_emails:
+            return email, ""
+        return email, name.lower()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, name: str, email: str) -> int:
+        """
+        Returns the id of the person behind a commit identity, giving them
+        the next free id the first time they're seen.
+
+        Args:
+            name (str): The name from the commit.
+            email (str): The email from the commit.
+
+        Returns:
+            int: The person's id.
+        """
+        author_id = self._memo.get((name, email))
+        if author_id is not None:
+            return author_id
+
+        stripped = name.strip()
+        mapped_name, mapped_email = self.mailmap.map(stripped, email)
+        normalized = normalize_email(mapped_email)
+        proper = mapped_name != stripped
+        key = self._key(mapped_name, normalized)
+        author_id = self._ids.get(key)
+        if author_id is None:
+            author_id = self._ids[key] = len(self.names)
+            self.names.append(mapped_name)
+            self.emails.append(normalized)
+            self._proper.append(proper)
+            self.dirty = True
+        elif (not proper, mapped_name) < (not self._proper[author_id], self.names[author_id]):
+            self.dirty = self.dirty or mapped_name != self.names[author_id]
+            self.names[author_id] = mapped_name
+            self._proper[author_id] = proper
+        self._memo[(name, email)] = author_id
+        return author_id
+
+    def resolve_string(self, identity: str) -> Optional[int]:
+        """
+        Resolves an identity written as 'Name <email>', e.g. the value of a
+        Co-authored-by trailer. A bare name is resolved by name.
+
+        Args:
+            identity (str): The identity string.
+
+        Returns:
+            Optional[int]: The person's id, or None if the string is empty.
+        """
+        parsed = _split_identity(identity)
+        return self.resolve(*parsed) if parsed else None
+
+    def resolve_credited(
+        self,
+        name: str,
+        email: str,
+        co_authors: Iterable[str] = (),
+        ignore_authors: Callable[[str], bool] = lambda _s: False,
+    ) -> List[int]:
+        """
+        Returns the ids of everyone credited with a commit: its author
+        first, then each person in its Co-authored-by trailers once.
+        Co-authors matching 'ignore_authors' are left out.
+
+        Args:
+            name (str): The author's name.
+            email (str): The author's email.
+            co_authors (Iterable[str]): The commit's 'Name <email>' trailer values.
+            ignore_authors (Callable[[str], bool]): The filter from the config.
+
+        Returns:
+            List[int]: The ids of the author and co-authors.
+        """
+        author_ids = [self.resolve(name, email)]
+        for identity in co_authors:
+            parsed = _split_identity(identity)
+            if parsed is None or is_author_ignored(ignore_authors, *parsed):
+                continue
+            author_id = self.resolve(*parsed)
+            if author_id not in author_ids:
+                author_ids.append(author_id)
+        return author_ids
+
+    def display_names(self, author_ids) -> Dict[int, str]:
+        """
+        Returns the name to show for each id. People who share a name get
+        their email added so they can be told apart.
+
+        Args:
+            author_ids (Iterable[int]): The ids to name.
+
+        Returns:
+            Dict[int, str]: Display name by id.
+        """
+        author_ids = list(author_ids)
+        seen: Dict[str, int] = {}
+        for author_id in author_ids:
+            seen[self.names[author_id]] = seen.get(self.names[author_id], 0) + 1
+        return {
+            author_id: (
+                f"{self.names[author_id]} <{self.emails[author_id]}>"
+                if seen[self.names[author_id]] > 1 and self.emails[author_id]
+                else self.names[author_id]
+            )
+            for author_id in author_ids
+        }
+
+    def to_json(self) -> Dict[str, object]:
+        """
+        Returns everything needed to rebuild the same ids later.
+        """
+        return {
+            "version": IDENTITIES_VERSION,
+            "mailmap": self.mailmap.digest,
+            "names": self.names,
+            "emails": self.emails,
+        }
+
+    def load_json(self, data: Dict[str, object]) -> bool:
+        """
+        Restores ids saved by to_json, unless they were made with another
+        mailmap or format, in which case nothing is loaded.
+
+        Returns:
+            bool: Whether the saved ids were loaded.
+        """
+        if (
+            data.get("version") != IDENTITIES_VERSION
+            or data.get("mailmap") != self.mailmap.digest
+            or self.names
+        ):
+            return False
+        names, emails = list(data.get("names", [])), list(data.get("emails", []))
+        if len(names) != len(emails):
+            return False
+        self.names, self.emails = names, emails
+        self._proper = [False] * len(names)
+        for author_id, (name, email) in enumerate(zip(names, emails)):
+            self._ids[self._key(name, email)] = author_id
+        return True
+
+
+def read_mailmap() -> Mailmap:
+    """
+    Reads the repository's mailmap: the .mailmap file at the top of the
+    worktree followed by the file named by the mailmap.file setting, the
+    same sources git log --use-mailmap reads.
+
+    Args:
+        None
+
+    Returns:
+        Mailmap: The parsed rules, empty if there are none.
+    """
+    texts = []
+    top_level = run_git_command(["git", "rev-parse", "--show-toplevel"])
+    # --default keeps git from failing when the setting isn't there
+    mailmap_file = run_git_command(
+        ["git", "config", "--path", "--default", "", "--get", "mailmap.file"]
+    )
+    paths = [os.path.join(top_level, ".mailmap")] if top_level else []
+    if mailmap_file:
+        paths.append(mailmap_file)
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="surrogateescape") as f:
+                texts.append(f.read())
+        except OSError:
+            continue
+    return Mailmap("\n".join(texts))
+
+
+# One resolver per repository for the whole run
+_resolvers: Dict[str, IdentityResolver] = {}
+
+
+def get_resolver(config: Dict[str, Union[str, int]]) -> IdentityResolver:
+    """
+    Returns this run's identity resolver, reading the mailmap the first
+    time. If the repository already has a cache directory, ids saved there
+    by earlier runs are reused and new ones are saved when the run ends.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        IdentityResolver: The shared resolver.
+    """
+    key = os.getcwd()
+    resolver = _resolvers.get(key)
+    if resolver is not None:
+        return resolver
+
+    resolver = _resolvers[key] = IdentityResolver(read_mailmap())
+    cache_dir = get_cache_dir(config, create=False)
+    if cache_dir:
+        path = os.path.join(cache_dir, IDENTITIES_NAME)
+        try:
+            with open(path) as f:
+                resolver.load_json(json.load(f))
+        except (OSError, ValueError):
+            pass
+        atexit.register(save_resolver, resolver, path)
+    return resolver
+
+
+def save_resolver(resolver: IdentityResolver, path: str) -> None:
+    """
+    Saves the resolver's ids to 'path' if it learned anyone new.
+
+    Args:
+        resolver (IdentityResolver): The resolver to save.
+        path (str): Where to write the JSON.
+
+    Returns:
+        None
+    """
+    if not resolver.dirty:
+        return
+    try:
+        with open(path, "w") as f:
+            json.dump(resolver.to_json(), f)
+        resolver.dirty = False
+    except OSError as e:
+        print(f"Failed to write to {path}: {e}")
@@ -4,9 +4,16 @@ Interactive mode file for Git Py Stats
 
 from typing import Dict, Union
 
-from git_py_stats import generate_cmds, list_cmds, suggest_cmds, calendar_cmds
+from git_py_stats.lazy import lazy_import
 from git_py_stats.menu import interactive_menu
 
+# Report modules load on first use so the menu shows up right away
+generate_cmds = lazy_import("git_py_stats.generate_cmds")
+list_cmds = lazy_import("git_py_stats.list_cmds")
+suggest_cmds = lazy_import("git_py_stats.suggest_cmds")
+calendar_cmds = lazy_import("git_py_stats.calendar_cmds")
+analyze_cmds = lazy_import("git_py_stats.analyze_cmds")
+
 
 # TODO: We can probably refactor this a bit.
 #       Make some sort of exec_cmd to handle a lot
@@ -48,6 +55,13 @@ def handle_interactive_mode(config: Dict[str, Union[str, int]]) -> None:
             config, input("Enter author name: ")
         ),
         "24": lambda: calendar_cmds.commits_heatmap(config),
+        "25": lambda: analyze_cmds.churn_by_directory(config),
+        "26": lambda: analyze_cmds.hotspots(config),
+        "27": lambda: analyze_cmds.cochanges(config),
+        "28": lambda: analyze_cmds.bus_factor(config),
+        "29": lambda: analyze_cmds.blame_ownership(config),
+        "30": lambda: analyze_cmds.activity_by_author(config),
+        "31": lambda: calendar_cmds.commits_calendars_all_authors(config),
     }
 
     while True:
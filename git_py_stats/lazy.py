@@ -0,0 +1,37 @@
+"""
+Deferred imports that keep CLI startup fast.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns a module whose code only runs the first time one of its
+    attributes is used, so commands don't pay for modules they never touch.
+    Modules that are already imported are returned as they are.
+
+    Args:
+        name (str): Fully qualified module name, e.g. 'git_py_stats.list_cmds'.
+
+    Returns:
+        ModuleType: The (possibly not yet loaded) module.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # Mirror a normal import, which also sets the module on its package
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
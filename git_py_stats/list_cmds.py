@@ -3,11 +3,17 @@ Functions related to the 'List' section.
 """
 
 import collections
+import heapq
+import itertools
 import re
 from datetime import datetime
-from typing import Dict, Union, Optional
+from typing import Dict, Tuple, Union, Optional
 
-from git_py_stats.git_operations import run_git_command
+from git_py_stats.backends import count_commits, open_backend
+from git_py_stats.commit_stream import CO_AUTHOR_SEP, CO_AUTHORS_FORMAT
+from git_py_stats.config import is_author_ignored
+from git_py_stats.git_operations import run_git_command, stream_git_command
+from git_py_stats.identity import get_resolver
 
 
 def branch_tree(config: Dict[str, Union[str, int]]) -> None:
@@ -27,6 +33,7 @@ def branch_tree(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
     limit = config.get("limit", 10)
 
     # Format string for git --format so it gets interpreted correctly
@@ -41,6 +48,8 @@ def branch_tree(config: Dict[str, Union[str, int]]) -> None:
     #      --format=format:'--+ Commit:  %h %n  | Date:    %aD (%ar) %n''  \
     #                       | Message: %s %d %n''  + Author:  %aN %n' \
     #      --all $_log_options | head -n $((_limit*5))
+    # Every commit takes at least 5 lines, so git never has to walk past
+    # the first $_limit commits.
     cmd = [
         "git",
         "-c",
@@ -49,32 +58,31 @@ def branch_tree(config: Dict[str, Union[str, int]]) -> None:
         "--use-mailmap",
         "--graph",
         "--abbrev-commit",
+        f"--max-count={limit}",
         since,
         until,
         "--decorate",
         format_str,
         "--all",
         log_options,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
+    # handle the head -n $((_limit*5)) portion. Closing the stream once we
+    # have enough lines hangs up on git instead of waiting for it to finish.
+    lines = stream_git_command(cmd)
+    try:
+        limited_lines = list(itertools.islice(lines, limit * 5))
+    finally:
+        lines.close()
 
-    # handle the head -n $((_limit*5)) portion
-    if output:
+    if any(line.strip() for line in limited_lines):
         print("Branching tree view:\n")
-        lines = output.split("\n")
-        total_lines = limit * 5
-        limited_lines = lines[:total_lines]
-
         for line in limited_lines:
             print(f"{line}")
-
-        # commit_count = sum(
-        #    1 for line in limited_lines if line.strip().startswith("--+ Commit:")
-        # )
     else:
         print("No data available.")
 
@@ -163,43 +171,54 @@ def contributors(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
     limit = config.get("limit", 10)
 
     # Original command
     #     git -c log.showSignature=false log --use-mailmap $_merges "$_since" "$_until" \
     #         --format='%aN' $_log_options $_pathspec | sort -u | cat -n
+    # git shortlog -s does the 'sort -u' itself (it always uses the mailmap),
+    # so we only ever see one line per author instead of one per commit.
+    # With -e it's one line per name and email, which the identity resolver
+    # merges the same way every other report does.
+    # HEAD has to be given or shortlog reads a log from stdin instead.
     cmd = [
         "git",
         "-c",
         "log.showSignature=false",
-        "log",
-        "--use-mailmap",
+        "shortlog",
+        "-s",
+        "-e",
         merges,
         since,
         until,
-        "--format=%aN",
         log_options,
-        pathspec,
+        "HEAD",
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
-    if output:
+    store = open_backend(config)
+    if store is not None:
+        unique_authors = set(count_commits(store, config, "author"))
+        store.close()
+    else:
+        # Each line looks like '   42\tAuthor Name <author@email>'
+        resolver = get_resolver(config)
+        author_ids = set()
+        for line in stream_git_command(cmd):
+            author_id = resolver.resolve_string(line.partition("\t")[2])
+            if author_id is not None:
+                author_ids.add(author_id)
+        unique_authors = set(resolver.display_names(author_ids).values())
+
+    if unique_authors:
         print("All contributors (sorted by name):\n")
-        # Split the output into individual author names
-        authors = [line.strip() for line in output.split("\n") if line.strip()]
-
-        # Remove duplicates by converting the list to a set
-        unique_authors = set(authors)
-
-        # Sort the unique authors alphabetically
-        sorted_authors = sorted(unique_authors)
 
-        # Apply the limit
-        limited_authors = sorted_authors[:limit]
+        # Pick the first authors alphabetically without sorting all of them
+        limited_authors = heapq.nsmallest(limit, unique_authors)
 
         # Number the authors similar to 'cat -n' and print
         numbered_authors = [f"{idx + 1}  {author}" for idx, author in enumerate(limited_authors)]
@@ -236,13 +255,17 @@ def new_contributors(config: Dict[str, Union[str, int]], new_date: str) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
     ignore_authors = config.get("ignore_authors", lambda _s: False)
 
     # Original command:
     # git -c log.showSignature=false log --use-mailmap $_merges \
     #     "$_since" "$_until" --format='%aE' $_log_options \
     #     $_pathspec | sort -u
+    # The name comes along in the same pass rather than from one more
+    # git log per new contributor. Ignored authors aren't left to git to
+    # drop: someone's first commit may be under an identity that's ignored,
+    # and without it a later one would make them look new.
     cmd = [
         "git",
         "-c",
@@ -252,9 +275,9 @@ def new_contributors(config: Dict[str, Union[str, int]], new_date: str) -> None:
         merges,
         since,
         until,
-        "--format=%aE|%at",
+        "--format=%aN|%aE|%at",
         log_options,
-        pathspec,
+        *pathspec,
     ]
 
     # Remove any empty strings from the command
@@ -262,60 +285,33 @@ def new_contributors(config: Dict[str, Union[str, int]], new_date: str) -> None:
 
     output = run_git_command(cmd)
     if output:
-        # Dictionary to store the earliest commit timestamp for each contributor
-        contributors_dict = {}
+        resolver = get_resolver(config)
+
+        # Earliest commit of each contributor as (timestamp, name, email)
+        first_commits: Dict[int, Tuple[int, str, str]] = {}
 
         # Process each line of the Git output
         for line in output.split("\n"):
             try:
-                email, timestamp = line.split("|")
+                # Names may contain '|', emails and timestamps can't
+                name, email, timestamp = line.rsplit("|", 2)
                 timestamp = int(timestamp)
-                # Skip ignored by email
-                if ignore_authors(email):
-                    continue
-                # If the contributor is not in the dictionary or the current timestamp is earlier
-                if email not in contributors_dict or timestamp < contributors_dict[email]:
-                    contributors_dict[email] = timestamp
             except ValueError:
                 continue  # Skip lines that don't match format
+            author_id = resolver.resolve(name, email)
+            first = first_commits.get(author_id)
+            if first is None or timestamp < first[0]:
+                first_commits[author_id] = (timestamp, name.strip(), email)
 
         # List to hold new contributors
         new_contributors_list = []
 
         # Iterate over contributors to find those who are new since 'new_date'
-        for email, first_commit_ts in contributors_dict.items():
+        for first_commit_ts, name, email in first_commits.values():
             if first_commit_ts >= new_date_ts:
-                # Retrieve the contributor's name
-                # Original command:
-                # git -c log.showSignature=false log --author="$c" \
-                #     --reverse --use-mailmap $_merges "$_since" "$_until" \
-                #     --format='%at' $_log_options $_pathspec | head -n 1
-                name_cmd = [
-                    "git",
-                    "-c",
-                    "log.showSignature=false",
-                    "log",
-                    "--author=" + email,
-                    "--reverse",
-                    "--use-mailmap",
-                    since,
-                    until,
-                    "--format=%aN",
-                    log_options,
-                    pathspec,
-                    "-n",
-                    "1",
-                ]
-
-                # Remove any empty strings from the command
-                name_cmd = [arg for arg in name_cmd if arg]
-
-                # Grab name + email if we can. Otherwise, just grab email
-                # while also making sure to ignore any authors that may be
-                # in our ignore_author env var
-                name = (run_git_command(name_cmd) or "").strip()
-                combo = f"{name} <{email}>" if name else f"<{email}>"
-                if ignore_authors(email) or ignore_authors(name) or ignore_authors(combo):
+                # Make sure to ignore any authors that may be in our
+                # ignore_author env var
+                if is_author_ignored(ignore_authors, name, email):
                     continue
 
                 new_contributors_list.append((name, email))
@@ -353,7 +349,7 @@ def git_commits_per_author(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
 
     # Original authors command:
     # git -c log.showSignature=false log --use-mailmap \
@@ -364,6 +360,8 @@ def git_commits_per_author(config: Dict[str, Union[str, int]]) -> None:
     # git -c log.showSignature=false log --author="$c" \
     #     --reverse --use-mailmap $_merges "$_since" "$_until" \
     #     --format='%at' $_log_options $_pathspec | head -n 1
+    # git picks out the Co-authored-by trailers itself, so each commit is a
+    # single line of 'author<GS>co-author<GS>...' instead of its whole body.
     cmd = [
         "git",
         "-c",
@@ -373,9 +371,9 @@ def git_commits_per_author(config: Dict[str, Union[str, int]]) -> None:
         merges,
         since,
         until,
-        "--pretty=format:Author:%aN <%aE>%n%b",
+        "--pretty=format:%aN <%aE>%x1d" + CO_AUTHORS_FORMAT,
         log_options,
-        pathspec,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
@@ -386,35 +384,22 @@ def git_commits_per_author(config: Dict[str, Union[str, int]]) -> None:
         print("No commits found.")
         return
 
-    # Initialize commit count dictionary
-    commit_counts = {}
+    # Commit counts by author id. Authors and co-authors both go through
+    # the identity resolver, so a co-author trailer with an old email is
+    # counted for the same person as their own commits.
+    resolver = get_resolver(config)
+    commit_counts: Dict[int, int] = collections.Counter()
 
     # Total commits (including co-authored commits)
     total_commits = 0
 
-    # Regular expressions for parsing the author(s)
-    author_regex = re.compile(r"^Author:\s*(.+)$", re.IGNORECASE)
-    coauthor_regex = re.compile(r"^Co-Authored-by:\s*(.+)$", re.IGNORECASE)
-
     # Process each line of the git output
     for line in output.split("\n"):
-        author_match = author_regex.match(line)
-        coauthor_match = coauthor_regex.match(line)
-
-        # Handle author
-        if author_match:
-            author_info = author_match.group(1).strip()
-            author_name = extract_name(author_info)
-            if author_name:
-                commit_counts[author_name] = commit_counts.get(author_name, 0) + 1
-                total_commits += 1
-
-        # Handle co-author
-        elif coauthor_match:
-            coauthor_info = coauthor_match.group(1).strip()
-            coauthor_name = extract_name(coauthor_info)
-            if coauthor_name:
-                commit_counts[coauthor_name] = commit_counts.get(coauthor_name, 0) + 1
+        # The author comes first, then any co-authors
+        for identity in line.split(CO_AUTHOR_SEP):
+            author_id = resolver.resolve_string(identity)
+            if author_id is not None:
+                commit_counts[author_id] += 1
                 total_commits += 1
 
     # Handle case if nothing is found
@@ -424,9 +409,10 @@ def git_commits_per_author(config: Dict[str, Union[str, int]]) -> None:
 
     # Prepare a list of contributors with counts and percentages
     contributors_list = []
-    for author, count in commit_counts.items():
+    names = resolver.display_names(commit_counts)
+    for author_id, count in commit_counts.items():
         percentage = (count / total_commits) * 100
-        contributors_list.append((count, author, percentage))
+        contributors_list.append((count, names[author_id], percentage))
 
     # Sort the list by commit count in descending order
     contributors_list.sort(key=lambda x: x[0], reverse=True)
@@ -481,7 +467,7 @@ def git_commits_per_date(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
 
     # Original command
     #  git -c log.showSignature=false log --use-mailmap $_merges "$_since" "$_until" \
@@ -498,17 +484,22 @@ def git_commits_per_date(config: Dict[str, Union[str, int]]) -> None:
         "--date=short",
         "--pretty=format:%ad",
         log_options,
-        pathspec,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
     # Print out the commit count and date in YYYY-MM-DD format
-    output = run_git_command(cmd)
-    if output:
-        dates = output.split("\n")
-        counter = collections.Counter(dates)
+    store = open_backend(config)
+    if store is not None:
+        counter = count_commits(store, config, "date")
+        store.close()
+    else:
+        output = run_git_command(cmd)
+        counter = collections.Counter(output.split("\n")) if output else collections.Counter()
+
+    if counter:
         print("Git commits per date:\n")
 
         # Need to figure out the max count for width alignment purposes
@@ -540,6 +531,7 @@ def git_commits_per_month(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
 
     # Define months
     months_order = [
@@ -583,20 +575,26 @@ def git_commits_per_month(config: Dict[str, Union[str, int]]) -> None:
         since,
         until,
         log_options,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
+    store = open_backend(config)
+    if store is not None:
+        counter = count_commits(store, config, "month")
+        store.close()
+    else:
+        output = run_git_command(cmd)
+        # Split the output into individual month abbreviations
+        counter = collections.Counter(output.split("\n")) if output else collections.Counter()
 
-    if output:
+    if counter:
         print("Git commits by month:\n")
-        # Split the output into individual month abbreviations
-        months = output.split("\n")
-        for month in months:
+        for month, count in counter.items():
             if month in commit_counts:
-                commit_counts[month] += 1
+                commit_counts[month] += count
 
         # Determine the maximum count to set the scaling factor
         max_count = max(commit_counts.values()) if commit_counts else 0
@@ -645,6 +643,7 @@ def git_commits_per_year(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
 
     # Bar length
     # TODO: Make this user adjustable
@@ -668,12 +667,22 @@ def git_commits_per_year(config: Dict[str, Union[str, int]]) -> None:
         since,
         until,
         log_options,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
+    store = open_backend(config)
+    if store is not None:
+        counter = count_commits(store, config, "year")
+        store.close()
+        # The distinct years are all the code below needs from the output
+        output = "\n".join(counter)
+    else:
+        output = run_git_command(cmd)
+        counter = None
+
     if output:
         print("Git commits by year:\n")
 
@@ -687,7 +696,8 @@ def git_commits_per_year(config: Dict[str, Union[str, int]]) -> None:
 
         # Count the frequency of each year
         # Handle cases in case years weren't valid
-        counter = collections.Counter(years)
+        if counter is None:
+            counter = collections.Counter(years)
         all_years = sorted(counter.keys())
         try:
             start_year = int(all_years[0])
@@ -754,6 +764,7 @@ def git_commits_per_weekday(
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
 
     # TODO: Make this user adjustable
     max_bar_length = 30
@@ -780,6 +791,7 @@ def git_commits_per_weekday(
         "-c",
         "log.showSignature=false",
         "log",
+        "--use-mailmap",
         merges,
         "--pretty=format:%cd",
         "--date=format:%a",
@@ -787,18 +799,25 @@ def git_commits_per_weekday(
         since,
         until,
         log_options,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
-    if output:
+    store = open_backend(config, author=author)
+    if store is not None:
+        counter = count_commits(store, config, "weekday", author)
+        store.close()
+    else:
+        output = run_git_command(cmd)
         # Split the output into individual weekday abbreviations
-        weekdays = output.split("\n")
-        for day in weekdays:
+        counter = collections.Counter(output.split("\n")) if output else collections.Counter()
+
+    if counter:
+        for day, count in counter.items():
             if day in commit_counts:
-                commit_counts[day] += 1
+                commit_counts[day] += count
 
         # Calculate total commits
         total_commits = sum(commit_counts.values())
@@ -860,6 +879,7 @@ def git_commits_per_hour(config: Dict[str, Union[str, int]], author: Optional[st
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
+    pathspec = config.get("pathspec", [])
 
     # TODO: Make this user adjustable
     max_bar_length = 20
@@ -886,6 +906,7 @@ def git_commits_per_hour(config: Dict[str, Union[str, int]], author: Optional[st
         "-c",
         "log.showSignature=false",
         "log",
+        "--use-mailmap",
         merges,
         "--pretty=format:%cd",
         "--date=format:%H",
@@ -893,18 +914,25 @@ def git_commits_per_hour(config: Dict[str, Union[str, int]], author: Optional[st
         since,
         until,
         log_options,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
-    if output:
+    store = open_backend(config, author=author)
+    if store is not None:
+        counter = count_commits(store, config, "hour", author)
+        store.close()
+    else:
+        output = run_git_command(cmd)
         # Split the output into individual hour abbreviations
-        hours = output.split("\n")
-        for hour in hours:
+        counter = collections.Counter(output.split("\n")) if output else collections.Counter()
+
+    if counter:
+        for hour, count in counter.items():
             if hour in commit_counts:
-                commit_counts[hour] += 1
+                commit_counts[hour] += count
 
         # Calculate total commits
         total_commits = sum(commit_counts.values())
@@ -968,7 +996,7 @@ def git_commits_per_timezone(
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
 
     # Initialize commit counts in a collection for easy storage and access
     commit_counts = collections.Counter()
@@ -989,6 +1017,7 @@ def git_commits_per_timezone(
         "-c",
         "log.showSignature=false",
         "log",
+        "--use-mailmap",
         merges,
         "--pretty=format:%ad %s",
         author_option,
@@ -996,16 +1025,22 @@ def git_commits_per_timezone(
         until,
         "--date=iso",
         log_options,
-        pathspec,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    output = run_git_command(cmd)
-    if output:
+    store = open_backend(config, author=author)
+    if store is not None:
+        commit_counts = count_commits(store, config, "timezone", author)
+        store.close()
+        found_commits = bool(commit_counts)
+    else:
+        output = run_git_command(cmd)
+        found_commits = bool(output)
         # Extract timezone offsets from each commit
-        for line in output.split("\n"):
+        for line in (output or "").split("\n"):
             parts = line.strip().split()
             if len(parts) >= 3:
                 # ISO format: YYYY-MM-DD HH:MM:SS +/-TZ
@@ -1018,6 +1053,8 @@ def git_commits_per_timezone(
                 ):
                     commit_counts[timezone] += 1
 
+    if found_commits:
+
         if not commit_counts:
             if author:
                 print(f"No valid timezones found for author: {author}")
@@ -6,11 +6,7 @@ Main entry point for Git Py Stats.
 
 import sys
 
-from git_py_stats.git_operations import check_git_repository
 from git_py_stats.arg_parser import parse_arguments
-from git_py_stats.interactive_mode import handle_interactive_mode
-from git_py_stats.non_interactive_mode import handle_non_interactive_mode
-from git_py_stats.config import get_config
 
 
 def main() -> None:
@@ -24,22 +20,41 @@ def main() -> None:
         None
     """
 
+    # Parse command-line arguments first so --help and --version
+    # return right away without running git or loading any reports
+    args = parse_arguments()
+
+    # Everything else is imported here rather than at the top of the file
+    # to keep startup fast when this is called from prompts and hooks
+    from git_py_stats.config import get_config
+    from git_py_stats.git_operations import check_git_repository
+
     # Check if we are inside a Git repository
     if not check_git_repository():
         print("This is not a git repository.")
         print("Please navigate to a git repository and try again.")
         sys.exit(1)
 
+    # Names and paths that aren't valid UTF-8 come back from git with
+    # surrogate escapes; print their original bytes, the way git log does
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(errors="surrogateescape")
+
     # Get env config
     config = get_config()
+    if args.no_renames:
+        config["renames"] = False
 
-    # Parse command-line arguments
-    args = parse_arguments()
+    # Non-Interactive Mode based on if any report was asked for. Options
+    # that only change how reports run don't count on their own.
+    reports = {name: value for name, value in vars(args).items() if name != "no_renames"}
+    if any(value is not None and value is not False for value in reports.values()):
+        from git_py_stats.non_interactive_mode import handle_non_interactive_mode
 
-    # Non-Interactive Mode based on if we see command-line arguments
-    if len(sys.argv) > 1:
         handle_non_interactive_mode(args, config)
     else:
+        from git_py_stats.interactive_mode import handle_interactive_mode
+
         handle_interactive_mode(config)
 
 
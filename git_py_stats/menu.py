@@ -84,6 +84,14 @@ def interactive_menu(config: Dict[str, Union[str, int]]) -> str:
     print(f"\n{TITLES} Calendar:{NORMAL}")
     print(f"{NUMS}   23){TEXT} Activity calendar by author")
     print(f"{NUMS}   24){TEXT} Activity heatmap for the last {days} days")
+    print(f"{NUMS}   31){TEXT} Activity calendars for every author (saved to a file)")
+    print(f"\n{TITLES} Analyze:{NORMAL}")
+    print(f"{NUMS}   25){TEXT} Churn by directory")
+    print(f"{NUMS}   26){TEXT} Hotspots (most changed files)")
+    print(f"{NUMS}   27){TEXT} Files changed together")
+    print(f"{NUMS}   28){TEXT} Bus factor by directory")
+    print(f"{NUMS}   29){TEXT} Surviving lines by directory (git blame)")
+    print(f"{NUMS}   30){TEXT} Commits by weekday, hour, and timezone for every author")
     print(f"\n{HELP_TXT}Please enter a menu option or {EXIT_TXT}press Enter to exit.{NORMAL}")
 
     choice = input(f"{TEXT}> {NORMAL}")
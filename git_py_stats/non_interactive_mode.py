@@ -5,7 +5,16 @@ Handles the non-interactive mode for Git Py Stats
 from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
 from typing import Dict, Union
 
-from git_py_stats import generate_cmds, list_cmds, suggest_cmds, calendar_cmds
+from git_py_stats.lazy import lazy_import
+
+# Only the module behind the requested command ever gets loaded
+generate_cmds = lazy_import("git_py_stats.generate_cmds")
+list_cmds = lazy_import("git_py_stats.list_cmds")
+suggest_cmds = lazy_import("git_py_stats.suggest_cmds")
+calendar_cmds = lazy_import("git_py_stats.calendar_cmds")
+analyze_cmds = lazy_import("git_py_stats.analyze_cmds")
+commit_db = lazy_import("git_py_stats.commit_db")
+doctor = lazy_import("git_py_stats.doctor")
 
 
 def handle_non_interactive_mode(args: Namespace, config: Dict[str, Union[str, int]]) -> None:
@@ -29,6 +38,7 @@ def handle_non_interactive_mode(args: Namespace, config: Dict[str, Union[str, in
         "my_daily_stats": lambda: generate_cmds.my_daily_status(config),
         "csv_output_by_branch": lambda: generate_cmds.output_daily_stats_csv(config),
         "json_output": lambda: generate_cmds.save_git_log_output_json(config),
+        "export_sqlite": lambda: commit_db.export_sqlite(config),
         "branch_tree": lambda: list_cmds.branch_tree(config),
         "branches_by_date": lambda: list_cmds.branches_by_date(config),
         "contributors": lambda: list_cmds.contributors(config),
@@ -50,10 +60,27 @@ def handle_non_interactive_mode(args: Namespace, config: Dict[str, Union[str, in
             config, args.commits_by_author_by_timezone
         ),
         "suggest_reviewers": lambda: suggest_cmds.suggest_reviewers(config),
+        "suggest_reviewers_for_paths": lambda: suggest_cmds.suggest_reviewers_for_changes(
+            config, paths=args.suggest_reviewers_for_paths
+        ),
+        "suggest_reviewers_for_diff": lambda: suggest_cmds.suggest_reviewers_for_changes(
+            config, diff=args.suggest_reviewers_for_diff
+        ),
         "commits_calendar_by_author": lambda: calendar_cmds.commits_calendar_by_author(
             config, args.commits_calendar_by_author
         ),
         "commits_heatmap": lambda: calendar_cmds.commits_heatmap(config),
+        "churn_by_directory": lambda: analyze_cmds.churn_by_directory(config),
+        "hotspots": lambda: analyze_cmds.hotspots(config),
+        "cochanges": lambda: analyze_cmds.cochanges(config),
+        "bus_factor": lambda: analyze_cmds.bus_factor(config),
+        "blame_ownership": lambda: analyze_cmds.blame_ownership(config),
+        "activity_by_author": lambda: analyze_cmds.activity_by_author(config),
+        "commits_calendars_all_authors": lambda: calendar_cmds.commits_calendars_all_authors(
+            config
+        ),
+        "doctor": lambda: doctor.repository_doctor(config),
+        "optimize": lambda: doctor.optimize_repository(config),
     }
 
     # Call the appropriate function based on the command-line argument
@@ -0,0 +1,364 @@
+"""
+Per-file ownership index used to suggest reviewers for a set of changes
+and to find directories that depend on a handful of authors.
+
+Every (path, author) pair gets a score that adds up one term per commit,
+weighted so that a commit counts half as much for every HALF_LIFE_DAYS it
+is older than another one. Scores are kept relative to a fixed base time,
+so new commits are simply added on top when the index catches up. Lines
+changed are kept next to the scores, without any decay.
+
+Authors are stored as committed and only merged into people by the
+identity resolver when the index is read, so a changed .mailmap takes
+effect without rebuilding anything. Renamed files are stored under their
+newest name, and history indexed before a rename is moved there when the
+index catches up.
+"""
+
+import posixpath
+import sqlite3
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from git_py_stats.cache import (
+    catch_up_args,
+    decode_path,
+    encode_path,
+    get_meta,
+    open_cache_db,
+    set_meta,
+)
+from git_py_stats.commit_stream import iter_commits, parent_directories
+from git_py_stats.git_operations import resolve_commit
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.renames import FileIdentities
+
+INDEX_NAME = "ownership.sqlite3"
+
+# Bump this whenever the schema or scoring changes so old indexes get rebuilt
+INDEX_VERSION = "4"
+
+# A commit counts half as much as one made this many days later
+HALF_LIFE_DAYS = 180
+
+_HALF_LIFE_SECONDS = HALF_LIFE_DAYS * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    UNIQUE (name, email)
+);
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path BLOB NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS ownership (
+    path_id INTEGER NOT NULL REFERENCES paths (id),
+    author_id INTEGER NOT NULL REFERENCES authors (id),
+    score REAL NOT NULL,
+    commits INTEGER NOT NULL,
+    last_time INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    PRIMARY KEY (path_id, author_id)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO ownership (path_id, author_id, score, commits, last_time, lines)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (path_id, author_id) DO UPDATE SET
+    score = score + excluded.score,
+    commits = commits + excluded.commits,
+    last_time = MAX(last_time, excluded.last_time),
+    lines = lines + excluded.lines
+"""
+
+# The same upsert, moving every row of one path onto another
+_MOVE = """
+INSERT INTO ownership (path_id, author_id, score, commits, last_time, lines)
+SELECT ?, author_id, score, commits, last_time, lines FROM ownership WHERE path_id = ?
+ON CONFLICT (path_id, author_id) DO UPDATE SET
+    score = score + excluded.score,
+    commits = commits + excluded.commits,
+    last_time = MAX(last_time, excluded.last_time),
+    lines = lines + excluded.lines
+"""
+
+
+class Reviewer(NamedTuple):
+    """
+    A suggested reviewer for a set of changed paths.
+
+    share is the author's part of the ownership of the changed paths, from
+    0 to 1. paths is how many of the changed paths they have touched.
+    """
+
+    name: str
+    share: float
+    paths: int
+    commits: int
+    last_time: int
+
+
+def open_index(config: Dict[str, Union[str, int]]) -> Optional[sqlite3.Connection]:
+    """
+    Opens (and creates if needed) the ownership index in the cache dir.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+
+    Returns:
+        Optional[sqlite3.Connection]: The open index, or None on failure.
+    """
+    return open_cache_db(config, INDEX_NAME, _SCHEMA, INDEX_VERSION)
+
+
+def sync_index(conn: sqlite3.Connection, ref: str = "HEAD") -> Optional[int]:
+    """
+    Brings the index up to date with 'ref' using a single numstat scan of
+    the commits it hasn't seen yet. If the stored tip is no longer part of
+    the history (e.g. after a rebase) the index is built again.
+
+    Args:
+        conn (sqlite3.Connection): An open ownership index.
+        ref (str): The branch or revision to index.
+
+    Returns:
+        Optional[int]: Number of commits added, or None if 'ref' is invalid.
+    """
+    tip = resolve_commit(ref)
+    if not tip:
+        return None
+
+    extra_args = catch_up_args(get_meta(conn, "tip"), get_meta(conn, "ref"), tip, ref)
+    if extra_args is None:
+        return 0
+    if not extra_args:
+        conn.executescript("""
+            DELETE FROM ownership;
+            DELETE FROM paths;
+            DELETE FROM authors;
+            DELETE FROM meta WHERE key IN ('tip', 'ref', 'base_time');
+            """)
+
+    base_time = get_meta(conn, "base_time")
+    author_ids: Dict[Tuple[str, str], int] = {
+        (name, email): author_id
+        for author_id, name, email in conn.execute("SELECT id, name, email FROM authors")
+    }
+    path_ids: Dict[str, int] = {
+        decode_path(path): path_id for path_id, path in conn.execute("SELECT id, path FROM paths")
+    }
+
+    added = 0
+    # (path id, author id) -> [score, commits, last time, lines], flushed in batches
+    pending: Dict[Tuple[int, int], List[float]] = {}
+    identities = FileIdentities()
+    renamed: Set[str] = set()
+    # Paths this scan wrote rows for, so a name reused after a rename keeps its own
+    written: Set[int] = set()
+    commits = iter_commits({"merges": "--no-merges"}, tip, numstat=True, extra_args=extra_args)
+    for commit in commits:
+        if base_time is None:
+            # The newest commit of the first scan anchors every score
+            base_time = str(commit.timestamp)
+            set_meta(conn, [("base_time", base_time)])
+
+        identity = (commit.author, commit.email)
+        author_id = author_ids.get(identity)
+        if author_id is None:
+            author_id = conn.execute(
+                "INSERT INTO authors (name, email) VALUES (?, ?)", identity
+            ).lastrowid
+            author_ids[identity] = author_id
+
+        weight = 2.0 ** ((commit.timestamp - int(base_time)) / _HALF_LIFE_SECONDS)
+        renamed.update(old for old, _new in commit.renames)
+        for added_lines, removed_lines, path in identities.canonical_files(commit):
+            path_id = _path_id(conn, path_ids, path)
+            written.add(path_id)
+            entry = pending.get((path_id, author_id))
+            if entry is None:
+                pending[(path_id, author_id)] = [
+                    weight,
+                    1,
+                    commit.timestamp,
+                    added_lines + removed_lines,
+                ]
+            else:
+                entry[0] += weight
+                entry[1] += 1
+                entry[2] = max(entry[2], commit.timestamp)
+                entry[3] += added_lines + removed_lines
+        added += 1
+
+        if len(pending) >= 50000:
+            _flush(conn, pending)
+
+    _flush(conn, pending)
+    # Rows indexed before this scan predate its renames
+    for old in renamed:
+        old_id = path_ids.get(old)
+        new = identities.find(old)
+        if old_id is None or old_id in written or new == old:
+            continue
+        conn.execute(_MOVE, (_path_id(conn, path_ids, new), old_id))
+        conn.execute("DELETE FROM ownership WHERE path_id = ?", (old_id,))
+    set_meta(conn, [("tip", tip), ("ref", ref)])
+    conn.commit()
+    return added
+
+
+def _path_id(conn: sqlite3.Connection, path_ids: Dict[str, int], path: str) -> int:
+    """
+    Returns the id of 'path', adding it to the index if it's new.
+    """
+    path_id = path_ids.get(path)
+    if path_id is None:
+        path_id = conn.execute(
+            "INSERT INTO paths (path) VALUES (?)", (encode_path(path),)
+        ).lastrowid
+        path_ids[path] = path_id
+    return path_id
+
+
+def _flush(conn: sqlite3.Connection, pending: Dict[Tuple[int, int], List[float]]) -> None:
+    """
+    Adds pending scores to the index and empties the buffer.
+    """
+    conn.executemany(_UPSERT, [(*key, *values) for key, values in pending.items()])
+    pending.clear()
+
+
+def _owner_rows(conn: sqlite3.Connection, path: str) -> List[Tuple[str, str, float, int, int]]:
+    """
+    Returns (name, email, score, commits, last time) rows for a path. Paths
+    the index has never seen (new files, or directories) use everything
+    under the closest directory that does have history.
+    """
+    query = """
+        SELECT a.name, a.email, SUM(o.score), SUM(o.commits), MAX(o.last_time)
+        FROM ownership o
+        JOIN paths p ON p.id = o.path_id
+        JOIN authors a ON a.id = o.author_id
+        WHERE {}
+        GROUP BY a.id
+    """
+    rows = conn.execute(query.format("p.path = ?"), (encode_path(path),)).fetchall()
+    directory = path.rstrip("/")
+    while not rows and directory:
+        # '0' sorts right after '/', so this range is everything inside the directory
+        bounds = (encode_path(f"{directory}/"), encode_path(f"{directory}0"))
+        rows = conn.execute(query.format("p.path >= ? AND p.path < ?"), bounds).fetchall()
+        directory = posixpath.dirname(directory)
+    return rows
+
+
+def rank_reviewers(
+    conn: sqlite3.Connection,
+    paths: Iterable[str],
+    ignore_authors: Callable[[str], bool] = lambda _s: False,
+    resolver: Optional[IdentityResolver] = None,
+) -> List[Reviewer]:
+    """
+    Ranks the owners of a set of paths. Each path splits one point between
+    its owners by score, so a single busy file can't drown out the rest.
+
+    Args:
+        conn (sqlite3.Connection): A synced ownership index.
+        paths (Iterable[str]): Changed paths, relative to the repository root.
+        ignore_authors (Callable[[str], bool]): Returns True for names or
+            emails that should never be suggested.
+        resolver (Optional[IdentityResolver]): Tells which stored authors
+            are the same person.
+
+    Returns:
+        List[Reviewer]: Reviewers, best match first.
+    """
+    resolver = resolver or IdentityResolver()
+    paths = list(paths)
+    # All keyed by person id
+    shares: Dict[int, float] = defaultdict(float)
+    touched: Dict[int, int] = defaultdict(int)
+    commits: Dict[int, int] = defaultdict(int)
+    last_time: Dict[int, int] = defaultdict(int)
+
+    for path in paths:
+        rows = [
+            row
+            for row in _owner_rows(conn, path)
+            if not ignore_authors(row[0]) and not ignore_authors(row[1])
+        ]
+        total = sum(row[2] for row in rows)
+        if not total:
+            continue
+        path_owners = set()
+        for name, email, score, count, last in rows:
+            person = resolver.resolve(name, email)
+            shares[person] += score / total
+            commits[person] += count
+            last_time[person] = max(last_time[person], last)
+            path_owners.add(person)
+        for person in path_owners:
+            touched[person] += 1
+
+    names = resolver.display_names(shares)
+    reviewers = [
+        Reviewer(
+            names[person], share / len(paths), touched[person], commits[person], last_time[person]
+        )
+        for person, share in shares.items()
+    ]
+    return sorted(reviewers, key=lambda reviewer: (-reviewer.share, reviewer.name))
+
+
+def lines_by_directory(
+    conn: sqlite3.Connection,
+    depth: int,
+    ignore_authors: Callable[[str], bool] = lambda _s: False,
+    resolver: Optional[IdentityResolver] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Rolls the lines each author has changed up into every directory at most
+    'depth' levels deep, plus the repository root as '.'.
+
+    Args:
+        conn (sqlite3.Connection): A synced ownership index.
+        depth (int): Deepest directory level to keep.
+        ignore_authors (Callable[[str], bool]): Returns True for names or
+            emails to leave out.
+        resolver (Optional[IdentityResolver]): Tells which stored authors
+            are the same person.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Lines changed per author display name,
+                                   keyed by directory ('src/app/').
+    """
+    resolver = resolver or IdentityResolver()
+    directories: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    rows = conn.execute("""
+        SELECT p.path, a.name, a.email, o.lines
+        FROM ownership o
+        JOIN paths p ON p.id = o.path_id
+        JOIN authors a ON a.id = o.author_id
+        WHERE o.lines > 0
+        """)
+    for path, name, email, lines in rows:
+        if ignore_authors(name) or ignore_authors(email):
+            continue
+        person = resolver.resolve(name, email)
+        for directory in parent_directories(decode_path(path), depth):
+            directories[directory][person] += lines
+    names = resolver.display_names(
+        {person for authors in directories.values() for person in authors}
+    )
+    return {
+        directory: {names[person]: lines for person, lines in authors.items()}
+        for directory, authors in directories.items()
+    }
@@ -0,0 +1,107 @@
+"""
+Gives a file one identity across every name it has had.
+
+git log reports each change under the path the file had at the time, so a
+file renamed five times shows up as six files with its churn spread over
+all of them. Every rename git detects (-M) is an edge between two paths,
+and a union-find over those edges maps each path to the newest name of
+the file it belongs to. Nothing has to be read twice: git log lists
+commits newest first, so a rename is always seen before the older commits
+that still use the old path.
+
+A path that a new file reuses after the old one was renamed away joins
+the renamed file's identity when paths are folded after the fact with
+count(). canonical_files() reads commits in order and keeps them apart.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from git_py_stats.commit_stream import CommitRecord
+
+# Paths as strings from git log, or path ids in the cached backends
+Path = Hashable
+
+
+class FileIdentities:
+    """
+    Union-find over rename edges. Each set is named after the newest path
+    of the file, which find() returns for any of its older paths.
+    """
+
+    def __init__(self) -> None:
+        # Only paths that were renamed at some point have an entry
+        self._parent: Dict[Path, Path] = {}
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def find(self, path: Path) -> Path:
+        """
+        Returns the newest path of the file 'path' belongs to.
+
+        Args:
+            path (Path): Any path the file had.
+
+        Returns:
+            Path: The identity of the file.
+        """
+        parent = self._parent.get(path)
+        if parent is None:
+            return path
+        root = parent
+        while True:
+            grandparent = self._parent.get(root)
+            if grandparent is None:
+                break
+            root = grandparent
+        # Point everything on the way straight at the root
+        while parent != root:
+            self._parent[path] = root
+            path, parent = parent, self._parent[parent]
+        return root
+
+    def add_rename(self, old: Path, new: Path) -> None:
+        """
+        Records that the file at 'old' was renamed to 'new'.
+
+        Args:
+            old (Path): The path before the rename.
+            new (Path): The path after it.
+        """
+        old_root, new_root = self.find(old), self.find(new)
+        if old_root != new_root:
+            self._parent[old_root] = new_root
+
+    def add_renames(self, renames: Iterable[Tuple[Path, Path]]) -> None:
+        """
+        Records every (old, new) rename in 'renames'.
+        """
+        for old, new in renames:
+            self.add_rename(old, new)
+
+    def canonical_files(self, commit: CommitRecord) -> List[Tuple[int, int, str]]:
+        """
+        Records the commit's renames and returns its files under their
+        identities. Commits have to come newest first, the way git log
+        lists them.
+
+        Args:
+            commit (CommitRecord): A commit read with numstat.
+
+        Returns:
+            List[Tuple[int, int, str]]: (insertions, deletions, identity) per file.
+        """
+        if commit.renames:
+            self.add_renames(commit.renames)
+        if not self._parent:
+            return commit.files
+        find = self.find
+        return [(added, removed, find(path)) for added, removed, path in commit.files]
+
+    def count(self, paths: Iterable[Path]) -> int:
+        """
+        Returns how many distinct files 'paths' hold.
+        """
+        if not self._parent:
+            return len(set(paths))
+        return len({self.find(path) for path in paths})
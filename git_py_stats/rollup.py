@@ -0,0 +1,547 @@
+"""
+Pre-aggregated rollup cube of commit history.
+
+Instead of one row per commit, the cube keeps one cell per combination of
+UTC hour, author, and the few attributes the reports group by (the
+committer's local hour shift, the author's local day and timezone, and
+whether the commit is a merge), holding how many commits fell into it and
+their insertions and deletions. Cells are sorted by hour, and per-day
+prefix sums sit next to them, so a --since/--until window is found with
+a binary search and answered by reading only the cells inside it. Reports
+then take time proportional to the days in the window, not the commits.
+
+Windows are resolved to whole UTC hours: a commit counts when the hour it
+was committed in overlaps the window.
+"""
+
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from git_py_stats.cache import catch_up_args, get_cache_dir
+from git_py_stats.commit_db import resolve_date_bounds
+from git_py_stats.commit_stream import CommitRecord, iter_commits, tz_offset_seconds
+from git_py_stats.git_operations import resolve_commit
+
+ROLLUP_NAME = "rollup.cube"
+
+# Bump this whenever the layout changes so old cubes get rebuilt
+ROLLUP_VERSION = 1
+
+_MAGIC = b"GPYROLL\0"
+_HEADER_LENGTH = struct.Struct("<I")
+
+# Column name -> array typecode, one entry per cell, sorted by hour
+_CELL_COLUMNS = {
+    # Hours since the epoch, in UTC, of the commits' committer dates
+    "hour": "q",
+    "author_id": "I",
+    # Committer's local hour minus the UTC hour
+    "local_shift": "b",
+    # Author's local day minus the committer's local day
+    "author_day_shift": "i",
+    # Author's timezone, in minutes east of UTC
+    "author_offset": "h",
+    "merge": "B",
+    "commits": "I",
+    "insertions": "Q",
+    "deletions": "Q",
+}
+
+# Column name -> array typecode. 'day' has one entry per UTC day with
+# commits; the rest have one more and hold running totals, so day i owns
+# cells [first_cell[i], first_cell[i + 1]) and, e.g., made
+# commits[i + 1] - commits[i] commits.
+_DAY_COLUMNS = {
+    "day": "q",
+    "first_cell": "Q",
+    "commits": "Q",
+    "merges": "Q",
+    "insertions": "Q",
+    "deletions": "Q",
+}
+
+_EPOCH = date(1970, 1, 1)
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_CellKey = Tuple[int, int, int, int, int, int]
+
+
+class Rollup:
+    """
+    A rollup cube loaded from disk.
+
+    cells and days map each column name to an array. authors holds the
+    (name, email) of each author id.
+    """
+
+    def __init__(
+        self,
+        cells: Dict[str, array],
+        days: Dict[str, array],
+        authors: List[Tuple[str, str]],
+        tip: str,
+        ref: str,
+    ) -> None:
+        self.cells = cells
+        self.days = days
+        self.authors = authors
+        self.tip = tip
+        self.ref = ref
+
+    def __len__(self) -> int:
+        return len(self.cells["hour"])
+
+    def close(self) -> None:
+        """
+        Nothing to release; kept so the cube can be used like the other stores.
+        """
+
+
+def build_rollup(
+    cells: Dict[_CellKey, List[int]], authors: List[Tuple[str, str]], tip: str, ref: str
+) -> Rollup:
+    """
+    Lays out aggregated cells as sorted columns and computes the per-day
+    running totals.
+
+    Args:
+        cells (Dict[_CellKey, List[int]]): [commits, insertions, deletions]
+                                           keyed by (hour, author id, local shift,
+                                           author day shift, author offset, merge).
+        authors (List[Tuple[str, str]]): (name, email) of each author id.
+        tip (str): Commit hash the cube was built up to.
+        ref (str): Branch or revision the cube follows.
+
+    Returns:
+        Rollup: The cube.
+    """
+    columns = {name: array(typecode) for name, typecode in _CELL_COLUMNS.items()}
+    days = {name: array(typecode) for name, typecode in _DAY_COLUMNS.items()}
+    totals = [0, 0, 0, 0]
+    for name in ("first_cell", "commits", "merges", "insertions", "deletions"):
+        days[name].append(0)
+
+    for index, key in enumerate(sorted(cells)):
+        commits, insertions, deletions = cells[key]
+        hour, author_id, local_shift, author_day_shift, author_offset, merge = key
+        day = hour // 24
+        if not days["day"] or days["day"][-1] != day:
+            if days["day"]:
+                _close_day(days, index, totals)
+            days["day"].append(day)
+        columns["hour"].append(hour)
+        columns["author_id"].append(author_id)
+        columns["local_shift"].append(local_shift)
+        columns["author_day_shift"].append(author_day_shift)
+        columns["author_offset"].append(author_offset)
+        columns["merge"].append(merge)
+        columns["commits"].append(commits)
+        columns["insertions"].append(insertions)
+        columns["deletions"].append(deletions)
+        totals[0] += commits
+        totals[1] += commits if merge else 0
+        totals[2] += insertions
+        totals[3] += deletions
+    if days["day"]:
+        _close_day(days, len(cells), totals)
+    return Rollup(columns, days, authors, tip, ref)
+
+
+def _close_day(days: Dict[str, array], next_cell: int, totals: List[int]) -> None:
+    """
+    Records where the current day's cells end and the running totals so far.
+    """
+    days["first_cell"].append(next_cell)
+    days["commits"].append(totals[0])
+    days["merges"].append(totals[1])
+    days["insertions"].append(totals[2])
+    days["deletions"].append(totals[3])
+
+
+def add_commits(
+    cells: Dict[_CellKey, List[int]],
+    authors: List[Tuple[str, str]],
+    commits: Iterator[CommitRecord],
+) -> None:
+    """
+    Adds commits to the cells they fall into, giving new authors the next
+    free id.
+
+    Args:
+        cells (Dict[_CellKey, List[int]]): Cells to add to, see build_rollup.
+        authors (List[Tuple[str, str]]): (name, email) of each author id.
+        commits (Iterator[CommitRecord]): Commits read with numstat.
+
+    Returns:
+        None
+    """
+    author_ids = {identity: index for index, identity in enumerate(authors)}
+    for commit in commits:
+        identity = (commit.author, commit.email)
+        author_id = author_ids.get(identity)
+        if author_id is None:
+            author_id = author_ids[identity] = len(authors)
+            authors.append(identity)
+
+        hour = commit.committer_timestamp // 3600
+        local_hour = (commit.committer_timestamp + tz_offset_seconds(commit.committer_tz)) // 3600
+        author_offset = tz_offset_seconds(commit.tz)
+        author_day = (commit.timestamp + author_offset) // 86400
+        key = (
+            hour,
+            author_id,
+            local_hour - hour,
+            author_day - local_hour // 24,
+            author_offset // 60,
+            1 if len(commit.parents) > 1 else 0,
+        )
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = [0, 0, 0]
+        cell[0] += 1
+        for insertions, deletions, _ in commit.files:
+            cell[1] += insertions
+            cell[2] += deletions
+
+
+def _cells_of(rollup: Rollup) -> Dict[_CellKey, List[int]]:
+    """
+    Turns a cube's columns back into cells that more commits can be added to.
+    """
+    columns = rollup.cells
+    keys = zip(
+        columns["hour"],
+        columns["author_id"],
+        columns["local_shift"],
+        columns["author_day_shift"],
+        columns["author_offset"],
+        columns["merge"],
+    )
+    values = zip(columns["commits"], columns["insertions"], columns["deletions"])
+    return {key: list(value) for key, value in zip(keys, values)}
+
+
+def load_rollup(path: str) -> Optional[Rollup]:
+    """
+    Reads a rollup cube file.
+
+    Args:
+        path (str): The cube file.
+
+    Returns:
+        Optional[Rollup]: The cube, or None if it is missing, from an older
+                          version, or written on another platform.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return None
+            (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            header = json.loads(f.read(header_length))
+            if header["version"] != ROLLUP_VERSION or header["byteorder"] != sys.byteorder:
+                return None
+            tables = []
+            for layout, lengths in (
+                (_CELL_COLUMNS, header["cells"]),
+                (_DAY_COLUMNS, header["days"]),
+            ):
+                table = {name: array(typecode) for name, typecode in layout.items()}
+                for name, column in table.items():
+                    column.frombytes(f.read(lengths[name] * column.itemsize))
+                    if len(column) != lengths[name]:
+                        return None
+                tables.append(table)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+    authors = [(name, email) for name, email in header["authors"]]
+    return Rollup(tables[0], tables[1], authors, header["tip"], header["ref"])
+
+
+def write_rollup(path: str, rollup: Rollup) -> None:
+    """
+    Writes a rollup cube to a file. The file is written next to 'path'
+    first and then moved over it, so readers never see half a cube.
+
+    Args:
+        path (str): The cube file.
+        rollup (Rollup): The cube to write.
+
+    Returns:
+        None
+    """
+    header = json.dumps(
+        {
+            "version": ROLLUP_VERSION,
+            "byteorder": sys.byteorder,
+            "tip": rollup.tip,
+            "ref": rollup.ref,
+            "authors": rollup.authors,
+            "cells": {name: len(column) for name, column in rollup.cells.items()},
+            "days": {name: len(column) for name, column in rollup.days.items()},
+        }
+    ).encode()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for name in _CELL_COLUMNS:
+            rollup.cells[name].tofile(f)
+        for name in _DAY_COLUMNS:
+            rollup.days[name].tofile(f)
+    os.replace(tmp_path, path)
+
+
+def sync_rollup(config: Dict[str, Union[str, int]], ref: str = "HEAD") -> Optional[Rollup]:
+    """
+    Brings the cube in the cache dir up to date with 'ref' and loads it.
+    Only commits added since the last sync are read from git. If the stored
+    tip is no longer part of the history (e.g. after a rebase) the cube is
+    built again from scratch.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        ref (str): The branch or revision to roll up.
+
+    Returns:
+        Optional[Rollup]: The cube, or None on failure.
+    """
+    cache_dir = get_cache_dir(config)
+    tip = resolve_commit(ref)
+    if not cache_dir or not tip:
+        return None
+
+    path = os.path.join(cache_dir, ROLLUP_NAME)
+    rollup = load_rollup(path)
+    old_tip, old_ref = (rollup.tip, rollup.ref) if rollup is not None else (None, None)
+    extra_args = catch_up_args(old_tip, old_ref, tip, ref)
+    if extra_args is None:
+        return rollup
+
+    cells: Dict[_CellKey, List[int]] = {}
+    authors: List[Tuple[str, str]] = []
+    if rollup is not None and extra_args:
+        cells, authors = _cells_of(rollup), list(rollup.authors)
+
+    # Roll up everything on the branch; filters are applied when counting
+    add_commits(
+        cells, authors, iter_commits({"merges": ""}, tip, numstat=True, extra_args=extra_args)
+    )
+    rollup = build_rollup(cells, authors, tip, ref)
+    try:
+        write_rollup(path, rollup)
+    except OSError as e:
+        print(f"Failed to write {path}: {e}")
+        return None
+    return rollup
+
+
+def _hour_range(
+    rollup: Rollup,
+    config: Dict[str, Union[str, int]],
+    bounds: Optional[Tuple[Optional[int], Optional[int]]],
+) -> Tuple[int, int]:
+    """
+    Returns the first and last hour of the window, widened to whole hours.
+    """
+    since_ts, until_ts = bounds if bounds is not None else resolve_date_bounds(config)
+    low = since_ts // 3600 if since_ts is not None else -sys.maxsize
+    high = until_ts // 3600 if until_ts is not None else sys.maxsize
+    return low, high
+
+
+def _matching_authors(rollup: Rollup, author: str) -> Set[int]:
+    """
+    Returns the ids of authors whose 'name <email>' contains 'author', which
+    is how git's --author matches a pattern without regex characters.
+    """
+    return {
+        author_id
+        for author_id, (name, email) in enumerate(rollup.authors)
+        if author in f"{name} <{email}>"
+    }
+
+
+def select_cells(
+    rollup: Rollup,
+    config: Dict[str, Union[str, int]],
+    author: Optional[str] = None,
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> List[int]:
+    """
+    Returns the indexes of the cells inside the window that pass the
+    configured merge filter, plus an optional author.
+
+    Args:
+        rollup (Rollup): A loaded cube.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        author (Optional[str]): Only keep cells whose 'name <email>' contains this text.
+        bounds (Optional[Tuple]): Since and until timestamps to use instead of
+                                  the configured window.
+
+    Returns:
+        List[int]: Cell indexes, oldest first.
+    """
+    low, high = _hour_range(rollup, config, bounds)
+    hours = rollup.cells["hour"]
+    selected = range(bisect_left(hours, low), bisect_right(hours, high))
+
+    merges = config.get("merges", "--no-merges")
+    if merges in ("--no-merges", "--merges"):
+        merge, wanted = rollup.cells["merge"], 1 if merges == "--merges" else 0
+        selected = [i for i in selected if merge[i] == wanted]
+    if author:
+        authors = _matching_authors(rollup, author)
+        author_id = rollup.cells["author_id"]
+        selected = [i for i in selected if author_id[i] in authors]
+    return list(selected)
+
+
+def totals(
+    rollup: Rollup,
+    config: Dict[str, Union[str, int]],
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> Tuple[int, int, int]:
+    """
+    Totals the commits, insertions, and deletions inside the window. Whole
+    days are taken from the running totals, so only the cells of the two
+    days at the edges of the window are read.
+
+    Args:
+        rollup (Rollup): A loaded cube.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        bounds (Optional[Tuple]): Since and until timestamps to use instead of
+                                  the configured window.
+
+    Returns:
+        Tuple[int, int, int]: Commits, insertions, and deletions.
+    """
+    low, high = _hour_range(rollup, config, bounds)
+    merges = config.get("merges", "--no-merges")
+    days = rollup.days
+
+    # Days wholly inside the window
+    first = bisect_left(days["day"], -(-low // 24))
+    last = bisect_right(days["day"], (high + 1) // 24 - 1)
+    commits = merged = insertions = deletions = 0
+    if first < last:
+        commits = days["commits"][last] - days["commits"][first]
+        merged = days["merges"][last] - days["merges"][first]
+        insertions = days["insertions"][last] - days["insertions"][first]
+        deletions = days["deletions"][last] - days["deletions"][first]
+    if merges == "--no-merges":
+        commits -= merged
+    elif merges == "--merges":
+        commits, insertions, deletions = merged, 0, 0
+
+    # The partial days at either edge
+    columns = rollup.cells
+    edges: List[int] = []
+    if first < last:
+        edges.extend(range(bisect_left(columns["hour"], low), days["first_cell"][first]))
+        edges.extend(range(days["first_cell"][last], bisect_right(columns["hour"], high)))
+    else:
+        edges.extend(range(bisect_left(columns["hour"], low), bisect_right(columns["hour"], high)))
+    for i in edges:
+        if (merges == "--no-merges" and columns["merge"][i]) or (
+            merges == "--merges" and not columns["merge"][i]
+        ):
+            continue
+        commits += columns["commits"][i]
+        insertions += columns["insertions"][i]
+        deletions += columns["deletions"][i]
+    return commits, insertions, deletions
+
+
+def _format_tz(minutes: int) -> str:
+    """
+    Turns minutes east of UTC back into git's +HHMM form.
+    """
+    sign = "-" if minutes < 0 else "+"
+    minutes = abs(minutes)
+    return f"{sign}{minutes // 60:02d}{minutes % 60:02d}"
+
+
+def count_commits(
+    rollup: Rollup,
+    config: Dict[str, Union[str, int]],
+    group: str,
+    author: Optional[str] = None,
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> Counter:
+    """
+    Counts commits grouped by author, date, year, month, weekday, hour,
+    timezone, or calendar cell. Keys match what the equivalent git log
+    format prints (e.g. 'Mon', 'Jan', '09', '+0100'), author keys are
+    (name, email) tuples, and calendar keys are (ISO weekday, month) tuples.
+
+    Args:
+        rollup (Rollup): A loaded cube.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        group (str): One of the supported groupings.
+        author (Optional[str]): Only count commits whose 'name <email>' contains this text.
+        bounds (Optional[Tuple]): Since and until timestamps to use instead of
+                                  the configured window.
+
+    Returns:
+        Counter: Commit counts per group value.
+    """
+    columns = rollup.cells
+    commits = columns["commits"]
+    counts: Counter = Counter()
+    by_key: Counter = Counter()
+    selected = select_cells(rollup, config, author, bounds)
+
+    if group == "author":
+        author_id = columns["author_id"]
+        for i in selected:
+            by_key[author_id[i]] += commits[i]
+        for key, count in by_key.items():
+            counts[rollup.authors[key]] += count
+        return counts
+    if group == "timezone":
+        offset = columns["author_offset"]
+        for i in selected:
+            by_key[offset[i]] += commits[i]
+        for key, count in by_key.items():
+            counts[_format_tz(key)] += count
+        return counts
+
+    # The committer's local hour; the author's local day is a shift away
+    hour, local_shift = columns["hour"], columns["local_shift"]
+    if group == "hour":
+        for i in selected:
+            by_key[(hour[i] + local_shift[i]) % 24] += commits[i]
+        for key, count in by_key.items():
+            counts[f"{key:02d}"] += count
+        return counts
+    if group in ("date", "calendar"):
+        day_shift = columns["author_day_shift"]
+        for i in selected:
+            by_key[(hour[i] + local_shift[i]) // 24 + day_shift[i]] += commits[i]
+    else:
+        for i in selected:
+            by_key[(hour[i] + local_shift[i]) // 24] += commits[i]
+
+    for day, count in by_key.items():
+        local_date = _EPOCH + timedelta(days=day)
+        if group == "date":
+            counts[local_date.isoformat()] += count
+        elif group == "year":
+            counts[str(local_date.year)] += count
+        elif group == "month":
+            counts[_MONTHS[local_date.month - 1]] += count
+        elif group == "weekday":
+            counts[_WEEKDAYS[local_date.weekday()]] += count
+        elif group == "calendar":
+            counts[(local_date.isoweekday(), local_date.month)] += count
+    return counts
@@ -0,0 +1,542 @@
+"""
+Columnar binary snapshot of commit history that reloads without parsing.
+
+The file holds one fixed-width array per field (timestamps, tz offsets,
+author ids, ...), a string table for names, emails, and paths, and an
+offsets array that slices each commit's files out of the per-file columns.
+Loading maps the file and casts each column in place, so it costs the
+same no matter how long the history is.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from git_py_stats.cache import catch_up_args, get_cache_dir
+from git_py_stats.commit_db import resolve_date_bounds
+from git_py_stats.commit_stream import CommitRecord, iter_commits, tz_offset_seconds
+from git_py_stats.git_operations import resolve_commit
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.renames import FileIdentities
+
+SNAPSHOT_NAME = "history.snap"
+
+# Bump this whenever the layout changes so old snapshots get rebuilt
+SNAPSHOT_VERSION = 3
+
+_MAGIC = b"GPYSNAP\0"
+_HEADER_LENGTH = struct.Struct("<I")
+
+# Column name -> array typecode. Commits are stored oldest first.
+_COLUMNS = {
+    # One entry per commit
+    "author_time": "q",
+    "author_offset": "i",
+    "committer_time": "q",
+    "committer_offset": "i",
+    "author_id": "I",
+    "parent_count": "H",
+    # One entry per commit plus one, commit i owns files [offsets[i], offsets[i + 1])
+    "file_offsets": "Q",
+    # One entry per changed file
+    "path_id": "I",
+    "insertions": "I",
+    "deletions": "I",
+    # One entry per commit plus one, commit i owns renames [offsets[i], offsets[i + 1])
+    "rename_offsets": "Q",
+    # One entry per rename, old and new path ids
+    "rename_old": "I",
+    "rename_new": "I",
+    # One entry per author, pointing into the string table
+    "author_name": "I",
+    "author_email": "I",
+}
+
+_EPOCH = date(1970, 1, 1)
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class Snapshot:
+    """
+    Commit history loaded from a snapshot file.
+
+    columns maps each column name to a sequence of ints. When loaded from
+    disk these are memoryviews onto the mapped file, so call close() once
+    done with them. The string table is only decoded when first needed.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, Any],
+        strings_blob: Union[bytes, memoryview],
+        tip: str,
+        ref: str,
+        mapping: Optional[mmap.mmap] = None,
+    ) -> None:
+        self.columns = columns
+        self.tip = tip
+        self.ref = ref
+        self._strings_blob = strings_blob
+        self._strings: Optional[List[str]] = None
+        self._mapping = mapping
+
+    def __len__(self) -> int:
+        return len(self.columns["author_time"])
+
+    @property
+    def strings(self) -> List[str]:
+        """
+        The decoded string table.
+        """
+        if self._strings is None:
+            # Every string is NUL terminated, so drop what follows the last one
+            blob = bytes(self._strings_blob).decode("utf-8", "surrogateescape")
+            self._strings = blob.split("\0")[:-1]
+        return self._strings
+
+    def author_name(self, author_id: int) -> str:
+        return self.strings[self.columns["author_name"][author_id]]
+
+    def author_email(self, author_id: int) -> str:
+        return self.strings[self.columns["author_email"][author_id]]
+
+    def close(self) -> None:
+        """
+        Releases the mapped file.
+        """
+        if self._mapping is None:
+            return
+        for view in self.columns.values():
+            view.release()
+        self._strings_blob.release()
+        self._mapping.close()
+        self._mapping = None
+
+
+def load_snapshot(path: str) -> Optional[Snapshot]:
+    """
+    Maps a snapshot file into memory.
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        Optional[Snapshot]: The snapshot, or None if it is missing, from an
+                            older version, or written on another platform.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if mapping[: len(_MAGIC)] != _MAGIC:
+            raise ValueError("not a snapshot")
+        start = len(_MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack_from(mapping, len(_MAGIC))
+        header = json.loads(mapping[start : start + header_length])
+        if header["version"] != SNAPSHOT_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError("incompatible snapshot")
+    except (ValueError, KeyError, struct.error):
+        mapping.close()
+        return None
+
+    view = memoryview(mapping)
+    columns = {
+        name: view[offset : offset + length].cast(typecode)
+        for name, (typecode, offset, length) in header["columns"].items()
+    }
+    offset, length = header["strings"]
+    strings_blob = view[offset : offset + length]
+    view.release()
+    return Snapshot(columns, strings_blob, header["tip"], header["ref"], mapping)
+
+
+def write_snapshot(
+    path: str, columns: Dict[str, array], strings: List[str], tip: str, ref: str
+) -> None:
+    """
+    Writes columns and the string table to a snapshot file. The file is
+    written next to 'path' first and then moved over it, so readers never
+    see a half written snapshot.
+
+    Args:
+        path (str): The snapshot file.
+        columns (Dict[str, array]): Column arrays keyed by name.
+        strings (List[str]): The string table.
+        tip (str): Commit hash the snapshot was built up to.
+        ref (str): Branch or revision the snapshot follows.
+
+    Returns:
+        None
+    """
+    strings_blob = "".join(f"{value}\0" for value in strings).encode("utf-8", "surrogateescape")
+    blobs: List[bytes] = [columns[name].tobytes() for name in _COLUMNS]
+
+    # Offsets depend on the header length, which depends on the offsets, so
+    # reserve enough room for the largest offsets up front
+    header: Dict[str, Any] = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "tip": tip,
+        "ref": ref,
+        "columns": {name: [typecode, 0, 0] for name, typecode in _COLUMNS.items()},
+        "strings": [0, 0],
+    }
+    header_space = len(json.dumps(header)) + 32 * (len(_COLUMNS) + 1)
+    offset = _align(len(_MAGIC) + _HEADER_LENGTH.size + header_space)
+    for name, blob in zip(_COLUMNS, blobs):
+        header["columns"][name][1:] = [offset, len(blob)]
+        offset = _align(offset + len(blob))
+    header["strings"] = [offset, len(strings_blob)]
+    header_bytes = json.dumps(header).encode().ljust(header_space)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs + [strings_blob]:
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def _align(offset: int) -> int:
+    """
+    Rounds an offset up to the next multiple of 8 so every column is aligned.
+    """
+    return (offset + 7) & ~7
+
+
+def sync_snapshot(config: Dict[str, Union[str, int]], ref: str = "HEAD") -> Optional[Snapshot]:
+    """
+    Brings the snapshot in the cache dir up to date with 'ref' and loads it.
+    Only commits added since the last sync are read from git. If the stored
+    tip is no longer part of the history (e.g. after a rebase) the snapshot
+    is built again from scratch.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        ref (str): The branch or revision to snapshot.
+
+    Returns:
+        Optional[Snapshot]: The loaded snapshot, or None on failure.
+    """
+    cache_dir = get_cache_dir(config)
+    tip = resolve_commit(ref)
+    if not cache_dir or not tip:
+        return None
+
+    path = os.path.join(cache_dir, SNAPSHOT_NAME)
+    snapshot = load_snapshot(path)
+    old_tip, old_ref = (snapshot.tip, snapshot.ref) if snapshot is not None else (None, None)
+    extra_args = catch_up_args(old_tip, old_ref, tip, ref)
+    if extra_args is None:
+        return snapshot
+
+    columns = {name: array(typecode) for name, typecode in _COLUMNS.items()}
+    strings: List[str] = []
+    if snapshot is not None:
+        if extra_args:
+            # Copy the old columns out of the mapping so new commits can go on the end
+            for name, column in columns.items():
+                column.frombytes(snapshot.columns[name].cast("B"))
+            strings = list(snapshot.strings)
+        snapshot.close()
+    extra_args.insert(0, "--reverse")
+
+    # Store everything on the branch; filters are applied when counting
+    commits = iter_commits({"merges": ""}, tip, numstat=True, extra_args=extra_args)
+    _append_commits(columns, strings, commits)
+    try:
+        write_snapshot(path, columns, strings, tip, ref)
+    except OSError as e:
+        print(f"Failed to write {path}: {e}")
+        return None
+    return load_snapshot(path)
+
+
+def _append_commits(
+    columns: Dict[str, array], strings: List[str], commits: Iterator[CommitRecord]
+) -> None:
+    """
+    Appends commits (oldest first) to the columns, interning names, emails,
+    and paths into the string table.
+    """
+    string_ids = {value: index for index, value in enumerate(strings)}
+
+    def intern(value: str) -> int:
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value)
+        return string_id
+
+    author_ids = {
+        (name_id, email_id): index
+        for index, (name_id, email_id) in enumerate(
+            zip(columns["author_name"], columns["author_email"])
+        )
+    }
+    if not columns["file_offsets"]:
+        columns["file_offsets"].append(0)
+        columns["rename_offsets"].append(0)
+
+    for commit in commits:
+        identity = (intern(commit.author), intern(commit.email))
+        author_id = author_ids.get(identity)
+        if author_id is None:
+            author_id = author_ids[identity] = len(author_ids)
+            columns["author_name"].append(identity[0])
+            columns["author_email"].append(identity[1])
+
+        columns["author_time"].append(commit.timestamp)
+        columns["author_offset"].append(tz_offset_seconds(commit.tz))
+        columns["committer_time"].append(commit.committer_timestamp)
+        columns["committer_offset"].append(tz_offset_seconds(commit.committer_tz))
+        columns["author_id"].append(author_id)
+        columns["parent_count"].append(min(len(commit.parents), 0xFFFF))
+        for insertions, deletions, path in commit.files:
+            columns["path_id"].append(intern(path))
+            columns["insertions"].append(insertions)
+            columns["deletions"].append(deletions)
+        columns["file_offsets"].append(len(columns["path_id"]))
+        for old, new in commit.renames:
+            columns["rename_old"].append(intern(old))
+            columns["rename_new"].append(intern(new))
+        columns["rename_offsets"].append(len(columns["rename_old"]))
+
+
+def _matching_authors(snapshot: Snapshot, author: str) -> Set[int]:
+    """
+    Returns the ids of authors whose 'name <email>' contains 'author', which
+    is how git's --author matches a pattern without regex characters.
+    """
+    return {
+        author_id
+        for author_id in range(len(snapshot.columns["author_name"]))
+        if author in f"{snapshot.author_name(author_id)} <{snapshot.author_email(author_id)}>"
+    }
+
+
+def select_commits(
+    snapshot: Snapshot,
+    config: Dict[str, Union[str, int]],
+    author: Optional[str] = None,
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> Sequence[int]:
+    """
+    Returns the indexes of the commits that pass the configured merge and
+    date filters, plus an optional author.
+
+    Args:
+        snapshot (Snapshot): A loaded snapshot.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        author (Optional[str]): Only keep commits whose 'name <email>' contains this text.
+        bounds (Optional[Tuple]): Since and until timestamps to use instead of
+                                  the configured window.
+
+    Returns:
+        Sequence[int]: Commit indexes, oldest first.
+    """
+    merges = config.get("merges", "--no-merges")
+    since_ts, until_ts = bounds if bounds is not None else resolve_date_bounds(config)
+    authors = _matching_authors(snapshot, author) if author else None
+
+    # One cheap pass per active filter beats testing every filter per commit
+    columns = snapshot.columns
+    selected: Sequence[int] = range(len(snapshot))
+    if merges in ("--no-merges", "--merges"):
+        parent_count = columns["parent_count"].tolist()
+        if merges == "--no-merges":
+            selected = [i for i in selected if parent_count[i] <= 1]
+        else:
+            selected = [i for i in selected if parent_count[i] > 1]
+    if since_ts is not None or until_ts is not None:
+        committer_time = columns["committer_time"].tolist()
+        low = since_ts if since_ts is not None else -sys.maxsize
+        high = until_ts if until_ts is not None else sys.maxsize
+        selected = [i for i in selected if low <= committer_time[i] <= high]
+    if authors is not None:
+        author_id = columns["author_id"].tolist()
+        selected = [i for i in selected if author_id[i] in authors]
+    return selected
+
+
+def _format_tz(offset: int) -> str:
+    """
+    Turns seconds east of UTC back into git's +HHMM form.
+    """
+    sign = "-" if offset < 0 else "+"
+    minutes = abs(offset) // 60
+    return f"{sign}{minutes // 60:02d}{minutes % 60:02d}"
+
+
+def count_commits(
+    snapshot: Snapshot,
+    config: Dict[str, Union[str, int]],
+    group: str,
+    author: Optional[str] = None,
+    bounds: Optional[Tuple[Optional[int], Optional[int]]] = None,
+) -> Counter:
+    """
+    Counts commits grouped by author, date, year, month, weekday, hour,
+    timezone, or calendar cell. Keys match what the equivalent git log
+    format prints (e.g. 'Mon', 'Jan', '09', '+0100'), author keys are
+    (name, email) tuples, and calendar keys are (ISO weekday, month) tuples.
+
+    Args:
+        snapshot (Snapshot): A loaded snapshot.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        group (str): One of the supported groupings.
+        author (Optional[str]): Only count commits whose 'name <email>' contains this text.
+        bounds (Optional[Tuple]): Since and until timestamps to use instead of
+                                  the configured window.
+
+    Returns:
+        Counter: Commit counts per group value.
+    """
+    selected = select_commits(snapshot, config, author, bounds)
+    columns = snapshot.columns
+    counts: Counter = Counter()
+
+    if group == "author":
+        author_id = columns["author_id"]
+        for key, count in Counter(author_id[i] for i in selected).items():
+            counts[(snapshot.author_name(key), snapshot.author_email(key))] += count
+        return counts
+    if group == "timezone":
+        offset = columns["author_offset"]
+        for key, count in Counter(offset[i] for i in selected).items():
+            counts[_format_tz(key)] += count
+        return counts
+
+    # Dates in reports are either the author's or committer's local time,
+    # mirroring the format git is asked for
+    prefix = "author" if group in ("date", "calendar") else "committer"
+    times, offsets = columns[f"{prefix}_time"], columns[f"{prefix}_offset"]
+    if group == "hour":
+        for key, count in Counter(
+            (times[i] + offsets[i]) % 86400 // 3600 for i in selected
+        ).items():
+            counts[f"{key:02d}"] += count
+        return counts
+
+    # Count by day first since there are far fewer days than commits
+    for day, count in Counter((times[i] + offsets[i]) // 86400 for i in selected).items():
+        local_date = _EPOCH + timedelta(days=day)
+        if group == "date":
+            counts[local_date.isoformat()] += count
+        elif group == "year":
+            counts[str(local_date.year)] += count
+        elif group == "month":
+            counts[_MONTHS[local_date.month - 1]] += count
+        elif group == "weekday":
+            counts[_WEEKDAYS[local_date.weekday()]] += count
+        elif group == "calendar":
+            counts[(local_date.isoweekday(), local_date.month)] += count
+    return counts
+
+
+def author_stats(
+    snapshot: Snapshot, config: Dict[str, Union[str, int]], resolver: IdentityResolver
+) -> Tuple[Dict[str, Dict[str, Any]], int, int, int, int]:
+    """
+    Aggregates the per-author contribution stats shown by detailed_git_stats.
+    Authors are merged by the identity resolver like the git log based
+    version, and unless rename tracking is off, files renamed within the
+    selected commits count once.
+
+    Args:
+        snapshot (Snapshot): A loaded snapshot.
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        resolver (IdentityResolver): Tells which stored authors are the same person.
+
+    Returns:
+        Tuple: Stats keyed by author display name, then total insertions,
+               deletions, distinct files changed, and commits.
+    """
+    columns = snapshot.columns
+    # Plain lists index much faster than memoryviews in the loop below
+    author_ids, author_times = columns["author_id"].tolist(), columns["author_time"].tolist()
+    file_offsets, path_ids = columns["file_offsets"].tolist(), columns["path_id"].tolist()
+    insertions, deletions = columns["insertions"].tolist(), columns["deletions"].tolist()
+    rename_offsets = columns["rename_offsets"]
+    identities = FileIdentities()
+    track_renames = config.get("renames", True)
+
+    # Aggregate per stored author first, then merge the ones that are one person
+    author_count = len(columns["author_name"])
+    commits = [0] * author_count
+    added = [0] * author_count
+    removed = [0] * author_count
+    first = [sys.maxsize] * author_count
+    last = [-sys.maxsize] * author_count
+    files: List[Set[int]] = [set() for _ in range(author_count)]
+    for index in select_commits(snapshot, config):
+        author_id, author_time = author_ids[index], author_times[index]
+        commits[author_id] += 1
+        if author_time < first[author_id]:
+            first[author_id] = author_time
+        if author_time > last[author_id]:
+            last[author_id] = author_time
+        start, end = file_offsets[index], file_offsets[index + 1]
+        if start != end:
+            added[author_id] += sum(insertions[start:end])
+            removed[author_id] += sum(deletions[start:end])
+            files[author_id].update(path_ids[start:end])
+        if track_renames:
+            start, end = rename_offsets[index], rename_offsets[index + 1]
+            if start != end:
+                identities.add_renames(
+                    zip(columns["rename_old"][start:end], columns["rename_new"][start:end])
+                )
+
+    stats: Dict[int, Dict[str, Any]] = {}
+    person_files: Dict[int, Set[int]] = defaultdict(set)
+    # Newest first, the order git log shows them to the resolver in, so the
+    # most recent email wins like in the git log based version
+    active = [author_id for author_id in range(author_count) if commits[author_id]]
+    for author_id in sorted(active, key=lambda author_id: -last[author_id]):
+        email = snapshot.author_email(author_id)
+        person = resolver.resolve(snapshot.author_name(author_id), email)
+        entry = stats.get(person)
+        if entry is None:
+            entry = stats[person] = {
+                "email": email,
+                "insertions": 0,
+                "deletions": 0,
+                "files": 0,
+                "commits": 0,
+                "lines_changed": 0,
+                "first_commit": first[author_id],
+                "last_commit": last[author_id],
+            }
+        entry["first_commit"] = min(entry["first_commit"], first[author_id])
+        entry["commits"] += commits[author_id]
+        entry["insertions"] += added[author_id]
+        entry["deletions"] += removed[author_id]
+        entry["lines_changed"] += added[author_id] + removed[author_id]
+        person_files[person] |= files[author_id]
+
+    for person, paths in person_files.items():
+        stats[person]["files"] = identities.count(paths)
+    total_files = identities.count(set().union(*person_files.values())) if person_files else 0
+
+    names = resolver.display_names(stats)
+    return (
+        {names[person]: entry for person, entry in stats.items()},
+        sum(added),
+        sum(removed),
+        total_files,
+        sum(commits),
+    )
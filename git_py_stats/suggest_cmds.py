@@ -2,10 +2,17 @@
 Performs all commands in the Suggest section of the program.
 """
 
+import itertools
+import os
+import posixpath
 import subprocess
-from typing import Dict, Union
+from datetime import datetime
+from typing import Dict, List, Optional, Union
 
-from git_py_stats.git_operations import run_git_command
+from git_py_stats import ownership
+from git_py_stats.config import is_author_ignored
+from git_py_stats.git_operations import run_git_command, stream_git_command
+from git_py_stats.identity import get_resolver
 
 
 def suggest_reviewers(config: Dict[str, Union[str, int]]) -> None:
@@ -33,7 +40,7 @@ def suggest_reviewers(config: Dict[str, Union[str, int]]) -> None:
     since = config.get("since", "")
     until = config.get("until", "")
     log_options = config.get("log_options", "")
-    pathspec = config.get("pathspec", "")
+    pathspec = config.get("pathspec", [])
     ignore_authors = config.get("ignore_authors", lambda _s: False)
 
     cmd = [
@@ -45,37 +52,50 @@ def suggest_reviewers(config: Dict[str, Union[str, int]]) -> None:
         merges,
         since,
         until,
-        "--pretty=%aN",
+        "--pretty=%aN|%aE",
         log_options,
-        pathspec,
+        *pathspec,
     ]
 
     # Remove any empty space from the cmd
     cmd = [arg for arg in cmd if arg]
 
-    try:
-        # Execute the git command and get the output
-        output = run_git_command(cmd)
-        if not output:
-            print("No data available.")
-            return
-
-        # Split the output into lines (each line is a commit author)
-        # and sanitize the string
-        lines = [line.strip() for line in output.splitlines()]
-        lines = [line for line in lines if line]
+    # The email comes along so the identity resolver can tell who is who
+    resolver = get_resolver(config)
 
-        # Drop ignored authors (name-or-email patterns both supported)
-        lines = [a for a in lines if not ignore_authors(a)]
+    try:
+        # Execute the git command and read it one author at a time
+        output = stream_git_command(cmd)
+        try:
+            first_line = next(output, None)
+            if first_line is None:
+                print("No data available.")
+                return
+
+            # Sanitize the string and drop ignored authors
+            # (name-or-email patterns both supported). Names may contain
+            # '|', emails can't.
+            lines = (line.strip() for line in itertools.chain([first_line], output))
+            identities = (line.rpartition("|")[::2] for line in lines if line)
+            author_ids = (
+                resolver.resolve(name, email)
+                for name, email in identities
+                if not is_author_ignored(ignore_authors, name, email)
+            )
+
+            # Mimic "head -n 100". Closing the stream once we have those
+            # stops git from walking the rest of the history.
+            head_ids = list(itertools.islice(author_ids, 100))
+        finally:
+            output.close()
+        names = resolver.display_names(set(head_ids))
+        head_lines = [names[author_id] for author_id in head_ids]
 
         # Return early if nothing found
-        if not lines:
+        if not head_lines:
             print("No potential reviewers found.")
             return
 
-        # Mimic "head -n 100"
-        head_lines = lines[:100]
-
         # Mimic "sort"
         sorted_lines = sorted(head_lines)
 
@@ -113,3 +133,76 @@ def suggest_reviewers(config: Dict[str, Union[str, int]]) -> None:
 
     except subprocess.CalledProcessError as e:
         print(f"Error executing git command: {e}")
+
+
+def suggest_reviewers_for_changes(
+    config: Dict[str, Union[str, int]],
+    paths: Optional[List[str]] = None,
+    diff: Optional[str] = None,
+) -> None:
+    """
+    Suggests reviewers for a change from who has owned the touched files,
+    favoring recent work. Reads from the ownership index in the cache dir,
+    which only has to catch up with new commits, so this stays quick
+    enough to run from a pre-push hook.
+
+    Args:
+        config: Dict[str, Union[str, int]]: Config dictionary holding env vars.
+        paths (Optional[List[str]]): Changed paths, relative to the current directory.
+        diff (Optional[str]): A revision to compare HEAD against (the changes
+                              since the merge base), or a 'A..B' range.
+
+    Returns:
+        None
+    """
+
+    # Grab the config options from our config.py.
+    # config.py should give fallbacks for these, but for sanity, lets
+    # also provide some defaults just in case.
+    branch = config.get("branch", "")
+    limit = int(config.get("limit", 10))
+    ignore_authors = config.get("ignore_authors", lambda _s: False)
+
+    if diff:
+        # Original command:
+        # git diff --name-only $diff...HEAD
+        revisions = diff if ".." in diff else f"{diff}...HEAD"
+        output = run_git_command(["git", "diff", "--name-only", revisions, "--"])
+        if output is None:
+            print(f"Could not diff against '{diff}'.")
+            return
+        changed = [line for line in output.splitlines() if line]
+    else:
+        # Paths come in relative to where we are; the index is keyed from the top
+        prefix = run_git_command(["git", "rev-parse", "--show-prefix"]) or ""
+        changed = [
+            posixpath.normpath(posixpath.join(prefix, path.replace(os.sep, "/")))
+            for path in paths or []
+        ]
+        changed = [path for path in changed if path != "."]
+
+    if not changed:
+        print("No changed paths found.")
+        return
+
+    conn = ownership.open_index(config)
+    if conn is None:
+        return
+    try:
+        if ownership.sync_index(conn, str(branch or "HEAD")) is None:
+            print("No data available.")
+            return
+        reviewers = ownership.rank_reviewers(conn, changed, ignore_authors, get_resolver(config))
+    finally:
+        conn.close()
+
+    if not reviewers:
+        print("No potential reviewers found.")
+        return
+
+    print(f"Suggested code reviewers for {len(changed)} changed path(s):")
+    for reviewer in reviewers[:limit]:
+        print(
+            f"{reviewer.share:7.1%} {reviewer.paths:>5}/{len(changed)} paths  "
+            f"{reviewer.name} (last commit {datetime.fromtimestamp(reviewer.last_time):%Y-%m-%d})"
+        )
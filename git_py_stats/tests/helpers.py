@@ -0,0 +1,110 @@
+"""
+Builders and fakes shared by the test modules.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from git_py_stats.commit_stream import CommitRecord
+
+
+def record(
+    commit_hash,
+    name="Alice",
+    timestamp=1700000000,
+    files=(),
+    *,
+    parents=(),
+    email=None,
+    tz="+0000",
+    committed=None,
+    co_authors=(),
+    renames=(),
+):
+    """
+    Build a CommitRecord by 'name' touching (insertions, deletions, path)
+    files, committed at 'committed' (timestamp, tz) if given, otherwise when
+    it was authored. The email defaults to one made up from the name.
+    """
+    committer_timestamp, committer_tz = committed or (timestamp, tz)
+    if email is None:
+        email = f"{name.lower()}@example.com"
+    return CommitRecord(
+        commit_hash,
+        tuple(parents),
+        name,
+        email,
+        timestamp,
+        tz,
+        committer_timestamp,
+        committer_tz,
+        f"Commit {commit_hash}",
+        list(files),
+        tuple(co_authors),
+        tuple(renames),
+    )
+
+
+@contextmanager
+def mocked_history(module, history, tip, ancestor=True):
+    """
+    Make a cache 'module' see 'history' (newest first) ending at 'tip' when
+    it syncs. 'ancestor' is whether the stored tip is still part of it.
+
+    Yields:
+        MagicMock: The patched iter_commits, to check what was asked for.
+    """
+    with patch.object(module, "resolve_commit", return_value=tip or None), patch(
+        "git_py_stats.cache.is_ancestor", return_value=ancestor
+    ), patch.object(module, "iter_commits", return_value=iter(history)) as mock_iter:
+        yield mock_iter
+
+
+def header(commit_hash, parents, name, email, date, subject="Msg"):
+    """
+    Build a commit header line in the commit_stream log format.
+    """
+    return f"\x1e{commit_hash}\x1f{parents}\x1f{name}\x1f{email}\x1f{date}\x1f{date}\x1f{subject}"
+
+
+def log_records(lines):
+    """
+    Encode log lines the way git log -z writes them and split them into records.
+    """
+    blob = b"".join(line.encode() + (b"\n" if line.startswith("\x1e") else b"\0") for line in lines)
+    return iter(blob.split(b"\x1e"))
+
+
+def git(cwd, *args, env=None):
+    """
+    Run a git command in 'cwd' and return its output.
+    """
+    return subprocess.run(
+        ["git", *args], cwd=cwd, env=env, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+
+
+def non_utf8_repo(test):
+    """
+    Create a repository whose only commit adds a file named b'caf\\xe9.txt',
+    which isn't valid UTF-8, and run the rest of 'test' inside it.
+
+    Returns:
+        str: The file's path the way git reports decode it.
+    """
+    repo = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, repo)
+    git(repo, "init", "-q")
+    with open(os.path.join(repo.encode(), b"caf\xe9.txt"), "w") as f:
+        f.write("one\ntwo\n")
+    git(repo, "add", ".")
+    git(repo, "-c", "user.name=Ann", "-c", "user.email=ann@example.com", "commit", "-qm", "Add")
+
+    cwd = os.getcwd()
+    os.chdir(repo)
+    test.addCleanup(os.chdir, cwd)
+    return b"caf\xe9.txt".decode("utf-8", "surrogateescape")
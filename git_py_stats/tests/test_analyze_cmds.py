@@ -0,0 +1,549 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import analyze_cmds
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.tests.helpers import record
+
+
+class TestAnalyzeCmds(unittest.TestCase):
+    """
+    Unit test class for testing analyze_cmds.
+    """
+
+    def setUp(self):
+        # Mock configuration for testing
+        self.mock_config = {
+            "since": "",
+            "until": "",
+            "merges": "--no-merges",
+            "log_options": "",
+            "pathspec": ["--"],
+            "limit": 10,
+            "dir_depth": 2,
+            "report_format": "text",
+        }
+        self.history = [
+            record("c3", "Alice", files=[(5, 1, "src/app/main.py"), (2, 0, "src/app/util.py")]),
+            record("c2", "Bob", files=[(10, 4, "src/core/io.py"), (1, 1, "README")]),
+            record("c1", "Alice", files=[(3, 0, "docs/guide/intro/start.md")]),
+        ]
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        # A fresh resolver per test, without the mailmap of the repo running the tests
+        resolver_patch = patch(
+            "git_py_stats.analyze_cmds.get_resolver", side_effect=lambda _c: IdentityResolver()
+        )
+        resolver_patch.start()
+        self.addCleanup(resolver_patch.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_build_churn_trie(self):
+        """
+        Test commits roll up into each directory once, down to the depth.
+        """
+        root = analyze_cmds._build_churn_trie(iter(self.history), 2, lambda _s: False)
+
+        self.assertEqual((root.commits, root.insertions, root.deletions), (3, 21, 6))
+        src = root.children["src"]
+        self.assertEqual((src.commits, src.insertions, src.deletions), (2, 17, 5))
+        self.assertEqual(sorted(src.children), ["app", "core"])
+        self.assertEqual(src.children["app"].commits, 1)
+        # Cut off at two levels
+        self.assertEqual(root.children["docs"].children["guide"].children, {})
+
+    def test_build_churn_trie_ignore_authors(self):
+        """
+        Test ignored authors don't count, and nothing left means no trie.
+        """
+        root = analyze_cmds._build_churn_trie(iter(self.history), 1, lambda s: s == "Bob")
+        self.assertEqual(sorted(root.children), ["docs", "src"])
+        self.assertEqual(root.commits, 2)
+
+        self.assertIsNone(analyze_cmds._build_churn_trie(iter(self.history), 1, lambda _s: True))
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_churn_by_directory(self, mock_iter_commits, mock_print):
+        """
+        Test the table lists directories under their parents by churn.
+        """
+        mock_iter_commits.return_value = iter(self.history)
+        self.mock_config["limit"] = 1
+
+        analyze_cmds.churn_by_directory(self.mock_config)
+
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        names = [line.split()[-1] for line in printed[2:]]
+        self.assertEqual(names, [".", "src/", "src/core/", "more", "more"])
+        mock_iter_commits.assert_called_once_with(
+            self.mock_config, "", numstat=True, skip_ignored=True
+        )
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_churn_by_directory_export(self, mock_iter_commits, mock_print):
+        """
+        Test every directory is saved as JSON or CSV.
+        """
+        mock_iter_commits.return_value = iter(self.history)
+        self.mock_config["report_format"] = "json"
+        analyze_cmds.churn_by_directory(self.mock_config)
+
+        with open("git_churn_by_directory.json") as f:
+            rows = json.load(f)
+        self.assertEqual(
+            rows[0], {"directory": ".", "commits": 3, "insertions": 21, "deletions": 6}
+        )
+        self.assertEqual(
+            [row["directory"] for row in rows],
+            [".", "src/", "src/core/", "src/app/", "docs/", "docs/guide/"],
+        )
+
+        mock_iter_commits.return_value = iter(self.history)
+        self.mock_config["report_format"] = "csv"
+        analyze_cmds.churn_by_directory(self.mock_config)
+
+        with open("git_churn_by_directory.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["Directory", "Commits", "Insertions", "Deletions"])
+        self.assertEqual(len(rows), 7)
+        mock_print.assert_called_with("Report saved to git_churn_by_directory.csv")
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_churn_by_directory_no_data(self, mock_iter_commits, mock_print):
+        """
+        Test an empty history prints a message.
+        """
+        mock_iter_commits.return_value = iter([])
+        analyze_cmds.churn_by_directory(self.mock_config)
+        mock_print.assert_called_once_with("No data available.")
+
+    def test_count_file_changes(self):
+        """
+        Test files get one id each and counts land on the new path after renames.
+        """
+        paths, commits, churn = analyze_cmds._count_file_changes(
+            iter(self.history + [record("c0", "Bob", files=[(7, 0, "src/core/io.py")])]),
+            lambda _s: False,
+        )
+
+        counts = {path: (commits[i], churn[i]) for i, path in enumerate(paths)}
+        self.assertEqual(len(paths), 5)
+        self.assertEqual(counts["src/core/io.py"], (2, 21))
+        self.assertEqual(counts["README"], (1, 2))
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_hotspots(self, mock_iter_commits, mock_print):
+        """
+        Test the top files are ranked by commits and by churn.
+        """
+        mock_iter_commits.return_value = iter(
+            self.history + [record("c0", "Bob", files=[(1, 0, "src/app/util.py")])]
+        )
+        self.mock_config["limit"] = 2
+
+        analyze_cmds.hotspots(self.mock_config)
+
+        printed = [call.args[0] if call.args else "" for call in mock_print.call_args_list]
+        self.assertEqual(printed[0], "Most frequently changed files:\n")
+        self.assertEqual(printed[2].split(), ["2", "3", "src/app/util.py"])
+        self.assertEqual(printed[5], "Most churned files:\n")
+        self.assertEqual(printed[7].split(), ["1", "14", "src/core/io.py"])
+        self.assertEqual(len(printed), 10)
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_hotspots_export(self, mock_iter_commits, mock_print):
+        """
+        Test both rankings are saved to one file.
+        """
+        mock_iter_commits.return_value = iter(self.history)
+        self.mock_config["report_format"] = "json"
+        self.mock_config["limit"] = 1
+
+        analyze_cmds.hotspots(self.mock_config)
+
+        with open("git_hotspots.json") as f:
+            rows = json.load(f)
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "ranking": "commits",
+                    "rank": 1,
+                    "path": "src/app/main.py",
+                    "commits": 1,
+                    "churn": 6,
+                },
+                {
+                    "ranking": "churn",
+                    "rank": 1,
+                    "path": "src/core/io.py",
+                    "commits": 1,
+                    "churn": 14,
+                },
+            ],
+        )
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_hotspots_no_data(self, mock_iter_commits, mock_print):
+        """
+        Test an empty history prints a message.
+        """
+        mock_iter_commits.return_value = iter([])
+        analyze_cmds.hotspots(self.mock_config)
+        mock_print.assert_called_once_with("No data available.")
+
+    def _cochange_history(self):
+        """
+        a.py and b.py always change together, c.py joins them once, and a
+        bulk commit touches everything.
+        """
+        history = [
+            record(f"p{i}", "Alice", files=[(1, 0, "src/a.py"), (1, 0, "src/b.py")])
+            for i in range(4)
+        ]
+        history.append(
+            record("p4", "Bob", files=[(1, 0, "src/a.py"), (1, 0, "src/b.py"), (1, 0, "src/c.py")])
+        )
+        history.append(record("p5", "Bob", files=[(1, 0, "src/c.py")]))
+        history.append(record("bulk", "Bot", files=[(1, 0, f"gen/{i}.py") for i in range(40)]))
+        return history
+
+    def test_count_cochanges(self):
+        """
+        Test pairs are counted per commit, skipping bulk commits and rare pairs.
+        """
+        paths, commits, pairs = analyze_cmds._count_cochanges(
+            iter(self._cochange_history()), lambda _s: False, 30, 1
+        )
+
+        named = {(paths[key >> 32], paths[key & 0xFFFFFFFF]): n for key, n in pairs.items()}
+        self.assertEqual(
+            named,
+            {("src/a.py", "src/b.py"): 5, ("src/a.py", "src/c.py"): 1, ("src/b.py", "src/c.py"): 1},
+        )
+        self.assertEqual(list(commits), [5, 5, 2])
+
+        _, _, pairs = analyze_cmds._count_cochanges(
+            iter(self._cochange_history()), lambda _s: False, 30, 2
+        )
+        self.assertEqual(list(pairs.values()), [5])
+
+    def test_count_cochanges_prunes(self):
+        """
+        Test rare pairs are dropped once too many are tracked.
+        """
+        history = [
+            record(f"r{i}", "Alice", files=[(1, 0, f"x{i}"), (1, 0, f"y{i}")]) for i in range(10)
+        ]
+        history += self._cochange_history()
+
+        _, _, pairs = analyze_cmds._count_cochanges(iter(history), lambda _s: False, 30, 2, 8)
+
+        self.assertEqual(list(pairs.values()), [5])
+
+    def test_cochanges_renames(self):
+        """
+        Test pairs from before a rename land on the file's newest name.
+        """
+        history = self._cochange_history()
+        history[2] = history[2]._replace(
+            files=[(1, 0, "src/a.py"), (1, 0, "src/b.py")], renames=(("src/old_b.py", "src/b.py"),)
+        )
+        for i in (3, 4):
+            history[i] = history[i]._replace(
+                files=[
+                    (1, 0, "src/old_b.py") if f[2] == "src/b.py" else f for f in history[i].files
+                ]
+            )
+
+        counted = analyze_cmds._count_cochanges(iter(history), lambda _s: False, 30, 3)
+        estimated = analyze_cmds._minhash_cochanges(iter(history), lambda _s: False, 30, 3, 64)
+        for paths, _, pairs in (counted, estimated):
+
+            named = {(paths[key >> 32], paths[key & 0xFFFFFFFF]): n for key, n in pairs.items()}
+            self.assertEqual(named, {("src/a.py", "src/b.py"): 5})
+            self.assertNotIn("src/old_b.py", paths)
+
+    def test_minhash_cochanges(self):
+        """
+        Test min-hash estimates find the pair that always changes together.
+        """
+        paths, commits, pairs = analyze_cmds._minhash_cochanges(
+            iter(self._cochange_history()), lambda _s: False, 30, 3, 64
+        )
+
+        named = {(paths[key >> 32], paths[key & 0xFFFFFFFF]): n for key, n in pairs.items()}
+        self.assertEqual(named, {("src/a.py", "src/b.py"): 5})
+        self.assertEqual(list(commits), [5, 5, 2])
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_cochanges(self, mock_iter_commits, mock_print):
+        """
+        Test pairs are listed by coupling.
+        """
+        mock_iter_commits.return_value = iter(self._cochange_history())
+        self.mock_config["cochange_min_support"] = 1
+
+        analyze_cmds.cochanges(self.mock_config)
+
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(printed[2].split(), ["5", "100.0%", "src/a.py"])
+        self.assertEqual(printed[3].strip(), "src/b.py")
+        self.assertEqual(printed[4].split(), ["1", "16.7%", "src/a.py"])
+        self.assertEqual(len(printed), 8)
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_cochanges_export(self, mock_iter_commits, mock_print):
+        """
+        Test the top pairs are saved as CSV.
+        """
+        mock_iter_commits.return_value = iter(self._cochange_history())
+        self.mock_config["report_format"] = "csv"
+
+        analyze_cmds.cochanges(self.mock_config)
+
+        with open("git_cochanges.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(
+            rows,
+            [["File A", "File B", "Together", "Coupling"], ["src/a.py", "src/b.py", "5", "1.0"]],
+        )
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_cochanges_no_pairs(self, mock_iter_commits, mock_print):
+        """
+        Test a history without frequent pairs prints a message.
+        """
+        mock_iter_commits.return_value = iter(self.history)
+        analyze_cmds.cochanges(self.mock_config)
+        mock_print.assert_called_once_with("No files changed together often enough.")
+
+    def test_bus_factor_count(self):
+        """
+        Test the fewest authors covering the threshold are counted.
+        """
+        self.assertEqual(analyze_cmds._bus_factor({"a": 60, "b": 30, "c": 10}, 50), 1)
+        self.assertEqual(analyze_cmds._bus_factor({"a": 60, "b": 30, "c": 10}, 80), 2)
+        self.assertEqual(analyze_cmds._bus_factor({"a": 60, "b": 30, "c": 10}, 100), 3)
+
+    def _bus_factor(self):
+        """
+        Run bus_factor against an ownership index synced from self.history.
+        """
+        self.mock_config["cache_dir"] = self.tmp_dir
+        with patch("git_py_stats.ownership.resolve_commit", return_value="c3"), patch(
+            "git_py_stats.ownership.iter_commits", return_value=iter(self.history)
+        ):
+            analyze_cmds.bus_factor(self.mock_config)
+
+    @patch("git_py_stats.analyze_cmds.print")
+    def test_bus_factor(self, mock_print):
+        """
+        Test directories are listed under their parents with single owners flagged.
+        """
+        self.mock_config["bus_factor_threshold"] = 60
+        self._bus_factor()
+
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        rows = [line.split() for line in printed[2:-1]]
+        self.assertEqual(
+            rows,
+            [
+                ["2", "27", "2", "59.3%", ".", "(Bob)"],
+                ["1!", "3", "1", "100.0%", "docs/", "(Alice)"],
+                ["1!", "3", "1", "100.0%", "docs/guide/", "(Alice)"],
+                ["1!", "22", "2", "63.6%", "src/", "(Bob)"],
+                ["1!", "8", "1", "100.0%", "src/app/", "(Alice)"],
+                ["1!", "14", "1", "100.0%", "src/core/", "(Bob)"],
+            ],
+        )
+        self.assertEqual(
+            printed[-1], "\n5 of 6 directories have a bus factor of 1 (marked with '!')."
+        )
+
+    @patch("git_py_stats.analyze_cmds.print")
+    def test_bus_factor_export(self, mock_print):
+        """
+        Test every directory is saved as JSON, leaving out ignored authors.
+        """
+        self.mock_config["report_format"] = "json"
+        self.mock_config["ignore_authors"] = lambda s: s == "Bob"
+        self._bus_factor()
+
+        with open("git_bus_factor.json") as f:
+            rows = json.load(f)
+        self.assertEqual(
+            rows[0],
+            {
+                "directory": ".",
+                "bus_factor": 1,
+                "lines": 11,
+                "authors": 1,
+                "top_author": "Alice",
+                "top_share": 1.0,
+            },
+        )
+        self.assertNotIn("src/core/", [row["directory"] for row in rows])
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.blame")
+    def test_blame_ownership(self, mock_blame, mock_print):
+        """
+        Test owners are listed under each directory by surviving lines.
+        """
+        mock_blame.sync_blame.return_value = ([("b1", "src/app.py")], 1)
+        mock_blame.lines_by_directory.return_value = {
+            ".": {"Alice": 30, "Bob": 10},
+            "src/": {"Alice": 30, "Bob": 10},
+        }
+        self.mock_config["limit"] = 1
+
+        analyze_cmds.blame_ownership(self.mock_config)
+
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(
+            [line.split() for line in printed[2:]],
+            [
+                ["40", "."],
+                ["30", "75.0%", "Alice"],
+                ["...", "1", "more"],
+                ["40", "src/"],
+                ["30", "75.0%", "Alice"],
+                ["...", "1", "more"],
+            ],
+        )
+        mock_blame.sync_blame.assert_called_once_with(mock_blame.open_index.return_value, "HEAD", 0)
+        mock_blame.open_index.return_value.close.assert_called_once()
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.blame")
+    def test_blame_ownership_export(self, mock_blame, mock_print):
+        """
+        Test every owner of every directory is saved as CSV.
+        """
+        mock_blame.sync_blame.return_value = ([("b1", "app.py")], 0)
+        mock_blame.lines_by_directory.return_value = {".": {"Bob": 1, "Alice": 3}}
+        self.mock_config["report_format"] = "csv"
+
+        analyze_cmds.blame_ownership(self.mock_config)
+
+        with open("git_blame_ownership.csv", newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(
+            rows,
+            [
+                ["Directory", "Author", "Lines", "Share"],
+                [".", "Alice", "3", "0.75"],
+                [".", "Bob", "1", "0.25"],
+            ],
+        )
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.blame")
+    def test_blame_ownership_no_data(self, mock_blame, mock_print):
+        """
+        Test an invalid branch prints a message.
+        """
+        mock_blame.sync_blame.return_value = None
+        analyze_cmds.blame_ownership(self.mock_config)
+        mock_print.assert_called_once_with("No data available.")
+
+    def _activity_history(self):
+        """
+        Alice commits on a Tuesday night in UTC and, for her committer, early
+        Wednesday in Tokyo; Bob commits once from New York.
+        """
+        return [
+            record("c3", "Alice"),
+            record("c2", "Alice", tz="+0900"),
+            record("c1", "Bob", tz="-0500"),
+        ]
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_activity_by_author(self, mock_iter_commits, mock_print):
+        """
+        Test every author's weekday, hour, and timezone counts come from one pass.
+        """
+        mock_iter_commits.return_value = iter(self._activity_history())
+
+        analyze_cmds.activity_by_author(self.mock_config)
+
+        mock_iter_commits.assert_called_once_with(self.mock_config, "", skip_ignored=True)
+        printed = [call.args[0] if call.args else "" for call in mock_print.call_args_list]
+        self.assertEqual(printed[0], "Commits by weekday per author:\n")
+        self.assertEqual(printed[2].split(), ["Alice", "0", "1", "1", "0", "0", "0", "0", "2"])
+        self.assertEqual(printed[3].split(), ["Bob", "0", "1", "0", "0", "0", "0", "0", "1"])
+        hours = printed[6].split()
+        self.assertEqual((hours[0], hours[1 + 7], hours[1 + 22]), ("Alice", "1", "1"))
+        self.assertEqual(printed[-2:], ["Alice   +0000 (1), +0900 (1)", "Bob     -0500 (1)"])
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_activity_by_author_export(self, mock_iter_commits, mock_print):
+        """
+        Test only non-zero cells are saved, and ignored authors are left out.
+        """
+        mock_iter_commits.return_value = iter(self._activity_history())
+        self.mock_config["report_format"] = "json"
+        self.mock_config["ignore_authors"] = lambda s: s == "Alice"
+
+        analyze_cmds.activity_by_author(self.mock_config)
+
+        with open("git_activity_by_author.json") as f:
+            rows = json.load(f)
+        self.assertEqual(
+            [(row["group"], row["value"], row["commits"]) for row in rows],
+            [("weekday", "Tue", 1), ("hour", "17", 1), ("timezone", "-0500", 1)],
+        )
+        self.assertEqual({row["author"] for row in rows}, {"Bob"})
+
+    def test_count_author_activity_co_authors(self):
+        """
+        Test co-authors are counted for a commit only when asked to.
+        """
+        history = self._activity_history()
+        history[2] = history[2]._replace(co_authors=("Alice <alice@example.com>",))
+        resolver = IdentityResolver()
+
+        activity = analyze_cmds._count_author_activity(iter(history), lambda _s: False, resolver)
+        self.assertEqual([row.commits for row in activity.values()], [2, 1])
+
+        activity = analyze_cmds._count_author_activity(
+            iter(history), lambda _s: False, resolver, co_authors=True
+        )
+        alice = activity[resolver.resolve("Alice", "alice@example.com")]
+        self.assertEqual(alice.commits, 3)
+        self.assertEqual(alice.timezones, {"+0000": 1, "+0900": 1, "-0500": 1})
+
+    @patch("git_py_stats.analyze_cmds.print")
+    @patch("git_py_stats.analyze_cmds.iter_commits")
+    def test_activity_by_author_no_data(self, mock_iter_commits, mock_print):
+        """
+        Test an empty history prints a message.
+        """
+        mock_iter_commits.return_value = iter([])
+        analyze_cmds.activity_by_author(self.mock_config)
+        mock_print.assert_called_once_with("No data available.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch
 import io
 
+from git_py_stats import __version__
 from git_py_stats.arg_parser import parse_arguments
 
 
@@ -18,6 +19,7 @@ class TestArgParser(unittest.TestCase):
         command-line arguments are provided.
         """
         args = parse_arguments([])
+        self.assertFalse(args.no_renames)
         self.assertFalse(args.detailed_git_stats)
         self.assertIsNone(args.git_stats_by_branch)
         self.assertFalse(args.changelogs)
@@ -52,6 +54,7 @@ class TestArgParser(unittest.TestCase):
         self.assertTrue(args.detailed_git_stats)
 
         args = parse_arguments([])
+        self.assertFalse(args.no_renames)
         self.assertFalse(args.detailed_git_stats)
 
     def test_git_stats_by_branch(self):
@@ -134,6 +137,26 @@ class TestArgParser(unittest.TestCase):
         args = parse_arguments([])
         self.assertFalse(args.json_output)
 
+    @patch("sys.stdout", new_callable=io.StringIO)
+    def test_version(self, mock_stdout):
+        """
+        Test the --version option prints the version and exits.
+        """
+        with self.assertRaises(SystemExit) as cm:
+            parse_arguments(["--version"])
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(mock_stdout.getvalue().strip(), f"git-py-stats {__version__}")
+
+    def test_export_sqlite(self):
+        """
+        Test the --export-sqlite option.
+        """
+        args = parse_arguments(["--export-sqlite"])
+        self.assertTrue(args.export_sqlite)
+
+        args = parse_arguments([])
+        self.assertFalse(args.export_sqlite)
+
     def test_branch_tree(self):
         """
         Test the --branch-tree and -b options.
@@ -330,6 +353,77 @@ class TestArgParser(unittest.TestCase):
         args = parse_arguments(["-r"])
         self.assertTrue(args.suggest_reviewers)
 
+    def test_churn_by_directory(self):
+        """
+        Test the --churn-by-directory option.
+        """
+        args = parse_arguments(["--churn-by-directory"])
+        self.assertTrue(args.churn_by_directory)
+
+    def test_hotspots(self):
+        """
+        Test the --hotspots option.
+        """
+        args = parse_arguments(["--hotspots"])
+        self.assertTrue(args.hotspots)
+
+    def test_cochanges(self):
+        """
+        Test the --cochanges option.
+        """
+        args = parse_arguments(["--cochanges"])
+        self.assertTrue(args.cochanges)
+
+    def test_bus_factor(self):
+        """
+        Test the --bus-factor option.
+        """
+        args = parse_arguments(["--bus-factor"])
+        self.assertTrue(args.bus_factor)
+
+    def test_blame_ownership(self):
+        """
+        Test the --blame-ownership option.
+        """
+        args = parse_arguments(["--blame-ownership"])
+        self.assertTrue(args.blame_ownership)
+
+    def test_activity_by_author(self):
+        """
+        Test the --activity-by-author option.
+        """
+        args = parse_arguments(["--activity-by-author"])
+        self.assertTrue(args.activity_by_author)
+
+    def test_commits_calendars_all_authors(self):
+        """
+        Test the --commits-calendars-all-authors option.
+        """
+        args = parse_arguments(["--commits-calendars-all-authors"])
+        self.assertTrue(args.commits_calendars_all_authors)
+
+    def test_doctor(self):
+        """
+        Test the --doctor and --optimize options.
+        """
+        args = parse_arguments(["--doctor"])
+        self.assertTrue(args.doctor)
+        self.assertFalse(args.optimize)
+
+        args = parse_arguments(["--optimize"])
+        self.assertTrue(args.optimize)
+
+    def test_suggest_reviewers_for_changes(self):
+        """
+        Test the --suggest-reviewers-for-paths and --suggest-reviewers-for-diff options.
+        """
+        args = parse_arguments(["--suggest-reviewers-for-paths", "src/a.py", "docs"])
+        self.assertEqual(args.suggest_reviewers_for_paths, ["src/a.py", "docs"])
+        self.assertIsNone(args.suggest_reviewers_for_diff)
+
+        args = parse_arguments(["--suggest-reviewers-for-diff", "origin/main"])
+        self.assertEqual(args.suggest_reviewers_for_diff, "origin/main")
+
         args = parse_arguments([])
         self.assertFalse(args.suggest_reviewers)
 
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from git_py_stats import backends
+from git_py_stats.rollup import Rollup
+from git_py_stats.snapshot import Snapshot
+
+
+class TestBackends(unittest.TestCase):
+    """
+    Unit test class for testing the backends module.
+    """
+
+    def setUp(self):
+        self.mock_config = {
+            "merges": "--no-merges",
+            "log_options": "",
+            "pathspec": ["--"],
+            "backend": "sqlite",
+            "branch": "",
+        }
+
+    def test_open_backend_git(self):
+        """
+        Test the default backend means git log.
+        """
+        self.mock_config["backend"] = "git"
+        self.assertIsNone(backends.open_backend(self.mock_config))
+
+    @patch("builtins.print")
+    def test_open_backend_unsupported_options(self, mock_print):
+        """
+        Test pathspecs, log options, and other branches fall back to git.
+        """
+        self.mock_config["pathspec"] = ["--", "src"]
+        self.assertIsNone(backends.open_backend(self.mock_config))
+        mock_print.assert_called_once()
+
+        self.mock_config["pathspec"] = ["--"]
+        self.mock_config["log_options"] = "--first-parent"
+        self.assertIsNone(backends.open_backend(self.mock_config))
+
+        self.mock_config["log_options"] = ""
+        self.assertIsNone(backends.open_backend(self.mock_config, "develop"))
+
+    @patch("git_py_stats.backends.commit_db")
+    @patch("builtins.print")
+    def test_open_backend_author_patterns(self, mock_print, mock_commit_db):
+        """
+        Test author patterns with regex characters fall back to git.
+        """
+        mock_commit_db.sync_commits.return_value = 3
+
+        self.assertIsNone(backends.open_backend(self.mock_config, author="C++ (dev"))
+        self.assertIsNone(backends.open_backend(self.mock_config, author="Ann|Ben"))
+        self.assertIsNone(backends.open_backend(self.mock_config, author="^Bob"))
+        self.assertEqual(mock_print.call_count, 3)
+        mock_commit_db.open_db.assert_not_called()
+
+        conn = mock_commit_db.open_db.return_value
+        self.assertIs(backends.open_backend(self.mock_config, author="Bob <bob@"), conn)
+
+    @patch("git_py_stats.backends.commit_db")
+    def test_open_backend_sqlite(self, mock_commit_db):
+        """
+        Test the SQLite store is synced before use.
+        """
+        conn = mock_commit_db.open_db.return_value
+        mock_commit_db.sync_commits.return_value = 3
+
+        self.assertIs(backends.open_backend(self.mock_config), conn)
+        mock_commit_db.sync_commits.assert_called_once_with(conn, "HEAD")
+
+        mock_commit_db.sync_commits.return_value = None
+        self.assertIsNone(backends.open_backend(self.mock_config))
+        conn.close.assert_called_once()
+
+    @patch("git_py_stats.backends.snapshot.sync_snapshot")
+    def test_open_backend_snapshot(self, mock_sync_snapshot):
+        """
+        Test the snapshot follows the configured branch.
+        """
+        self.mock_config["backend"] = "snapshot"
+        self.mock_config["branch"] = "main"
+
+        self.assertIs(
+            backends.open_backend(self.mock_config, "main"), mock_sync_snapshot.return_value
+        )
+        mock_sync_snapshot.assert_called_once_with(self.mock_config, "main")
+
+    @patch("git_py_stats.backends.rollup.sync_rollup")
+    def test_open_backend_rollup(self, mock_sync_rollup):
+        """
+        Test the cube is synced, except for reports that need per-file data.
+        """
+        self.mock_config["backend"] = "rollup"
+
+        self.assertIs(backends.open_backend(self.mock_config), mock_sync_rollup.return_value)
+        mock_sync_rollup.assert_called_once_with(self.mock_config, "HEAD")
+
+        self.assertIsNone(backends.open_backend(self.mock_config, files=True))
+        mock_sync_rollup.assert_called_once()
+
+    @patch("git_py_stats.backends.commit_db.count_commits")
+    @patch("git_py_stats.backends.snapshot.count_commits")
+    @patch("git_py_stats.backends.rollup.count_commits")
+    def test_count_commits_dispatch(self, mock_rollup_count, mock_snapshot_count, mock_db_count):
+        """
+        Test count_commits goes to the store that was opened.
+        """
+        snap = Snapshot({}, b"", "c1", "HEAD")
+        backends.count_commits(snap, self.mock_config, "hour", "Bob")
+        mock_snapshot_count.assert_called_once_with(snap, self.mock_config, "hour", "Bob", None)
+
+        cube = Rollup({}, {}, [], "c1", "HEAD")
+        backends.count_commits(cube, self.mock_config, "hour", bounds=(0, 3600))
+        mock_rollup_count.assert_called_once_with(cube, self.mock_config, "hour", None, (0, 3600))
+
+        conn = MagicMock()
+        backends.count_commits(conn, self.mock_config, "hour")
+        mock_db_count.assert_called_once_with(conn, self.mock_config, "hour", None, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import blame
+
+ALICE = "a" * 40
+BOB = "b" * 40
+
+PORCELAIN = f"""{ALICE} 1 1 2
+author Alice
+author-mail <alice@example.com>
+author-time 1700000000
+author-tz +0000
+committer Alice
+committer-mail <alice@example.com>
+committer-time 1700000000
+committer-tz +0000
+summary First
+boundary
+filename src/app.py
+\timport os
+{ALICE} 2 2
+\t
+{BOB} 3 3 1
+author Bob
+author-mail <bob@example.com>
+author-time 1700000100
+author-tz +0000
+committer Bob
+committer-mail <bob@example.com>
+committer-time 1700000100
+committer-tz +0000
+summary Second
+previous {ALICE} src/app.py
+filename src/app.py
+\tprint("caf\xe9")
+{ALICE} 4 4 1
+filename src/app.py
+\tos.exit()
+""".encode("latin-1")
+
+
+class TestBlame(unittest.TestCase):
+    """
+    Unit test class for testing the blame module.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.conn = blame.open_index({"cache_dir": self.cache_dir})
+        self.counts = {
+            "app": {("Alice", "alice@example.com"): 3, ("Bob", "bob@example.com"): 1},
+            "util": {("Bob", "bob@example.com"): 2},
+            "guide": {("Carol", "carol@example.com"): 5},
+        }
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_parse_blame(self):
+        """
+        Test lines are counted per author, including commits seen earlier.
+        """
+        self.assertEqual(
+            blame.parse_blame(PORCELAIN),
+            {("Alice", "alice@example.com"): 3, ("Bob", "bob@example.com"): 1},
+        )
+        self.assertIsNone(blame.parse_blame(PORCELAIN.replace(b"os.exit()", b"\x00\x01")))
+        self.assertEqual(blame.parse_blame(b""), {})
+
+    @patch("git_py_stats.blame.run_git_command")
+    def test_list_files(self, mock_run_git_command):
+        """
+        Test only regular files up to MAX_BLOB_SIZE are listed.
+        """
+        mock_run_git_command.return_value = "\0".join(
+            [
+                "100644 blob 1111111111111111111111111111111111111111      12\tsrc/a b.py",
+                "100755 blob 2222222222222222222222222222222222222222 2000000\tdata.bin",
+                "120000 blob 3333333333333333333333333333333333333333       5\tlink",
+                "160000 commit 4444444444444444444444444444444444444444       -\tvendor/lib",
+            ]
+        )
+
+        self.assertEqual(
+            blame.list_files("c1"), [("1111111111111111111111111111111111111111", "src/a b.py")]
+        )
+
+    def _sync(self, files, tip="c1"):
+        """
+        Sync the cache against a mocked tree, blaming from self.counts.
+        """
+        with patch("git_py_stats.blame.resolve_commit", return_value=tip), patch(
+            "git_py_stats.blame.list_files", return_value=files
+        ), patch(
+            "git_py_stats.blame.blame_file",
+            side_effect=lambda _tip, path: self.counts[path.split("/")[-1].split(".")[0]],
+        ) as mock_blame_file, patch(
+            "builtins.print"
+        ):
+            synced = blame.sync_blame(self.conn, "HEAD", 2)
+        return synced, mock_blame_file
+
+    def test_sync_blame_incremental(self):
+        """
+        Test only blobs missing from the cache are blamed, once per blob.
+        """
+        files = [("b1", "src/app.py"), ("b2", "src/util.py"), ("b2", "lib/util.py")]
+        (_, blamed), mock_blame_file = self._sync(files)
+        self.assertEqual(blamed, 2)
+        self.assertEqual(mock_blame_file.call_count, 2)
+
+        files = [("b1", "src/app.py"), ("b3", "docs/guide.md")]
+        (synced_files, blamed), mock_blame_file = self._sync(files, "c2")
+        self.assertEqual(blamed, 1)
+        mock_blame_file.assert_called_once_with("c2", "docs/guide.md")
+        self.assertEqual(synced_files, files)
+
+        # b2 left the tree, so its lines are gone from the cache
+        blobs = [row[0] for row in self.conn.execute("SELECT blob FROM blobs ORDER BY blob")]
+        self.assertEqual(blobs, ["b1", "b3"])
+
+    def test_sync_blame_invalid_ref(self):
+        """
+        Test an unknown ref leaves the cache alone.
+        """
+        synced, mock_blame_file = self._sync([], None)
+
+        self.assertIsNone(synced)
+        mock_blame_file.assert_not_called()
+
+    def test_lines_by_directory(self):
+        """
+        Test surviving lines roll up into every directory level.
+        """
+        files = [("b1", "src/app.py"), ("b2", "src/util.py"), ("b2", "lib/util.py")]
+        self._sync(files)
+
+        directories = blame.lines_by_directory(self.conn, files, 1)
+
+        self.assertEqual(directories["."], {"Alice": 3, "Bob": 5})
+        self.assertEqual(directories["src/"], {"Alice": 3, "Bob": 3})
+        self.assertEqual(directories["lib/"], {"Bob": 2})
+
+        directories = blame.lines_by_directory(self.conn, files, 1, lambda s: s == "Bob")
+        self.assertEqual(directories, {".": {"Alice": 3}, "src/": {"Alice": 3}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import cache
+
+
+class TestCache(unittest.TestCase):
+    """
+    Unit test class for testing the cache module.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @patch("git_py_stats.cache.run_git_command")
+    def test_get_cache_dir_default(self, mock_run_git_command):
+        """
+        Test the cache defaults to a folder in the git common dir.
+        """
+        mock_run_git_command.return_value = self.tmp_dir
+
+        cache_dir = cache.get_cache_dir({})
+
+        self.assertEqual(cache_dir, os.path.join(self.tmp_dir, "git-py-stats"))
+        self.assertTrue(os.path.isdir(cache_dir))
+
+    @patch("git_py_stats.cache.run_git_command")
+    def test_get_cache_dir_override(self, mock_run_git_command):
+        """
+        Test _GIT_CACHE_DIR wins over the git common dir.
+        """
+        target = os.path.join(self.tmp_dir, "nested", "cache")
+
+        self.assertIsNone(cache.get_cache_dir({"cache_dir": target}, create=False))
+        self.assertEqual(cache.get_cache_dir({"cache_dir": target}), target)
+        self.assertEqual(cache.get_cache_dir({"cache_dir": target}, create=False), target)
+        mock_run_git_command.assert_not_called()
+
+    @patch("git_py_stats.cache.run_git_command", return_value=None)
+    def test_get_cache_dir_not_a_repo(self, mock_run_git_command):
+        """
+        Test None is returned outside of a git repository.
+        """
+        self.assertIsNone(cache.get_cache_dir({}))
+
+    def test_open_cache_db_version_mismatch(self):
+        """
+        Test a database with another schema version is started over.
+        """
+        config = {"cache_dir": self.tmp_dir}
+        schema = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+
+        conn = cache.open_cache_db(config, "test.sqlite3", schema, "1")
+        cache.set_meta(conn, [("tip", "c1")])
+        conn.commit()
+        conn.close()
+
+        conn = cache.open_cache_db(config, "test.sqlite3", schema, "1")
+        self.assertEqual(cache.get_meta(conn, "tip"), "c1")
+        conn.close()
+
+        conn = cache.open_cache_db(config, "test.sqlite3", schema, "2")
+        self.assertIsNone(cache.get_meta(conn, "tip"))
+        self.assertEqual(cache.get_meta(conn, "schema_version"), "2")
+        conn.close()
+
+    @patch("git_py_stats.cache.is_ancestor")
+    def test_catch_up_args(self, mock_is_ancestor):
+        """
+        Test caches skip git, read new commits, or rebuild as needed.
+        """
+        mock_is_ancestor.return_value = True
+        self.assertIsNone(cache.catch_up_args("c2", "HEAD", "c2", "HEAD"))
+        self.assertEqual(cache.catch_up_args("c1", "HEAD", "c2", "HEAD"), ["^c1"])
+        self.assertEqual(cache.catch_up_args(None, None, "c2", "HEAD"), [])
+        self.assertEqual(cache.catch_up_args("c1", "main", "c2", "HEAD"), [])
+
+        mock_is_ancestor.return_value = False
+        self.assertEqual(cache.catch_up_args("c1", "HEAD", "c2", "HEAD"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
+import json
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch
 from datetime import datetime
 
 from git_py_stats import calendar_cmds
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.tests.helpers import record
 
 
 class TestCalendarCmds(unittest.TestCase):
@@ -17,7 +23,7 @@ class TestCalendarCmds(unittest.TestCase):
             "until": "--until=2024-12-31",
             "merges": "--no-merges",
             "log_options": "",
-            "pathspec": "--",
+            "pathspec": ["--"],
             "limit": 10,  # Ensure limit is an integer
             "menu_theme": "",
         }
@@ -39,10 +45,33 @@ class TestCalendarCmds(unittest.TestCase):
 
         # Verify that the author option was included in the command
         called_cmd = mock_run_git_command.call_args_list[0][0][0]
-        self.assertIn("--author=John Doe", called_cmd)
+        self.assertEqual(called_cmd.count("--author=John Doe"), 1)
 
         self.assertTrue(mock_print.called)
 
+    @patch("git_py_stats.calendar_cmds.run_git_command")
+    @patch("git_py_stats.calendar_cmds.count_commits")
+    @patch("git_py_stats.calendar_cmds.open_backend")
+    @patch("builtins.print")
+    def test_commits_calendar_by_author_backend(
+        self, mock_print, mock_open_backend, mock_count_commits, mock_run_git_command
+    ):
+        """
+        Test commits_calendar_by_author reads counts from a backend store when one is set.
+        """
+        mock_count_commits.return_value = {(1, 1): 3, (7, 12): 25}
+
+        calendar_cmds.commits_calendar_by_author(self.mock_config, author="John Doe")
+
+        mock_run_git_command.assert_not_called()
+        mock_count_commits.assert_called_once_with(
+            mock_open_backend.return_value, self.mock_config, "calendar", "John Doe"
+        )
+        mock_open_backend.return_value.close.assert_called_once()
+        printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+        self.assertIn("Mon   ░░░ ... ... ... ... ... ... ... ... ... ... ...", printed)
+        self.assertIn("Sun   ... ... ... ... ... ... ... ... ... ... ... ▓▓▓", printed)
+
     # HEATMAP HELPER FUNCTIONS
     def _freeze_today(self, y: int, m: int, d: int):
         """
@@ -146,6 +175,88 @@ class TestCalendarCmds(unittest.TestCase):
 
         self.assertEqual(mock_run.call_count, 3)
 
+    @patch("git_py_stats.calendar_cmds.run_git_command")
+    @patch("git_py_stats.calendar_cmds.count_commits")
+    @patch("git_py_stats.calendar_cmds.open_backend")
+    @patch("builtins.print")
+    def test_commits_heatmap_from_backend(
+        self, mock_print, mock_open_backend, mock_count_commits, mock_run
+    ):
+        """
+        With a backend, each day is one hourly count over that local day.
+        """
+        self._freeze_today(2024, 1, 3)
+        cfg = dict(self.mock_config, days=2)
+        mock_count_commits.side_effect = [{"00": 1, "15": 11}, {}]
+
+        calendar_cmds.commits_heatmap(cfg)
+
+        mock_run.assert_not_called()
+        store = mock_open_backend.return_value
+        start = int(datetime(2024, 1, 2).timestamp())
+        mock_count_commits.assert_any_call(
+            store, cfg, "hour", bounds=(start, start + 23 * 3600 + 59 * 60)
+        )
+        store.close.assert_called_once()
+        out = "\n".join(" ".join(map(str, c.args)) for c in mock_print.call_args_list)
+        self.assertIn("\x1b[38;5;226m █ ", out)
+        self.assertIn("\x1b[38;5;52m █ ", out)
+
+    @patch("git_py_stats.calendar_cmds.get_resolver", side_effect=lambda _c: IdentityResolver())
+    @patch("git_py_stats.calendar_cmds.iter_commits")
+    @patch("builtins.print")
+    def test_commits_calendars_all_authors(self, mock_print, mock_iter_commits, mock_get_resolver):
+        """
+        Test every author's calendars come from one pass and land in one file.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+        # Wed 2024-01-10 12:00 UTC, then Tue 2024-01-02 20:00 UTC (Wed in Tokyo),
+        # then Tue 2022-12-06, before the week grid starts
+        mock_iter_commits.return_value = iter(
+            [
+                record("c", "Alice", 1704888000),
+                record("c", "Bob", 1704225600, tz="+0900"),
+                record("c", "Alice", 1704888000 - 400 * 86400),
+            ]
+        )
+        self.mock_config["report_format"] = "json"
+
+        calendar_cmds.commits_calendars_all_authors(self.mock_config)
+
+        mock_print.assert_called_once_with(
+            "Calendars for 2 authors saved to git_calendars_by_author.json"
+        )
+        with open("git_calendars_by_author.json") as f:
+            data = json.load(f)
+        self.assertEqual(data["first_week"], "2023-01-09")
+        alice, bob = data["authors"]
+        self.assertEqual(alice["author"], "Alice")
+        self.assertEqual((alice["calendar"][2][0], alice["calendar"][1][11]), (1, 1))
+        self.assertEqual(sum(map(sum, alice["calendar"])), 2)
+        # Only the recent one is inside the week grid, in its last column
+        self.assertEqual(sum(map(sum, alice["weeks"])), 1)
+        self.assertEqual(alice["weeks"][52][2], 1)
+        self.assertEqual(bob["calendar"][2][0], 1)
+        self.assertEqual(bob["weeks"][51][2], 1)
+
+    @patch("git_py_stats.calendar_cmds.get_resolver", side_effect=lambda _c: IdentityResolver())
+    @patch("git_py_stats.calendar_cmds.iter_commits")
+    @patch("builtins.print")
+    def test_commits_calendars_all_authors_no_data(
+        self, mock_print, mock_iter_commits, mock_get_resolver
+    ):
+        """
+        Test an empty history prints a message.
+        """
+        mock_iter_commits.return_value = iter([])
+        calendar_cmds.commits_calendars_all_authors(self.mock_config)
+        mock_print.assert_called_once_with("No commits found.")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,236 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import commit_db
+from git_py_stats.cache import decode_path
+from git_py_stats.identity import IdentityResolver, Mailmap
+from git_py_stats.tests.helpers import mocked_history, non_utf8_repo, record
+
+# Alice and Bob committed under two emails each
+MAILMAP = Mailmap("Alice <alice@new.com> <alice@old.com>\nBob <bob@example.com> <b@x.com>")
+
+
+class TestCommitDb(unittest.TestCase):
+    """
+    Unit test class for testing the commit_db module.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.mock_config = {
+            "since": "",
+            "until": "",
+            "merges": "--no-merges",
+            "log_options": "",
+            "pathspec": ["--"],
+            "backend": "sqlite",
+            "cache_dir": self.cache_dir,
+        }
+        # 2021-01-01 (Fri) 10:00 UTC, 2021-01-04 (Mon) 23:30 -0500, and a merge
+        self.history = [
+            record("c3", "Alice", 1609800000, parents=["c1", "c2"], email="alice@new.com"),
+            record(
+                "c2",
+                "Bob",
+                1609821000,
+                [(5, 1, "b.py"), (0, 0, "logo.png")],
+                parents=["c1"],
+                tz="-0500",
+            ),
+            record("c1", "Alice", 1609495200, [(10, 0, "a.py")], email="alice@old.com"),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _sync(self, history, tip):
+        """
+        Sync the database against a mocked history ending at 'tip'.
+        """
+        with mocked_history(commit_db, history, tip) as mock_iter:
+            conn = commit_db.open_db(self.mock_config)
+            added = commit_db.sync_commits(conn, "HEAD")
+        return conn, added, mock_iter
+
+    def test_sync_commits_incremental(self):
+        """
+        Test sync_commits only asks git for commits after the stored tip.
+        """
+        conn, added, mock_iter = self._sync(self.history[1:], "c2")
+        self.assertEqual(added, 2)
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], [])
+        conn.close()
+
+        conn, added, mock_iter = self._sync(self.history[:1], "c3")
+        self.assertEqual(added, 1)
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], ["^c2"])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM commits").fetchone()[0], 3)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0], 3)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM file_changes").fetchone()[0], 3)
+        conn.close()
+
+        # Nothing new to ingest
+        conn, added, mock_iter = self._sync([], "c3")
+        self.assertEqual(added, 0)
+        mock_iter.assert_not_called()
+        conn.close()
+
+    def test_sync_commits_duplicate(self):
+        """
+        Test a commit that is already stored fails the sync rather than
+        leaving its file changes under the wrong commit.
+        """
+        with self.assertRaises(sqlite3.IntegrityError):
+            self._sync(self.history[1:] + self.history[1:2], "c2")
+
+    def test_sync_commits_invalid_ref(self):
+        """
+        Test sync_commits returns None when the ref can't be resolved.
+        """
+        conn, added, _ = self._sync([], "")
+        self.assertIsNone(added)
+        conn.close()
+
+    def test_count_commits(self):
+        """
+        Test count_commits groups like the git log based reports.
+        """
+        conn, _, _ = self._sync(self.history, "c3")
+
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "author"),
+            {("Alice", "alice@old.com"): 1, ("Bob", "bob@example.com"): 1},
+        )
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "date"),
+            {"2021-01-01": 1, "2021-01-04": 1},
+        )
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "weekday"), {"Fri": 1, "Mon": 1}
+        )
+        self.assertEqual(commit_db.count_commits(conn, self.mock_config, "month"), {"Jan": 2})
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "timezone"), {"+0000": 1, "-0500": 1}
+        )
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "author", author="bob@"),
+            {("Bob", "bob@example.com"): 1},
+        )
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "author", author="C++ (dev"), {}
+        )
+
+        self.mock_config["merges"] = ""
+        self.assertEqual(
+            commit_db.count_commits(conn, self.mock_config, "author"),
+            {
+                ("Alice", "alice@old.com"): 1,
+                ("Alice", "alice@new.com"): 1,
+                ("Bob", "bob@example.com"): 1,
+            },
+        )
+        conn.close()
+
+    @patch("git_py_stats.commit_db.run_git_command")
+    def test_count_commits_date_bounds(self, mock_run_git_command):
+        """
+        Test the since and until bounds come from git rev-parse.
+        """
+        conn, _, _ = self._sync(self.history, "c3")
+        self.mock_config["since"] = "--since=2021-01-02"
+        mock_run_git_command.return_value = "--max-age=1609545600"
+
+        counts = commit_db.count_commits(conn, self.mock_config, "author")
+
+        self.assertEqual(counts, {("Bob", "bob@example.com"): 1})
+        mock_run_git_command.assert_called_once_with(["git", "rev-parse", "--since=2021-01-02"])
+        conn.close()
+
+    def test_author_stats(self):
+        """
+        Test author_stats totals and picks the most recent email.
+        """
+        conn, _, _ = self._sync(self.history, "c3")
+        self.mock_config["merges"] = ""
+
+        stats, insertions, deletions, files, commits = commit_db.author_stats(
+            conn, self.mock_config, IdentityResolver(MAILMAP)
+        )
+
+        self.assertEqual((insertions, deletions, files, commits), (15, 1, 3, 3))
+        self.assertEqual(stats["Alice"]["email"], "alice@new.com")
+        self.assertEqual(stats["Alice"]["commits"], 2)
+        self.assertEqual(stats["Alice"]["lines_changed"], 10)
+        self.assertEqual(stats["Alice"]["first_commit"], 1609495200)
+        self.assertEqual(stats["Bob"]["files"], 2)
+        conn.close()
+
+    def test_author_stats_renames(self):
+        """
+        Test a renamed file counts once unless rename tracking is off.
+        """
+        history = [
+            record(
+                "c5",
+                "Alice",
+                1609900100,
+                [(2, 1, "src/a.py")],
+                parents=["c4"],
+                email="alice@new.com",
+            ),
+            record(
+                "c4", "Bob", 1609900000, [(1, 0, "src/a.py")], parents=["c3"], email="b@x.com"
+            )._replace(renames=(("a.py", "src/a.py"),)),
+        ] + self.history
+        conn, _, _ = self._sync(history, "c5")
+
+        stats, _, _, files, _ = commit_db.author_stats(
+            conn, self.mock_config, IdentityResolver(MAILMAP)
+        )
+        self.assertEqual((files, stats["Alice"]["files"], stats["Bob"]["files"]), (3, 1, 3))
+
+        self.mock_config["renames"] = False
+        stats, _, _, files, _ = commit_db.author_stats(
+            conn, self.mock_config, IdentityResolver(MAILMAP)
+        )
+        self.assertEqual((files, stats["Alice"]["files"]), (4, 2))
+        conn.close()
+
+    @patch("builtins.print")
+    def test_export_sqlite(self, mock_print):
+        """
+        Test export_sqlite writes the database into the cache dir.
+        """
+        with patch("git_py_stats.commit_db.resolve_commit", return_value="c3"), patch(
+            "git_py_stats.commit_db.iter_commits", return_value=iter(self.history)
+        ):
+            commit_db.export_sqlite(self.mock_config)
+
+        path = os.path.join(self.cache_dir, commit_db.DB_NAME)
+        self.assertTrue(os.path.exists(path))
+        mock_print.assert_any_call(f"Commit history saved to {path}")
+        mock_print.assert_any_call("\t3 new commits, 3 commits total")
+
+    @unittest.skipUnless(shutil.which("git"), "git is not installed")
+    def test_sync_commits_non_utf8_path(self):
+        """
+        Test a file name that isn't valid UTF-8 is stored and read back as git wrote it.
+        """
+        path = non_utf8_repo(self)
+
+        conn = commit_db.open_db(self.mock_config)
+        self.assertEqual(commit_db.sync_commits(conn, "HEAD"), 1)
+
+        stored = [decode_path(blob) for (blob,) in conn.execute("SELECT path FROM paths")]
+        self.assertEqual(stored, [path])
+        stats = commit_db.author_stats(conn, self.mock_config, IdentityResolver())
+        self.assertEqual(stats[0]["Ann"]["files"], 1)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,422 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import commit_stream
+from git_py_stats import config as config_module
+from git_py_stats.tests.helpers import git, header, log_records
+
+
+class TestCommitStream(unittest.TestCase):
+    """
+    Unit test class for testing the commit_stream module.
+    """
+
+    def setUp(self):
+        # Mock configuration for testing
+        self.mock_config = {
+            "since": "--since=2020-01-01",
+            "until": "--until=2024-12-31",
+            "merges": "--no-merges",
+            "log_options": "",
+            "pathspec": ["--"],
+        }
+
+    def test_build_log_command(self):
+        """
+        Test build_log_command only adds numstat and branch when asked to.
+        """
+        cmd = commit_stream.build_log_command(self.mock_config)
+        self.assertNotIn("--numstat", cmd)
+        self.assertEqual(cmd[:4], ["git", "-c", "log.showSignature=false", "log"])
+        self.assertIn(commit_stream.LOG_FORMAT, cmd)
+        self.assertEqual(cmd[-1], "--")
+
+        cmd = commit_stream.build_log_command(self.mock_config, "develop", numstat=True)
+        self.assertEqual(cmd[4], "develop")
+        self.assertIn("--numstat", cmd)
+        self.assertIn("-z", cmd)
+        self.assertIn("-M", cmd)
+
+    def test_parse_commit_records(self):
+        """
+        Test parse_commit_records attaches numstat rows to the right commit.
+        """
+        lines = [
+            header("c1", "p1 p2", "Alice", "alice@example.com", "1609459200 -0500", "Fix\tbug"),
+            "10\t2\ta.py",
+            "-\t-\tlogo.png",
+            "",
+            "garbage line",
+            header("c2", "", "Bob", "bob@example.com", "1609459300 +0000", "Init"),
+            "1\t0\tpath with\ttab.py",
+        ]
+
+        records = list(commit_stream.parse_commit_records(log_records(lines)))
+
+        self.assertEqual(len(records), 2)
+        first, second = records
+        self.assertEqual(first.hash, "c1")
+        self.assertEqual(first.parents, ("p1", "p2"))
+        self.assertEqual(first.tz, "-0500")
+        self.assertEqual(first.subject, "Fix\tbug")
+        self.assertEqual(first.files, [(10, 2, "a.py"), (0, 0, "logo.png")])
+        self.assertEqual(second.parents, ())
+        self.assertEqual(second.files, [(1, 0, "path with\ttab.py")])
+
+    def test_parse_commit_records_committer_date(self):
+        """
+        Test parse_commit_records keeps author and committer dates apart.
+        """
+        line = "\x1ec1\x1f\x1fAlice\x1fa@example.com\x1f100 +0100\x1f200 -0200\x1fMsg"
+
+        (record,) = commit_stream.parse_commit_records(log_records([line]))
+
+        self.assertEqual((record.timestamp, record.tz), (100, "+0100"))
+        self.assertEqual((record.committer_timestamp, record.committer_tz), (200, "-0200"))
+
+    def test_parse_commit_records_undecodable(self):
+        """
+        Test names and paths that aren't UTF-8 keep their bytes, and paths are shared.
+        """
+        output = b"".join(
+            [
+                header("c1", "", "Ren\xe9", "r@example.com", "100 +0000").encode("latin-1"),
+                b"\n1\t0\tdocs/caf\xe9.txt\0\0",
+                header("c2", "", "Ann", "a@example.com", "200 +0000").encode(),
+                b"\n2\t0\tdocs/caf\xe9.txt\0",
+            ]
+        )
+
+        first, second = commit_stream.parse_commit_records(output.split(b"\x1e"))
+
+        self.assertEqual(first.author.encode("utf-8", "surrogateescape"), b"Ren\xe9")
+        self.assertEqual(first.files[0][2], "docs/caf\udce9.txt")
+        self.assertIs(first.files[0][2], second.files[0][2])
+
+    def test_parse_commit_records_skips_malformed_headers(self):
+        """
+        Test parse_commit_records drops headers it can't parse along with their numstat.
+        """
+        lines = [
+            "\x1ebroken",
+            "1\t1\ta.py",
+            "\x1ec1\x1f\x1fAlice\x1falice@example.com\x1fnot-a-date\x1fnot-a-date\x1fMsg",
+            header("c2", "", "Bob", "bob@example.com", "1609459300 +0000"),
+        ]
+
+        records = list(commit_stream.parse_commit_records(log_records(lines)))
+
+        self.assertEqual([record.hash for record in records], ["c2"])
+        self.assertEqual(records[0].files, [])
+
+    def test_parse_commit_records_co_authors(self):
+        """
+        Test Co-authored-by trailer values land on the record.
+        """
+        first = header("c1", "", "Alice", "alice@example.com", "1609459200 +0000")
+        records = list(
+            commit_stream.parse_commit_records(
+                log_records(
+                    [
+                        first + "\x1fBob <bob@example.com>\x1dCarol <carol@example.com>",
+                        header("c2", "", "Bob", "bob@example.com", "1609459300 +0000") + "\x1f",
+                    ]
+                )
+            )
+        )
+
+        self.assertEqual(
+            records[0].co_authors, ("Bob <bob@example.com>", "Carol <carol@example.com>")
+        )
+        self.assertEqual(records[1].co_authors, ())
+
+    def test_format_iso_date(self):
+        """
+        Test format_iso_date renders the commit's own timezone.
+        """
+        self.assertEqual(
+            commit_stream.format_iso_date(1609459200, "+0530"), "2021-01-01 05:30:00 +0530"
+        )
+        self.assertEqual(
+            commit_stream.format_iso_date(1609459200, "-0800"), "2020-12-31 16:00:00 -0800"
+        )
+
+    def test_parse_numstat(self):
+        """
+        Test NUL framed rows keep odd paths whole and split renames into both paths.
+        """
+        body = (
+            b"1\t0\tpath with\ttab.py\0"
+            b"2\t1\t\0src/old.py\0src/new.py\0"
+            b"-\t-\tline\nbreak.png\0"
+            b"x\ty\tbad.py\0"
+            b"3\t3\t\0truncated.py\0"
+        )
+
+        files, renames = commit_stream.parse_numstat(body, {})
+
+        self.assertEqual(
+            files, [(1, 0, "path with\ttab.py"), (2, 1, "src/new.py"), (0, 0, "line\nbreak.png")]
+        )
+        self.assertEqual(renames, (("src/old.py", "src/new.py"),))
+
+    def test_parse_numstat_raw(self):
+        """
+        Test --raw rows list files without line counts, renames with both paths.
+        """
+        old, new = b"1" * 40, b"2" * 40
+        body = (
+            b":100644 100644 " + old + b" " + new + b" M\0src/a.py\0"
+            b":100644 100644 " + old + b" " + old + b" R100\0b.py\0c.py\0"
+            b":000000 100644 " + b"0" * 40 + b" " + new + b" A\0"
+        )
+
+        files, renames = commit_stream.parse_numstat(body, {})
+
+        self.assertEqual(files, [(0, 0, "src/a.py"), (0, 0, "c.py")])
+        self.assertEqual(renames, (("b.py", "c.py"),))
+
+    def test_parse_commit_records_renames(self):
+        """
+        Test renames land on the record, and commits without files still parse.
+        """
+        output = (
+            b"\x1e"
+            + header("c2", "c1", "Alice", "a@example.com", "200 +0000")[1:].encode()
+            + b"\n4\t0\t\0a.py\0b.py\0\0"
+            + b"\x1e"
+            + header("c1", "", "Alice", "a@example.com", "100 +0000")[1:].encode()
+            + b"\0"
+        )
+
+        second, first = commit_stream.parse_commit_records(output.split(b"\x1e"))
+
+        self.assertEqual(second.files, [(4, 0, "b.py")])
+        self.assertEqual(second.renames, (("a.py", "b.py"),))
+        self.assertEqual((first.hash, first.subject, first.files), ("c1", "Msg", []))
+
+    def test_parent_directories(self):
+        """
+        Test files roll up into the root and at most 'depth' directories.
+        """
+        self.assertEqual(commit_stream.parent_directories("README", 2), ["."])
+        self.assertEqual(
+            commit_stream.parent_directories("src/app/io/main.py", 2), [".", "src/", "src/app/"]
+        )
+
+    def test_local_day(self):
+        """
+        Test local_day uses the author's timezone rather than UTC.
+        """
+        # 2021-01-01 02:00 UTC
+        self.assertEqual(commit_stream.local_day(1609466400, "+0000").isoformat(), "2021-01-01")
+        self.assertEqual(commit_stream.local_day(1609466400, "-0500").isoformat(), "2020-12-31")
+        self.assertEqual(commit_stream.local_day(1609466400, "bogus").isoformat(), "2021-01-01")
+
+    def test_git_author_exclusion(self):
+        """
+        Test only literal alternations are handed to git, which can't match
+        more than the Python check does.
+        """
+        self.assertEqual(
+            commit_stream.git_author_exclusion("(bot@example.com|Some User)"),
+            r"^(?!.*(?:bot@example[^<>]com|Some\ User))",
+        )
+        self.assertEqual(commit_stream.git_author_exclusion(r"a\.b"), r"^(?!.*(?:a\.b))")
+        for pattern in ["", "^root$", r"bot\d+", "(?i)bot", "Jane <jane", "1|bot", "a|", "..."]:
+            self.assertIsNone(commit_stream.git_author_exclusion(pattern), pattern)
+
+    @patch("git_py_stats.commit_stream.supports_perl_regexp", return_value=True)
+    @patch("git_py_stats.commit_stream.git_version", return_value=(2, 43, 0))
+    def test_author_exclusion_args(self, mock_git_version, mock_supports_perl_regexp):
+        """
+        Test the exclusion is left out whenever git can't apply it exactly.
+        """
+        config = dict(
+            self.mock_config, ignore_authors=config_module._build_author_exclusion_filter("bot")
+        )
+        self.assertEqual(
+            commit_stream.author_exclusion_args(config),
+            ["--perl-regexp", "--author=^(?!.*(?:bot))"],
+        )
+        self.assertIn(
+            "--perl-regexp",
+            commit_stream.build_log_command(config, numstat=True, skip_ignored=True),
+        )
+        self.assertNotIn("--perl-regexp", commit_stream.build_log_command(config, numstat=True))
+
+        # Plain callables, other --author options, and old git all fall back to Python
+        self.assertEqual(commit_stream.author_exclusion_args(dict(config, ignore_authors=len)), [])
+        self.assertEqual(
+            commit_stream.author_exclusion_args(dict(config, log_options="--author=alice")), []
+        )
+        mock_git_version.return_value = (2, 30, 1)
+        self.assertEqual(commit_stream.author_exclusion_args(config), [])
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    def test_iter_commits(self, mock_stream_git_command):
+        """
+        Test iter_commits streams records from the built command.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [
+                header("c1", "", "Alice", "alice@example.com", "1609459200 +0000"),
+                "3\t1\ta.py",
+            ]
+        )
+
+        records = list(commit_stream.iter_commits(self.mock_config, numstat=True))
+
+        self.assertEqual(records[0].files, [(3, 1, "a.py")])
+        called_cmd = mock_stream_git_command.call_args[0][0]
+        self.assertIn("--numstat", called_cmd)
+
+    def test_build_log_command_metadata_only(self):
+        """
+        Test a metadata only log lists files from the trees and skips rename detection.
+        """
+        cmd = commit_stream.build_log_command(self.mock_config, numstat=True, metadata_only=True)
+
+        self.assertIn("--raw", cmd)
+        self.assertIn("--no-renames", cmd)
+        self.assertNotIn("--numstat", cmd)
+        self.assertNotIn("-M", cmd)
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    def test_missing_blobs(self, mock_stream_git_command):
+        """
+        Test only changed blobs the clone doesn't have are listed.
+        """
+        present, missing, gitlink = b"a" * 40, b"b" * 40, b"c" * 40
+        mock_stream_git_command.side_effect = [
+            iter(
+                [
+                    header("c1", "", "Alice", "a@example.com", "1 +0000").encode(),
+                    b":100644 100644 " + present + b" " + missing + b" M\tsrc/a.py",
+                    b":000000 160000 " + b"0" * 40 + b" " + gitlink + b" A\tlib",
+                    b"",
+                ]
+            ),
+            iter([present, b"d" * 40]),
+        ]
+
+        self.assertEqual(commit_stream.missing_blobs(self.mock_config), [missing.decode()])
+
+        log_cmd, cat_file_cmd = (call.args[0] for call in mock_stream_git_command.call_args_list)
+        self.assertIn("--raw", log_cmd)
+        self.assertNotIn("-z", log_cmd)
+        self.assertIn("--batch-all-objects", cat_file_cmd)
+
+    @patch("git_py_stats.commit_stream.fetch_objects")
+    @patch("git_py_stats.commit_stream.missing_blobs", return_value=["b" * 40])
+    @patch("git_py_stats.commit_stream.promisor_remote", return_value="origin")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    @patch("builtins.print")
+    def test_iter_commits_partial_clone(
+        self, mock_print, mock_stream, mock_promisor, mock_missing, mock_fetch
+    ):
+        """
+        Test a partial clone prefetches blobs in one go, or reads only metadata.
+        """
+        mock_stream.side_effect = lambda *args: iter([])
+
+        list(commit_stream.iter_commits(self.mock_config, numstat=True))
+        mock_fetch.assert_called_once_with("origin", ["b" * 40])
+        self.assertIn("--numstat", mock_stream.call_args[0][0])
+
+        mock_fetch.reset_mock()
+        config = dict(self.mock_config, partial_clone="metadata")
+        list(commit_stream.iter_commits(config, numstat=True))
+        mock_fetch.assert_not_called()
+        self.assertIn("--raw", mock_stream.call_args[0][0])
+
+        config = dict(self.mock_config, partial_clone="lazy")
+        list(commit_stream.iter_commits(config, numstat=True))
+        list(commit_stream.iter_commits(self.mock_config))
+        mock_fetch.assert_not_called()
+        self.assertEqual(mock_missing.call_count, 1)
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestPartialClone(unittest.TestCase):
+    """
+    Reads a blobless clone of a local repository served over file://.
+    """
+
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        server = os.path.join(tmp_dir, "server")
+        os.mkdir(server)
+        git(server, "init", "-q")
+        git(server, "config", "uploadpack.allowFilter", "true")
+        git(server, "config", "uploadpack.allowAnySHA1InWant", "true")
+        for i in range(3):
+            with open(os.path.join(server, f"file{i}.txt"), "w") as f:
+                f.write("line\n" * (i + 1))
+            git(server, "add", ".")
+            git(
+                server,
+                "-c",
+                "user.name=Alice",
+                "-c",
+                "user.email=a@example.com",
+                "commit",
+                "-q",
+                "-m",
+                f"Commit {i}",
+            )
+        self.clone = os.path.join(tmp_dir, "clone")
+        git(
+            tmp_dir,
+            "clone",
+            "-q",
+            "--no-checkout",
+            "--filter=blob:none",
+            f"file://{server}",
+            self.clone,
+        )
+
+        cwd = os.getcwd()
+        os.chdir(self.clone)
+        self.addCleanup(os.chdir, cwd)
+        commit_stream.promisor_remote.cache_clear()
+        self.addCleanup(commit_stream.promisor_remote.cache_clear)
+
+    def _packs(self):
+        pack_dir = os.path.join(self.clone, ".git", "objects", "pack")
+        return len([name for name in os.listdir(pack_dir) if name.endswith(".pack")])
+
+    @patch("builtins.print")
+    def test_prefetch(self, mock_print):
+        """
+        Test every blob arrives in a single fetch and line counts are right.
+        """
+        config = {"merges": "--no-merges", "partial_clone": "prefetch"}
+        self.assertEqual(commit_stream.promisor_remote(), "origin")
+
+        records = list(commit_stream.iter_commits(config, numstat=True))
+
+        self.assertEqual([record.files for record in records][0], [(3, 0, "file2.txt")])
+        self.assertEqual(self._packs(), 2)
+        mock_print.assert_called_once_with("Partial clone: fetching 3 blobs from 'origin'...")
+        self.assertEqual(commit_stream.missing_blobs(config), [])
+
+    @patch("builtins.print")
+    def test_metadata_only(self, mock_print):
+        """
+        Test files are listed without fetching anything.
+        """
+        config = {"merges": "--no-merges", "partial_clone": "metadata"}
+
+        records = list(commit_stream.iter_commits(config, numstat=True))
+
+        self.assertEqual([record.files for record in records][0], [(0, 0, "file2.txt")])
+        self.assertEqual(self._packs(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
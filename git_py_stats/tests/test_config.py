@@ -0,0 +1,68 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import config
+
+
+class TestConfig(unittest.TestCase):
+    """
+    Unit test class for testing the config module.
+    """
+
+    def test_author_exclusion_filter(self):
+        """
+        Test the filter searches the pattern and caches each verdict.
+        """
+        ignore_authors = config._build_author_exclusion_filter(" (bot@|Some User) ")
+
+        self.assertTrue(ignore_authors("ci-bot@example.com"))
+        self.assertTrue(ignore_authors("ci-bot@example.com"))
+        self.assertFalse(ignore_authors("Jane Doe"))
+        self.assertFalse(ignore_authors(None))
+        self.assertEqual(ignore_authors.pattern, "(bot@|Some User)")
+        self.assertEqual(ignore_authors.cache_info().hits, 1)
+
+        self.assertFalse(config._build_author_exclusion_filter("")("anything"))
+
+    def test_is_author_ignored(self):
+        """
+        Test authors match by name, email, or 'name <email>', once each.
+        """
+        checked = []
+
+        def ignore_authors(s):
+            checked.append(s)
+            return s in ("Bot", "jane@example.com", "Sam <sam@example.com>")
+
+        self.assertTrue(config.is_author_ignored(ignore_authors, "Bot", "bot@example.com"))
+        self.assertTrue(config.is_author_ignored(ignore_authors, "Jane", "jane@example.com"))
+        self.assertTrue(config.is_author_ignored(ignore_authors, "Sam", "sam@example.com"))
+        self.assertFalse(config.is_author_ignored(ignore_authors, "Alex", ""))
+
+        checked.clear()
+        config.is_author_ignored(ignore_authors, "Alex", "")
+        self.assertEqual(checked, [])
+
+    @patch("git_py_stats.config.run_git_command", return_value="")
+    @patch("builtins.print")
+    def test_pathspec(self, mock_print, mock_run_git_command):
+        """
+        Test _GIT_PATHSPEC becomes one git argument per pathspec.
+        """
+        cases = [
+            ("", ["--"]),
+            ("src", ["--", "src"]),
+            (":(exclude)vendor ':!my docs' src", ["--", ":(exclude)vendor", ":!my docs", "src"]),
+            ("'unbalanced src", ["--", "'unbalanced", "src"]),
+        ]
+        for value, expected in cases:
+            with patch.dict(os.environ, {"_GIT_PATHSPEC": value}):
+                self.assertEqual(config.get_config()["pathspec"], expected)
+        mock_print.assert_any_call(
+            "Invalid value for _GIT_PATHSPEC: ''unbalanced src'. Splitting on whitespace."
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
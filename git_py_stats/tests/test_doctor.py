@@ -0,0 +1,224 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import doctor
+from git_py_stats.doctor import CommitGraph, RepositoryHealth
+
+
+def _commit_graph(commits, bloom):
+    """
+    Build a commit-graph file holding only the header, the chunk table,
+    and the OID fanout chunk, which is all the doctor reads.
+    """
+    chunk_ids = [b"OIDF", b"BIDX", b"BDAT"] if bloom else [b"OIDF"]
+    table_end = 8 + 12 * (len(chunk_ids) + 1)
+    fanout = struct.pack(">256I", *([0] * 255 + [commits]))
+    offsets = [table_end] + [table_end + len(fanout)] * (len(chunk_ids) - 1)
+    table = b"".join(struct.pack(">4sQ", *entry) for entry in zip(chunk_ids, offsets))
+    table += struct.pack(">4sQ", b"\0\0\0\0", table_end + len(fanout))
+    return struct.pack(">4sBBBB", b"CGPH", 1, 1, len(chunk_ids), 0) + table + fanout
+
+
+def _health(**changes):
+    """
+    A healthy repository with 'changes' applied.
+    """
+    health = RepositoryHealth(
+        commits=100,
+        graph=CommitGraph(100, 100, 1),
+        graph_enabled=True,
+        packs=1,
+        multi_pack_index=True,
+        bitmaps=1,
+        loose_objects=10,
+        loose_size_kib=40,
+    )
+    return health._replace(**changes)
+
+
+class TestDoctor(unittest.TestCase):
+    """
+    Unit test class for testing the doctor module.
+    """
+
+    def setUp(self):
+        self.objects_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.objects_dir)
+        os.makedirs(os.path.join(self.objects_dir, "info", "commit-graphs"))
+
+    def _write(self, name, data):
+        with open(os.path.join(self.objects_dir, "info", name), "wb") as f:
+            f.write(data)
+
+    def test_read_commit_graph(self):
+        """
+        Test a single commit-graph file is read from its fanout and chunk table.
+        """
+        self._write("commit-graph", _commit_graph(42, bloom=True))
+
+        self.assertEqual(doctor.read_commit_graph(self.objects_dir), CommitGraph(42, 42, 1))
+
+    def test_read_commit_graph_chain(self):
+        """
+        Test the layers of a split commit-graph add up, Bloom filters per layer.
+        """
+        self._write("commit-graphs/commit-graph-chain", b"aaa\nbbb\n")
+        self._write("commit-graphs/graph-aaa.graph", _commit_graph(30, bloom=True))
+        self._write("commit-graphs/graph-bbb.graph", _commit_graph(5, bloom=False))
+
+        self.assertEqual(doctor.read_commit_graph(self.objects_dir), CommitGraph(35, 30, 2))
+
+    def test_read_commit_graph_missing(self):
+        """
+        Test no commit-graph, or a file that isn't one, covers nothing.
+        """
+        self.assertEqual(doctor.read_commit_graph(self.objects_dir), CommitGraph(0, 0, 0))
+        self._write("commit-graph", b"not a graph")
+        self.assertEqual(doctor.read_commit_graph(self.objects_dir), CommitGraph(0, 0, 0))
+
+    def test_diagnose(self):
+        """
+        Test only missing structures come with an impact.
+        """
+        self.assertEqual([row[2] for row in doctor.diagnose(_health())], [None] * 5)
+
+        rows = doctor.diagnose(
+            _health(
+                graph=CommitGraph(80, 0, 2),
+                packs=3,
+                multi_pack_index=False,
+                bitmaps=0,
+                loose_objects=10000,
+            )
+        )
+
+        self.assertEqual(rows[0][:2], ("commit-graph", "80 of 100 commits (80%)"))
+        self.assertEqual(rows[1][:2], ("Bloom filters", "0 of 100 commits"))
+        self.assertEqual(rows[2][:2], ("multi-pack-index", "none (3 packs)"))
+        self.assertTrue(all(row[2] for row in rows))
+
+    @patch("git_py_stats.doctor.promisor_remote", return_value=None)
+    @patch("git_py_stats.doctor.git_version", return_value=(2, 39, 5))
+    def test_optimize_commands(self, mock_git_version, mock_promisor_remote):
+        """
+        Test loose objects are packed first and the commit-graph written last.
+        """
+        self.assertEqual(doctor.optimize_commands(_health()), [])
+
+        steps = doctor.optimize_commands(
+            _health(graph=CommitGraph(80, 0, 2), bitmaps=0, loose_objects=10000)
+        )
+
+        self.assertEqual(
+            [cmd for _description, cmd in steps],
+            [
+                ["git", "repack", "-d", "-q"],
+                ["git", "multi-pack-index", "write", "--bitmap"],
+                [
+                    "git",
+                    "commit-graph",
+                    "write",
+                    "--reachable",
+                    "--changed-paths",
+                    "--split=replace",
+                ],
+            ],
+        )
+
+    @patch("git_py_stats.doctor.promisor_remote", return_value=None)
+    @patch("git_py_stats.doctor.git_version", return_value=(2, 39, 5))
+    def test_optimize_commands_no_packs(self, mock_git_version, mock_promisor_remote):
+        """
+        Test loose objects are packed before bitmaps are written, and an
+        empty repository gets no multi-pack-index.
+        """
+        health = _health(packs=0, multi_pack_index=False, bitmaps=0, loose_objects=12)
+
+        steps = doctor.optimize_commands(health)
+
+        self.assertEqual(
+            [cmd for _description, cmd in steps],
+            [["git", "repack", "-d", "-q"], ["git", "multi-pack-index", "write", "--bitmap"]],
+        )
+
+        empty = health._replace(commits=0, graph=CommitGraph(0, 0, 0), loose_objects=0)
+        self.assertEqual(doctor.optimize_commands(empty), [])
+        self.assertEqual(doctor.diagnose(empty)[3], ("bitmaps", "not needed", None))
+
+    @patch("git_py_stats.doctor.promisor_remote", return_value="origin")
+    @patch("git_py_stats.doctor.git_version", return_value=(2, 39, 5))
+    def test_optimize_commands_partial_clone(self, mock_git_version, mock_promisor_remote):
+        """
+        Test a partial clone gets no bitmaps, and a disabled commit-graph isn't written.
+        """
+        health = _health(graph_enabled=False, packs=2, multi_pack_index=False, bitmaps=0)
+
+        steps = doctor.optimize_commands(health)
+
+        self.assertEqual(
+            [cmd for _description, cmd in steps], [["git", "multi-pack-index", "write"]]
+        )
+
+    @patch("git_py_stats.doctor._time_commands", return_value=[1.0, 2.0])
+    @patch("git_py_stats.doctor.sample_reports")
+    @patch("git_py_stats.doctor.inspect_repository")
+    @patch("builtins.print")
+    def test_repository_doctor(
+        self, mock_print, mock_inspect_repository, mock_sample_reports, mock_time_commands
+    ):
+        """
+        Test the doctor prints the findings and the sample timings.
+        """
+        mock_inspect_repository.return_value = _health(graph=CommitGraph(0, 0, 0))
+        mock_sample_reports.return_value = [("Commits per author", []), ("Commits -- a.py", [])]
+
+        doctor.repository_doctor({})
+
+        printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+        self.assertIn("  ! commit-graph      0 of 100 commits (0%)", printed)
+        self.assertIn("     1.000s  Commits per author", printed)
+        self.assertIn("\nRun git-py-stats --optimize to write what is missing.", printed)
+
+    @patch("git_py_stats.doctor.run_git_command", return_value="")
+    @patch("git_py_stats.doctor._time_commands", side_effect=[[1.0], [0.25]])
+    @patch("git_py_stats.doctor.sample_reports", return_value=[("Commits per author", [])])
+    @patch("git_py_stats.doctor.optimize_commands")
+    @patch("git_py_stats.doctor.inspect_repository", return_value=_health())
+    @patch("builtins.print")
+    def test_optimize_repository(
+        self,
+        mock_print,
+        mock_inspect_repository,
+        mock_optimize_commands,
+        mock_sample_reports,
+        mock_time_commands,
+        mock_run_git_command,
+    ):
+        """
+        Test optimizing runs each step and times the samples before and after.
+        """
+        step = ["git", "commit-graph", "write", "--reachable", "--changed-paths"]
+        mock_optimize_commands.return_value = [("Writing the commit-graph", step)]
+
+        doctor.optimize_repository({})
+
+        mock_run_git_command.assert_called_once_with(step)
+        printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+        self.assertIn("     1.000s    0.250s  Commits per author", printed)
+
+    @patch("git_py_stats.doctor.inspect_repository", return_value=None)
+    @patch("builtins.print")
+    def test_optimize_repository_failure(self, mock_print, mock_inspect_repository):
+        """
+        Test a repository that can't be inspected isn't touched.
+        """
+        doctor.optimize_repository({})
+        mock_print.assert_called_once_with("Could not inspect the repository.")
+
+
+if __name__ == "__main__":
+    unittest.main()
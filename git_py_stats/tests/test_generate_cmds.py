@@ -1,8 +1,13 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open
 import json
 
-from git_py_stats import generate_cmds
+from git_py_stats import analyze_cmds, generate_cmds, identity, list_cmds
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.tests.helpers import git, header, log_records
 
 
 class TestGenerateCmds(unittest.TestCase):
@@ -17,10 +22,16 @@ class TestGenerateCmds(unittest.TestCase):
             "until": "--until=2024-12-31",
             "merges": "--no-merges",
             "log_options": "",
-            "pathspec": "--",
+            "pathspec": ["--"],
             "limit": 10,  # Ensure limit is an integer
             "menu_theme": "",
         }
+        # A fresh resolver per test, without the mailmap of the repo running the tests
+        resolver_patch = patch(
+            "git_py_stats.generate_cmds.get_resolver", side_effect=lambda _c: IdentityResolver()
+        )
+        resolver_patch.start()
+        self.addCleanup(resolver_patch.stop)
 
     def _extract_printed_authors(self, mock_print):
         """
@@ -34,26 +45,28 @@ class TestGenerateCmds(unittest.TestCase):
                 authors.append(msg.strip()[:-1])  # drop trailing ":"
         return authors
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_sort_by_commits_desc(self, mock_print, mock_run_git_command):
+    def test_sort_by_commits_desc(self, mock_print, mock_stream_git_command):
         """
         Test detailed_git_stats when sorting by commits in descending order.
         """
         # Two authors, B has more commits but fewer insertions
-        mock_run_git_command.return_value = (
-            # A1 (2 commits total)
-            "c1\tAlice\talice@example.com\t1609459200\n"
-            "10\t1\ta.py\n"
-            "c2\tAlice\talice@example.com\t1609459300\n"
-            "5\t0\ta2.py\n"
-            # B1 (3 commits total)
-            "c3\tBob\tbob@example.com\t1609460000\n"
-            "1\t1\tb.py\n"
-            "c4\tBob\tbob@example.com\t1609460100\n"
-            "2\t2\tb2.py\n"
-            "c5\tBob\tbob@example.com\t1609460200\n"
-            "3\t3\tb3.py\n"
+        mock_stream_git_command.return_value = log_records(
+            [
+                # A1 (2 commits total)
+                header("c1", "", "Alice", "alice@example.com", "1609459200 +0000"),
+                "10\t1\ta.py",
+                header("c2", "", "Alice", "alice@example.com", "1609459300 +0000"),
+                "5\t0\ta2.py",
+                # B1 (3 commits total)
+                header("c3", "", "Bob", "bob@example.com", "1609460000 +0000"),
+                "1\t1\tb.py",
+                header("c4", "", "Bob", "bob@example.com", "1609460100 +0000"),
+                "2\t2\tb2.py",
+                header("c5", "", "Bob", "bob@example.com", "1609460200 +0000"),
+                "3\t3\tb3.py",
+            ]
         )
 
         cfg = dict(self.mock_config)
@@ -71,22 +84,24 @@ class TestGenerateCmds(unittest.TestCase):
         printed = " ".join(a.args[0] for a in mock_print.call_args_list if a.args)
         self.assertIn("Sorting by: commits (desc)", printed)
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_sort_by_lines_asc_with_name_tiebreaker(self, mock_print, mock_run_git_command):
+    def test_sort_by_lines_asc_with_name_tiebreaker(self, mock_print, mock_stream_git_command):
         """
         Test detailed_git_stats when sorting by lines in ascending order.
         Attempts to handle a "tiebreaker" when sorting by falling back to
         the person's name in ascending order. So if Alice and Bob have the
         same number of commits, Alice should be chosen.
         """
-        mock_run_git_command.return_value = (
-            # Alice: 3+3 = 6 lines
-            "c1\tAlice\talice@example.com\t1609459200\n"
-            "3\t3\ta.py\n"
-            # Bob: 4+2 = 6 lines
-            "c2\tBob\tbob@example.com\t1609460000\n"
-            "4\t2\tb.py\n"
+        mock_stream_git_command.return_value = log_records(
+            [
+                # Alice: 3+3 = 6 lines
+                header("c1", "", "Alice", "alice@example.com", "1609459200 +0000"),
+                "3\t3\ta.py",
+                # Bob: 4+2 = 6 lines
+                header("c2", "", "Bob", "bob@example.com", "1609460000 +0000"),
+                "4\t2\tb.py",
+            ]
         )
 
         cfg = dict(self.mock_config)
@@ -102,19 +117,21 @@ class TestGenerateCmds(unittest.TestCase):
         printed = " ".join(a.args[0] for a in mock_print.call_args_list if a.args)
         self.assertIn("Sorting by: lines (asc)", printed)
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_sort_by_name_desc(self, mock_print, mock_run_git_command):
+    def test_sort_by_name_desc(self, mock_print, mock_stream_git_command):
         """
         Test detailed_git_stats when sorting by name in descending order.
         """
-        mock_run_git_command.return_value = (
-            "c1\tAlice\talice@example.com\t1609459200\n"
-            "1\t0\ta.py\n"
-            "c2\tBob\tbob@example.com\t1609460000\n"
-            "1\t0\tb.py\n"
-            "c3\tCarol\tcarol@example.com\t1609470000\n"
-            "1\t0\tc.py\n"
+        mock_stream_git_command.return_value = log_records(
+            [
+                header("c1", "", "Alice", "alice@example.com", "1609459200 +0000"),
+                "1\t0\ta.py",
+                header("c2", "", "Bob", "bob@example.com", "1609460000 +0000"),
+                "1\t0\tb.py",
+                header("c3", "", "Carol", "carol@example.com", "1609470000 +0000"),
+                "1\t0\tc.py",
+            ]
         )
 
         cfg = dict(self.mock_config)
@@ -129,20 +146,22 @@ class TestGenerateCmds(unittest.TestCase):
         self.assertTrue(authors[1].startswith("Bob <bob@example.com>"))
         self.assertTrue(authors[2].startswith("Alice <alice@example.com>"))
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_detailed_git_stats(self, mock_print, mock_run_git_command):
+    def test_detailed_git_stats(self, mock_print, mock_stream_git_command):
         """
         Test detailed_git_stats function with sample git output.
         """
         # Mock git command output
-        mock_output = (
-            "abc123\tJohn Doe\tjohn@example.com\t1609459200\n"
-            "10\t2\tsomefile.py\n"
-            "def456\tJane Smith\tjane@example.com\t1609545600\n"
-            "5\t3\tanotherfile.py\n"
+        mock_output = log_records(
+            [
+                header("abc123", "", "John Doe", "john@example.com", "1609459200 +0000"),
+                "10\t2\tsomefile.py",
+                header("def456", "", "Jane Smith", "jane@example.com", "1609545600 +0000"),
+                "5\t3\tanotherfile.py",
+            ]
         )
-        mock_run_git_command.return_value = mock_output
+        mock_stream_git_command.return_value = mock_output
 
         generate_cmds.detailed_git_stats(self.mock_config)
 
@@ -150,13 +169,80 @@ class TestGenerateCmds(unittest.TestCase):
         self.assertTrue(mock_print.called)
         # You can add more detailed assertions based on the expected outputs
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    def test_collect_author_stats_odd_paths(self, mock_stream_git_command):
+        """
+        Test paths with tabs aren't taken for headers, and a renamed file counts once.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [
+                header("c2", "c1", "Alice", "alice@example.com", "1609459300 +0000"),
+                "1\t0\tsrc/new.py\twith tab",
+                "2\t1\t",
+                "src/old.py",
+                "src/new.py",
+                header("c1", "", "Alice", "alice@example.com", "1609459200 +0000"),
+                "5\t0\tsrc/old.py",
+            ]
+        )
+
+        stats, insertions, deletions, files, commits = generate_cmds._collect_author_stats(
+            self.mock_config
+        )
+
+        self.assertEqual((insertions, deletions, files, commits), (8, 1, 2, 2))
+        self.assertEqual(stats["Alice"]["commits"], 2)
+        self.assertEqual(stats["Alice"]["files"], 2)
+
+        # Without rename detection git reports the old path as its own file
+        self.mock_config["renames"] = False
+        mock_stream_git_command.return_value = log_records(
+            [
+                header("c2", "c1", "Alice", "alice@example.com", "1609459300 +0000"),
+                "0\t5\tsrc/old.py",
+                "7\t0\tsrc/new.py",
+                header("c1", "", "Alice", "alice@example.com", "1609459200 +0000"),
+                "5\t0\tsrc/old.py",
+            ]
+        )
+        self.assertEqual(generate_cmds._collect_author_stats(self.mock_config)[3], 2)
+        self.assertIn("--no-renames", mock_stream_git_command.call_args[0][0])
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    def test_collect_author_stats_co_authors(self, mock_stream_git_command):
+        """
+        Test co-authors are credited with the whole commit when enabled,
+        while the totals count it once.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [
+                header("c2", "c1", "Alice", "alice@example.com", "1609459300 +0000")
+                + "\x1fBob <Bob@Example.com>",
+                "3\t1\tsrc/app.py",
+                header("c1", "", "Bob", "bob@example.com", "1609459200 +0000") + "\x1f",
+                "5\t0\tREADME",
+            ]
+        )
+        self.mock_config["co_authors"] = True
+
+        stats, insertions, deletions, files, commits = generate_cmds._collect_author_stats(
+            self.mock_config
+        )
+
+        self.assertEqual((insertions, deletions, files, commits), (8, 1, 2, 2))
+        self.assertEqual(stats["Alice"]["commits"], 1)
+        self.assertEqual(
+            [stats["Bob"][key] for key in ("email", "commits", "insertions", "files")],
+            ["bob@example.com", 2, 8, 2],
+        )
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_detailed_git_stats_no_output(self, mock_print, mock_run_git_command):
+    def test_detailed_git_stats_no_output(self, mock_print, mock_stream_git_command):
         """
         Test detailed_git_stats when git command returns no output.
         """
-        mock_run_git_command.return_value = ""
+        mock_stream_git_command.return_value = log_records([])
 
         generate_cmds.detailed_git_stats(self.mock_config)
 
@@ -254,48 +340,119 @@ class TestGenerateCmds(unittest.TestCase):
         self.assertIn("\tNo changes in the last day.", calls)
         self.assertIn("\t0 commits", calls)
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.input", return_value="")
     @patch("builtins.print")
-    def test_output_daily_stats_csv(self, mock_print, mock_input, mock_run_git_command):
-        """
-        Test output_daily_stats_csv function with sample git output.
-        """
-        mock_run_git_command.return_value = "2021-01-01\n2021-01-01\n2021-01-02\n2021-01-03\n"
+    def test_output_daily_stats_csv(self, mock_print, mock_input, mock_stream_git_command):
+        """
+        Test output_daily_stats_csv aggregates commits per day and per author.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [
+                # 2021-01-02 in UTC, but still 2021-01-01 for this author
+                header("c1", "", "John Doe", "john@example.com", "1609549200 -0500"),
+                "10\t2\ta.py",
+                "1\t1\tb.py",
+                header("c2", "", "Jane Smith", "jane@example.com", "1609502400 +0000"),
+                "5\t0\ta.py",
+                header("c3", "", "Jane Smith", "jane@example.com", "1609588800 +0000"),
+                "-\t-\tlogo.png",
+                # Jane again, under another spelling of their name and email
+                header("c4", "", "jane smith", "Jane@Example.com", "1609495200 +0000"),
+                "1\t0\tc.py",
+            ]
+        )
 
         # Mock open to prevent actual file creation
         with patch("builtins.open", mock_open()) as mocked_file:
             generate_cmds.output_daily_stats_csv(self.mock_config)
 
-            # Check that file was written
-            mocked_file.assert_called_with("git_daily_stats.csv", "w", newline="")
+            mocked_file.assert_any_call(
+                "git_daily_stats.csv", "w", newline="", errors="surrogateescape"
+            )
+            mocked_file.assert_any_call(
+                "git_daily_stats_by_author.csv", "w", newline="", errors="surrogateescape"
+            )
+            written = "".join(call.args[0] for call in mocked_file().write.call_args_list)
+
+        self.assertIn("Date,Commits,Insertions,Deletions\r\n", written)
+        self.assertIn("2021-01-01,3,17,3\r\n", written)
+        self.assertIn("2021-01-02,1,0,0\r\n", written)
+        self.assertIn("2021-01-01,Jane Smith,jane@example.com,2,6,0\r\n", written)
+        self.assertIn("2021-01-01,John Doe,john@example.com,1,11,3\r\n", written)
+        mock_print.assert_any_call("Daily stats saved to git_daily_stats.csv")
+        mock_print.assert_any_call("Daily stats by author saved to git_daily_stats_by_author.csv")
+
+        # Only the fields we aggregate are requested, not full commit bodies
+        called_cmd = mock_stream_git_command.call_args[0][0]
+        self.assertIn("--numstat", called_cmd)
+        self.assertFalse(any("%B" in arg for arg in called_cmd))
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    @patch("builtins.input", return_value="")
+    @patch("builtins.print")
+    def test_output_daily_stats_csv_ignores_authors(
+        self, mock_print, mock_input, mock_stream_git_command
+    ):
+        """
+        Test output_daily_stats_csv drops commits from ignored authors.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [
+                header("c1", "", "Bot", "bot@example.com", "1609502400 +0000"),
+                "100\t0\tgenerated.py",
+                header("c2", "", "Jane Smith", "jane@example.com", "1609502400 +0000"),
+                "5\t0\ta.py",
+            ]
+        )
+        cfg = dict(self.mock_config)
+        cfg["ignore_authors"] = lambda s: "bot@" in s
 
-            # Check that print was called
-            self.assertTrue(mock_print.called)
-            mock_print.assert_any_call("Daily stats saved to git_daily_stats.csv")
+        with patch("builtins.open", mock_open()) as mocked_file:
+            generate_cmds.output_daily_stats_csv(cfg)
+            written = "".join(call.args[0] for call in mocked_file().write.call_args_list)
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+        self.assertIn("2021-01-01,1,5,0\r\n", written)
+        self.assertNotIn("Bot", written)
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.input", return_value="")
     @patch("builtins.print")
-    def test_output_daily_stats_csv_no_data(self, mock_print, mock_input, mock_run_git_command):
+    def test_output_daily_stats_csv_no_data(self, mock_print, mock_input, mock_stream_git_command):
         """
         Test output_daily_stats_csv when git command returns no data.
         """
-        mock_run_git_command.return_value = ""
+        mock_stream_git_command.return_value = log_records([])
 
         generate_cmds.output_daily_stats_csv(self.mock_config)
 
         mock_print.assert_called_once_with("No data available.")
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_save_git_log_output_json(self, mock_print, mock_run_git_command):
+    def test_save_git_log_output_json(self, mock_print, mock_stream_git_command):
         """
         Test save_git_log_output_json function with sample git output.
         """
-        mock_run_git_command.return_value = (
-            "abc123|John Doe|2021-01-01 12:00:00 +0000|Commit message 1\n"
-            "def456|Jane Smith|2021-01-02 13:00:00 +0000|Commit message 2\n"
+        mock_stream_git_command.return_value = log_records(
+            [
+                header(
+                    "abc123",
+                    "",
+                    "John Doe",
+                    "john@example.com",
+                    "1609502400 +0000",
+                    "Commit message 1",
+                ),
+                header(
+                    "def456",
+                    "abc123",
+                    "Jane Smith",
+                    "jane@example.com",
+                    "1609592400 +0000",
+                    "Commit message 2",
+                ),
+            ]
         )
 
         # Mock open to prevent actual file creation
@@ -312,36 +469,107 @@ class TestGenerateCmds(unittest.TestCase):
             data = json.loads(written_data)
             self.assertEqual(len(data), 2)
             self.assertEqual(data[0]["hash"], "abc123")
+            self.assertEqual(data[0]["date"], "2021-01-01 12:00:00 +0000")
+            self.assertEqual(data[1]["message"], "Commit message 2")
+            self.assertNotIn("email", data[0])
 
             # Check that print was called
             self.assertTrue(mock_print.called)
             mock_print.assert_any_call("Git log saved to git_log.json")
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_save_git_log_output_json_no_data(self, mock_print, mock_run_git_command):
+    def test_save_git_log_output_json_ndjson_with_fields(self, mock_print, mock_stream_git_command):
+        """
+        Test save_git_log_output_json writing NDJSON with the extra fields.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [
+                header(
+                    "abc123",
+                    "p1 p2",
+                    "John Doe",
+                    "john@example.com",
+                    "1609502400 +0100",
+                    "Merge it",
+                ),
+                "10\t2\ta.py",
+                "-\t-\timage.png",
+                "",
+                header("def456", "", "Jane Smith", "jane@example.com", "1609592400 +0000", "Init"),
+            ]
+        )
+        cfg = dict(self.mock_config)
+        cfg["json_format"] = "ndjson"
+        cfg["json_fields"] = ["email", "parents", "numstat"]
+
+        with patch("builtins.open", mock_open()) as mocked_file:
+            generate_cmds.save_git_log_output_json(cfg)
+
+            mocked_file.assert_called_with("git_log.ndjson", "w")
+            handle = mocked_file()
+            written_data = "".join(call.args[0] for call in handle.write.call_args_list)
+            records = [json.loads(line) for line in written_data.splitlines()]
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["email"], "john@example.com")
+        self.assertEqual(records[0]["parents"], ["p1", "p2"])
+        self.assertEqual(records[0]["date"], "2021-01-01 13:00:00 +0100")
+        self.assertEqual(
+            (records[0]["insertions"], records[0]["deletions"], records[0]["files"]), (10, 2, 2)
+        )
+        self.assertEqual(records[1]["files"], 0)
+        mock_print.assert_any_call("Git log saved to git_log.ndjson")
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    @patch("builtins.print")
+    def test_save_git_log_output_json_gzip(self, mock_print, mock_stream_git_command):
+        """
+        Test save_git_log_output_json writing a gzipped JSON array.
+        """
+        mock_stream_git_command.return_value = log_records(
+            [header("abc123", "", "John Doe", "john@example.com", "1609502400 +0000")]
+        )
+        cfg = dict(self.mock_config)
+        cfg["json_format"] = "json.gz"
+
+        with patch("git_py_stats.generate_cmds.gzip.open", mock_open()) as mocked_gzip:
+            generate_cmds.save_git_log_output_json(cfg)
+
+            mocked_gzip.assert_called_with("git_log.json.gz", "wt", encoding="utf-8")
+            handle = mocked_gzip()
+            written_data = "".join(call.args[0] for call in handle.write.call_args_list)
+            self.assertEqual(json.loads(written_data)[0]["hash"], "abc123")
+
+        mock_print.assert_any_call("Git log saved to git_log.json.gz")
+
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
+    @patch("builtins.print")
+    def test_save_git_log_output_json_no_data(self, mock_print, mock_stream_git_command):
         """
         Test save_git_log_output_json when git command returns no data.
         """
-        mock_run_git_command.return_value = ""
+        mock_stream_git_command.return_value = log_records([])
 
         generate_cmds.save_git_log_output_json(self.mock_config)
 
         mock_print.assert_called_once_with("No log data available.")
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_detailed_git_stats_handles_invalid_lines(self, mock_print, mock_run_git_command):
+    def test_detailed_git_stats_handles_invalid_lines(self, mock_print, mock_stream_git_command):
         """
         Test detailed_git_stats with invalid lines in git output.
         """
-        mock_output = (
-            "invalid line without tabs\n"
-            "abc123\tJohn Doe\tjohn@example.com\t1609459200\n"
-            "invalid\tdata\n"
-            "5\t3\tfile.py\n"
+        mock_output = log_records(
+            [
+                "invalid line without tabs",
+                header("abc123", "", "John Doe", "john@example.com", "1609459200 +0000"),
+                "invalid\tdata",
+                "5\t3\tfile.py",
+            ]
         )
-        mock_run_git_command.return_value = mock_output
+        mock_stream_git_command.return_value = mock_output
 
         generate_cmds.detailed_git_stats(self.mock_config)
 
@@ -366,28 +594,30 @@ class TestGenerateCmds(unittest.TestCase):
         log_cmd = mock_run_git_command.call_args_list[2][0][0]
         self.assertIn("--author=unknown", log_cmd)
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.input", return_value="")
     @patch("builtins.print")
-    def test_output_daily_stats_csv_io_error(self, mock_print, mock_input, mock_run_git_command):
+    def test_output_daily_stats_csv_io_error(self, mock_print, mock_input, mock_stream_git_command):
         """
         Test output_daily_stats_csv when an IOError occurs during file writing.
         """
-        mock_run_git_command.return_value = "2021-01-01\n2021-01-02"
+        mock_stream_git_command.return_value = log_records(
+            [header("c1", "", "John Doe", "john@example.com", "1609502400 +0000")]
+        )
 
         with patch("builtins.open", side_effect=IOError("Disk full")):
             generate_cmds.output_daily_stats_csv(self.mock_config)
 
             mock_print.assert_any_call("Failed to write to git_daily_stats.csv: Disk full")
 
-    @patch("git_py_stats.generate_cmds.run_git_command")
+    @patch("git_py_stats.commit_stream.stream_git_command_bytes")
     @patch("builtins.print")
-    def test_save_git_log_output_json_io_error(self, mock_print, mock_run_git_command):
+    def test_save_git_log_output_json_io_error(self, mock_print, mock_stream_git_command):
         """
         Test save_git_log_output_json when an IOError occurs during file writing.
         """
-        mock_run_git_command.return_value = (
-            "abc123|John Doe|2021-01-01 12:00:00 +0000|Commit message 1\n"
+        mock_stream_git_command.return_value = log_records(
+            [header("abc123", "", "John Doe", "john@example.com", "1609502400 +0000", "Msg 1")]
         )
 
         with patch("builtins.open", side_effect=IOError("Disk full")):
@@ -396,5 +626,93 @@ class TestGenerateCmds(unittest.TestCase):
             mock_print.assert_any_call("Failed to write to git_log.json: Disk full")
 
 
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestDetailedGitStatsBackends(unittest.TestCase):
+    """
+    Runs the contribution stats on a real repository with every backend.
+    """
+
+    def setUp(self):
+        self.repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.repo)
+        # The same person twice, then someone else, a day apart
+        authors = [("Bob", "bob@x.com"), ("bob", "BOB@x.com"), ("Alice", "alice@x.com")]
+        git(self.repo, "init", "-q")
+        for day, (name, email) in enumerate(authors, 1):
+            with open(os.path.join(self.repo, f"file{day}.txt"), "w") as f:
+                f.write("line\n" * day)
+            date = f"2021-01-0{day}T12:00:00+0000"
+            env = dict(
+                os.environ,
+                GIT_AUTHOR_NAME=name,
+                GIT_AUTHOR_EMAIL=email,
+                GIT_AUTHOR_DATE=date,
+                GIT_COMMITTER_NAME=name,
+                GIT_COMMITTER_EMAIL=email,
+                GIT_COMMITTER_DATE=date,
+            )
+            git(self.repo, "add", ".")
+            git(self.repo, "commit", "-q", "-m", name, env=env)
+
+        cwd = os.getcwd()
+        os.chdir(self.repo)
+        self.addCleanup(os.chdir, cwd)
+        self.config = {
+            "since": "",
+            "until": "",
+            "merges": "--no-merges",
+            "log_options": "",
+            "pathspec": ["--"],
+            "branch": "",
+            "cache_dir": os.path.join(self.repo, ".git", "git-py-stats"),
+        }
+
+    def _printed(self, report, **config):
+        """
+        Returns what 'report' prints, starting from a resolver that hasn't
+        seen anyone yet.
+        """
+        with patch.dict(identity._resolvers, clear=True), patch("atexit.register"), patch(
+            "builtins.print"
+        ) as mock_print:
+            report(dict(self.config, **config))
+        return [call.args[0] if call.args else "" for call in mock_print.call_args_list]
+
+    def _detailed_git_stats(self, backend):
+        """
+        Returns what detailed_git_stats prints with 'backend'.
+        """
+        return self._printed(generate_cmds.detailed_git_stats, backend=backend)
+
+    def test_backends_agree(self):
+        """
+        Test every backend merges the same person and prints the same stats.
+        """
+        printed = self._detailed_git_stats("git")
+
+        self.assertIn("         Bob <BOB@x.com>:", printed)
+        self.assertIn("          commits:       2      (67%)", printed)
+        self.assertNotIn("         Bob <bob@x.com>:", printed)
+        for backend in ("sqlite", "snapshot", "rollup"):
+            with self.subTest(backend=backend):
+                self.assertEqual(self._detailed_git_stats(backend), printed)
+
+    def test_reports_agree_on_names(self):
+        """
+        Test reports that read the log in different orders name a person alike.
+        """
+        reports = (
+            list_cmds.contributors,
+            list_cmds.git_commits_per_author,
+            analyze_cmds.activity_by_author,
+            generate_cmds.detailed_git_stats,
+        )
+        for report in reports:
+            with self.subTest(report=report.__name__):
+                printed = "\n".join(self._printed(report, limit=10, report_format="text"))
+                self.assertIn("Bob", printed)
+                self.assertNotRegex(printed, r"\bbob\b(?!@)")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,20 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
+from io import BytesIO
 import subprocess
+import sys
 
-from git_py_stats.git_operations import run_git_command, check_git_repository
+from git_py_stats.git_operations import (
+    run_git_command,
+    run_git_command_bytes,
+    stream_git_command,
+    stream_git_command_bytes,
+    check_git_repository,
+    resolve_commit,
+    is_ancestor,
+    promisor_remote,
+    fetch_objects,
+)
 
 
 class TestGitOperations(unittest.TestCase):
@@ -29,7 +41,8 @@ class TestGitOperations(unittest.TestCase):
             ["git", "--version"],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
+            encoding="utf-8",
+            errors="surrogateescape",
             check=True,
         )
 
@@ -52,7 +65,8 @@ class TestGitOperations(unittest.TestCase):
             ["git", "invalidcommand"],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
+            encoding="utf-8",
+            errors="surrogateescape",
             check=True,
         )
 
@@ -72,7 +86,12 @@ class TestGitOperations(unittest.TestCase):
         self.assertEqual(output, "")
 
         mock_subprocess_run.assert_called_once_with(
-            ["git", "status"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
+            ["git", "status"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            errors="surrogateescape",
+            check=True,
         )
 
     @patch("subprocess.run")
@@ -87,7 +106,12 @@ class TestGitOperations(unittest.TestCase):
         self.assertIsNone(output)
 
         mock_subprocess_run.assert_called_once_with(
-            ["git", "status"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True
+            ["git", "status"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            errors="surrogateescape",
+            check=True,
         )
 
     def test_run_git_command_empty_command(self):
@@ -97,6 +121,134 @@ class TestGitOperations(unittest.TestCase):
         output = run_git_command([])
         self.assertIsNone(output)
 
+    def _mock_process(self, mock_popen, stdout, stderr="", returncode=0):
+        """
+        Make the patched subprocess.Popen start a stand-in with a file-like
+        stdout pipe that writes 'stderr' to wherever it was sent.
+        """
+        proc = MagicMock()
+        proc.stdout = BytesIO(stdout.encode("utf-8", "surrogateescape"))
+        proc.wait.return_value = returncode
+
+        def start(cmd, **kwargs):
+            kwargs["stderr"].write(stderr.encode())
+            return proc
+
+        mock_popen.side_effect = start
+        return proc
+
+    @patch("subprocess.run")
+    def test_run_git_command_bytes(self, mock_subprocess_run):
+        """
+        Test run_git_command_bytes returns undecoded output, or None on failure.
+        """
+        mock_subprocess_run.return_value = MagicMock(stdout=b"caf\xe9\n")
+        self.assertEqual(run_git_command_bytes(["git", "show", "HEAD:a"]), b"caf\xe9\n")
+        mock_subprocess_run.assert_called_once_with(
+            ["git", "show", "HEAD:a"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+        )
+
+        mock_subprocess_run.side_effect = subprocess.CalledProcessError(1, ["git"])
+        with patch("builtins.print"):
+            self.assertIsNone(run_git_command_bytes(["git", "show", "HEAD:b"]))
+
+    @patch("subprocess.Popen")
+    def test_stream_git_command_yields_lines(self, mock_popen):
+        """
+        Test stream_git_command yields each line without the newline.
+        """
+        self._mock_process(mock_popen, "first\nsecond\n\nlast\n")
+
+        lines = list(stream_git_command(["git", "log"]))
+
+        self.assertEqual(lines, ["first", "second", "", "last"])
+        mock_popen.assert_called_once_with(["git", "log"], stdout=subprocess.PIPE, stderr=ANY)
+
+    @patch("subprocess.Popen")
+    def test_stream_git_command_undecodable(self, mock_popen):
+        """
+        Test bytes that aren't UTF-8 survive decoding and encode back as they were.
+        """
+        self._mock_process(mock_popen, "caf\udce9\nna\u00efve\n")
+
+        lines = list(stream_git_command(["git", "log"]))
+
+        self.assertEqual(lines, ["caf\udce9", "na\u00efve"])
+        self.assertEqual(lines[0].encode("utf-8", "surrogateescape"), b"caf\xe9")
+
+    @patch("git_py_stats.git_operations._STREAM_CHUNK", 4)
+    @patch("subprocess.Popen")
+    def test_stream_git_command_bytes_separator(self, mock_popen):
+        """
+        Test records split on another separator, even across reads.
+        """
+        self._mock_process(mock_popen, "12\tsrc/a.py\x00\x00b\tc\x00tail")
+
+        records = list(stream_git_command_bytes(["git", "log", "-z"], b"\0"))
+
+        self.assertEqual(records, [b"12\tsrc/a.py", b"", b"b\tc", b"tail"])
+
+    @patch("subprocess.Popen")
+    def test_stream_git_command_early_close(self, mock_popen):
+        """
+        Test stream_git_command closes the pipe when the consumer stops early.
+        """
+        proc = self._mock_process(mock_popen, "a\nb\nc\n", returncode=-13)
+
+        with patch("builtins.print") as mock_print:
+            stream = stream_git_command(["git", "log"])
+            self.assertEqual(next(stream), "a")
+            stream.close()
+
+            self.assertTrue(proc.stdout.closed)
+            proc.wait.assert_called_once()
+            mock_print.assert_not_called()
+
+    @patch("subprocess.Popen")
+    def test_stream_git_command_failure(self, mock_popen):
+        """
+        Test stream_git_command reports a failing git command.
+        """
+        self._mock_process(mock_popen, "", "fatal: bad revision", 128)
+
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(list(stream_git_command(["git", "log", "nope"])), [])
+            mock_print.assert_called_once_with(
+                "Error running command: git log nope (fatal: bad revision)"
+            )
+
+    def test_stream_git_command_noisy_stderr(self):
+        """
+        Test a command that writes more to stderr than a pipe holds before
+        its output finishes instead of hanging.
+        """
+        script = "import sys; sys.stderr.write('x' * (1 << 20)); print('done'); sys.exit(1)"
+
+        with patch("builtins.print") as mock_print:
+            lines = list(stream_git_command([sys.executable, "-c", script]))
+
+        self.assertEqual(lines, ["done"])
+        self.assertTrue(mock_print.call_args[0][0].endswith("x" * 10 + ")"))
+
+    @patch("subprocess.Popen")
+    def test_stream_git_command_exception(self, mock_popen):
+        """
+        Test stream_git_command when git cannot be started.
+        """
+        mock_popen.side_effect = OSError("No such file or directory")
+
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(list(stream_git_command(["git", "log"])), [])
+            mock_print.assert_called_once_with(
+                "Unexpected error running command: No such file or directory"
+            )
+
+    def test_stream_git_command_empty_command(self):
+        """
+        Test stream_git_command with an empty command list.
+        """
+        self.assertEqual(list(stream_git_command([])), [])
+
     @patch("git_py_stats.git_operations.run_git_command")
     def test_check_git_repository_true(self, mock_run_git_command):
         """
@@ -169,6 +321,67 @@ class TestGitOperations(unittest.TestCase):
 
         mock_run_git_command.assert_called_once_with(["git", "rev-parse", "--is-inside-work-tree"])
 
+    @patch("git_py_stats.git_operations.run_git_command")
+    def test_resolve_commit(self, mock_run_git_command):
+        """
+        Test resolve_commit peels refs to a commit and maps failures to None.
+        """
+        mock_run_git_command.return_value = "abc123"
+        self.assertEqual(resolve_commit("main"), "abc123")
+        mock_run_git_command.assert_called_once_with(
+            ["git", "rev-parse", "--verify", "-q", "main^{commit}"]
+        )
+
+        mock_run_git_command.return_value = None
+        self.assertIsNone(resolve_commit("nope"))
+
+    @patch("git_py_stats.git_operations.run_git_command")
+    def test_is_ancestor(self, mock_run_git_command):
+        """
+        Test is_ancestor compares the merge base with the ancestor.
+        """
+        mock_run_git_command.return_value = "old"
+        self.assertTrue(is_ancestor("old", "new"))
+
+        mock_run_git_command.return_value = "other"
+        self.assertFalse(is_ancestor("old", "new"))
+
+    @patch("git_py_stats.git_operations.subprocess.run")
+    def test_promisor_remote(self, mock_subprocess_run):
+        """
+        Test promisor_remote finds the remote a partial clone fetches from.
+        """
+        self.addCleanup(promisor_remote.cache_clear)
+        cases = [
+            ("remote.backup.promisor false\nremote.origin.promisor true\n", "origin"),
+            ("extensions.partialclone upstream\nremote.origin.promisor true\n", "upstream"),
+            ("", None),
+        ]
+        for output, expected in cases:
+            promisor_remote.cache_clear()
+            mock_subprocess_run.return_value = MagicMock(stdout=output)
+            self.assertEqual(promisor_remote(), expected)
+
+    @patch("git_py_stats.git_operations.subprocess.run")
+    def test_fetch_objects(self, mock_subprocess_run):
+        """
+        Test fetch_objects asks for every object in one fetch and reports failures.
+        """
+        self.assertTrue(fetch_objects("origin", ["a" * 40, "b" * 40]))
+        args, kwargs = mock_subprocess_run.call_args
+        self.assertEqual(
+            args[0][:5], ["git", "-c", "fetch.negotiationAlgorithm=noop", "fetch", "origin"]
+        )
+        self.assertIn("--stdin", args[0])
+        self.assertEqual(kwargs["input"], "a" * 40 + "\n" + "b" * 40 + "\n")
+
+        mock_subprocess_run.side_effect = subprocess.CalledProcessError(
+            128, ["git", "fetch"], stderr="fatal: no such remote"
+        )
+        with patch("builtins.print") as mock_print:
+            self.assertFalse(fetch_objects("origin", ["a" * 40]))
+        mock_print.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,223 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import identity
+
+MAILMAP = """
+# Comments and blank lines are skipped
+
+Jane Doe <jane@example.com>
+<jane@example.com> <jane@old.example.com>
+Jane Doe <jane@example.com> Jane D <jd@laptop>
+Build Bot <bot@example.com> <ci@example.com> # trailing comment
+"""
+
+
+class TestIdentity(unittest.TestCase):
+    """
+    Unit test class for testing the identity module.
+    """
+
+    def setUp(self):
+        self.mailmap = identity.Mailmap(MAILMAP)
+
+    def test_normalize_email(self):
+        """
+        Test emails are compared without case, whitespace, or brackets.
+        """
+        self.assertEqual(identity.normalize_email(" <Jane@Example.COM> "), "jane@example.com")
+        self.assertEqual(identity.normalize_email(""), "")
+
+    def test_mailmap(self):
+        """
+        Test each form of .mailmap entry the way git applies it.
+        """
+        # Name only
+        self.assertEqual(
+            self.mailmap.map("jane", "JANE@example.com"), ("Jane Doe", "JANE@example.com")
+        )
+        # Email only
+        self.assertEqual(
+            self.mailmap.map("Jane", "jane@old.example.com"), ("Jane", "jane@example.com")
+        )
+        # Name and email, for one commit name only
+        self.assertEqual(self.mailmap.map("jane d", "jd@laptop"), ("Jane Doe", "jane@example.com"))
+        self.assertEqual(self.mailmap.map("Someone", "jd@laptop"), ("Someone", "jd@laptop"))
+        self.assertEqual(self.mailmap.map("ci", "ci@example.com"), ("Build Bot", "bot@example.com"))
+        self.assertEqual(self.mailmap.map("Bob", "bob@example.com"), ("Bob", "bob@example.com"))
+        self.assertFalse(identity.Mailmap("# nothing here\n"))
+
+    def test_resolve(self):
+        """
+        Test ids are handed out in order and shared after the mailmap.
+        """
+        resolver = identity.IdentityResolver(self.mailmap)
+
+        jane = resolver.resolve("Jane D", "jd@laptop")
+        self.assertEqual(jane, 0)
+        self.assertEqual(resolver.resolve("Jane", "jane@old.example.com"), jane)
+        self.assertEqual(resolver.resolve("Jane Doe", "JANE@example.com"), jane)
+        self.assertEqual(resolver.resolve("Bob", ""), 1)
+        self.assertEqual(resolver.resolve("bob", ""), 1)
+        self.assertEqual(len(resolver), 2)
+        self.assertEqual(
+            (resolver.names[jane], resolver.emails[jane]), ("Jane Doe", "jane@example.com")
+        )
+
+    def test_resolve_names(self):
+        """
+        Test a person's name doesn't depend on the order spellings are seen
+        in, and the mailmap's proper name beats any other.
+        """
+        spellings = [("bob", "BOB@example.com"), ("Bob", "bob@example.com")]
+        for order in (spellings, spellings[::-1]):
+            resolver = identity.IdentityResolver(self.mailmap)
+            ids = {resolver.resolve(*spelling) for spelling in order}
+            self.assertEqual(resolver.display_names(ids), {0: "Bob"})
+
+        resolver = identity.IdentityResolver(self.mailmap)
+        jane = resolver.resolve("Al", "jane@old.example.com")
+        self.assertEqual(resolver.names[jane], "Al")
+        self.assertEqual(resolver.resolve("Jane D", "jd@laptop"), jane)
+        self.assertEqual(resolver.names[jane], "Jane Doe")
+        self.assertEqual(resolver.resolve("Aaron", "jane@example.com"), jane)
+        self.assertEqual(resolver.names[jane], "Jane Doe")
+
+    def test_resolve_shared_email(self):
+        """
+        Test people sharing an address the mailmap doesn't know stay apart.
+        """
+        resolver = identity.IdentityResolver(self.mailmap)
+
+        ann = resolver.resolve("Ann", "root@localhost")
+        self.assertNotEqual(resolver.resolve("Ben", "root@localhost"), ann)
+        self.assertEqual(resolver.resolve("ann", "ROOT@localhost"), ann)
+        # The mailmap joins every name at an address it maps to
+        self.assertEqual(
+            resolver.resolve("J", "jane@old.example.com"),
+            resolver.resolve("Jane", "jane@example.com"),
+        )
+
+    def test_resolve_string(self):
+        """
+        Test 'Name <email>' strings, like co-author trailers, resolve too.
+        """
+        resolver = identity.IdentityResolver(self.mailmap)
+
+        self.assertEqual(
+            resolver.resolve_string(" Jane D <jd@laptop> "),
+            resolver.resolve("Jane", "jane@example.com"),
+        )
+        self.assertEqual(resolver.resolve_string("Bob"), resolver.resolve("Bob", ""))
+        self.assertIsNone(resolver.resolve_string("  "))
+
+    def test_resolve_credited(self):
+        """
+        Test co-authors follow the author once each, leaving out ignored ones.
+        """
+        resolver = identity.IdentityResolver(self.mailmap)
+        co_authors = [
+            "Jane D <jd@laptop>",
+            "Bob <bob@example.com>",
+            "Bot",
+            " ",
+            "jane <JANE@example.com>",
+        ]
+
+        credited = resolver.resolve_credited(
+            "Jane", "jane@old.example.com", co_authors, lambda s: s == "Bot"
+        )
+
+        self.assertEqual(credited, [0, resolver.resolve("Bob", "bob@example.com")])
+        self.assertEqual(resolver.resolve_credited("Bob", "bob@example.com"), [credited[1]])
+
+    def test_display_names(self):
+        """
+        Test people sharing a name are told apart by email.
+        """
+        resolver = identity.IdentityResolver()
+        ids = [
+            resolver.resolve("Alex", "alex@a.example.com"),
+            resolver.resolve("Alex", "alex@b.example.com"),
+            resolver.resolve("Sam", "sam@example.com"),
+        ]
+
+        self.assertEqual(
+            resolver.display_names(ids),
+            {0: "Alex <alex@a.example.com>", 1: "Alex <alex@b.example.com>", 2: "Sam"},
+        )
+
+    def test_json_round_trip(self):
+        """
+        Test saved ids come back, unless the mailmap changed.
+        """
+        resolver = identity.IdentityResolver(self.mailmap)
+        resolver.resolve("Bob", "bob@example.com")
+        resolver.resolve("Jane", "jane@example.com")
+        data = json.loads(json.dumps(resolver.to_json()))
+
+        restored = identity.IdentityResolver(identity.Mailmap(MAILMAP))
+        self.assertTrue(restored.load_json(data))
+        self.assertEqual(restored.resolve("Jane D", "jd@laptop"), 1)
+        self.assertFalse(restored.dirty)
+
+        self.assertFalse(identity.IdentityResolver().load_json(data))
+
+    @patch("git_py_stats.identity.read_mailmap")
+    def test_get_resolver_persists(self, mock_read_mailmap):
+        """
+        Test ids are shared for the run and saved to an existing cache dir.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        mock_read_mailmap.side_effect = lambda: identity.Mailmap(MAILMAP)
+        config = {"cache_dir": cache_dir}
+        path = os.path.join(cache_dir, identity.IDENTITIES_NAME)
+
+        with patch.dict(identity._resolvers, clear=True), patch("atexit.register") as mock_register:
+            resolver = identity.get_resolver(config)
+            self.assertIs(identity.get_resolver(config), resolver)
+            resolver.resolve("Bob", "bob@example.com")
+            mock_register.assert_called_once_with(identity.save_resolver, resolver, path)
+            identity.save_resolver(resolver, path)
+
+        with patch.dict(identity._resolvers, clear=True), patch("atexit.register"):
+            self.assertEqual(identity.get_resolver(config).names, ["Bob"])
+
+    @patch("git_py_stats.identity.read_mailmap", return_value=identity.Mailmap())
+    def test_get_resolver_without_cache(self, mock_read_mailmap):
+        """
+        Test nothing is saved when the cache dir doesn't exist.
+        """
+        missing = os.path.join(tempfile.gettempdir(), "git-py-stats-no-such-cache")
+        with patch.dict(identity._resolvers, clear=True), patch("atexit.register") as mock_register:
+            identity.get_resolver({"cache_dir": missing})
+        mock_register.assert_not_called()
+        self.assertFalse(os.path.exists(missing))
+
+    @patch("git_py_stats.identity.run_git_command")
+    def test_read_mailmap(self, mock_run_git_command):
+        """
+        Test the worktree's .mailmap and mailmap.file are both read.
+        """
+        top_level = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, top_level)
+        with open(os.path.join(top_level, ".mailmap"), "w") as f:
+            f.write("Jane Doe <jane@example.com>\n")
+        extra = os.path.join(top_level, "extra-mailmap")
+        with open(extra, "w") as f:
+            f.write("Build Bot <bot@example.com> <ci@example.com>\n")
+        mock_run_git_command.side_effect = [top_level, extra]
+
+        mailmap = identity.read_mailmap()
+
+        self.assertEqual(mailmap.map("jane", "jane@example.com")[0], "Jane Doe")
+        self.assertEqual(mailmap.map("ci", "ci@example.com")[0], "Build Bot")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,7 +16,7 @@ class TestInteractiveMode(unittest.TestCase):
             "until": "--until=2024-12-31",
             "merges": "--no-merges",
             "log_options": "",
-            "pathspec": "--",
+            "pathspec": ["--"],
             "limit": 10,
             "menu_theme": "",
         }
@@ -190,6 +190,55 @@ class TestInteractiveMode(unittest.TestCase):
         interactive_mode.handle_interactive_mode(self.mock_config)
         mock_suggest_reviewers.assert_called_once_with(self.mock_config)
 
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.analyze_cmds.churn_by_directory")
+    def test_option_25(self, mock_churn_by_directory, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["25", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_churn_by_directory.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.analyze_cmds.hotspots")
+    def test_option_26(self, mock_hotspots, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["26", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_hotspots.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.analyze_cmds.cochanges")
+    def test_option_27(self, mock_cochanges, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["27", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_cochanges.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.analyze_cmds.bus_factor")
+    def test_option_28(self, mock_bus_factor, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["28", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_bus_factor.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.analyze_cmds.blame_ownership")
+    def test_option_29(self, mock_blame_ownership, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["29", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_blame_ownership.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.analyze_cmds.activity_by_author")
+    def test_option_30(self, mock_activity_by_author, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["30", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_activity_by_author.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.interactive_mode.interactive_menu")
+    @patch("git_py_stats.calendar_cmds.commits_calendars_all_authors")
+    def test_option_31(self, mock_commits_calendars_all_authors, mock_interactive_menu):
+        mock_interactive_menu.side_effect = ["31", ""]
+        interactive_mode.handle_interactive_mode(self.mock_config)
+        mock_commits_calendars_all_authors.assert_called_once_with(self.mock_config)
+
     @patch("git_py_stats.interactive_mode.interactive_menu")
     @patch("builtins.print")
     def test_invalid_option(self, mock_print, mock_interactive_menu):
@@ -0,0 +1,55 @@
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+
+from git_py_stats import lazy
+
+
+class TestLazy(unittest.TestCase):
+    """
+    Unit test class for testing the lazy module.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmp_dir, "gps_lazy_probe.py"), "w") as f:
+            f.write("import gps_lazy_log\n")
+            f.write("gps_lazy_log.executed.append(1)\n")
+            f.write("VALUE = 42\n")
+        sys.path.insert(0, self.tmp_dir)
+        # The probe appends here when its code actually runs. It lives in
+        # sys.modules so every copy of this test module sees the same list,
+        # whether the runner imports it as 'test_lazy' or from the package.
+        self.log = types.ModuleType("gps_lazy_log")
+        self.log.executed = []
+        sys.modules["gps_lazy_log"] = self.log
+
+    def tearDown(self):
+        sys.path.remove(self.tmp_dir)
+        sys.modules.pop("gps_lazy_probe", None)
+        sys.modules.pop("gps_lazy_log", None)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lazy_import_defers_execution(self):
+        """
+        Test the module only runs when an attribute is first used.
+        """
+        module = lazy.lazy_import("gps_lazy_probe")
+        self.assertEqual(self.log.executed, [])
+        self.assertIs(sys.modules["gps_lazy_probe"], module)
+
+        self.assertEqual(module.VALUE, 42)
+        self.assertEqual(self.log.executed, [1])
+
+    def test_lazy_import_reuses_loaded_module(self):
+        """
+        Test modules that are already imported are returned as they are.
+        """
+        self.assertIs(lazy.lazy_import("git_py_stats.lazy"), lazy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch
 from git_py_stats import list_cmds
+from git_py_stats.config import _build_author_exclusion_filter
+from git_py_stats.identity import IdentityResolver, Mailmap
 
 
 class TestListCmds(unittest.TestCase):
@@ -15,35 +17,68 @@ class TestListCmds(unittest.TestCase):
             "until": "--until=2024-12-31",
             "merges": "--no-merges",
             "log_options": "",
-            "pathspec": "--",
+            "pathspec": ["--"],
             "limit": 10,
         }
+        # A fresh resolver per test, without the mailmap of the repo running the tests
+        self.mailmap = Mailmap()
+        resolver_patch = patch(
+            "git_py_stats.list_cmds.get_resolver",
+            side_effect=lambda _c: IdentityResolver(self.mailmap),
+        )
+        resolver_patch.start()
+        self.addCleanup(resolver_patch.stop)
 
     # Prevent printing to stdout and mock git command output
-    @patch("git_py_stats.list_cmds.run_git_command")
+    @patch("git_py_stats.list_cmds.stream_git_command")
     @patch("git_py_stats.list_cmds.print")
-    def test_branch_tree(self, mock_print, mock_run_git_command) -> None:
+    def test_branch_tree(self, mock_print, mock_stream_git_command) -> None:
         """
         Test case for the branch_tree function.
         """
-        mock_run_git_command.return_value = (
-            "* 12345 Commit message\n"
-            "| * 67890 Another commit message\n"
-            "| * abcde Yet another commit message\n"
+        mock_stream_git_command.return_value = (
+            line
+            for line in [
+                "* 12345 Commit message",
+                "| * 67890 Another commit message",
+                "| * abcde Yet another commit message",
+            ]
         )
 
         list_cmds.branch_tree(self.mock_config)
 
         mock_print.assert_called()
-        mock_run_git_command.assert_called_once()
+        mock_stream_git_command.assert_called_once()
+        self.assertIn("--max-count=10", mock_stream_git_command.call_args[0][0])
 
-    @patch("git_py_stats.list_cmds.run_git_command")
+    @patch("git_py_stats.list_cmds.stream_git_command")
+    @patch("git_py_stats.list_cmds.print")
+    def test_branch_tree_stops_reading(self, mock_print, mock_stream_git_command) -> None:
+        """
+        Test branch_tree hangs up on git after limit * 5 lines.
+        """
+
+        def graph():
+            for i in range(1000):
+                yield f"* line {i}"
+
+        stream = graph()
+        mock_stream_git_command.return_value = stream
+        self.mock_config["limit"] = 2
+
+        list_cmds.branch_tree(self.mock_config)
+
+        self.assertIsNone(stream.gi_frame)
+        mock_print.assert_called_with("* line 9")
+        self.assertEqual(mock_print.call_count, 11)
+
+    @patch("git_py_stats.list_cmds.stream_git_command")
     @patch("git_py_stats.list_cmds.print")
-    def test_branch_tree_no_data(self, mock_print, mock_run_git_command) -> None:
+    def test_branch_tree_no_data(self, mock_print, mock_stream_git_command) -> None:
         """
         Test case for branch_tree with no data.
         """
-        mock_run_git_command.return_value = ""
+        mock_stream_git_command.return_value = (line for line in [])
         list_cmds.branch_tree(self.mock_config)
 
         mock_print.assert_called_with("No data available.")
@@ -73,25 +108,49 @@ class TestListCmds(unittest.TestCase):
 
         mock_print.assert_called_with("No commits found.")
 
-    @patch("git_py_stats.list_cmds.run_git_command")
+    @patch("git_py_stats.list_cmds.stream_git_command")
     @patch("git_py_stats.list_cmds.print")
-    def test_contributors(self, mock_print, mock_run_git_command) -> None:
+    def test_contributors(self, mock_print, mock_stream_git_command) -> None:
         """
         Test case for the contributors function.
         """
-        mock_run_git_command.return_value = "Author1\nAuthor2\nAuthor3\n"
+        mock_stream_git_command.return_value = iter(
+            [
+                "     3\tAuthor1 <author1@example.com>",
+                "     1\tAuthor2 <author2@example.com>",
+                "     2\tauthor1 <AUTHOR1@example.com>",
+            ]
+        )
         list_cmds.contributors(self.mock_config)
 
-        mock_print.assert_called()
-        mock_run_git_command.assert_called_once()
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        # The same email under another spelling of the name is one person
+        self.assertEqual(printed[1:], ["\t1  Author1", "\t2  Author2"])
+        mock_stream_git_command.assert_called_once()
+        self.assertIn("shortlog", mock_stream_git_command.call_args[0][0])
 
-    @patch("git_py_stats.list_cmds.run_git_command")
+    @patch("git_py_stats.list_cmds.stream_git_command")
+    @patch("git_py_stats.list_cmds.print")
+    def test_contributors_limit(self, mock_print, mock_stream_git_command) -> None:
+        """
+        Test contributors keeps the first names alphabetically up to the limit.
+        """
+        mock_stream_git_command.return_value = iter(
+            [f"     1\tAuthor {i:02} <{i}@example.com>" for i in reversed(range(30))]
+        )
+        self.mock_config["limit"] = 3
+        list_cmds.contributors(self.mock_config)
+
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(printed[1:], ["\t1  Author 00", "\t2  Author 01", "\t3  Author 02"])
+
+    @patch("git_py_stats.list_cmds.stream_git_command")
     @patch("git_py_stats.list_cmds.print")
-    def test_contributors_no_data(self, mock_print, mock_run_git_command) -> None:
+    def test_contributors_no_data(self, mock_print, mock_stream_git_command) -> None:
         """
         Test case for contributors with no data.
         """
-        mock_run_git_command.return_value = ""
+        mock_stream_git_command.return_value = iter([])
         list_cmds.contributors(self.mock_config)
 
         mock_print.assert_called_with("No contributors found.")
@@ -103,22 +162,21 @@ class TestListCmds(unittest.TestCase):
         Test case for new_contributors function.
         """
 
-        mock_run_git_command.side_effect = [
-            "author1@example.com|1577854800\n",  # First call output
-            "Author One",  # Second call output
-        ]
+        mock_run_git_command.return_value = (
+            "Author One|author1@example.com|1600000000\n"
+            "Old Timer|old@example.com|1600000000\n"
+            "Old Timer|OLD@example.com|1500000000\n"
+        )
 
         list_cmds.new_contributors(self.mock_config, "2020-01-01")
-        for call in mock_print.call_args_list:
-            print(call)
 
         mock_print.assert_any_call("New contributors since 2020-01-01:\n")
         mock_print.assert_any_call("Author One <author1@example.com>")
+        # The same person under a differently cased email isn't new
+        self.assertEqual(mock_print.call_count, 2)
 
-        self.assertEqual(mock_run_git_command.call_count, 2)
-
-        # Verify the actual calls made to run_git_command.
-        first_call = call(
+        # Names come from the same git log, so it only runs once
+        mock_run_git_command.assert_called_once_with(
             [
                 "git",
                 "-c",
@@ -128,28 +186,29 @@ class TestListCmds(unittest.TestCase):
                 "--no-merges",
                 "--since=2020-01-01",
                 "--until=2024-12-31",
-                "--format=%aE|%at",
+                "--format=%aN|%aE|%at",
                 "--",
             ]
         )
-        second_call = call(
-            [
-                "git",
-                "-c",
-                "log.showSignature=false",
-                "log",
-                "--author=author1@example.com",
-                "--reverse",
-                "--use-mailmap",
-                "--since=2020-01-01",
-                "--until=2024-12-31",
-                "--format=%aN",
-                "--",
-                "-n",
-                "1",
-            ]
+
+    @patch("git_py_stats.list_cmds.run_git_command")
+    @patch("git_py_stats.list_cmds.print")
+    def test_new_contributors_ignored_first_commit(self, mock_print, mock_run_git_command) -> None:
+        """
+        Test someone whose first commit is under an ignored identity isn't
+        listed as new once their later commits aren't ignored.
+        """
+        mock_run_git_command.return_value = (
+            "Old Timer|old@example.com|1600000000\n" "Old Timer|OLD@example.com|1500000000\n"
         )
-        mock_run_git_command.assert_has_calls([first_call, second_call])
+        self.mock_config["ignore_authors"] = _build_author_exclusion_filter("OLD@")
+
+        list_cmds.new_contributors(self.mock_config, "2020-01-01")
+
+        mock_print.assert_called_once_with("No new contributors found since the specified date.")
+        # git must see the ignored commits too, so it isn't asked to drop them
+        called_cmd = mock_run_git_command.call_args[0][0]
+        self.assertFalse(any(arg.startswith("--author") for arg in called_cmd))
 
     @patch("git_py_stats.list_cmds.run_git_command")
     @patch("git_py_stats.list_cmds.print")
@@ -168,11 +227,32 @@ class TestListCmds(unittest.TestCase):
         """
         Test case for git_commits_per_author function.
         """
-        mock_run_git_command.return_value = "Author:Author1 <author1@example.com>\n"
+        mock_run_git_command.return_value = "Author1 <author1@example.com>\x1d\n"
         list_cmds.git_commits_per_author(self.mock_config)
 
         mock_print.assert_called()
         mock_run_git_command.assert_called_once()
+        called_cmd = mock_run_git_command.call_args[0][0]
+        self.assertTrue(any("%(trailers:key=Co-authored-by" in arg for arg in called_cmd))
+
+    @patch("git_py_stats.list_cmds.run_git_command")
+    @patch("git_py_stats.list_cmds.print")
+    def test_git_commits_per_author_co_authors(self, mock_print, mock_run_git_command) -> None:
+        """
+        Test co-authors count for the same person as their own commits.
+        """
+        self.mailmap = Mailmap("Author Two <two@example.com> <two@old.example.com>")
+        mock_run_git_command.return_value = (
+            "Author One <author1@example.com>\x1dA. Two <two@old.example.com>\n"
+            "Author Two <two@example.com>\x1d"
+        )
+
+        list_cmds.git_commits_per_author(self.mock_config)
+
+        printed = [call.args[0].split() for call in mock_print.call_args_list[1:]]
+        self.assertEqual(
+            printed, [["2", "Author", "Two", "66.7%"], ["1", "Author", "One", "33.3%"]]
+        )
 
     @patch("git_py_stats.list_cmds.run_git_command")
     @patch("git_py_stats.list_cmds.print")
@@ -215,10 +295,14 @@ class TestListCmds(unittest.TestCase):
         Test case for git_commits_per_month function.
         """
         mock_run_git_command.return_value = "Jan\nJan\nFeb\n"
+        self.mock_config["pathspec"] = ["--", "src", ":(exclude)src/vendor"]
         list_cmds.git_commits_per_month(self.mock_config)
 
         mock_print.assert_called()
         mock_run_git_command.assert_called_once()
+        # Every pathspec is its own argument, after the '--'
+        called_cmd = mock_run_git_command.call_args[0][0]
+        self.assertEqual(called_cmd[-3:], ["--", "src", ":(exclude)src/vendor"])
 
     @patch("git_py_stats.list_cmds.run_git_command")
     @patch("git_py_stats.list_cmds.print")
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import main
+
+
+class TestMain(unittest.TestCase):
+    """
+    Unit test class for testing the main entry point.
+    """
+
+    @patch("git_py_stats.git_operations.run_git_command")
+    @patch("builtins.print")
+    def test_version_skips_git(self, mock_print, mock_run_git_command):
+        """
+        Test --version and --help exit before any git command runs.
+        """
+        for flag in ("--version", "--help"):
+            with patch("sys.argv", ["git-py-stats", flag]), patch("sys.stdout"):
+                with self.assertRaises(SystemExit) as cm:
+                    main.main()
+            self.assertEqual(cm.exception.code, 0)
+        mock_run_git_command.assert_not_called()
+
+    @patch("git_py_stats.git_operations.check_git_repository", return_value=False)
+    @patch("git_py_stats.config.get_config")
+    @patch("builtins.print")
+    def test_not_a_repository(self, mock_print, mock_get_config, mock_check):
+        """
+        Test main exits with an error outside of a git repository.
+        """
+        with patch("sys.argv", ["git-py-stats", "-T"]):
+            with self.assertRaises(SystemExit) as cm:
+                main.main()
+        self.assertEqual(cm.exception.code, 1)
+        mock_get_config.assert_not_called()
+
+    @patch("git_py_stats.non_interactive_mode.handle_non_interactive_mode")
+    @patch("git_py_stats.git_operations.check_git_repository", return_value=True)
+    @patch("git_py_stats.config.get_config", return_value={"merges": "--no-merges"})
+    def test_non_interactive(self, mock_get_config, mock_check, mock_handle):
+        """
+        Test command-line flags go to the non-interactive mode.
+        """
+        with patch("sys.argv", ["git-py-stats", "-T"]):
+            main.main()
+        args, config = mock_handle.call_args[0]
+        self.assertTrue(args.detailed_git_stats)
+        self.assertEqual(config, {"merges": "--no-merges"})
+
+    @patch("git_py_stats.interactive_mode.handle_interactive_mode")
+    @patch("git_py_stats.git_operations.check_git_repository", return_value=True)
+    @patch("git_py_stats.config.get_config", return_value={})
+    def test_interactive(self, mock_get_config, mock_check, mock_handle):
+        """
+        Test no arguments opens the interactive menu.
+        """
+        with patch("sys.argv", ["git-py-stats"]):
+            main.main()
+        mock_handle.assert_called_once_with({})
+
+    @patch("git_py_stats.interactive_mode.handle_interactive_mode")
+    @patch("git_py_stats.git_operations.check_git_repository", return_value=True)
+    @patch("git_py_stats.config.get_config", return_value={"renames": True})
+    def test_no_renames(self, mock_get_config, mock_check, mock_handle):
+        """
+        Test --no-renames alone turns rename tracking off and still opens the menu.
+        """
+        with patch("sys.argv", ["git-py-stats", "--no-renames"]):
+            main.main()
+        mock_handle.assert_called_once_with({"renames": False})
+
+    @patch("git_py_stats.non_interactive_mode.handle_non_interactive_mode")
+    @patch("git_py_stats.git_operations.check_git_repository", return_value=True)
+    @patch("git_py_stats.config.get_config", return_value={"renames": True})
+    def test_no_renames_with_report(self, mock_get_config, mock_check, mock_handle):
+        """
+        Test --no-renames next to a report flag, on either side, runs the report.
+        """
+        for argv in (["--no-renames", "-C"], ["-C", "--no-renames"]):
+            with self.subTest(argv=argv), patch("sys.argv", ["git-py-stats", *argv]):
+                main.main()
+                args, config = mock_handle.call_args[0]
+                self.assertTrue(args.contributors)
+                self.assertTrue(args.no_renames)
+                self.assertEqual(config, {"renames": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
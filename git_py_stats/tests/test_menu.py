@@ -55,6 +55,18 @@ class TestInteractiveMenu(unittest.TestCase):
         self.assertIn("Suggest:", output)
         self.assertIn("22) Code reviewers (based on git history)", output)
 
+    @patch("builtins.input", return_value="25")
+    @patch("sys.stdout", new_callable=StringIO)
+    def test_default_theme_option_25(self, mock_stdout, mock_input):
+        """
+        Test the interactive_menu with default theme and user selects option '25'.
+        """
+        choice = interactive_menu(self.config_default)
+        self.assertEqual(choice, "25")
+        output = strip_ansi_codes(mock_stdout.getvalue())
+        self.assertIn("Analyze:", output)
+        self.assertIn("25) Churn by directory", output)
+
     @patch("builtins.input", return_value="")
     @patch("sys.stdout", new_callable=StringIO)
     def test_default_theme_exit(self, mock_stdout, mock_input):
@@ -17,7 +17,7 @@ class TestNonInteractiveMode(unittest.TestCase):
             "until": "--until=2024-12-31",
             "merges": "--no-merges",
             "log_options": "",
-            "pathspec": "--",
+            "pathspec": ["--"],
             "limit": 10,
             "menu_theme": "",
         }
@@ -31,6 +31,7 @@ class TestNonInteractiveMode(unittest.TestCase):
             "my_daily_stats": False,
             "csv_output_by_branch": False,
             "json_output": False,
+            "export_sqlite": False,
             "branch_tree": False,
             "branches_by_date": False,
             "contributors": False,
@@ -46,8 +47,19 @@ class TestNonInteractiveMode(unittest.TestCase):
             "commits_by_timezone": False,
             "commits_by_author_by_timezone": None,
             "suggest_reviewers": False,
+            "suggest_reviewers_for_paths": None,
+            "suggest_reviewers_for_diff": None,
             "commits_calendar_by_author": None,
             "commits_heatmap": None,
+            "churn_by_directory": False,
+            "hotspots": False,
+            "cochanges": False,
+            "bus_factor": False,
+            "blame_ownership": False,
+            "activity_by_author": False,
+            "commits_calendars_all_authors": False,
+            "doctor": False,
+            "optimize": False,
         }
 
     @patch("git_py_stats.non_interactive_mode.generate_cmds.detailed_git_stats")
@@ -106,6 +118,30 @@ class TestNonInteractiveMode(unittest.TestCase):
         non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
         mock_save_json.assert_called_once_with(self.mock_config)
 
+    @patch("git_py_stats.non_interactive_mode.commit_db.export_sqlite")
+    def test_export_sqlite(self, mock_export_sqlite):
+        args_dict = self.all_args.copy()
+        args_dict["export_sqlite"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_export_sqlite.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.doctor.repository_doctor")
+    def test_doctor(self, mock_repository_doctor):
+        args_dict = self.all_args.copy()
+        args_dict["doctor"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_repository_doctor.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.doctor.optimize_repository")
+    def test_optimize(self, mock_optimize_repository):
+        args_dict = self.all_args.copy()
+        args_dict["optimize"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_optimize_repository.assert_called_once_with(self.mock_config)
+
     @patch("git_py_stats.non_interactive_mode.calendar_cmds.commits_calendar_by_author")
     def test_commits_calendar_by_author(self, mock_commits_calendar_by_author):
         args_dict = self.all_args.copy()
@@ -242,6 +278,82 @@ class TestNonInteractiveMode(unittest.TestCase):
         non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
         mock_suggest_reviewers.assert_called_once_with(self.mock_config)
 
+    @patch("git_py_stats.non_interactive_mode.suggest_cmds.suggest_reviewers_for_changes")
+    def test_suggest_reviewers_for_paths(self, mock_suggest_reviewers_for_changes):
+        args_dict = self.all_args.copy()
+        args_dict["suggest_reviewers_for_paths"] = ["src/a.py", "docs"]
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_suggest_reviewers_for_changes.assert_called_once_with(
+            self.mock_config, paths=["src/a.py", "docs"]
+        )
+
+    @patch("git_py_stats.non_interactive_mode.suggest_cmds.suggest_reviewers_for_changes")
+    def test_suggest_reviewers_for_diff(self, mock_suggest_reviewers_for_changes):
+        args_dict = self.all_args.copy()
+        args_dict["suggest_reviewers_for_diff"] = "origin/main"
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_suggest_reviewers_for_changes.assert_called_once_with(
+            self.mock_config, diff="origin/main"
+        )
+
+    @patch("git_py_stats.non_interactive_mode.analyze_cmds.churn_by_directory")
+    def test_churn_by_directory(self, mock_churn_by_directory):
+        args_dict = self.all_args.copy()
+        args_dict["churn_by_directory"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_churn_by_directory.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.analyze_cmds.hotspots")
+    def test_hotspots(self, mock_hotspots):
+        args_dict = self.all_args.copy()
+        args_dict["hotspots"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_hotspots.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.analyze_cmds.cochanges")
+    def test_cochanges(self, mock_cochanges):
+        args_dict = self.all_args.copy()
+        args_dict["cochanges"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_cochanges.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.analyze_cmds.bus_factor")
+    def test_bus_factor(self, mock_bus_factor):
+        args_dict = self.all_args.copy()
+        args_dict["bus_factor"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_bus_factor.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.analyze_cmds.blame_ownership")
+    def test_blame_ownership(self, mock_blame_ownership):
+        args_dict = self.all_args.copy()
+        args_dict["blame_ownership"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_blame_ownership.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.analyze_cmds.activity_by_author")
+    def test_activity_by_author(self, mock_activity_by_author):
+        args_dict = self.all_args.copy()
+        args_dict["activity_by_author"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_activity_by_author.assert_called_once_with(self.mock_config)
+
+    @patch("git_py_stats.non_interactive_mode.calendar_cmds.commits_calendars_all_authors")
+    def test_commits_calendars_all_authors(self, mock_commits_calendars_all_authors):
+        args_dict = self.all_args.copy()
+        args_dict["commits_calendars_all_authors"] = True
+        args = Namespace(**args_dict)
+        non_interactive_mode.handle_non_interactive_mode(args, self.mock_config)
+        mock_commits_calendars_all_authors.assert_called_once_with(self.mock_config)
+
     @patch("builtins.print")
     @patch("git_py_stats.non_interactive_mode.ArgumentParser")
     def test_invalid_option(self, mock_argument_parser, mock_print):
@@ -0,0 +1,202 @@
+import shutil
+import tempfile
+import unittest
+
+from git_py_stats import ownership
+from git_py_stats.identity import IdentityResolver
+from git_py_stats.tests.helpers import mocked_history, non_utf8_repo, record
+
+DAY = 86400
+
+
+class TestOwnership(unittest.TestCase):
+    """
+    Unit test class for testing the ownership module.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.conn = ownership.open_index({"cache_dir": self.cache_dir})
+        now = 1700000000
+        # Newest first, like git log
+        self.history = [
+            record("c4", "Bob", now, [(1, 0, "src/app.py")]),
+            record("c3", "Alice", now - 360 * DAY, [(1, 0, "src/app.py")]),
+            record(
+                "c2",
+                "Alice",
+                now - 400 * DAY,
+                [(1, 0, "src/app.py"), (1, 0, "README")],
+            ),
+            record("c1", "Carol", now - 500 * DAY, [(1, 0, "docs/guide.md")]),
+        ]
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.cache_dir)
+
+    def _sync(self, history, tip, ancestor=True):
+        """
+        Sync the index against a mocked history ending at 'tip'.
+        """
+        with mocked_history(ownership, history, tip, ancestor) as mock_iter:
+            added = ownership.sync_index(self.conn)
+        return added, mock_iter
+
+    def test_sync_index_scores(self):
+        """
+        Test a commit counts half as much per half-life it is older.
+        """
+        added, _ = self._sync(self.history, "c4")
+        self.assertEqual(added, 4)
+
+        rows = dict(self.conn.execute("""
+                SELECT a.name, o.score FROM ownership o
+                JOIN paths p ON p.id = o.path_id
+                JOIN authors a ON a.id = o.author_id
+                WHERE p.path = CAST('src/app.py' AS BLOB)
+                """).fetchall())
+        self.assertAlmostEqual(rows["Bob"], 1.0)
+        self.assertAlmostEqual(rows["Alice"], 2**-2 + 2 ** (-400 / 180))
+
+    def test_sync_index_incremental(self):
+        """
+        Test only new commits are read, and scores add up across syncs.
+        """
+        self._sync(self.history[1:], "c3")
+        added, mock_iter = self._sync(self.history[:1], "c4")
+
+        self.assertEqual(added, 1)
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], ["^c3"])
+        commits = self.conn.execute("SELECT SUM(commits) FROM ownership").fetchone()[0]
+        self.assertEqual(commits, 5)
+
+        # Up to date, so git log isn't run at all
+        added, mock_iter = self._sync([], "c4")
+        self.assertEqual(added, 0)
+        mock_iter.assert_not_called()
+
+    def test_sync_index_renames(self):
+        """
+        Test history from before a rename ends up under the file's newest
+        name, whether the rename is in the same scan or a later one.
+        """
+        rename = record("c5", "Dan", 1700000000, [(1, 0, "lib/app.py")])
+        rename = rename._replace(renames=(("src/app.py", "lib/app.py"),))
+
+        def owners(path):
+            return self.conn.execute(
+                """
+                SELECT SUM(o.commits) FROM ownership o JOIN paths p ON p.id = o.path_id
+                WHERE p.path = ?
+                """,
+                (path.encode(),),
+            ).fetchone()[0]
+
+        self._sync([rename] + self.history, "c5")
+        self.assertEqual((owners("lib/app.py"), owners("src/app.py")), (4, None))
+
+        self._sync([], "c9", ancestor=False)
+        self._sync(self.history, "c4")
+        self._sync([rename], "c5")
+        self.assertEqual((owners("lib/app.py"), owners("src/app.py")), (4, None))
+
+        reviewers = ownership.rank_reviewers(self.conn, ["lib/app.py"])
+        self.assertEqual(sorted(r.name for r in reviewers), ["Alice", "Bob", "Dan"])
+
+    def test_sync_index_rewritten_history(self):
+        """
+        Test the index is rebuilt when the old tip is gone.
+        """
+        self._sync(self.history, "c4")
+        _, mock_iter = self._sync(self.history[3:], "c9", ancestor=False)
+
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], [])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM ownership").fetchone()[0], 1)
+
+    def test_sync_index_invalid_ref(self):
+        """
+        Test an unknown ref leaves the index alone.
+        """
+        added, mock_iter = self._sync([], None)
+
+        self.assertIsNone(added)
+        mock_iter.assert_not_called()
+
+    def test_rank_reviewers(self):
+        """
+        Test recent owners rank first and new files use their directory.
+        """
+        self._sync(self.history, "c4")
+
+        reviewers = ownership.rank_reviewers(self.conn, ["src/app.py", "src/new.py"])
+
+        self.assertEqual([r.name for r in reviewers], ["Bob", "Alice"])
+        self.assertEqual(reviewers[0].paths, 2)
+        self.assertEqual(reviewers[1].commits, 4)
+        self.assertAlmostEqual(sum(r.share for r in reviewers), 1.0)
+
+    def test_rank_reviewers_ignore_authors(self):
+        """
+        Test ignored authors are dropped before shares are split.
+        """
+        self._sync(self.history, "c4")
+
+        reviewers = ownership.rank_reviewers(
+            self.conn, ["src/app.py", "docs/guide.md"], lambda s: s == "bob@example.com"
+        )
+
+        self.assertEqual([(r.name, r.share) for r in reviewers], [("Alice", 0.5), ("Carol", 0.5)])
+
+    def test_rank_reviewers_same_person(self):
+        """
+        Test one person committing under two spellings is ranked once.
+        """
+        history = [record("c5", "alice", 1700000000, [(1, 0, "README")], email="ALICE@example.com")]
+        self._sync(history + self.history, "c5")
+
+        reviewers = ownership.rank_reviewers(self.conn, ["README"], resolver=IdentityResolver())
+
+        self.assertEqual([(r.name, r.commits) for r in reviewers], [("Alice", 2)])
+        self.assertAlmostEqual(reviewers[0].share, 1.0)
+
+    def test_rank_reviewers_unknown_path(self):
+        """
+        Test paths outside any known directory have no reviewers.
+        """
+        self._sync(self.history, "c4")
+        self.assertEqual(ownership.rank_reviewers(self.conn, ["lib/other.py"]), [])
+
+    def test_lines_by_directory(self):
+        """
+        Test lines roll up into every directory level.
+        """
+        history = [record("c5", "Dan", 1700000000, [(1, 0, "src/lib/io.py")])]
+        self._sync(history + self.history, "c5")
+
+        directories = ownership.lines_by_directory(self.conn, 1)
+
+        self.assertEqual(directories["."], {"Dan": 1, "Bob": 1, "Alice": 3, "Carol": 1})
+        self.assertEqual(directories["src/"], {"Dan": 1, "Bob": 1, "Alice": 2})
+        self.assertEqual(sorted(directories), [".", "docs/", "src/"])
+
+        directories = ownership.lines_by_directory(self.conn, 2, lambda s: s == "Bob")
+        self.assertEqual(directories["src/lib/"], {"Dan": 1})
+        self.assertNotIn("Bob", directories["src/"])
+
+    @unittest.skipUnless(shutil.which("git"), "git is not installed")
+    def test_non_utf8_path(self):
+        """
+        Test a file name that isn't valid UTF-8 is indexed and looked up.
+        """
+        path = non_utf8_repo(self)
+
+        self.assertEqual(ownership.sync_index(self.conn), 1)
+
+        reviewers = ownership.rank_reviewers(self.conn, [path])
+        self.assertEqual([(r.name, r.commits) for r in reviewers], [("Ann", 1)])
+        self.assertEqual(ownership.lines_by_directory(self.conn, 1), {".": {"Ann": 2}})
+
+
+if __name__ == "__main__":
+    unittest.main()
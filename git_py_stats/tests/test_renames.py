@@ -0,0 +1,59 @@
+import unittest
+
+from git_py_stats.renames import FileIdentities
+from git_py_stats.tests.helpers import record
+
+
+class TestRenames(unittest.TestCase):
+    """
+    Unit test class for testing the renames module.
+    """
+
+    def test_find(self):
+        """
+        Test every old name of a file leads to its newest one, in either order.
+        """
+        identities = FileIdentities()
+        self.assertEqual(identities.find("a.py"), "a.py")
+
+        identities.add_renames([("c.py", "d.py"), ("a.py", "b.py"), ("b.py", "c.py")])
+
+        for path in ("a.py", "b.py", "c.py", "d.py"):
+            self.assertEqual(identities.find(path), "d.py")
+        self.assertEqual(identities.find("other.py"), "other.py")
+        self.assertEqual(len(identities), 3)
+
+    def test_count(self):
+        """
+        Test count folds every name of a file into one.
+        """
+        identities = FileIdentities()
+        self.assertEqual(identities.count([1, 2, 2, 3]), 3)
+
+        identities.add_rename(1, 2)
+        self.assertEqual(identities.count([1, 2, 3]), 2)
+
+    def test_canonical_files(self):
+        """
+        Test commits read newest first land on the file's newest name, and a
+        path reused after a rename stays its own file.
+        """
+        identities = FileIdentities()
+        # a.py was renamed to b.py, then to c.py, and a new a.py came along later
+        history = [
+            record("c4", files=[(1, 0, "a.py")]),
+            record("c3", files=[(2, 0, "c.py")], renames=(("b.py", "c.py"),)),
+            record("c2", files=[(4, 0, "b.py")]),
+            record("c1", files=[(0, 0, "b.py")], renames=(("a.py", "b.py"),)),
+            record("c0", files=[(3, 0, "a.py")]),
+        ]
+
+        files = [identities.canonical_files(commit) for commit in history]
+
+        self.assertEqual(files[0], [(1, 0, "a.py")])
+        self.assertEqual([path for commit in files[1:] for _, _, path in commit], ["c.py"] * 4)
+        self.assertEqual([commit[0][0] for commit in files], [1, 2, 4, 0, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import rollup, snapshot
+from git_py_stats.tests.helpers import mocked_history, record
+
+
+class TestRollup(unittest.TestCase):
+    """
+    Unit test class for testing the rollup module.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.mock_config = {
+            "since": "",
+            "until": "",
+            "merges": "--no-merges",
+            "cache_dir": self.cache_dir,
+        }
+        self.history = [
+            # Fri 2021-01-01 10:00 UTC
+            record("c1", "Alice", 1609495200, [(10, 0, "a.py")]),
+            # Mon 2021-01-04 23:00 -0530, committed the next day in India
+            record(
+                "c2",
+                "Bob",
+                1609821000,
+                [(5, 1, "b.py"), (0, 0, "logo.png")],
+                parents=["c1"],
+                tz="-0530",
+                committed=(1609821000, "+0530"),
+            ),
+            # Mon 2021-01-04 22:40 UTC, a merge
+            record("c3", "Alice", 1609800000, parents=["c1", "c2"]),
+            # Fri 2021-01-01 10:30 UTC, same cell as c1
+            record("c4", "Alice", 1609497000, [(1, 2, "a.py")], parents=["c3"]),
+        ]
+        self.path = os.path.join(self.cache_dir, rollup.ROLLUP_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _sync(self, history, tip, ancestor=True):
+        """
+        Sync the cube against a mocked history ending at 'tip'.
+        """
+        with mocked_history(rollup, history, tip, ancestor) as mock_iter:
+            cube = rollup.sync_rollup(self.mock_config)
+        return cube, mock_iter
+
+    def test_round_trip(self):
+        """
+        Test commits sharing a cell are summed and the cube survives a reload.
+        """
+        cube, _ = self._sync(self.history, "c4")
+
+        self.assertEqual(len(cube), 3)
+        self.assertEqual(list(cube.cells["commits"]), [2, 1, 1])
+        self.assertEqual(list(cube.cells["insertions"]), [11, 0, 5])
+        self.assertEqual(list(cube.cells["local_shift"]), [0, 0, 6])
+        self.assertEqual(list(cube.cells["author_day_shift"]), [0, 0, -1])
+        self.assertEqual(list(cube.days["day"]), [18628, 18631, 18632])
+        self.assertEqual(list(cube.days["first_cell"]), [0, 1, 2, 3])
+        self.assertEqual(list(cube.days["commits"]), [0, 2, 3, 4])
+        self.assertEqual(list(cube.days["merges"]), [0, 0, 1, 1])
+
+        loaded = rollup.load_rollup(self.path)
+        self.assertEqual(loaded.cells, cube.cells)
+        self.assertEqual(loaded.days, cube.days)
+        self.assertEqual(
+            loaded.authors, [("Alice", "alice@example.com"), ("Bob", "bob@example.com")]
+        )
+        self.assertEqual(loaded.tip, "c4")
+
+    def test_sync_incremental(self):
+        """
+        Test only commits after the stored tip are read and added in.
+        """
+        cube, mock_iter = self._sync(self.history[:3], "c3")
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], [])
+
+        cube, mock_iter = self._sync(self.history[3:], "c4")
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], ["^c3"])
+        self.assertEqual(list(cube.cells["commits"]), [2, 1, 1])
+
+        # Up to date, so git log isn't run at all
+        cube, mock_iter = self._sync([], "c4")
+        mock_iter.assert_not_called()
+        self.assertEqual(len(cube), 3)
+
+        # Rewritten history starts over
+        cube, _ = self._sync(self.history[:1], "c9", ancestor=False)
+        self.assertEqual(list(cube.cells["commits"]), [1])
+
+    def test_load_rollup_invalid(self):
+        """
+        Test missing, foreign, or truncated files are not loaded.
+        """
+        self.assertIsNone(rollup.load_rollup(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a cube at all")
+        self.assertIsNone(rollup.load_rollup(self.path))
+
+        self._sync(self.history, "c4")
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        self.assertIsNone(rollup.load_rollup(self.path))
+
+    def test_count_commits(self):
+        """
+        Test count_commits groups like the git log based reports.
+        """
+        cube, _ = self._sync(self.history, "c4")
+
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "author"),
+            {("Alice", "alice@example.com"): 2, ("Bob", "bob@example.com"): 1},
+        )
+        # Bob's author date is still the 4th where he was
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "date"),
+            {"2021-01-01": 2, "2021-01-04": 1},
+        )
+        # ...but he committed on the 5th at 10:00 in India
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "weekday"), {"Fri": 2, "Tue": 1}
+        )
+        self.assertEqual(rollup.count_commits(cube, self.mock_config, "hour"), {"10": 3})
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "timezone"), {"+0000": 2, "-0530": 1}
+        )
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "calendar"), {(5, 1): 2, (1, 1): 1}
+        )
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "author", author="Bob <"),
+            {("Bob", "bob@example.com"): 1},
+        )
+
+        self.mock_config["merges"] = "--merges"
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "author"),
+            {("Alice", "alice@example.com"): 1},
+        )
+
+    def test_count_commits_window(self):
+        """
+        Test windows select whole hours, from the config or given bounds.
+        """
+        cube, _ = self._sync(self.history, "c4")
+
+        # 10:15 to 10:20 still takes all of the 10:00 hour
+        bounds = (1609496100, 1609496400)
+        self.assertEqual(
+            rollup.count_commits(cube, self.mock_config, "author", bounds=bounds),
+            {("Alice", "alice@example.com"): 2},
+        )
+
+        with patch("git_py_stats.rollup.resolve_date_bounds", return_value=(1609545600, None)):
+            self.assertEqual(
+                rollup.count_commits(cube, self.mock_config, "author"),
+                {("Bob", "bob@example.com"): 1},
+            )
+
+    def test_totals(self):
+        """
+        Test totals over whole and partial days.
+        """
+        cube, _ = self._sync(self.history, "c4")
+
+        self.assertEqual(rollup.totals(cube, self.mock_config), (3, 16, 3))
+        self.assertEqual(
+            rollup.totals(cube, self.mock_config, (1609459200, 1609545599)), (2, 11, 2)
+        )
+        self.assertEqual(
+            rollup.totals(cube, self.mock_config, (1609495200, 1609834000)), (3, 16, 3)
+        )
+        self.assertEqual(rollup.totals(cube, self.mock_config, (None, 1609496000)), (2, 11, 2))
+
+        self.mock_config["merges"] = ""
+        self.assertEqual(rollup.totals(cube, self.mock_config, (1609459200, None)), (4, 16, 3))
+
+    def test_matches_snapshot(self):
+        """
+        Test the cube counts exactly like the per-commit snapshot.
+        """
+        rng = random.Random(7)
+        zones = ["+0000", "-0800", "+0530", "+0945", "-0330", "+1400"]
+        history = []
+        for i in range(500):
+            committed = 1600000000 + i * 3911
+            history.append(
+                record(
+                    f"c{i}",
+                    f"Dev {rng.randrange(5)}",
+                    committed - rng.randrange(0, 200000),
+                    [(rng.randrange(20), rng.randrange(20), "f.py")],
+                    parents=[f"c{i - 1}"] * rng.choice([1, 1, 1, 2]),
+                    tz=rng.choice(zones),
+                    committed=(committed, rng.choice(zones)),
+                )
+            )
+        cube, _ = self._sync(history, "c499")
+        with patch("git_py_stats.snapshot.resolve_commit", return_value="c499"), patch(
+            "git_py_stats.snapshot.iter_commits", return_value=iter(history)
+        ):
+            snap = snapshot.sync_snapshot(self.mock_config)
+
+        for group in ("author", "date", "year", "month", "weekday", "hour", "timezone", "calendar"):
+            # Whole hours, since that's as fine as the cube goes
+            for bounds in (None, (1599998400 + 3600 * 100, 1599998400 + 3600 * 300 - 1)):
+                self.assertEqual(
+                    rollup.count_commits(cube, self.mock_config, group, "Dev [12]", bounds),
+                    snapshot.count_commits(snap, self.mock_config, group, "Dev [12]", bounds),
+                    group,
+                )
+        snap.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
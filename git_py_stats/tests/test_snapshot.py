@@ -0,0 +1,218 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from git_py_stats import snapshot
+from git_py_stats.identity import IdentityResolver, Mailmap
+from git_py_stats.tests.helpers import mocked_history, record
+
+# Alice committed under two emails
+MAILMAP = Mailmap("Alice <alice@new.com> <alice@old.com>")
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Unit test class for testing the snapshot module.
+    """
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.mock_config = {
+            "since": "",
+            "until": "",
+            "merges": "--no-merges",
+            "cache_dir": self.cache_dir,
+        }
+        # Oldest first, like git log --reverse
+        self.history = [
+            record("c1", "Alice", 1609495200, [(10, 0, "a.py")], email="alice@old.com"),
+            record(
+                "c2",
+                "Bob",
+                1609821000,
+                [(5, 1, "b.py"), (0, 0, "logo.png")],
+                parents=["c1"],
+                email="",
+                tz="-0530",
+            ),
+            record("c3", "Alice", 1609800000, parents=["c1", "c2"], email="alice@new.com"),
+        ]
+        self.path = os.path.join(self.cache_dir, snapshot.SNAPSHOT_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _sync(self, history, tip, ancestor=True):
+        """
+        Sync the snapshot against a mocked history ending at 'tip'.
+        """
+        with mocked_history(snapshot, history, tip, ancestor) as mock_iter:
+            snap = snapshot.sync_snapshot(self.mock_config)
+        return snap, mock_iter
+
+    def test_round_trip(self):
+        """
+        Test columns and strings survive being written and mapped back in.
+        """
+        snap, _ = self._sync(self.history, "c3")
+
+        self.assertEqual(len(snap), 3)
+        self.assertEqual(snap.tip, "c3")
+        self.assertEqual(list(snap.columns["author_time"]), [1609495200, 1609821000, 1609800000])
+        self.assertEqual(list(snap.columns["author_offset"]), [0, -19800, 0])
+        self.assertEqual(list(snap.columns["parent_count"]), [0, 1, 2])
+        self.assertEqual(list(snap.columns["file_offsets"]), [0, 1, 3, 3])
+        self.assertEqual(list(snap.columns["insertions"]), [10, 5, 0])
+        self.assertEqual(
+            [snap.author_email(i) for i in range(3)], ["alice@old.com", "", "alice@new.com"]
+        )
+        snap.close()
+
+    def test_sync_incremental(self):
+        """
+        Test only commits after the stored tip are read from git.
+        """
+        snap, mock_iter = self._sync(self.history[:2], "c2")
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], ["--reverse"])
+        snap.close()
+
+        snap, mock_iter = self._sync(self.history[2:], "c3")
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], ["--reverse", "^c2"])
+        self.assertEqual(len(snap), 3)
+        self.assertEqual(list(snap.columns["author_id"]), [0, 1, 2])
+        self.assertEqual(list(snap.columns["file_offsets"]), [0, 1, 3, 3])
+        snap.close()
+
+        # Up to date, so git log isn't run at all
+        snap, mock_iter = self._sync([], "c3")
+        mock_iter.assert_not_called()
+        self.assertEqual(len(snap), 3)
+        snap.close()
+
+    def test_sync_rewritten_history(self):
+        """
+        Test the snapshot is rebuilt when the old tip is gone.
+        """
+        snap, _ = self._sync(self.history[:2], "c2")
+        snap.close()
+
+        snap, mock_iter = self._sync(self.history[:1], "c9", ancestor=False)
+        self.assertEqual(mock_iter.call_args.kwargs["extra_args"], ["--reverse"])
+        self.assertEqual(len(snap), 1)
+        snap.close()
+
+    def test_load_snapshot_invalid(self):
+        """
+        Test missing or foreign files are not loaded.
+        """
+        self.assertIsNone(snapshot.load_snapshot(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot at all")
+        self.assertIsNone(snapshot.load_snapshot(self.path))
+
+    def test_count_commits(self):
+        """
+        Test count_commits groups like the git log based reports.
+        """
+        snap, _ = self._sync(self.history, "c3")
+
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "author"),
+            {("Alice", "alice@old.com"): 1, ("Bob", ""): 1},
+        )
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "date"),
+            {"2021-01-01": 1, "2021-01-04": 1},
+        )
+        self.assertEqual(snapshot.count_commits(snap, self.mock_config, "hour"), {"10": 1, "23": 1})
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "weekday"), {"Fri": 1, "Mon": 1}
+        )
+        self.assertEqual(snapshot.count_commits(snap, self.mock_config, "year"), {"2021": 2})
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "timezone"), {"+0000": 1, "-0530": 1}
+        )
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "calendar"), {(5, 1): 1, (1, 1): 1}
+        )
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "author", author="Bob"), {("Bob", ""): 1}
+        )
+
+        self.mock_config["merges"] = "--merges"
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "author"),
+            {("Alice", "alice@new.com"): 1},
+        )
+        snap.close()
+
+    @patch("git_py_stats.commit_db.run_git_command")
+    def test_count_commits_date_bounds(self, mock_run_git_command):
+        """
+        Test the since and until bounds come from git rev-parse.
+        """
+        snap, _ = self._sync(self.history, "c3")
+        self.mock_config["until"] = "--until=2021-01-02"
+        mock_run_git_command.return_value = "--min-age=1609545600"
+
+        self.assertEqual(
+            snapshot.count_commits(snap, self.mock_config, "author"),
+            {("Alice", "alice@old.com"): 1},
+        )
+        snap.close()
+
+    def test_author_stats(self):
+        """
+        Test author_stats totals and picks the most recent email.
+        """
+        snap, _ = self._sync(self.history, "c3")
+        self.mock_config["merges"] = ""
+
+        stats, insertions, deletions, files, commits = snapshot.author_stats(
+            snap, self.mock_config, IdentityResolver(MAILMAP)
+        )
+
+        self.assertEqual((insertions, deletions, files, commits), (15, 1, 3, 3))
+        self.assertEqual(stats["Alice"]["email"], "alice@new.com")
+        self.assertEqual(stats["Alice"]["commits"], 2)
+        self.assertEqual(stats["Alice"]["files"], 1)
+        self.assertEqual(stats["Bob"]["lines_changed"], 6)
+        self.assertEqual(stats["Bob"]["first_commit"], 1609821000)
+        snap.close()
+
+    def test_author_stats_renames(self):
+        """
+        Test a renamed file counts once unless rename tracking is off.
+        """
+        history = self.history + [
+            record(
+                "c4", "Bob", 1609900000, [(1, 0, "src/a.py")], parents=["c3"], email=""
+            )._replace(renames=(("a.py", "src/a.py"),)),
+            record(
+                "c5",
+                "Alice",
+                1609900100,
+                [(2, 1, "src/a.py")],
+                parents=["c4"],
+                email="alice@new.com",
+            ),
+        ]
+        snap, _ = self._sync(history, "c5")
+
+        stats, _, _, files, _ = snapshot.author_stats(
+            snap, self.mock_config, IdentityResolver(MAILMAP)
+        )
+        self.assertEqual((files, stats["Alice"]["files"], stats["Bob"]["files"]), (3, 1, 3))
+
+        self.mock_config["renames"] = False
+        stats, _, _, files, _ = snapshot.author_stats(
+            snap, self.mock_config, IdentityResolver(MAILMAP)
+        )
+        self.assertEqual((files, stats["Alice"]["files"]), (4, 2))
+        snap.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
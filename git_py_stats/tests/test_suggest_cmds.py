@@ -1,7 +1,17 @@
 import unittest
 from unittest.mock import patch
 
-from git_py_stats import suggest_cmds
+from git_py_stats import ownership, suggest_cmds
+from git_py_stats.identity import IdentityResolver
+
+
+def _stream(output):
+    """
+    Mimic stream_git_command yielding a '%aN|%aE' line for each name in
+    'output', with an email made up from the name.
+    """
+    for name in (output or "").splitlines():
+        yield f"{name}|{name.strip().lower()}@example.com" if name.strip() else name
 
 
 class TestSuggestCmds(unittest.TestCase):
@@ -16,17 +26,23 @@ class TestSuggestCmds(unittest.TestCase):
             "until": "--until=2024-12-31",
             "merges": "--no-merges",
             "log_options": "",
-            "pathspec": "--",
+            "pathspec": ["--"],
         }
+        # A fresh resolver per test, without the mailmap of the repo running the tests
+        resolver_patch = patch(
+            "git_py_stats.suggest_cmds.get_resolver", side_effect=lambda _c: IdentityResolver()
+        )
+        resolver_patch.start()
+        self.addCleanup(resolver_patch.stop)
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_normal_case(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_normal_case(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers with typical git output.
         """
         # Mock git command output with multiple authors
-        mock_run_git_command.return_value = "Alice\nBob\nAlice\nCharlie\nBob\nBob\n"
+        mock_stream_git_command.return_value = _stream("Alice\nBob\nAlice\nCharlie\nBob\nBob\n")
 
         # Expected output after processing
 
@@ -39,12 +55,28 @@ class TestSuggestCmds(unittest.TestCase):
         mock_print.assert_any_call("      1 Charlie")
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_no_output(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_same_person(self, mock_stream_git_command, mock_print):
+        """
+        Test one person under differently cased names and emails counts once.
+        """
+        mock_stream_git_command.return_value = (
+            line for line in ["Bob|bob@x.com", "bob|BOB@x.com", "Alice|alice@x.com"]
+        )
+
+        suggest_cmds.suggest_reviewers(self.mock_config)
+
+        mock_print.assert_any_call("      2 Bob")
+        mock_print.assert_any_call("      1 Alice")
+        self.assertEqual(mock_print.call_count, 3)
+
+    @patch("git_py_stats.suggest_cmds.print")
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_no_output(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers when git command returns no output.
         """
-        mock_run_git_command.return_value = ""
+        mock_stream_git_command.return_value = _stream("")
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -52,12 +84,12 @@ class TestSuggestCmds(unittest.TestCase):
         mock_print.assert_called_once_with("No data available.")
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_no_authors_found(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_no_authors_found(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers when no authors are found after processing.
         """
-        mock_run_git_command.return_value = "\n"  # Only newline characters
+        mock_stream_git_command.return_value = _stream("\n")  # Only newline characters
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -65,12 +97,12 @@ class TestSuggestCmds(unittest.TestCase):
         mock_print.assert_called_once_with("No potential reviewers found.")
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_single_author(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_single_author(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers with only one author in git output.
         """
-        mock_run_git_command.return_value = "Alice\nAlice\nAlice\n"
+        mock_stream_git_command.return_value = _stream("Alice\nAlice\nAlice\n")
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -79,12 +111,12 @@ class TestSuggestCmds(unittest.TestCase):
         mock_print.assert_any_call("      3 Alice")
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_handles_exceptions(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_handles_exceptions(self, mock_stream_git_command, mock_print):
         """
-        Test suggest_reviewers when run_git_command returns None (simulating an exception).
+        Test suggest_reviewers when git fails and the stream yields nothing.
         """
-        mock_run_git_command.return_value = None
+        mock_stream_git_command.return_value = _stream(None)
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -92,14 +124,14 @@ class TestSuggestCmds(unittest.TestCase):
         mock_print.assert_called_once_with("No data available.")
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_large_number_of_authors(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_large_number_of_authors(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers with more than 100 authors.
         """
         # Create a list of 150 authors
         authors = [f"Author_{i%10}" for i in range(150)]  # 10 unique authors repeated
-        mock_run_git_command.return_value = "\n".join(authors)
+        mock_stream_git_command.return_value = _stream("\n".join(authors))
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -121,12 +153,12 @@ class TestSuggestCmds(unittest.TestCase):
             mock_print.assert_any_call(line)
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_authors_with_same_count(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_authors_with_same_count(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers when authors have the same commit count.
         """
-        mock_run_git_command.return_value = "Bob\nAlice\nCharlie\nBob\nAlice\nCharlie\n"
+        mock_stream_git_command.return_value = _stream("Bob\nAlice\nCharlie\nBob\nAlice\nCharlie\n")
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -144,12 +176,12 @@ class TestSuggestCmds(unittest.TestCase):
             mock_print.assert_any_call(line)
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_non_standard_characters(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_non_standard_characters(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers with author names containing non-standard characters.
         """
-        mock_run_git_command.return_value = "José\nMüller\n李四\nO'Connor\nJosé\n"
+        mock_stream_git_command.return_value = _stream("José\nMüller\n李四\nO'Connor\nJosé\n")
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -166,12 +198,12 @@ class TestSuggestCmds(unittest.TestCase):
             mock_print.assert_any_call(line)
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_handles_empty_lines(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_handles_empty_lines(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers when git output contains empty lines.
         """
-        mock_run_git_command.return_value = "Alice\n\nBob\n\nAlice\n"
+        mock_stream_git_command.return_value = _stream("Alice\n\nBob\n\nAlice\n")
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -186,12 +218,12 @@ class TestSuggestCmds(unittest.TestCase):
             mock_print.assert_any_call(line)
 
     @patch("git_py_stats.suggest_cmds.print")
-    @patch("git_py_stats.suggest_cmds.run_git_command")
-    def test_suggest_reviewers_handles_whitespace(self, mock_run_git_command, mock_print):
+    @patch("git_py_stats.suggest_cmds.stream_git_command")
+    def test_suggest_reviewers_handles_whitespace(self, mock_stream_git_command, mock_print):
         """
         Test suggest_reviewers when author names have leading/trailing whitespace.
         """
-        mock_run_git_command.return_value = "  Alice  \nBob\nAlice\n"
+        mock_stream_git_command.return_value = _stream("  Alice  \nBob\nAlice\n")
 
         suggest_cmds.suggest_reviewers(self.mock_config)
 
@@ -206,6 +238,66 @@ class TestSuggestCmds(unittest.TestCase):
         for line in expected_output[1:]:
             mock_print.assert_any_call(line)
 
+    @patch("git_py_stats.suggest_cmds.print")
+    @patch("git_py_stats.suggest_cmds.ownership")
+    @patch("git_py_stats.suggest_cmds.run_git_command")
+    def test_suggest_reviewers_for_paths(self, mock_run_git_command, mock_ownership, mock_print):
+        """
+        Test paths given from a subdirectory are looked up from the top.
+        """
+        mock_run_git_command.return_value = "src/"
+        mock_ownership.rank_reviewers.return_value = [
+            ownership.Reviewer("Alice", 0.75, 2, 9, 1700000000),
+        ]
+        conn = mock_ownership.open_index.return_value
+
+        suggest_cmds.suggest_reviewers_for_changes(self.mock_config, paths=["app.py", "../docs/"])
+
+        mock_ownership.sync_index.assert_called_once_with(conn, "HEAD")
+        self.assertEqual(mock_ownership.rank_reviewers.call_args.args[1], ["src/app.py", "docs"])
+        conn.close.assert_called_once()
+        mock_print.assert_any_call("Suggested code reviewers for 2 changed path(s):")
+        self.assertIn("Alice", mock_print.call_args.args[0])
+        self.assertIn("75.0%", mock_print.call_args.args[0])
+
+    @patch("git_py_stats.suggest_cmds.print")
+    @patch("git_py_stats.suggest_cmds.ownership")
+    @patch("git_py_stats.suggest_cmds.run_git_command")
+    def test_suggest_reviewers_for_diff(self, mock_run_git_command, mock_ownership, mock_print):
+        """
+        Test a revision is compared from its merge base, and ranges as given.
+        """
+        mock_run_git_command.return_value = "src/app.py\nREADME\n"
+        mock_ownership.rank_reviewers.return_value = []
+
+        suggest_cmds.suggest_reviewers_for_changes(self.mock_config, diff="origin/main")
+        mock_run_git_command.assert_called_once_with(
+            ["git", "diff", "--name-only", "origin/main...HEAD", "--"]
+        )
+        self.assertEqual(mock_ownership.rank_reviewers.call_args.args[1], ["src/app.py", "README"])
+        mock_print.assert_called_once_with("No potential reviewers found.")
+
+        suggest_cmds.suggest_reviewers_for_changes(self.mock_config, diff="v1.0..v2.0")
+        self.assertEqual(mock_run_git_command.call_args.args[0][3], "v1.0..v2.0")
+
+    @patch("git_py_stats.suggest_cmds.print")
+    @patch("git_py_stats.suggest_cmds.ownership")
+    @patch("git_py_stats.suggest_cmds.run_git_command")
+    def test_suggest_reviewers_for_diff_no_changes(
+        self, mock_run_git_command, mock_ownership, mock_print
+    ):
+        """
+        Test nothing is indexed when the diff is empty or invalid.
+        """
+        mock_run_git_command.return_value = ""
+        suggest_cmds.suggest_reviewers_for_changes(self.mock_config, diff="HEAD")
+        mock_print.assert_called_once_with("No changed paths found.")
+
+        mock_run_git_command.return_value = None
+        suggest_cmds.suggest_reviewers_for_changes(self.mock_config, diff="nope")
+        mock_print.assert_called_with("Could not diff against 'nope'.")
+        mock_ownership.open_index.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
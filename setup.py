@@ -1,12 +1,18 @@
+import re
+
 from setuptools import setup, find_packages
 
 # Read the long description from README
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
+# Read the version without importing the package
+with open("git_py_stats/__init__.py", "r", encoding="utf-8") as fh:
+    version = re.search(r'__version__ = "([^"]+)"', fh.read()).group(1)
+
 setup(
     name="git-py-stats",
-    version="0.2.0",
+    version=version,
     packages=find_packages(exclude=("git_py_stats.tests", "git_py_stats.tests.*")),
     entry_points={
         "console_scripts": [